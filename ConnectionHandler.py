@@ -258,14 +258,16 @@ class ScripterModuleMixin:
             self._WrappedInterface.SubscribeStatus('ConnectionStatus', None,
                                                    self._NewConnectionStatus)
 
-    def _SubscribeStatus(self, command, qualifier, callback):
+    def _SubscribeStatus(self, command, qualifier, callback, **kwargs):
         # Passes status subscriptions down to the wrapped interface except for
         # ConnectionStatus. ConnectionStatus subscription is instead handled in
-        # this class.
+        # this class. Extra keyword arguments, such as a module's subscription
+        # Mode, are passed through unchanged.
         if command == 'ConnectionStatus':
             self._Subscriptions[command] = callback
         else:
-            self._WrappedInterface.SubscribeStatus(command, qualifier, callback)
+            self._WrappedInterface.SubscribeStatus(command, qualifier, callback,
+                                                   **kwargs)
 
 
 class ConnectionHandler:
@@ -0,0 +1,916 @@
+import re
+from collections.abc import Mapping
+from operator import itemgetter
+from threading import Lock
+from time import monotonic
+from extronlib.system import Wait
+
+
+class MatchDispatcher:
+    """
+    CLASS: MatchDispatcher
+    PARAMETERS: None
+
+    Compiles every registered match string into a single alternation so the receive buffer is scanned once,
+    left to right, instead of once per registered pattern. Each hit is re-matched with its own compiled pattern
+    so callbacks receive the same match object (group numbers, spans) as the per-pattern engine.
+
+    METHODS:
+        Add(regex, callback, arg)
+            Registers a compiled pattern. Duplicate patterns are ignored, the same as AddMatchString.
+        Dispatch(buffer, *owner)
+            Calls back every match in buffer in stream order. Returns the end index of the last match (0 if none).
+            When owner is given it is passed as the first argument, for callbacks shared through a MatchTable.
+    """
+    def __init__(self):
+        self.__entries = {}         # compiled pattern -> {'callback', 'para'}, in registration order
+        self.__combined = None      # the alternation of all entries, rebuilt lazily after Add
+        self.__groupMap = {}        # combined group index -> (pattern, entry)
+
+    def Add(self, regex, callback, arg):
+        if regex not in self.__entries:
+            self.__entries[regex] = {'callback': callback, 'para': arg}
+            self.__combined = None
+
+    def __Compile(self):
+        parts = []
+        groupMap = {}
+        groupIndex = 1
+        for regex, entry in self.__entries.items():
+            # The empty marker group closes last, so lastindex identifies the pattern. Keeping the pattern's own
+            # first token at the head of its branch lets the regex engine skip branches on the first byte.
+            parts.append(b'(?:' + regex.pattern + b')()')
+            groupIndex += regex.groups
+            groupMap[groupIndex] = (regex, entry)
+            groupIndex += 1
+        self.__groupMap = groupMap
+        self.__combined = re.compile(b'|'.join(parts)) if parts else None
+
+    def Dispatch(self, buffer, *owner):
+        if self.__combined is None:
+            self.__Compile()
+            if self.__combined is None:
+                return 0
+
+        # Collect the hits first so no scanner holds an export on a bytearray buffer while callbacks run.
+        groupMap = self.__groupMap
+        index = 0
+        for hit in list(self.__combined.finditer(buffer)):
+            regex, entry = groupMap[hit.lastindex]
+            result = regex.match(buffer, hit.start())
+            entry['callback'](*owner, result, entry['para'])
+            index = hit.end()
+        return index
+
+
+class MatchTable:
+    """
+    CLASS: MatchTable
+    PARAMETERS: None
+
+    A table of match strings built once per driver class and shared by every instance. Callbacks are the class's
+    plain functions (DeviceClass.__MatchX), so they are called with the driver instance as the first argument.
+    Patterns that depend on instance data stay in the instance's own AddMatchString dictionary.
+
+    METHODS:
+        Add(regex, callback, arg)
+            Registers a compiled pattern. Duplicate patterns are ignored. Raises TypeError once the table is frozen.
+        Freeze()
+            Stops further changes and returns the table.
+        Entries
+            A tuple of (regex, callback, arg), in registration order.
+        Dispatcher
+            A MatchDispatcher over the entries, compiled on first use. Call Dispatch(buffer, instance).
+        Lines
+            A LineDispatcher over the entries, built on first use. Call Dispatch(receiveBuffer, instance).
+        Bind(owner)
+            Returns a new MatchDispatcher with the entries bound to owner, for an instance that adds its own patterns.
+    """
+    def __init__(self):
+        self.__entries = {}
+        self.__frozen = False
+        self.__dispatcher = None
+        self.__lines = None
+        self.Entries = ()
+
+    def __contains__(self, regex):
+        return regex in self.__entries
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def Add(self, regex, callback, arg):
+        if self.__frozen:
+            raise TypeError('MatchTable is frozen')
+        if regex not in self.__entries:
+            self.__entries[regex] = (regex, callback, arg)
+
+    def Freeze(self):
+        self.__frozen = True
+        self.Entries = tuple(self.__entries.values())
+        return self
+
+    @property
+    def Dispatcher(self):
+        if self.__dispatcher is None:
+            dispatcher = MatchDispatcher()
+            for regex, callback, arg in self.Entries:
+                dispatcher.Add(regex, callback, arg)
+            self.__dispatcher = dispatcher
+        return self.__dispatcher
+
+    @property
+    def Lines(self):
+        if self.__lines is None:
+            lines = LineDispatcher()
+            for regex, callback, arg in self.Entries:
+                lines.Add(regex, callback, arg)
+            self.__lines = lines
+        return self.__lines
+
+    def Bind(self, owner):
+        dispatcher = MatchDispatcher()
+        for regex, callback, arg in self.Entries:
+            dispatcher.Add(regex, callback.__get__(owner), arg)
+        return dispatcher
+
+
+class LineDispatcher:
+    """
+    CLASS: LineDispatcher
+    PARAMETERS: None
+
+    Splits the receive buffer into complete lines and tries each line only against the patterns that can match it.
+    Extron SIS responses are CRLF-terminated and identified by their first bytes (Frz, Nm, Vol, or the command after a
+    {nnnno} qualifier), so patterns are indexed in a prefix trie on the literal text they start with. Patterns with no
+    literal start are tried on every line. Patterns that span several lines are run over what is left of the buffer
+    afterwards, the same as the per-pattern engine.
+
+    METHODS:
+        Add(regex, callback, arg)
+            Registers a compiled pattern. Duplicate patterns are ignored, the same as AddMatchString.
+        Dispatch(receiveBuffer, *owner)
+            Calls back every matched line in stream order and removes the matches from the ReceiveBuffer. Returns the
+            start of possible good data (0 if nothing matched), for the driver's Consume/Cap step.
+        Prefixes(regex)
+            Returns the keys a pattern is indexed under: its leading literal text, after b'}' for a {nnnno} qualifier.
+            A short character class such as [gG] gives one key per character.
+    """
+    def __init__(self):
+        self.__entries = {}         # compiled pattern -> (pattern, callback, arg), in registration order
+        self.__trie = None          # (children, candidates) nodes keyed by byte, rebuilt lazily after Add
+        self.__multiLine = ()       # entries matched against the buffer instead of a single line
+
+    def Add(self, regex, callback, arg):
+        if regex not in self.__entries:
+            self.__entries[regex] = (regex, callback, arg)
+            self.__trie = None
+
+    @staticmethod
+    def Prefixes(regex):
+        pattern = regex.pattern
+        if regex.flags & re.IGNORECASE or LineDispatcher.__HasAlternation(pattern):
+            return [b'']
+        keys = [b'']
+        index = 0
+        if pattern.startswith(b'\\{'):
+            close = pattern.find(b'\\}')
+            if close < 0:
+                return keys
+            keys = [b'}']
+            index = close + 2
+        escapes = {0x72: b'\r', 0x6E: b'\n', 0x74: b'\t'}
+        while index < len(pattern):
+            char = pattern[index:index + 1]
+            step = 1
+            if char == b'\\':
+                escaped = pattern[index + 1:index + 2]
+                if not escaped or (escaped.isalnum() and escaped[0] not in escapes):
+                    break
+                chars = [escapes.get(escaped[0], escaped)]
+                step = 2
+            elif char == b'[':
+                # A short class of plain characters, such as [gG], branches the key once per character
+                close = pattern.find(b']', index + 1)
+                members = pattern[index + 1:close]
+                if close < 0 or not members or len(members) > 4 or any(c in members for c in b'\\-^'):
+                    break
+                chars = [members[i:i + 1] for i in range(len(members))]
+                step = close + 1 - index
+            elif char in b'.^$*+?{}()|':
+                break
+            else:
+                chars = [char]
+            following = pattern[index + step:index + step + 1]
+            if (following and following in b'*?{') or len(keys) * len(chars) > 16:
+                break
+            keys = [key + c for key in keys for c in chars]
+            index += step
+            if following == b'+':
+                break
+        return keys
+
+    # True if the pattern has a '|' outside any group or character class
+    @staticmethod
+    def __HasAlternation(pattern):
+        depth = 0
+        inClass = False
+        index = 0
+        while index < len(pattern):
+            char = pattern[index]
+            if char == 0x5C:
+                index += 1
+            elif inClass:
+                inClass = char != 0x5D
+            elif char == 0x5B:
+                inClass = True
+            elif char == 0x28:
+                depth += 1
+            elif char == 0x29:
+                depth -= 1
+            elif char == 0x7C and depth == 0:
+                return True
+            index += 1
+        return False
+
+    @staticmethod
+    def __IsMultiLine(pattern):
+        for ending in (b'\r\n', b'\\r\\n'):
+            if pattern.endswith(ending):
+                pattern = pattern[:-len(ending)]
+                break
+        return any(newline in pattern for newline in (b'\r', b'\n', b'\\r', b'\\n'))
+
+    def __Compile(self):
+        root = ({}, [])
+        multiLine = []
+        for order, entry in enumerate(self.__entries.values()):
+            if self.__IsMultiLine(entry[0].pattern):
+                multiLine.append(entry)
+                continue
+            for key in self.Prefixes(entry[0]):
+                node = root
+                for char in key:
+                    node = node[0].setdefault(char, ({}, []))
+                node[1].append((order, entry))
+
+        # Each node's candidates are its own patterns plus every shorter prefix's, in registration order
+        def Flatten(node, inherited):
+            candidates = sorted(inherited + node[1], key=lambda item: item[0])
+            for char, child in node[0].items():
+                node[0][char] = Flatten(child, candidates)
+            return (node[0], tuple(entry for _, entry in candidates))
+        self.__trie = Flatten(root, [])
+        self.__multiLine = tuple(multiLine)
+
+    def Dispatch(self, receiveBuffer, *owner):
+        if self.__trie is None:
+            self.__Compile()
+
+        # Patterns spanning several lines go first, so the line spans below are taken from the final buffer
+        streamIndex = receiveBuffer.MatchEach(self.__multiLine, *owner)
+        data = receiveBuffer.Data
+        root = self.__trie
+        spans = []
+        start = 0
+        end = data.find(b'\n') + 1
+        while end:
+            # Walk the trie as far as the line's first bytes go, from after the qualifier for a {nnnno} line
+            node = root
+            index = start
+            if data[start] == 0x7B:
+                close = data.find(b'}', start, end)
+                if close >= 0:
+                    node = root[0].get(0x7D, root)
+                    index = close + 1
+            children = node[0]
+            while index < end:
+                child = children.get(data[index])
+                if child is None:
+                    break
+                node = child
+                children = node[0]
+                index += 1
+
+            for regex, callback, arg in node[1]:
+                result = regex.match(data, start, end)
+                if result:
+                    callback(*owner, result, arg)
+                    spans.append(result.span())
+                    break
+            start = end
+            end = data.find(b'\n', start) + 1
+
+        # The start of the last match once the earlier matches are removed, as the per-pattern loop reports it
+        index = streamIndex - sum(end - start for start, end in spans if end <= streamIndex)
+        if spans:
+            index = max(index, spans[-1][0] - sum(end - start for start, end in spans[:-1]))
+            receiveBuffer.RemoveSpans(spans)
+        return index
+
+
+class ReceiveBuffer:
+    """
+    CLASS: ReceiveBuffer
+    PARAMETERS:
+        MaxSize: The number of bytes kept by Cap() when nothing in the buffer has matched
+
+    A bytearray-backed receive buffer for driver __ReceiveData methods. Matched data is removed in place instead of
+    rebuilding an immutable bytes object for every match. Consuming from the front only moves the bytearray's logical
+    start, and the bytearray compacts itself in place once the consumed space outgrows the live data.
+
+    METHODS:
+        Append(data)
+            Adds received bytes to the end of the buffer.
+        Search(regex)
+            Searches the buffer in place with a compiled pattern. Match groups are returned as bytes.
+        MatchEach(entries, *owner)
+            Runs each (regex, callback, arg) entry over the buffer until it stops matching, calling back and removing
+            every match in place. Returns the start of the last match (0 if none), as the drivers' own loop did.
+        Remove(start, end)
+            Removes a matched span in place.
+        RemoveSpans(spans)
+            Removes several ascending (start, end) spans in place, merging adjacent spans into a single removal.
+        Consume(count)
+            Drops count bytes from the front of the buffer.
+        Cap()
+            Keeps only the last MaxSize bytes.
+        Clear()
+            Empties the buffer.
+        Stats()
+            Returns a dictionary of counters: Appended, Removed and Consumed bytes, and Allocations, the number of
+            times the backing storage was allocated or reallocated.
+    """
+    def __init__(self, MaxSize):
+        self.MaxSize = MaxSize
+        self.Data = bytearray()
+        self.__size = self.Data.__sizeof__()
+        self.__stats = {'Appended': 0, 'Removed': 0, 'Consumed': 0, 'Allocations': 1}
+
+    def __len__(self):
+        return len(self.Data)
+
+    # Count a reallocation whenever the storage behind the bytearray changed size
+    def __Track(self):
+        size = self.Data.__sizeof__()
+        if size != self.__size:
+            self.__size = size
+            self.__stats['Allocations'] += 1
+
+    def Append(self, data):
+        self.Data += data
+        self.__stats['Appended'] += len(data)
+        self.__Track()
+
+    def Search(self, regex):
+        return regex.search(self.Data)
+
+    def MatchEach(self, entries, *owner):
+        index = 0
+        for regex, callback, arg in entries:
+            while True:
+                result = regex.search(self.Data)
+                if result:
+                    index = result.start()
+                    callback(*owner, result, arg)
+                    self.Remove(result.start(), result.end())
+                else:
+                    break
+        return index
+
+    def Remove(self, start, end):
+        del self.Data[start:end]
+        self.__stats['Removed'] += end - start
+        self.__Track()
+
+    def RemoveSpans(self, spans):
+        merged = []
+        for start, end in spans:
+            if merged and merged[-1][1] == start:
+                merged[-1][1] = end
+            else:
+                merged.append([start, end])
+        # Remove from the back so the earlier spans keep their offsets
+        for start, end in reversed(merged):
+            self.Remove(start, end)
+
+    def Consume(self, count):
+        if count > 0:
+            del self.Data[:count]
+            self.__stats['Consumed'] += count
+            self.__Track()
+
+    def Cap(self):
+        self.Consume(len(self.Data) - self.MaxSize)
+
+    def Clear(self):
+        self.Consume(len(self.Data))
+
+    def Stats(self):
+        return dict(self.__stats)
+
+
+class StatusStore:
+    """
+    CLASS: StatusStore
+    PARAMETERS:
+        Commands: The driver's Commands dictionary
+
+    Keeps each command's status in one flat dictionary keyed by its qualifier values, taken in the order of the
+    command's Parameters: the value itself for one Parameter, a tuple for several, None for a status without a
+    qualifier. A read or write is a single lookup instead of a walk through nested dictionaries, and no dictionary
+    is allocated per qualifier value. Each Commands[command]['Status'] is replaced with a read-only StatusView, so
+    code that still looks into the nested layout (Status[value]['Live'], value in Status) keeps working.
+
+    METHODS:
+        Key(command, qualifier)
+            Returns the key of a status within its command, or the StatusStore.Missing sentinel when the qualifier
+            lacks one of the command's Parameters. Raises KeyError for an unknown command.
+        Write(command, value, qualifier)
+            Stores value. Returns True when it differs from the stored value (or nothing was stored yet).
+        Read(command, qualifier)
+            Returns the stored value, or None.
+    """
+    Missing = object()
+
+    def __init__(self, Commands):
+        self.__getters = {}     # command -> itemgetter over its Parameters, None when it has none
+        self.__values = {}      # command -> {qualifier values: value}
+        for command, entry in Commands.items():
+            parameters = entry.get('Parameters', ())
+            self.__getters[command] = itemgetter(*parameters) if parameters else None
+            self.__values[command] = {}
+            entry['Status'] = StatusView(self.__values[command], (), len(parameters))
+
+    def Key(self, command, qualifier=None):
+        getter = self.__getters[command]
+        if not qualifier or getter is None:
+            return None
+        try:
+            return getter(qualifier)
+        except KeyError:
+            return self.Missing
+
+    # Write and Read repeat Key() inline, they run for every status a driver parses
+    def Write(self, command, value, qualifier=None):
+        getter = self.__getters[command]
+        if not qualifier or getter is None:
+            key = None
+        else:
+            try:
+                key = getter(qualifier)
+            except KeyError:
+                return False
+        values = self.__values[command]
+        if values.get(key, self.Missing) == value:
+            return False
+        values[key] = value
+        return True
+
+    def Read(self, command, qualifier=None):
+        getter = self.__getters[command]
+        if not qualifier or getter is None:
+            return self.__values[command].get(None)
+        try:
+            return self.__values[command].get(getter(qualifier))
+        except KeyError:
+            return None
+
+
+class StatusView(Mapping):
+    """
+    CLASS: StatusView
+    PARAMETERS:
+        values: One command's dictionary from a StatusStore
+        prefix: The qualifier values this level of the view stands for
+        depth: The number of Parameters of the command
+
+    A read-only view of a StatusStore shaped like the nested Commands[command]['Status'] dictionaries drivers used to
+    build: one level per Parameter, with the value under 'Live'. Looking up a full key is a single dictionary lookup;
+    iterating, or testing a partial qualifier of a multi-parameter command, scans the command's statuses.
+    """
+    def __init__(self, values, prefix, depth):
+        self.__values = values
+        self.__prefix = prefix
+        self.__depth = depth
+
+    # The store key for a complete prefix, None for the top level
+    def __Key(self, prefix):
+        if not prefix:
+            return None
+        return prefix[0] if self.__depth == 1 else prefix
+
+    def __Branches(self, prefix):
+        size = len(prefix)
+        return [key for key in self.__values if isinstance(key, tuple) and key[:size] == prefix]
+
+    def __getitem__(self, key):
+        prefix = self.__prefix
+        if key == 'Live' and self.__Key(prefix) in self.__values:
+            return self.__values[self.__Key(prefix)]
+        if len(prefix) < self.__depth:
+            branch = prefix + (key,)
+            if self.__Key(branch) in self.__values if len(branch) == self.__depth else self.__Branches(branch):
+                return StatusView(self.__values, branch, self.__depth)
+        raise KeyError(key)
+
+    def __iter__(self):
+        prefix = self.__prefix
+        seen = {}
+        if self.__Key(prefix) in self.__values:
+            seen['Live'] = None
+        if len(prefix) < self.__depth:
+            for key in self.__values:
+                if key is not None:
+                    full = (key,) if self.__depth == 1 else key
+                    if full[:len(prefix)] == prefix:
+                        seen[full[len(prefix)]] = None
+        return iter(seen)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class SubscriptionIndex:
+    """
+    CLASS: SubscriptionIndex
+    PARAMETERS:
+        Commands: The driver's Commands dictionary
+
+    The SubscribeStatus callbacks of a driver. A subscription's qualifier may leave Parameters out, or give them as
+    None, to match every value: {'Instance Tag': 'Mixer1'} covers all channels of Mixer1, and a None qualifier covers
+    every status of the command. The callbacks that match a status are resolved the first time that status changes
+    and kept in a fan-out list, so later changes cost one lookup. Adding a subscription drops the command's lists.
+
+    METHODS:
+        Add(command, qualifier, callback)
+            Subscribes callback. A later Add with the same qualifier replaces the callback.
+        Callbacks(command, qualifier)
+            Returns the callbacks subscribed to the status, in subscription order, each callback once.
+    """
+    def __init__(self, Commands):
+        self.__parameters = {}
+        self.__getters = {}     # command -> itemgetter over its Parameters, None when it has none
+        self.__patterns = {}    # command -> {positions given: {values at those positions: [order, callback]}}
+        self.__fanout = {}      # command with subscriptions -> (its getter, {status key: tuple of callbacks})
+        self.__order = 0
+        for command, entry in Commands.items():
+            parameters = tuple(entry.get('Parameters', ()))
+            self.__parameters[command] = parameters
+            self.__getters[command] = itemgetter(*parameters) if parameters else None
+
+    def Add(self, command, qualifier, callback):
+        values = [qualifier.get(parameter) if qualifier else None for parameter in self.__parameters[command]]
+        positions = tuple(index for index, value in enumerate(values) if value is not None)
+        given = tuple(values[index] for index in positions)
+        patterns = self.__patterns.setdefault(command, {}).setdefault(positions, {})
+        if given in patterns:
+            patterns[given][1] = callback
+        else:
+            self.__order += 1
+            patterns[given] = [self.__order, callback]
+        self.__fanout[command] = (self.__getters[command], {})
+
+    def Callbacks(self, command, qualifier=None):
+        entry = self.__fanout.get(command)
+        if entry is None:
+            return ()
+        getter, fanout = entry
+        key = None
+        if qualifier and getter is not None:
+            try:
+                key = getter(qualifier)
+            except KeyError:
+                pass
+        callbacks = fanout.get(key)
+        if callbacks is None:
+            callbacks = fanout[key] = self.__Resolve(command, key)
+        return callbacks
+
+    # One lookup per distinct set of given Parameters, rather than a test of every subscription
+    def __Resolve(self, command, key):
+        if key is None:
+            values = None
+        elif len(self.__parameters[command]) == 1:
+            values = (key,)
+        else:
+            values = key
+        found = []
+        for positions, patterns in self.__patterns[command].items():
+            if values is None:
+                match = patterns.get(()) if not positions else None
+            else:
+                match = patterns.get(tuple(values[index] for index in positions))
+            if match is not None:
+                found.append(match)
+        callbacks = []
+        for order, callback in sorted(found, key=lambda match: match[0]):
+            if callback and callback not in callbacks:
+                callbacks.append(callback)
+        return tuple(callbacks)
+
+
+class TieGrid:
+    """
+    CLASS: TieGrid
+    PARAMETERS:
+        InputSize: The number of matrix inputs
+        OutputSize: The number of matrix outputs
+
+    The tie state of an audio/video matrix. An output takes at most one input per plane, so the grid is stored as the
+    input tied to each output, one bytearray per plane (0 when untied), rather than a cell per crosspoint. Any
+    crosspoint's state is two comparisons, a tie is two byte writes, and Clear() resets the grid in place.
+    Inputs and outputs are numbered from 1, as the device numbers them.
+
+    METHODS:
+        Tie(input_, output, tietype)
+            Ties input_ to output on the tietype ('Audio', 'Video' or 'Audio/Video') planes, replacing whatever was
+            tied there. Input 0 unties.
+        TieAll(input_, tietype)
+            Ties input_ to every output.
+        Clear()
+            Unties everything.
+        Input(output, tietype)
+            Returns the input tied to output on the 'Audio' or 'Video' plane (0 when untied).
+        State(input_, output)
+            Returns the crosspoint's tie: 'Untied', 'Audio', 'Video' or 'Audio/Video'.
+        Rows()
+            Returns the states as a list per input of lists per output.
+    """
+    States = ('Untied', 'Audio', 'Video', 'Audio/Video')
+
+    def __init__(self, InputSize, OutputSize):
+        if not 0 < InputSize < 256:
+            raise ValueError('TieGrid supports 1 to 255 inputs')
+        self.InputSize = InputSize
+        self.OutputSize = OutputSize
+        self.__planes = {'Audio': bytearray(OutputSize), 'Video': bytearray(OutputSize)}
+        self.__audio = self.__planes['Audio']
+        self.__video = self.__planes['Video']
+
+    def Tie(self, input_, output, tietype):
+        if tietype == 'Audio/Video':
+            self.__audio[output - 1] = input_
+            self.__video[output - 1] = input_
+        else:
+            self.__planes[tietype][output - 1] = input_
+
+    def TieAll(self, input_, tietype):
+        fill = bytes((input_,)) * self.OutputSize
+        if tietype == 'Audio/Video':
+            self.__audio[:] = fill
+            self.__video[:] = fill
+        else:
+            self.__planes[tietype][:] = fill
+
+    def Clear(self):
+        self.TieAll(0, 'Audio/Video')
+
+    def Input(self, output, tietype):
+        return self.__planes[tietype][output - 1]
+
+    def State(self, input_, output):
+        return self.States[(self.__audio[output - 1] == input_) | (self.__video[output - 1] == input_) << 1]
+
+    def Rows(self):
+        return [[self.State(input_, output) for output in range(1, self.OutputSize + 1)]
+                for input_ in range(1, self.InputSize + 1)]
+
+
+class TieMap:
+    """
+    CLASS: TieMap
+    PARAMETERS:
+        Planes: The names of the tie planes, ('Audio', 'Video') by default
+
+    The tie state of a large, sparsely tied matrix. Each plane holds the input tied to each output, for tied outputs
+    only, and a reverse index of the outputs each input is tied to, so both "what is output N showing" and "which
+    outputs are showing input N" are dictionary lookups however many endpoints the matrix has. Endpoints can be any
+    hashable value other than 0, which means untied.
+
+    METHODS:
+        Tie(input_, output, tietype)
+            Ties input_ to output on the tietype plane, or on every plane for 'Audio/Video', replacing whatever was
+            tied there. Input 0 unties.
+        Input(output, tietype)
+            Returns the input tied to output on the tietype plane (0 when untied).
+        Outputs(input_, tietype)
+            Returns a frozenset of the outputs input_ is tied to on the tietype plane, or on every plane for
+            'Audio/Video'.
+        Clear()
+            Unties everything.
+        Stats()
+            Returns the number of tied outputs and of inputs with at least one tie, per plane.
+    """
+    def __init__(self, Planes=('Audio', 'Video')):
+        self.Planes = tuple(Planes)
+        self.__forward = {plane: {} for plane in self.Planes}   # plane -> {output: input}
+        self.__reverse = {plane: {} for plane in self.Planes}   # plane -> {input: {output: None}}, dicts being smaller than sets
+
+    def __PlaneNames(self, tietype):
+        return self.Planes if tietype == 'Audio/Video' else (tietype,)
+
+    def Tie(self, input_, output, tietype):
+        for plane in self.__PlaneNames(tietype):
+            forward = self.__forward[plane]
+            reverse = self.__reverse[plane]
+            old = forward.get(output, 0)
+            if old == input_:
+                continue
+            if old:
+                outputs = reverse[old]
+                del outputs[output]
+                if not outputs:
+                    del reverse[old]
+            if input_:
+                forward[output] = input_
+                reverse.setdefault(input_, {})[output] = None
+            else:
+                del forward[output]
+
+    def Input(self, output, tietype):
+        return self.__forward[tietype].get(output, 0)
+
+    def Outputs(self, input_, tietype):
+        sets = [self.__reverse[plane].get(input_, ()) for plane in self.__PlaneNames(tietype)]
+        return frozenset(sets[0]).intersection(*sets[1:])
+
+    def Clear(self):
+        for plane in self.Planes:
+            self.__forward[plane].clear()
+            self.__reverse[plane].clear()
+
+    def Stats(self):
+        return {plane: {'Outputs': len(self.__forward[plane]), 'Inputs': len(self.__reverse[plane])} for plane in self.Planes}
+
+
+class SessionHandshake:
+    """
+    CLASS: SessionHandshake
+    PARAMETERS:
+        Send: The driver's send function
+        Steps: (name, commandstring) pairs that put a new session in the mode the driver parses, such as echo off
+               and verbose mode, in the order they are sent
+        Timeout: Seconds to wait for the device to confirm the steps before the queued commands are sent anyway
+
+    The per-connection handshake of a driver. The first command of a session sends every unconfirmed step in one
+    write and is queued, as is every command after it, until the device has confirmed each step; the queue then goes
+    out in one write and later commands are sent straight away. If the device has not confirmed within Timeout the
+    queue is sent as it is, as the deferral this replaces did, and the next command starts the handshake again.
+    Without any steps every command is sent straight away.
+
+    METHODS:
+        Send(commandstring)
+            Sends commandstring once the handshake is confirmed, starting the handshake if it is not pending yet.
+        Confirm(name)
+            Records the device's reply to step name. The queue is flushed when it was the last unconfirmed step.
+        Reset()
+            Drops the queue and the confirmations, for a new connection.
+        Stats()
+            Returns a dictionary of the State ('Idle', 'Pending' or 'Ready'), the Latency of the last confirmed
+            handshake in seconds (None before the first), the number of Handshakes sent, of Timeouts, and of commands
+            Queued now.
+    """
+    def __init__(self, Send, Steps, Timeout=1):
+        self.Steps = tuple(Steps)
+        self.Timeout = Timeout
+        self.__send = Send
+        self.__confirmed = set()
+        self.__queue = []
+        self.__state = 'Ready' if not self.Steps else 'Idle'
+        self.__started = None           # monotonic time the pending handshake was sent
+        self.__wait = None
+        self.__stats = {'Latency': None, 'Handshakes': 0, 'Timeouts': 0}
+
+    def Send(self, commandstring):
+        if self.__state == 'Ready':
+            self.__send(commandstring)
+            return
+        self.__queue.append(commandstring)
+        if self.__state == 'Idle':
+            self.__state = 'Pending'
+            self.__started = monotonic()
+            self.__stats['Handshakes'] += 1
+            self.__send(''.join(step for name, step in self.Steps if name not in self.__confirmed))
+            if self.__wait is None:
+                self.__wait = Wait(self.Timeout, self.__Expire)
+            else:
+                self.__wait.Restart()
+
+    def Confirm(self, name):
+        self.__confirmed.add(name)
+        if self.__state != 'Ready' and all(step in self.__confirmed for step, commandstring in self.Steps):
+            if self.__state == 'Pending':
+                self.__stats['Latency'] = monotonic() - self.__started
+                self.__wait.Cancel()
+            self.__state = 'Ready'
+            self.__Flush()
+
+    def Reset(self):
+        if self.__wait is not None:
+            self.__wait.Cancel()
+        self.__confirmed.clear()
+        self.__queue.clear()
+        self.__state = 'Ready' if not self.Steps else 'Idle'
+
+    def Stats(self):
+        stats = dict(self.__stats)
+        stats['State'] = self.__state
+        stats['Queued'] = len(self.__queue)
+        return stats
+
+    def __Expire(self):
+        if self.__state == 'Pending':
+            self.__stats['Timeouts'] += 1
+            self.__state = 'Idle'
+            self.__Flush()
+
+    def __Flush(self):
+        if self.__queue:
+            commandstrings = ''.join(self.__queue)
+            self.__queue.clear()
+            self.__send(commandstrings)
+
+
+class CoalescingQueue:
+    """
+    CLASS: CoalescingQueue
+    PARAMETERS:
+        Device: The driver, or its connection handler, that the queued Set and Update calls are made on
+        Interval: Seconds between the end of one call on Device and the start of the next
+
+    An opt-in outbound queue for controls that produce a stream of Set calls, such as repeating buttons and slider
+    drags. A call made while the device is idle goes out at once. Calls made within Interval of the last one are
+    queued by (command, qualifier), and a newer call for a queued key replaces the older value where it stands, so
+    only the latest value is ever sent. One queued call is made per Interval, counted from when the previous call
+    returned, so calls on Device never overlap and a serial port is given at least Interval between commands. Set and
+    Update may be called from any thread; the call on Device is made outside the queue's lock.
+
+    METHODS:
+        Set(command, value, qualifier=None)
+            Sets command on Device, now or, latest value wins, once it is the key's turn.
+        Update(command, qualifier=None)
+            Queues an Update the same way; repeated Updates of the same key are sent once.
+        Clear()
+            Drops the calls not yet made.
+        Stats()
+            Returns a dictionary of the calls Sent, the calls Coalesced into a newer one and the calls Queued now.
+    """
+    def __init__(self, Device, Interval=0.1):
+        self.Device = Device
+        self.Interval = Interval
+        self.__pending = {}             # ('Set' or 'Update', command, qualifier key) -> (method, command, value, qualifier)
+        self.__busy = False             # a call was made within the last Interval
+        self.__lock = Lock()            # guards __pending and __busy between event threads and the Wait
+        self.__wait = None
+        self.__stats = {'Sent': 0, 'Coalesced': 0}
+
+    def Set(self, command, value, qualifier=None):
+        self.__Put('Set', command, value, qualifier)
+
+    def Update(self, command, qualifier=None):
+        self.__Put('Update', command, None, qualifier)
+
+    def Clear(self):
+        with self.__lock:
+            self.__pending.clear()
+
+    def Stats(self):
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats['Queued'] = len(self.__pending)
+        return stats
+
+    def __Put(self, method, command, value, qualifier):
+        with self.__lock:
+            if self.__busy:
+                key = (method, command, tuple(sorted(qualifier.items())) if qualifier else None)
+                if key in self.__pending:
+                    self.__stats['Coalesced'] += 1
+                self.__pending[key] = (method, command, value, qualifier)
+                return
+            self.__busy = True
+        self.__Call(method, command, value, qualifier)
+
+    # Only the caller that set __busy, or the Wait it arms, makes a call, so calls never overlap
+    def __Call(self, method, command, value, qualifier):
+        try:
+            if method == 'Set':
+                self.Device.Set(command, value, qualifier)
+            else:
+                self.Device.Update(command, qualifier)
+            self.__stats['Sent'] += 1
+        finally:
+            if self.__wait is None:
+                self.__wait = Wait(self.Interval, self.__Drain)
+            else:
+                self.__wait.Change(self.Interval)
+                self.__wait.Restart()
+
+    def __Drain(self):
+        with self.__lock:
+            if not self.__pending:
+                self.__busy = False
+                return
+            call = self.__pending.pop(next(iter(self.__pending)))
+        self.__Call(*call)
@@ -1,18 +1,18 @@
 from extronlib.interface import SerialInterface, EthernetClientInterface
 from re import compile, findall, search
-from extronlib.system import ProgramLog, Wait
+from extronlib.system import ProgramLog
 from decimal import Decimal, ROUND_HALF_UP
-import copy
+from SC_DriverSupport import MatchTable, ReceiveBuffer, SessionHandshake, StatusStore, SubscriptionIndex
 
 class DeviceClass:
+    __matchTable = None     # MatchTable shared by every instance, built by the first __init__
+
     def __init__(self):
 
         self.Unidirectional = 'False'
         self.connectionCounter = 15
-        self.Subscription = {}
         self.ReceiveData = self.__ReceiveData
-        self.__receiveBuffer = b''
-        self.__maxBufferSize = 4096
+        self.__receiveBuffer = ReceiveBuffer(MaxSize=4096)
         self.__matchStringDict = {}
         self.counter = 0
         self.connectionFlag = True
@@ -94,24 +94,29 @@ class DeviceClass:
             'VoIPTransmitLevel': {'Parameters': ['Instance Tag', 'Line'], 'Status': {}},
             'VoIPTransmitMute': {'Parameters': ['Instance Tag', 'Line'], 'Status': {}},
         }
+        self.__statusStore = StatusStore(self.Commands)
+        self.Subscription = SubscriptionIndex(self.Commands)
 
         self.InitialStatusList = []
         self.MatchstringList = []
         self.SUBSCRIPTION_RESPONSE_TIME = 100
-        self.VerboseDisabled = True
+        self.Session = SessionHandshake(self.Send, [('Verbose', 'SESSION set verbose true\n')])
         if 'Serial' not in self.ConnectionType:
             self.deviceUsername = 'default'
             self.devicePassword = None
 
         if self.Unidirectional == 'False':
-            self.AddMatchString(compile(b'\! \"publishToken\":\"([\S ]+?)\" \"value\":([\S ]+?)\r\n'), self.__MatchAllSubscribe, None)
+            if DeviceClass.__matchTable is None:
+                table = MatchTable()
+                table.Add(compile(b'\! \"publishToken\":\"([\S ]+?)\" \"value\":([\S ]+?)\r\n'), DeviceClass.__MatchAllSubscribe, None)
 
-            self.AddMatchString(compile(b'SESSION set verbose true\r\n\+OK\r\n'), self.__MatchVerboseMode, 'Set')
-            self.AddMatchString(compile(b'SESSION get verbose\r\n\+OK \"value\":(true|false)\r\n'), self.__MatchVerboseMode, 'Update')
+                table.Add(compile(b'SESSION set verbose true\r\n\+OK\r\n'), DeviceClass.__MatchVerboseMode, 'Set')
+                table.Add(compile(b'SESSION get verbose\r\n\+OK \"value\":(true|false)\r\n'), DeviceClass.__MatchVerboseMode, 'Update')
 
-            self.AddMatchString(compile(b'DEVICE get version\r\n\+OK \"value\":\"([\d+.]+)\"\r\n'), self.__MatchFirmwareVersion, None)
-            self.AddMatchString(compile(b'-(ERR .*?|CANNOT_DELIVER|GENERAL_FAILURE)\r\n'), self.__MatchError, None)
-            self.AddMatchString(compile(b'OK \"value\":\[{\"id\":(INDICATOR_NONE_IN_DEVICE|INDICATOR_MINOR_IN_DEVICE|INDICATOR_MAJOR_IN_DEVICE) \"name\":\"(No fault in device|Minor Fault in (System|Device)|Major Fault in (System|Device))\" \"faults\"'), self.__MatchDeviceFaultList, None)
+                table.Add(compile(b'DEVICE get version\r\n\+OK \"value\":\"([\d+.]+)\"\r\n'), DeviceClass.__MatchFirmwareVersion, None)
+                table.Add(compile(b'-(ERR .*?|CANNOT_DELIVER|GENERAL_FAILURE)\r\n'), DeviceClass.__MatchError, None)
+                table.Add(compile(b'OK \"value\":\[{\"id\":(INDICATOR_NONE_IN_DEVICE|INDICATOR_MINOR_IN_DEVICE|INDICATOR_MAJOR_IN_DEVICE) \"name\":\"(No fault in device|Minor Fault in (System|Device)|Major Fault in (System|Device))\" \"faults\"'), DeviceClass.__MatchDeviceFaultList, None)
+                DeviceClass.__matchTable = table.Freeze()
 
     def __MatchError(self, match, tag):
         self.counter = 0
@@ -120,7 +125,7 @@ class DeviceClass:
             self.Error([errorMessage])
 
     def __MatchVerboseMode(self, match, tag):
-        self.VerboseDisabled = False
+        self.Session.Confirm('Verbose')
 
         if tag == 'Set':
             self.WriteStatus('VerboseMode', 'True')
@@ -130,134 +135,161 @@ class DeviceClass:
             else:
                 self.WriteStatus('VerboseMode', 'False')
 
+    # Subscription pushes are labelled '<command>_<instance tag>'; route each by its command through __publishHandlers
     def __MatchAllSubscribe(self, match, tag):
-
-        StateValues = {
-            'true' : ['On',  'True',  'Connected',    'Signal Present',    'In Use'],
-            'false': ['Off', 'False', 'Disconnected', 'No Signal Present', 'Not in Use']
-        }
-
-        label = match.group(1).decode()
-        data = [label[:label.index('_')],label[label.index('_')+1:]]
-        paramsList = data[1].split('_')
-        if data[0] in ['AECPhantomPower','LogicMeter','MuteControl']:
-            stateIndex = 1 if data[0] == 'LogicMeter' else 0
-            chnl = 1
-            allValues = findall('false|true',match.group(2).decode())
-            for value in allValues:
-                self.WriteStatus(data[0], StateValues[value][stateIndex], {'Instance Tag': data[1], 'Channel': str(chnl)})
-                chnl += 1
-
-        elif data[0] in ['Bluetooth','BluetoothDiscovery','BluetoothUSBConnectionStatus','BluetoothUSBStreamingStatus']:
-            stateIndex = 2 if data[0] == 'BluetoothUSBConnectionStatus' else 0
-            value = StateValues[match.group(2).decode()][stateIndex]
-            self.WriteStatus(data[0], value, {'Instance Tag': data[1]})
-
-        elif data[0] == 'BluetoothConnectedDeviceName':
-            if match.group(2):
-                value = match.group(2).decode()
-            else:
-                value = ''
-            self.WriteStatus('BluetoothConnectedDeviceName', value, {'Instance Tag': data[1]})
-
-        elif data[0] == 'FineLevelControl':
-            chnl = 1
-            allValues = findall('(-?\d+\.\d+)', match.group(2).decode())
-            for value in allValues:
-                value = Decimal(float(value)).quantize(Decimal('.1'),rounding=ROUND_HALF_UP)
-                self.WriteStatus('FineLevelControl', value, {'Instance Tag': data[1], 'Channel': str(chnl)})
-                chnl += 1
-
-        elif data[0] == 'LevelControl':
-            chnl = 1
-            allValues = findall('(-?\d+)\.\d+', match.group(2).decode())
-            for value in allValues:
-                self.WriteStatus('LevelControl', int(value), {'Instance Tag': data[1], 'Channel': str(chnl)})
-                chnl += 1
-
-        elif data[0] == 'RoomCombinerOutputLevel':
-            value = int(float(match.group(2).decode()))
-            tag = '_'.join(paramsList[:len(paramsList)-1])
-            room = paramsList[-1]
-            self.WriteStatus('RoomCombinerOutputLevel', value, {'Instance Tag': tag, 'Room': room})
-
-        elif data[0] == 'SignalPresentMeter':
-            value = StateValues[match.group(2).decode()][3]
-            tag = '_'.join(paramsList[:len(paramsList)-2])
-            chnl = paramsList[-2]
-            mtrName = paramsList[-1]
-            self.WriteStatus('SignalPresentMeter', value, {'Instance Tag': tag, 'Channel': chnl, 'Meter Name': mtrName})
-
-        elif data[0] == 'SourceSelectorSourceSelection':
-            value = match.group(2).decode()
-            if value == '0':
-                self.WriteStatus('SourceSelectorSourceSelection', 'No Source', {'Instance Tag': data[1]})
-            elif 1 <= int(value) <= 32:
-                self.WriteStatus('SourceSelectorSourceSelection', value, {'Instance Tag': data[1]})
-
-        elif data[0] == 'TICallStatus':
-            res = match.group(2).decode()
-
-            stateValues = findall('\"state\":TI_CALL_STATE_(\w+) \"', res)
-            for val in stateValues:
-                value = val.replace('_', ' ').title()
-                self.WriteStatus('TICallStatus', value, {'Instance Tag': data[1]})
-
-            idValues = findall('"cid":"\x5C\x5C"(\d{8})\x5C\x5C"\x5C\x5C"(.*?)\x5C\x5C"\x5C\x5C"(.*?)\x5C\x5C""|"cid":""', res)
-            for id_ in idValues:
-                name = id_[2]
-                number = id_[1]
-                if number:
-                    if name:
-                        value = name + ' : ' + number
-                    else:
-                        value = number
+        command, _, tag = match.group(1).partition(b'_')
+        handler = self.__publishHandlers.get(command)
+        if handler:
+            handler[0](self, handler[1], tag.decode(), match.group(2))
+
+    __stateNames = {
+        b'true' : ('On',  'True',  'Connected',    'Signal Present',    'In Use'),
+        b'false': ('Off', 'False', 'Disconnected', 'No Signal Present', 'Not in Use')
+    }
+    __stateList = compile(b'false|true')
+    __levelList = compile(b'(-?\d+)\.(\d+)')
+    __decibels = {}     # tenths of a dB -> Decimal status value, shared by every instance
+
+    # Convert '-12.345' to -123 tenths of a dB, rounding half away from zero like Decimal ROUND_HALF_UP
+    @staticmethod
+    def __Tenths(whole, fraction):
+        if fraction[1:2] == b'5' and not fraction[2:].strip(b'0'):
+            # An exact tie such as '3.050000' rounds the way the float it has always been read as does
+            value = Decimal(float(whole + b'.' + fraction)).quantize(Decimal('.1'), rounding=ROUND_HALF_UP)
+            return int(value.scaleb(1))
+        tenths = abs(int(whole)) * 10 + fraction[0] - 0x30
+        if fraction[1:2] > b'4':
+            tenths += 1
+        return -tenths if whole[0] == 0x2D else tenths
+
+    # The Decimal status value for a level in tenths of a dB, built once per distinct level
+    def __Decibels(self, tenths):
+        try:
+            return self.__decibels[tenths]
+        except KeyError:
+            value = self.__decibels[tenths] = Decimal(tenths).scaleb(-1)
+            return value
+
+    def __PublishStateList(self, command, tag, value):
+        stateIndex = 1 if command == 'LogicMeter' else 0
+        chnl = 1
+        for state in self.__stateList.findall(value):
+            self.WriteStatus(command, self.__stateNames[state][stateIndex], {'Instance Tag': tag, 'Channel': str(chnl)})
+            chnl += 1
+
+    def __PublishState(self, command, tag, value):
+        stateIndex = 2 if command == 'BluetoothUSBConnectionStatus' else 0
+        self.WriteStatus(command, self.__stateNames[value][stateIndex], {'Instance Tag': tag})
+
+    def __PublishBluetoothConnectedDeviceName(self, command, tag, value):
+        self.WriteStatus('BluetoothConnectedDeviceName', value.decode() if value else '', {'Instance Tag': tag})
+
+    def __PublishFineLevelControl(self, command, tag, value):
+        chnl = 1
+        for whole, fraction in self.__levelList.findall(value):
+            self.WriteStatus('FineLevelControl', self.__Decibels(self.__Tenths(whole, fraction)), {'Instance Tag': tag, 'Channel': str(chnl)})
+            chnl += 1
+
+    def __PublishLevelControl(self, command, tag, value):
+        chnl = 1
+        for whole, _ in self.__levelList.findall(value):
+            self.WriteStatus('LevelControl', int(whole), {'Instance Tag': tag, 'Channel': str(chnl)})
+            chnl += 1
+
+    def __PublishRoomCombinerOutputLevel(self, command, tag, value):
+        tag, _, room = tag.rpartition('_')
+        self.WriteStatus('RoomCombinerOutputLevel', int(float(value)), {'Instance Tag': tag, 'Room': room})
+
+    def __PublishSignalPresentMeter(self, command, tag, value):
+        tag, chnl, mtrName = tag.rsplit('_', 2)
+        self.WriteStatus('SignalPresentMeter', self.__stateNames[value][3], {'Instance Tag': tag, 'Channel': chnl, 'Meter Name': mtrName})
+
+    def __PublishSourceSelectorSourceSelection(self, command, tag, value):
+        if value == b'0':
+            self.WriteStatus('SourceSelectorSourceSelection', 'No Source', {'Instance Tag': tag})
+        elif 1 <= int(value) <= 32:
+            self.WriteStatus('SourceSelectorSourceSelection', value.decode(), {'Instance Tag': tag})
+
+    def __PublishTICallStatus(self, command, tag, value):
+        res = value.decode()
+
+        stateValues = findall('\"state\":TI_CALL_STATE_(\w+) \"', res)
+        for val in stateValues:
+            value = val.replace('_', ' ').title()
+            self.WriteStatus('TICallStatus', value, {'Instance Tag': tag})
+
+        idValues = findall('"cid":"\x5C\x5C"(\d{8})\x5C\x5C"\x5C\x5C"(.*?)\x5C\x5C"\x5C\x5C"(.*?)\x5C\x5C""|"cid":""', res)
+        for id_ in idValues:
+            name = id_[2]
+            number = id_[1]
+            if number:
+                if name:
+                    value = name + ' : ' + number
                 else:
-                    value = ''
-                self.WriteStatus('TICallerID', value, {'Instance Tag': data[1]})
-
-        elif data[0] == 'TILineInUse':
-            value = StateValues[match.group(2).decode()][4]
-            self.WriteStatus('TILineInUse', value, {'Instance Tag': data[1]})
-
-        elif data[0] == 'VoIPCallStatus':
-            line = 1
-            call = 1
-            res = match.group(2).decode()
-
-            stateValues = findall('\"state\":VOIP_CALL_STATE_(\w+) \"', res)
-            for val in stateValues:
-                value = val.replace('_', ' ').replace('XFER', 'Transfer').title()
-                self.WriteStatus('VoIPCallStatus', value, {'Instance Tag': data[1], 'Line': str(line), 'Call Appearance': str(call)})
-                if call >= 6:
-                    call = 0
-                    line += 1
-                call += 1
-
-            line = 1
-            call = 1
-            idValues = findall('"cid":"\x5C\x5C"(\d{8})\x5C\x5C"\x5C\x5C"(.*?)\x5C\x5C"\x5C\x5C"(.*?)\x5C\x5C""|"cid":""', res)
-            for id_ in idValues:
-                name = id_[2]
-                number = id_[1]
-                if number:
                     value = number
-                    if name:
-                        value = name + ' : ' + number
-                else:
-                    value = ''
-                self.WriteStatus('VoIPCallerID', value, {'Instance Tag': data[1], 'Line': str(line), 'Call Appearance': str(call)})
-                if call >= 6:
-                    call = 0
-                    line += 1
-                call += 1
-
-        elif data[0] == 'VoIPLineInUse':
-            value = StateValues[match.group(2).decode()][4]
-            tag = '_'.join(paramsList[:len(paramsList)-2])
-            line = paramsList[-2]
-            call = paramsList[-1]
-            self.WriteStatus('VoIPLineInUse', value, {'Instance Tag': tag, 'Line': line, 'Call Appearance': call})
+            else:
+                value = ''
+            self.WriteStatus('TICallerID', value, {'Instance Tag': tag})
+
+    def __PublishTILineInUse(self, command, tag, value):
+        self.WriteStatus('TILineInUse', self.__stateNames[value][4], {'Instance Tag': tag})
+
+    def __PublishVoIPCallStatus(self, command, tag, value):
+        line = 1
+        call = 1
+        res = value.decode()
+
+        stateValues = findall('\"state\":VOIP_CALL_STATE_(\w+) \"', res)
+        for val in stateValues:
+            value = val.replace('_', ' ').replace('XFER', 'Transfer').title()
+            self.WriteStatus('VoIPCallStatus', value, {'Instance Tag': tag, 'Line': str(line), 'Call Appearance': str(call)})
+            if call >= 6:
+                call = 0
+                line += 1
+            call += 1
+
+        line = 1
+        call = 1
+        idValues = findall('"cid":"\x5C\x5C"(\d{8})\x5C\x5C"\x5C\x5C"(.*?)\x5C\x5C"\x5C\x5C"(.*?)\x5C\x5C""|"cid":""', res)
+        for id_ in idValues:
+            name = id_[2]
+            number = id_[1]
+            if number:
+                value = number
+                if name:
+                    value = name + ' : ' + number
+            else:
+                value = ''
+            self.WriteStatus('VoIPCallerID', value, {'Instance Tag': tag, 'Line': str(line), 'Call Appearance': str(call)})
+            if call >= 6:
+                call = 0
+                line += 1
+            call += 1
+
+    def __PublishVoIPLineInUse(self, command, tag, value):
+        tag, line, call = tag.rsplit('_', 2)
+        self.WriteStatus('VoIPLineInUse', self.__stateNames[value][4], {'Instance Tag': tag, 'Line': line, 'Call Appearance': call})
+
+    # publishToken command -> (handler, command name written to the status)
+    __publishHandlers = {
+        b'AECPhantomPower':                 (__PublishStateList, 'AECPhantomPower'),
+        b'LogicMeter':                      (__PublishStateList, 'LogicMeter'),
+        b'MuteControl':                     (__PublishStateList, 'MuteControl'),
+        b'Bluetooth':                       (__PublishState, 'Bluetooth'),
+        b'BluetoothDiscovery':              (__PublishState, 'BluetoothDiscovery'),
+        b'BluetoothUSBConnectionStatus':    (__PublishState, 'BluetoothUSBConnectionStatus'),
+        b'BluetoothUSBStreamingStatus':     (__PublishState, 'BluetoothUSBStreamingStatus'),
+        b'BluetoothConnectedDeviceName':    (__PublishBluetoothConnectedDeviceName, 'BluetoothConnectedDeviceName'),
+        b'FineLevelControl':                (__PublishFineLevelControl, 'FineLevelControl'),
+        b'LevelControl':                    (__PublishLevelControl, 'LevelControl'),
+        b'RoomCombinerOutputLevel':         (__PublishRoomCombinerOutputLevel, 'RoomCombinerOutputLevel'),
+        b'SignalPresentMeter':              (__PublishSignalPresentMeter, 'SignalPresentMeter'),
+        b'SourceSelectorSourceSelection':   (__PublishSourceSelectorSourceSelection, 'SourceSelectorSourceSelection'),
+        b'TICallStatus':                    (__PublishTICallStatus, 'TICallStatus'),
+        b'TILineInUse':                     (__PublishTILineInUse, 'TILineInUse'),
+        b'VoIPCallStatus':                  (__PublishVoIPCallStatus, 'VoIPCallStatus'),
+        b'VoIPLineInUse':                   (__PublishVoIPLineInUse, 'VoIPLineInUse'),
+    }
 
     def SetAECEnable(self, value, qualifier):
 
@@ -2207,12 +2239,8 @@ class DeviceClass:
     def __SetHelper(self, command, commandstring, value, qualifier):
 
         self.Debug = True
-        if self.VerboseDisabled and self.Unidirectional == 'False':
-            @Wait(1)
-            def SendVerbose():
-                if self.VerboseDisabled:
-                    self.Send('SESSION set verbose true\n')
-                self.Send(commandstring)
+        if self.Unidirectional == 'False':
+            self.Session.Send(commandstring)
         else:
             self.Send(commandstring)
 
@@ -2229,14 +2257,7 @@ class DeviceClass:
             if self.counter > self.connectionCounter and self.connectionFlag:
                 self.OnDisconnected()
 
-            if self.VerboseDisabled:
-                @Wait(1)
-                def SendVerbose():
-                    if self.VerboseDisabled:
-                        self.Send('SESSION set verbose true\n')
-                    self.Send(commandstring)
-            else:
-                self.Send(commandstring)
+            self.Session.Send(commandstring)
 
     def _UpdateSubscribeHelper(self, command, commandstring, tag, label, qualifier):
 
@@ -2251,28 +2272,14 @@ class DeviceClass:
             if self.counter > self.connectionCounter and self.connectionFlag:
                 self.OnDisconnected()
 
-            if self.VerboseDisabled:
-                @Wait(1)
-                def SendVerbose():
-                    if self.VerboseDisabled:
-                        self.Send('SESSION set verbose true\n')
-                    if label not in self.InitialStatusList:
-                        self.InitialStatusList.append(label)
-
-                        unsubscribe = '"{0}" unsubscribe {1} "{2}"\n'.format(tag, commandstring, label)
-                        self.Send(unsubscribe)
-
-                    subscribe = '"{0}" subscribe {1} "{2}" {3}\n'.format(tag, commandstring, label, self.SUBSCRIPTION_RESPONSE_TIME)
-                    self.Send(subscribe)
-            else:
-                if label not in self.InitialStatusList:
-                    self.InitialStatusList.append(label)
+            if label not in self.InitialStatusList:
+                self.InitialStatusList.append(label)
 
-                    unsubscribe = '"{0}" unsubscribe {1} "{2}"\n'.format(tag, commandstring, label)
-                    self.Send(unsubscribe)
+                unsubscribe = '"{0}" unsubscribe {1} "{2}"\n'.format(tag, commandstring, label)
+                self.Session.Send(unsubscribe)
 
-                subscribe = '"{0}" subscribe {1} "{2}" {3}\n'.format(tag, commandstring, label, self.SUBSCRIPTION_RESPONSE_TIME)
-                self.Send(subscribe)
+            subscribe = '"{0}" subscribe {1} "{2}" {3}\n'.format(tag, commandstring, label, self.SUBSCRIPTION_RESPONSE_TIME)
+            self.Session.Send(subscribe)
 
     def OnConnected(self):
         self.connectionFlag = True
@@ -2283,7 +2290,7 @@ class DeviceClass:
         self.WriteStatus('ConnectionStatus', 'Disconnected')
         self.connectionFlag = False
         self.InitialStatusList.clear()
-        self.VerboseDisabled = True
+        self.Session.Reset()
 
     ######################################################
     # RECOMMENDED not to modify the code below this point
@@ -2324,111 +2331,46 @@ class DeviceClass:
     def SubscribeStatus(self, command, qualifier, callback):
         Command = self.Commands.get(command)
         if Command:
-            if command not in self.Subscription:
-                self.Subscription[command] = {'method': {}}
-
-            Subscribe = self.Subscription[command]
-            Method = Subscribe['method']
-
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Method = Method[qualifier[Parameter]]
-                    except:
-                        if Parameter in qualifier:
-                            Method[qualifier[Parameter]] = {}
-                            Method = Method[qualifier[Parameter]]
-                        else:
-                            return
-
-            Method['callback'] = callback
-            Method['qualifier'] = qualifier
+            self.Subscription.Add(command, qualifier, callback)
         else:
             print(command, 'does not exist in the module')
 
     # This method is to check the command with new status have a callback method then trigger the callback
     def NewStatus(self, command, value, qualifier):
-        if command in self.Subscription:
-            Subscribe = self.Subscription[command]
-            Method = Subscribe['method']
-            Command = self.Commands[command]
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Method = Method[qualifier[Parameter]]
-                    except:
-                        break
-            if 'callback' in Method and Method['callback']:
-                Method['callback'](command, value, qualifier)
+        for callback in self.Subscription.Callbacks(command, qualifier):
+            callback(command, value, qualifier)
 
     # Save new status to the command
     def WriteStatus(self, command, value, qualifier=None):
         self.counter = 0
         if not self.connectionFlag and command != 'ConnectionStatus': 
             self.OnConnected()
-        Command = self.Commands[command]
-        Status = Command['Status']
-        if qualifier:
-            for Parameter in Command['Parameters']:
-                try:
-                    Status = Status[qualifier[Parameter]]
-                except KeyError:
-                    if Parameter in qualifier:
-                        Status[qualifier[Parameter]] = {}
-                        Status = Status[qualifier[Parameter]]
-                    else:
-                        return
-        try:
-            if Status['Live'] != value:
-                Status['Live'] = value
-                self.NewStatus(command, value, qualifier)
-        except:
-            Status['Live'] = value
+        if self.__statusStore.Write(command, value, qualifier):
             self.NewStatus(command, value, qualifier)
 
     # Read the value from a command.
     def ReadStatus(self, command, qualifier=None):
-        Command = self.Commands[command]
-        Status = Command['Status']
-        if qualifier:
-            for Parameter in Command['Parameters']:
-                try:
-                    Status = Status[qualifier[Parameter]]
-                except KeyError:
-                    return None
-        try:
-            return Status['Live']
-        except:
-            return None
+        return self.__statusStore.Read(command, qualifier)
 
     def __ReceiveData(self, interface, data):
         # Handle incoming data
-        self.__receiveBuffer += data
-        index = 0    # Start of possible good data
+        self.__receiveBuffer.Append(data)
         # check incoming data if it matched any expected data from device module
-        tempList = copy.copy(self.__matchStringDict)
-        for regexString, CurrentMatch in tempList.items():
-            while True:
-                result = search(regexString, self.__receiveBuffer)
-                if result:
-                    index = result.start()
-                    CurrentMatch['callback'](result, CurrentMatch['para'])
-                    self.__receiveBuffer = self.__receiveBuffer[:result.start()] + self.__receiveBuffer[result.end():]
-                else:
-                    break
+        index = self.__receiveBuffer.MatchEach(self.__matchTable.Entries, self)
+        index = self.__receiveBuffer.MatchEach(list(self.__matchStringDict.values())) or index
                     
         if index: 
             # Clear out any junk data that came in before any good matches.
-            self.__receiveBuffer = self.__receiveBuffer[index:]
+            self.__receiveBuffer.Consume(index)
         else:
             # In rare cases, the buffer could be filled with garbage quickly.
             # Make sure the buffer is capped.  Max buffer size set in init.
-            self.__receiveBuffer = self.__receiveBuffer[-self.__maxBufferSize:]
+            self.__receiveBuffer.Cap()
 
     # Add regular expression so that it can be check on incoming data from device.
     def AddMatchString(self, regex_string, callback, arg):
-        if regex_string not in self.__matchStringDict:
-            self.__matchStringDict[regex_string] = {'callback': callback, 'para':arg}
+        if regex_string not in self.__matchTable and regex_string not in self.__matchStringDict:
+            self.__matchStringDict[regex_string] = (regex_string, callback, arg)
 
 class SerialClass(SerialInterface, DeviceClass):
     def __init__(self, Host, Port, Baud=115200, Data=8, Parity='None', Stop=1, FlowControl='Off', CharDelay=0, Mode='RS232', Model=None):
@@ -1,18 +1,20 @@
 from extronlib.interface import SerialInterface, EthernetClientInterface
 import re
-from extronlib.system import Wait, ProgramLog
+from extronlib.system import ProgramLog
+from SC_DriverSupport import MatchTable, ReceiveBuffer, SessionHandshake, StatusStore, SubscriptionIndex
 
 
 class DeviceClass:
+    __matchTable = None     # MatchTable shared by every instance, built by the first __init__
+
     def __init__(self):
 
         self.Unidirectional = 'False'
         self.connectionCounter = 15
         self.DefaultResponseTimeout = 0.3
-        self.Subscription = {}
         self.ReceiveData = self.__ReceiveData
-        self.__receiveBuffer = b''
-        self.__maxBufferSize = 2048
+        self.__receiveBuffer = ReceiveBuffer(MaxSize=2048)
+        self.MatchEngine = 'Legacy'     # 'Lines' dispatches complete lines by prefix; 'Legacy' runs each pattern in turn
         self.__matchStringDict = {}
         self.counter = 0
         self.connectionFlag = True
@@ -34,32 +36,40 @@ class DeviceClass:
             'Subwoofer': {'Status': {}},
             'Volume': {'Status': {}},
             }
-
-        self.VerboseDisabled = True
-        self.EchoDisabled = True
+        self.__statusStore = StatusStore(self.Commands)
+        self.Subscription = SubscriptionIndex(self.Commands)
+
+        # Echo is only turned off on SSH; the session is confirmed by Echo0 and Vrb3
+        steps = [('Verbose', 'w3cv\r\n')]
+        if 'Serial' not in self.ConnectionType:
+            steps.insert(0, ('Echo', 'w0echo\r\n'))
+        self.Session = SessionHandshake(self.Send, steps)
       
         if self.Unidirectional == 'False':
-            self.AddMatchString(re.compile(b'SspA(-?[0-9]{1,2})\r\n'), self.__MatchAnalogInputGain, None)
-            self.AddMatchString(re.compile(rb'Amt(\d+)\*([01])\r\n'), self.__MatchAudioMute, None)
-            self.AddMatchString(re.compile(b'Exe([0-3])\r\n'), self.__MatchExecutiveMode, None)
-            self.AddMatchString(re.compile(b'SspE([0234])\r\n'), self.__MatchEXPInputAssignment, None)
-            self.AddMatchString(re.compile(b'Amt([01])\r\n'), self.__MatchAudioMute, 'Global')
-            self.AddMatchString(re.compile(b'Aud([1-5])\r\n'), self.__MatchInput, None)
-            self.AddMatchString(re.compile(rb'SspL([1-5])\*([0-9]{1,2})\*([1-7])\r\n'), self.__MatchListeningMode, None)
-            self.AddMatchString(re.compile(rb'SspV(\d+)\*(-?[0-9]{1,2})\r\n'), self.__MatchOutputTrim, None)
-            self.AddMatchString(re.compile(b'Inf33SrcFormat ([0-9]{1,2}) Sampling [0-7] EnChan [0-9]{1,2}'), self.__MatchSourceFormat, None)
-            self.AddMatchString(re.compile(b'SspJ([01])\r\n'), self.__MatchSubwoofer, None)
-            self.AddMatchString(re.compile(rb'Vol(\d+)'), self.__MatchVolume, None)
-            self.AddMatchString(re.compile(rb'(E\d+)\r\n'), self.__MatchError, None)
-            self.AddMatchString(re.compile(b'Vrb3\r\n'), self.__MatchVerboseMode, None)
-            self.AddMatchString(re.compile(b'Echo0\r\n'), self.__MatchEchoMode, None)  # Echo Mode for SSH
+            if DeviceClass.__matchTable is None:
+                table = MatchTable()
+                table.Add(re.compile(b'SspA(-?[0-9]{1,2})\r\n'), DeviceClass.__MatchAnalogInputGain, None)
+                table.Add(re.compile(rb'Amt(\d+)\*([01])\r\n'), DeviceClass.__MatchAudioMute, None)
+                table.Add(re.compile(b'Exe([0-3])\r\n'), DeviceClass.__MatchExecutiveMode, None)
+                table.Add(re.compile(b'SspE([0234])\r\n'), DeviceClass.__MatchEXPInputAssignment, None)
+                table.Add(re.compile(b'Amt([01])\r\n'), DeviceClass.__MatchAudioMute, 'Global')
+                table.Add(re.compile(b'Aud([1-5])\r\n'), DeviceClass.__MatchInput, None)
+                table.Add(re.compile(rb'SspL([1-5])\*([0-9]{1,2})\*([1-7])\r\n'), DeviceClass.__MatchListeningMode, None)
+                table.Add(re.compile(rb'SspV(\d+)\*(-?[0-9]{1,2})\r\n'), DeviceClass.__MatchOutputTrim, None)
+                table.Add(re.compile(b'Inf33SrcFormat ([0-9]{1,2}) Sampling [0-7] EnChan [0-9]{1,2}'), DeviceClass.__MatchSourceFormat, None)
+                table.Add(re.compile(b'SspJ([01])\r\n'), DeviceClass.__MatchSubwoofer, None)
+                table.Add(re.compile(rb'Vol(\d+)'), DeviceClass.__MatchVolume, None)
+                table.Add(re.compile(rb'(E\d+)\r\n'), DeviceClass.__MatchError, None)
+                table.Add(re.compile(b'Vrb3\r\n'), DeviceClass.__MatchVerboseMode, None)
+                table.Add(re.compile(b'Echo0\r\n'), DeviceClass.__MatchEchoMode, None)  # Echo Mode for SSH
+                DeviceClass.__matchTable = table.Freeze()
 
     def __MatchVerboseMode(self, match, qualifier):
         self.OnConnected()
-        self.VerboseDisabled = False
+        self.Session.Confirm('Verbose')
 
     def __MatchEchoMode(self, match, qualifier):
-        self.EchoDisabled = False
+        self.Session.Confirm('Echo')
 
     def SetAnalogInputGain(self, value, qualifier):
 
@@ -528,17 +538,10 @@ class DeviceClass:
 
     def __SetHelper(self, command, commandstring, value, qualifier):
         self.Debug = True
-        if self.EchoDisabled and 'Serial' not in self.ConnectionType:
-            @Wait(1)
-            def SendEcho():
-                self.Send('w0echo\r\n')
-        elif self.VerboseDisabled:
-            @Wait(1)
-            def SendVerbose():
-                self.Send('w3cv\r\n')
-                self.Send(commandstring)
-        else:
+        if self.Unidirectional == 'True':
             self.Send(commandstring)
+        else:
+            self.Session.Send(commandstring)
 
     def __UpdateHelper(self, command, commandstring, value, qualifier):
         if self.initializationChk:
@@ -551,18 +554,8 @@ class DeviceClass:
 
         if self.Unidirectional == 'True':
             self.Discard('Inappropriate Command ' + command)
-        elif self.EchoDisabled and 'Serial' not in self.ConnectionType:
-            @Wait(1)
-            def SendEcho():
-                self.Send('w0echo\r\n') 
         else:
-            if self.VerboseDisabled:
-                @Wait(1)
-                def SendVerbose():
-                    self.Send('w3cv\r\n')
-                    self.Send(commandstring)
-            else:
-                self.Send(commandstring)
+            self.Session.Send(commandstring)
 
     def __MatchError(self, match, tag):
         self.counter = 0
@@ -591,8 +584,7 @@ class DeviceClass:
         self.WriteStatus('ConnectionStatus', 'Disconnected')
         self.connectionFlag = False
 
-        self.EchoDisabled = True
-        self.VerboseDisabled = True
+        self.Session.Reset()
         
     ######################################################    
     # RECOMMENDED not to modify the code below this point
@@ -621,114 +613,53 @@ class DeviceClass:
     def SubscribeStatus(self, command, qualifier, callback):
         Command = self.Commands.get(command, None)
         if Command:
-            if command not in self.Subscription:
-                self.Subscription[command] = {'method':{}}
-        
-            Subscribe = self.Subscription[command]
-            Method = Subscribe['method']
-        
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Method = Method[qualifier[Parameter]]
-                    except:
-                        if Parameter in qualifier:
-                            Method[qualifier[Parameter]] = {}
-                            Method = Method[qualifier[Parameter]]
-                        else:
-                            return
-        
-            Method['callback'] = callback
-            Method['qualifier'] = qualifier    
+            self.Subscription.Add(command, qualifier, callback)
         else:
             raise KeyError('Invalid command for SubscribeStatus ' + command)
 
     # This method is to check the command with new status have a callback method then trigger the callback
     def NewStatus(self, command, value, qualifier):
-        if command in self.Subscription :
-            Subscribe = self.Subscription[command]
-            Method = Subscribe['method']
-            Command = self.Commands[command]
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Method = Method[qualifier[Parameter]]
-                    except:
-                        break
-            if 'callback' in Method and Method['callback']:
-                Method['callback'](command, value, qualifier)  
+        for callback in self.Subscription.Callbacks(command, qualifier):
+            callback(command, value, qualifier)
 
     # Save new status to the command
     def WriteStatus(self, command, value, qualifier=None):
         self.counter = 0
         if not self.connectionFlag:
             self.OnConnected()
-        Command = self.Commands[command]
-        Status = Command['Status']
-        if qualifier:
-            for Parameter in Command['Parameters']:
-                try:
-                    Status = Status[qualifier[Parameter]]
-                except KeyError:
-                    if Parameter in qualifier:
-                        Status[qualifier[Parameter]] = {}
-                        Status = Status[qualifier[Parameter]]
-                    else:
-                        return  
-        try:
-            if Status['Live'] != value:
-                Status['Live'] = value
-                self.NewStatus(command, value, qualifier)
-        except:
-            Status['Live'] = value
+        if self.__statusStore.Write(command, value, qualifier):
             self.NewStatus(command, value, qualifier)
 
     # Read the value from a command.
     def ReadStatus(self, command, qualifier=None):
-        Command = self.Commands.get(command, None)
-        if Command:
-            Status = Command['Status']
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Status = Status[qualifier[Parameter]]
-                    except KeyError:
-                        return None
-            try:
-                return Status['Live']
-            except:
-                return None
+        if command in self.Commands:
+            return self.__statusStore.Read(command, qualifier)
         else:
             raise KeyError('Invalid command for ReadStatus: ' + command)
 
     def __ReceiveData(self, interface, data):
         # Handle incoming data
-        self.__receiveBuffer += data
-        index = 0    # Start of possible good data
+        self.__receiveBuffer.Append(data)
         
         # check incoming data if it matched any expected data from device module
-        for regexString, CurrentMatch in self.__matchStringDict.items():
-            while True:
-                result = re.search(regexString, self.__receiveBuffer)
-                if result:
-                    index = result.start()
-                    CurrentMatch['callback'](result, CurrentMatch['para'])
-                    self.__receiveBuffer = self.__receiveBuffer[:result.start()] + self.__receiveBuffer[result.end():]
-                else:
-                    break
+        if self.MatchEngine == 'Lines':
+            index = self.__matchTable.Lines.Dispatch(self.__receiveBuffer, self)
+        else:
+            index = self.__receiveBuffer.MatchEach(self.__matchTable.Entries, self)
+        index = self.__receiveBuffer.MatchEach(list(self.__matchStringDict.values())) or index
                     
         if index: 
             # Clear out any junk data that came in before any good matches.
-            self.__receiveBuffer = self.__receiveBuffer[index:]
+            self.__receiveBuffer.Consume(index)
         else:
             # In rare cases, the buffer could be filled with garbage quickly.
             # Make sure the buffer is capped.  Max buffer size set in init.
-            self.__receiveBuffer = self.__receiveBuffer[-self.__maxBufferSize:]
+            self.__receiveBuffer.Cap()
 
     # Add regular expression so that it can be check on incoming data from device.
     def AddMatchString(self, regex_string, callback, arg):
-        if regex_string not in self.__matchStringDict:
-            self.__matchStringDict[regex_string] = {'callback': callback, 'para':arg}
+        if regex_string not in self.__matchTable and regex_string not in self.__matchStringDict:
+            self.__matchStringDict[regex_string] = (regex_string, callback, arg)
 
     def MissingCredentialsLog(self, credential_type):
         if isinstance(self, EthernetClientInterface):
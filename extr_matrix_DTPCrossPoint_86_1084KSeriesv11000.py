@@ -2,18 +2,30 @@ from extronlib.interface import SerialInterface, EthernetClientInterface
 import re
 import time
 from extronlib.system import Wait, ProgramLog
+from SC_DriverSupport import MatchTable, ReceiveBuffer, SessionHandshake, StatusStore, SubscriptionIndex, TieGrid
 
 class DeviceClass:
+    __matchTable = None     # MatchTable shared by every instance, built by the first __init__
+
     def __init__(self):
 
         self.Unidirectional = 'False'
         self.connectionCounter = 15
         self.DefaultResponseTimeout = 0.3
-        self.Subscription = {}
         self.ReceiveData = self.__ReceiveData
-        self.__receiveBuffer = b''
-        self.__maxBufferSize = 2048
+        self.__receiveBuffer = ReceiveBuffer(MaxSize=2048)
         self.__matchStringDict = {}
+        self.__matchDispatcher = None       # per-instance dispatcher, only built once AddMatchString adds a pattern
+        self.__tieGrid = None               # TieGrid, see __Ties
+        self.__inputTiesWritten = []        # per output, the (audio, video) inputs last written by InputTieStatusHelper
+        self.__outputTiesWritten = []       # per output, the (audio, video, names) last written by OutputTieStatusHelper
+        self.__tieWriteStats = {'Written': 0, 'Suppressed': 0}
+        self.__ioNames = {}                 # ('Input' or 'Output', number) -> 'Matrix IO Name Status', see __IOName
+        self.__tieTransactions = []         # (tie type, {output: input}) sent by SetMatrixTieTransaction, oldest first
+        self.__tieTransactionWait = None
+        self.TieTransactionTimeout = 3
+        # 'Dispatcher' scans the buffer once; 'Lines' dispatches complete lines by prefix; 'Legacy' runs each pattern in turn
+        self.MatchEngine = 'Dispatcher'
         self.counter = 0
         self.connectionFlag = True
         self.initializationChk = True
@@ -72,6 +84,7 @@ class DeviceClass:
             'MatrixIONameCommand': {'Parameters':['Type'], 'Status': {}},
             'MatrixIONameStatus': {'Parameters':['Type','Number'], 'Status': {}},
             'MatrixTieCommand': {'Parameters':['Input','Output','Tie Type'], 'Status': {}},
+            'MatrixTieTransaction': { 'Status': {}},
             'MicLineGain': {'Parameters': ['Input'], 'Status': {}},
             'MicLineMute': {'Parameters':['Input'], 'Status': {}},
             'MicrophoneSignalStatus': {'Parameters':['Input'], 'Status': {}},
@@ -99,164 +112,187 @@ class DeviceClass:
             'VirtualReturnGain': {'Parameters':['Input'], 'Status': {}},
             'VirtualReturnMute': {'Parameters':['Input'], 'Status': {}},
         }
+        self.__statusStore = StatusStore(self.Commands)
+        self.Subscription = SubscriptionIndex(self.Commands)
 
-        self.EchoDisabled = True
-        self.VerboseDisabled = True
+        # Echo is only turned off on SSH; the session is confirmed by Echo0 and Vrb3
+        steps = [('Verbose', 'w3cv\r\n')]
+        if 'Serial' not in self.ConnectionType:
+            steps.insert(0, ('Echo', 'w0echo\r\n'))
+        self.Session = SessionHandshake(self.Send, steps)
         self.GroupFunction = {}
 
         if self.Unidirectional == 'False':
-            self.AddMatchString(re.compile(b'Rpr\d\*\d+\r\n'), self.__MatchPreset, None)
-            self.AddMatchString(re.compile(b'Ds[gG]600(16|17)\*([-]\d{1,4}|0)\r\n'), self.__MatchAmplifierAttenuation, None)
-            self.AddMatchString(re.compile(b'Ds[mM]600(16|17)\*(0|1)\r\n'), self.__MatchAmplifierMute, None)
-            self.AddMatchString(re.compile(b'Ds[gG]6011([67])\*([0-9 -]{1,4})\r\n'), self.__MatchAmplifierPostmixerTrim, None)
-            self.AddMatchString(re.compile(b'Ds[gG]6000([0-7])\*([-]\d{1,4}|0)\r\n'), self.__MatchAnalogAttenuation, None)
-            self.AddMatchString(re.compile(b'Ds[mM]6000([0-7])\*(0|1)\r\n'), self.__MatchAnalogMute, None)
-            self.AddMatchString(re.compile(b'Aspr(\d{2})\*(1|2)\r\n'), self.__MatchAspectRatio, None)
-            self.AddMatchString(re.compile(b'GrpmD(1|2|3|4|5|6|7|8|9|10|11|12|13|14|15|16|17|18|19|20|21|22|23|24|25|26|27|28|29|30|31|32)\*([-+]{0,1}[0-9]{1,4})\r\n'), self.__MatchGroup, None)
-            self.AddMatchString(re.compile(b'Ds[gG]600(08|09|10|11|12|13|14|15)\*([-]\d{1,4}|0)\r\n'), self.__MatchDTPAttenuation, None)
-            self.AddMatchString(re.compile(b'Ds[mM]600(08|09|10|11|12|13|14|15)\*(0|1)\r\n'), self.__MatchDTPMute, None)
-            self.AddMatchString(re.compile(b'EdidA(0[1-9]|10)\*(0?[1-9]|[1-5][0-9]|6[0-6])\r\n'), self.__MatchEDIDAssignment, None)
-            self.AddMatchString(re.compile(b'Exe([0-2])\r\n'), self.__MatchExecutiveMode, None)
-            self.AddMatchString(re.compile(b'Ds[gG]502([01][0-9])\*([0-9 -]{1,5})\r\n'), self.__MatchExpansionPremixerGain, None)
-            self.AddMatchString(re.compile(b'Ds[mM]502([01][0-9])\*([01])\r\n'), self.__MatchExpansionPremixerMute, None)
-            self.AddMatchString(re.compile(b'Frz(\d{2})\*(00|01)\r\n'), self.__MatchFreeze, None)
-            self.AddMatchString(re.compile(b'Ds[gG]6020([0-7])\*([-]\d{1,4}|0)\r\n'), self.__MatchHDMIAttenuation, None)
-            self.AddMatchString(re.compile(b'Ds[mM]6020([0-7])\*(0|1)\r\n'), self.__MatchHDMIMute, None)
-            self.AddMatchString(re.compile(b'AfmtI(\d{2})\*([0-2])\r\n'), self.__MatchInputAudioSwitchMode, 'Single')
-            self.AddMatchString(re.compile(b'AfmtI([0-2]{10}|[0-2]{8})\r\n'), self.__MatchInputAudioSwitchMode, 'All')
-            self.AddMatchString(re.compile(b'Ds([gGhH])300([01][0-9])\*([0-9 -]{1,4})\r\n'), self.__MatchInputGain, None)
-            self.AddMatchString(re.compile(b'Ds[mM]300([01][0-9])\*([01])\r\n'), self.__MatchInputMute, None)
-            self.AddMatchString(re.compile(b'Ityp(0[1-9]|10)\*([0-7])\r\n'), self.__MatchInputFormat, None)
-            self.AddMatchString(re.compile(b'Frq00 ([0-1]+)\r\n'), self.__MatchInputSignalStatus, None)
-            self.AddMatchString(re.compile(b'HdcpE(\d{2})\*(0|1)\r\n'), self.__MatchHDCPInputAuthorization, None)
-            self.AddMatchString(re.compile(b'LogoE([3-8])\*(.*)\r\n'), self.__MatchLogo, None)
-            self.AddMatchString(re.compile(b'LogoQ00\*([01]+)[\*01]+\r\n'), self.__MatchLogoAvailability, None)
-            self.AddMatchString(re.compile(b'Vkef00([1-8])\*([0-4])\r\n'), self.__MatchLogoKeySetting, None)
-            self.AddMatchString(re.compile(b'Nm([io])([1-9]|10),([ \S]{0,16})\r\n'), self.__MatchMatrixIONameStatus, None)
-            self.AddMatchString(re.compile(b'Ds[gG]4000([0-3])\*([0-9 -]{1,4})\r\n'), self.__MatchMicLineGain, None)
-            self.AddMatchString(re.compile(b'Ds[mM]4000([0-3])\*(0|1)\r\n'), self.__MatchMicLineMute, None)
-            self.AddMatchString(re.compile(b'Ds[vV]4000([0-3])\*[01]\*([0-9]{1,4})\r\n'), self.__MatchMicrophoneSignalStatus, None)
-            self.AddMatchString(re.compile(b'Ds[gG]2([0-9]{2})([0-9]{2})\*([-][0-9]{1,4}|0|[0-9]{1,3})\r\n'), self.__MatchMixpointGain, None)
-            self.AddMatchString(re.compile(b'Ds[mM]2([0-9]{2})([0-9]{2})\*(0|1)\r\n'), self.__MatchMixpointMute, None)
-            self.AddMatchString(re.compile(b'AfmtO(\d{2})\*([0-2])\r\n'), self.__MatchOutputAudioSelect, 'Single')
-            self.AddMatchString(re.compile(b'AfmtO([0-2]{2,8})\r\n'), self.__MatchOutputAudioSelect, 'All')
-            self.AddMatchString(re.compile(b'HdcpS(([1-8])(A|B|a|b|))\*(0|1)\r\n'), self.__MatchHDCPOutputAuthorization, None)
-            self.AddMatchString(re.compile(b'Ds[gG]601(0[0-9]|1[0-5])\*([0-9 -]{1,4})\r\n'), self.__MatchOutputPostmixerTrim, None)
-            self.AddMatchString(re.compile(b'HdcpI(\d{2})\*([0-2])\r\n'), self.__MatchHDCPInputStatus, None)
-            self.AddMatchString(re.compile(b'HdcpO(1|2|3|3A|3B|4|4A|4B|5|5A|5B|6|6A|6B|7|8)\*([0-3])\r\n'), self.__MatchHDCPOutputStatus, None)
-            self.AddMatchString(re.compile(b'Rate(\d{2})\*(\d{2})\r\n'), self.__MatchOutputResolution, None)
-            self.AddMatchString(re.compile(b'DsZ4000([0-3])\*([01])\r\n'), self.__MatchPhantomPower, None)
-            self.AddMatchString(re.compile(b'Ds[gG]301([01][0-9])\*([0-9 -]{1,4})\r\n'), self.__MatchPrematrixTrim, None)
-            self.AddMatchString(re.compile(b'Ds[gG]500([01][0-9])\*([-]\d{1,4}|\d{1,3})\r\n'), self.__MatchPostMatrixGain, None)
-            self.AddMatchString(re.compile(b'Ds[mM]500([01][0-9])\*(0|1)\r\n'), self.__MatchPostMatrixMute, None)
-            self.AddMatchString(re.compile(b'Ds[gG]4010([0-7])\*(-*\d{1,4})\r\n'), self.__MatchPremixerGain, None)
-            self.AddMatchString(re.compile(b'Ds[mM]4010([0-7])\*(0|1)\r\n'), self.__MatchPremixerMute, None)
-            self.AddMatchString(re.compile(b'Sts00\*\d{1,3}\.\d{1,3} (\d{1,3}\.\d{1,3}) \d+ \d+\r\n'), self.__MatchTemperature, None),
-            self.AddMatchString(re.compile(b'Test0([3-8])\*0([0-6])\r\n'), self.__MatchTestPattern, None)
-            self.AddMatchString(re.compile(b'Vmt(([1-8])(A|B|a|b|))\*([0-2])\r\n'), self.__MatchVideoMute, None)
-            self.AddMatchString(re.compile(b'Ds[gG]5010([0-7])\*([-]\d{1,4}|\d{1,3})\r\n'), self.__MatchVirtualReturnGain, None)
-            self.AddMatchString(re.compile(b'Ds[mM]5010([0-7])\*([0-1])\r\n'), self.__MatchVirtualReturnMute, None)
-            self.AddMatchString(re.compile(b'Qik\r\n'), self.__MatchQik, None)
-            self.AddMatchString(re.compile(b'PrstR\d+\r\n'), self.__MatchQik, None)  # Response to a Set Preset Recall command
-            self.AddMatchString(re.compile(b'Vgp00 Out(\d{2})\*([0-9 -]*)Vid\r\n'), self.__MatchAllMatrixTie, 'Video')
-            self.AddMatchString(re.compile(b'Vgp00 Out(\d{2})\*([0-9 -]*)Aud\r\n'), self.__MatchAllMatrixTie, 'Audio')
-            self.AddMatchString(re.compile(b'(?:Out(\d+) In(\d+) (All|Vid|Aud))|(?:In(\d+) (All|Vid|Aud))\r\n'), self.__MatchOutputTieStatus, None)
-
-            self.AddMatchString(re.compile(b'E(01|1[0-7]|2[245678]|3[012])\r\n'), self.__MatchError, None)
-            self.AddMatchString(re.compile(b'Vrb3\r\n'), self.__MatchVerboseMode, None)
-            self.AddMatchString(re.compile(b'Echo0\r\n'), self.__MatchEchoMode, None)
+            if DeviceClass.__matchTable is None:
+                table = MatchTable()
+                table.Add(re.compile(b'Rpr\d\*\d+\r\n'), DeviceClass.__MatchPreset, None)
+                table.Add(re.compile(b'Ds[gG]600(16|17)\*([-]\d{1,4}|0)\r\n'), DeviceClass.__MatchAmplifierAttenuation, None)
+                table.Add(re.compile(b'Ds[mM]600(16|17)\*(0|1)\r\n'), DeviceClass.__MatchAmplifierMute, None)
+                table.Add(re.compile(b'Ds[gG]6011([67])\*([0-9 -]{1,4})\r\n'), DeviceClass.__MatchAmplifierPostmixerTrim, None)
+                table.Add(re.compile(b'Ds[gG]6000([0-7])\*([-]\d{1,4}|0)\r\n'), DeviceClass.__MatchAnalogAttenuation, None)
+                table.Add(re.compile(b'Ds[mM]6000([0-7])\*(0|1)\r\n'), DeviceClass.__MatchAnalogMute, None)
+                table.Add(re.compile(b'Aspr(\d{2})\*(1|2)\r\n'), DeviceClass.__MatchAspectRatio, None)
+                table.Add(re.compile(b'GrpmD(1|2|3|4|5|6|7|8|9|10|11|12|13|14|15|16|17|18|19|20|21|22|23|24|25|26|27|28|29|30|31|32)\*([-+]{0,1}[0-9]{1,4})\r\n'), DeviceClass.__MatchGroup, None)
+                table.Add(re.compile(b'Ds[gG]600(08|09|10|11|12|13|14|15)\*([-]\d{1,4}|0)\r\n'), DeviceClass.__MatchDTPAttenuation, None)
+                table.Add(re.compile(b'Ds[mM]600(08|09|10|11|12|13|14|15)\*(0|1)\r\n'), DeviceClass.__MatchDTPMute, None)
+                table.Add(re.compile(b'EdidA(0[1-9]|10)\*(0?[1-9]|[1-5][0-9]|6[0-6])\r\n'), DeviceClass.__MatchEDIDAssignment, None)
+                table.Add(re.compile(b'Exe([0-2])\r\n'), DeviceClass.__MatchExecutiveMode, None)
+                table.Add(re.compile(b'Ds[gG]502([01][0-9])\*([0-9 -]{1,5})\r\n'), DeviceClass.__MatchExpansionPremixerGain, None)
+                table.Add(re.compile(b'Ds[mM]502([01][0-9])\*([01])\r\n'), DeviceClass.__MatchExpansionPremixerMute, None)
+                table.Add(re.compile(b'Frz(\d{2})\*(00|01)\r\n'), DeviceClass.__MatchFreeze, None)
+                table.Add(re.compile(b'Ds[gG]6020([0-7])\*([-]\d{1,4}|0)\r\n'), DeviceClass.__MatchHDMIAttenuation, None)
+                table.Add(re.compile(b'Ds[mM]6020([0-7])\*(0|1)\r\n'), DeviceClass.__MatchHDMIMute, None)
+                table.Add(re.compile(b'AfmtI(\d{2})\*([0-2])\r\n'), DeviceClass.__MatchInputAudioSwitchMode, 'Single')
+                table.Add(re.compile(b'AfmtI([0-2]{10}|[0-2]{8})\r\n'), DeviceClass.__MatchInputAudioSwitchMode, 'All')
+                table.Add(re.compile(b'Ds([gGhH])300([01][0-9])\*([0-9 -]{1,4})\r\n'), DeviceClass.__MatchInputGain, None)
+                table.Add(re.compile(b'Ds[mM]300([01][0-9])\*([01])\r\n'), DeviceClass.__MatchInputMute, None)
+                table.Add(re.compile(b'Ityp(0[1-9]|10)\*([0-7])\r\n'), DeviceClass.__MatchInputFormat, None)
+                table.Add(re.compile(b'Frq00 ([0-1]+)\r\n'), DeviceClass.__MatchInputSignalStatus, None)
+                table.Add(re.compile(b'HdcpE(\d{2})\*(0|1)\r\n'), DeviceClass.__MatchHDCPInputAuthorization, None)
+                table.Add(re.compile(b'LogoE([3-8])\*(.*)\r\n'), DeviceClass.__MatchLogo, None)
+                table.Add(re.compile(b'LogoQ00\*([01]+)[\*01]+\r\n'), DeviceClass.__MatchLogoAvailability, None)
+                table.Add(re.compile(b'Vkef00([1-8])\*([0-4])\r\n'), DeviceClass.__MatchLogoKeySetting, None)
+                table.Add(re.compile(b'Nm([io])([1-9]|10),([ \S]{0,16})\r\n'), DeviceClass.__MatchMatrixIONameStatus, None)
+                table.Add(re.compile(b'Ds[gG]4000([0-3])\*([0-9 -]{1,4})\r\n'), DeviceClass.__MatchMicLineGain, None)
+                table.Add(re.compile(b'Ds[mM]4000([0-3])\*(0|1)\r\n'), DeviceClass.__MatchMicLineMute, None)
+                table.Add(re.compile(b'Ds[vV]4000([0-3])\*[01]\*([0-9]{1,4})\r\n'), DeviceClass.__MatchMicrophoneSignalStatus, None)
+                table.Add(re.compile(b'Ds[gG]2([0-9]{2})([0-9]{2})\*([-][0-9]{1,4}|0|[0-9]{1,3})\r\n'), DeviceClass.__MatchMixpointGain, None)
+                table.Add(re.compile(b'Ds[mM]2([0-9]{2})([0-9]{2})\*(0|1)\r\n'), DeviceClass.__MatchMixpointMute, None)
+                table.Add(re.compile(b'AfmtO(\d{2})\*([0-2])\r\n'), DeviceClass.__MatchOutputAudioSelect, 'Single')
+                table.Add(re.compile(b'AfmtO([0-2]{2,8})\r\n'), DeviceClass.__MatchOutputAudioSelect, 'All')
+                table.Add(re.compile(b'HdcpS(([1-8])(A|B|a|b|))\*(0|1)\r\n'), DeviceClass.__MatchHDCPOutputAuthorization, None)
+                table.Add(re.compile(b'Ds[gG]601(0[0-9]|1[0-5])\*([0-9 -]{1,4})\r\n'), DeviceClass.__MatchOutputPostmixerTrim, None)
+                table.Add(re.compile(b'HdcpI(\d{2})\*([0-2])\r\n'), DeviceClass.__MatchHDCPInputStatus, None)
+                table.Add(re.compile(b'HdcpO(1|2|3|3A|3B|4|4A|4B|5|5A|5B|6|6A|6B|7|8)\*([0-3])\r\n'), DeviceClass.__MatchHDCPOutputStatus, None)
+                table.Add(re.compile(b'Rate(\d{2})\*(\d{2})\r\n'), DeviceClass.__MatchOutputResolution, None)
+                table.Add(re.compile(b'DsZ4000([0-3])\*([01])\r\n'), DeviceClass.__MatchPhantomPower, None)
+                table.Add(re.compile(b'Ds[gG]301([01][0-9])\*([0-9 -]{1,4})\r\n'), DeviceClass.__MatchPrematrixTrim, None)
+                table.Add(re.compile(b'Ds[gG]500([01][0-9])\*([-]\d{1,4}|\d{1,3})\r\n'), DeviceClass.__MatchPostMatrixGain, None)
+                table.Add(re.compile(b'Ds[mM]500([01][0-9])\*(0|1)\r\n'), DeviceClass.__MatchPostMatrixMute, None)
+                table.Add(re.compile(b'Ds[gG]4010([0-7])\*(-*\d{1,4})\r\n'), DeviceClass.__MatchPremixerGain, None)
+                table.Add(re.compile(b'Ds[mM]4010([0-7])\*(0|1)\r\n'), DeviceClass.__MatchPremixerMute, None)
+                table.Add(re.compile(b'Sts00\*\d{1,3}\.\d{1,3} (\d{1,3}\.\d{1,3}) \d+ \d+\r\n'), DeviceClass.__MatchTemperature, None),
+                table.Add(re.compile(b'Test0([3-8])\*0([0-6])\r\n'), DeviceClass.__MatchTestPattern, None)
+                table.Add(re.compile(b'Vmt(([1-8])(A|B|a|b|))\*([0-2])\r\n'), DeviceClass.__MatchVideoMute, None)
+                table.Add(re.compile(b'Ds[gG]5010([0-7])\*([-]\d{1,4}|\d{1,3})\r\n'), DeviceClass.__MatchVirtualReturnGain, None)
+                table.Add(re.compile(b'Ds[mM]5010([0-7])\*([0-1])\r\n'), DeviceClass.__MatchVirtualReturnMute, None)
+                table.Add(re.compile(b'Qik\r\n'), DeviceClass.__MatchQik, None)
+                table.Add(re.compile(b'PrstR\d+\r\n'), DeviceClass.__MatchPreset, None)  # Response to a Set Preset Recall command
+                table.Add(re.compile(b'Vgp00 Out(\d{2})\*([0-9 -]*)Vid\r\n'), DeviceClass.__MatchAllMatrixTie, 'Video')
+                table.Add(re.compile(b'Vgp00 Out(\d{2})\*([0-9 -]*)Aud\r\n'), DeviceClass.__MatchAllMatrixTie, 'Audio')
+                table.Add(re.compile(b'(?:Out(\d+) In(\d+) (All|Vid|Aud))|(?:In(\d+) (All|Vid|Aud))\r\n'), DeviceClass.__MatchOutputTieStatus, None)
+
+                table.Add(re.compile(b'E(01|1[0-7]|2[245678]|3[012])\r\n'), DeviceClass.__MatchError, None)
+                table.Add(re.compile(b'Vrb3\r\n'), DeviceClass.__MatchVerboseMode, None)
+                table.Add(re.compile(b'Echo0\r\n'), DeviceClass.__MatchEchoMode, None)
+                DeviceClass.__matchTable = table.Freeze()
 
 
     def __MatchVerboseMode(self, match, qualifier):
         self.OnConnected()
-        self.VerboseDisabled = False
+        self.Session.Confirm('Verbose')
         self.UpdateAllMatrixTie( None, None)
 
     def __MatchEchoMode(self, match, qualifier):
-        self.EchoDisabled = False
+        self.Session.Confirm('Echo')
 
 
     def __MatchQik(self, match, tag):
-        self.UpdateAllMatrixTie( None, None)
+        if self.__tieTransactions:
+            self.__CompleteTieTransaction()
+        else:
+            self.UpdateAllMatrixTie( None, None)
 
     def __MatchPreset(self, match, tag):
         self.UpdateAllMatrixTie( None, None)
 
+    # The tie grid is sized by the model, so it is built on first use rather than in __init__
+    def __Ties(self):
+        if self.__tieGrid is None or (self.__tieGrid.InputSize, self.__tieGrid.OutputSize) != (self.InputSize, self.OutputSize):
+            self.__tieGrid = TieGrid(self.InputSize, self.OutputSize)
+            self.__inputTiesWritten = [None] * self.OutputSize
+            self.__outputTiesWritten = [None] * self.OutputSize
+        return self.__tieGrid
+
+    # Tie states as a list per input of lists per output, as earlier versions of the module kept them
+    @property
+    def matrix_tie_status(self):
+        return self.__Ties().Rows()
+
+    # Counts of tie status writes made by the helpers, and of writes skipped because the output's ties had not changed
+    def TieWriteStats(self):
+        return dict(self.__tieWriteStats)
+
     def UpdateAllMatrixTie(self, value, qualifier):
 
         self.audio_status_counter = 0
         self.video_status_counter = 0
-        self.matrix_tie_status = [['Untied' for _ in range(self.OutputSize)] for _ in range(self.InputSize)]
+        self.__Ties().Clear()
 
         self.Send('w0*1*1VC\r\nw0*1*2VC\r\n')
 
+    # Only the crosspoints of outputs whose ties changed since the last write are written. On such an output, only
+    # the inputs tied there before or after the change can have a different state.
     def InputTieStatusHelper(self, tie, output=None):
         if tie == 'Individual':
             output_range = range(output-1, output)
         else:
             output_range = range(self.OutputSize)
-        for input_ in range(self.InputSize):
-            for output in output_range:
-                self.WriteStatus('InputTieStatus', self.matrix_tie_status[input_][output], {'Input': str(input_ + 1), 'Output': str(output + 1)})
-
+        ties = self.__Ties()
+        written = self.__inputTiesWritten
+        count = 0
+        for output in output_range:
+            audio, video = ties.Input(output + 1, 'Audio'), ties.Input(output + 1, 'Video')
+            previous = written[output]
+            if previous == (audio, video):
+                continue
+            if previous is None:
+                inputs = range(1, self.InputSize + 1)
+            else:
+                inputs = sorted({previous[0], previous[1], audio, video} - {0})
+            for input_ in inputs:
+                self.WriteStatus('InputTieStatus', ties.State(input_, output + 1), {'Input': str(input_), 'Output': str(output + 1)})
+            count += len(inputs)
+            written[output] = (audio, video)
+        self.__tieWriteStats['Written'] += count
+        self.__tieWriteStats['Suppressed'] += self.InputSize * len(output_range) - count
+
+    # An output's three tie types are written together, and only when its ties changed since the last write. Names
+    # are written as well once 'Matrix IO Name Status' is known, and in full the first time it is.
     def OutputTieStatusHelper(self, tie, output=None):
 
-        AudioList = set()
-        VideoList = set()
-
         if tie == 'Individual':
             output_range = range(output-1, output)
         else:
             output_range = range(self.OutputSize)
 
-        matrixIONameStatus = self.ReadStatus('MatrixIONameStatus', {'Type': 'Output', 'Number': str(self.OutputSize)}) # used to check if 'Matrix IO Name Status' exists or not
-        for input_ in range(self.InputSize):
-            inputName = self.ReadStatus('MatrixIONameStatus', {'Type': 'Input', 'Number': str(input_+1)}) # get input name to write for 'Output Tie Status Name'
-            for output in output_range:
-                tietype = self.matrix_tie_status[input_][output]
-                inputName = 'Untied' if not inputName else inputName # write 'Untied' for 'Output Tie Status Name' if no input name exists
-                if tietype == 'Audio/Video':
-                    for tie_type in ['Audio', 'Video', 'Audio/Video']:
-                        self.WriteStatus('OutputTieStatus', str(input_+1), {'Output': str(output+1), 'Tie Type': tie_type})
-                        if matrixIONameStatus: # only write 'Output Tie Status Name' if 'Matrix IO Name Status' has been written (prevents debug log error)
-                            self.WriteStatus('OutputTieStatusName', inputName, {'Output': str(output+1), 'Tie Type': tie_type})
-                    AudioList.add(output)
-                    VideoList.add(output)
-                elif tietype == 'Audio':
-                    self.WriteStatus('OutputTieStatus', '0', {'Output': str(output+1), 'Tie Type': 'Audio/Video'})
-                    self.WriteStatus('OutputTieStatus', str(input_+1), {'Output': str(output+1), 'Tie Type': 'Audio'})
-                    if matrixIONameStatus:
-                        self.WriteStatus('OutputTieStatusName', 'Untied', {'Output': str(output+1), 'Tie Type': 'Audio/Video'})
-                        self.WriteStatus('OutputTieStatusName', inputName, {'Output': str(output+1), 'Tie Type': 'Audio'})
-                    AudioList.add(output)
-                elif tietype == 'Video':
-                    self.WriteStatus('OutputTieStatus', '0', {'Output': str(output+1), 'Tie Type': 'Audio/Video'})
-                    self.WriteStatus('OutputTieStatus', str(input_+1), {'Output': str(output+1), 'Tie Type': 'Video'})
-                    if matrixIONameStatus:
-                        self.WriteStatus('OutputTieStatusName', 'Untied', {'Output': str(output+1), 'Tie Type': 'Audio/Video'})
-                        self.WriteStatus('OutputTieStatusName', inputName, {'Output': str(output+1), 'Tie Type': 'Video'})
-                    VideoList.add(output)
-        for o in output_range:
-            if o not in VideoList:
-                self.WriteStatus('OutputTieStatus', '0', {'Output': str(o+1), 'Tie Type': 'Video'})
-                if matrixIONameStatus:
-                    self.WriteStatus('OutputTieStatusName', 'Untied', {'Output': str(o+1), 'Tie Type': 'Video'})
-            if o not in AudioList:
-                self.WriteStatus('OutputTieStatus', '0', {'Output': str(o+1), 'Tie Type': 'Audio'})
-                if matrixIONameStatus:
-                    self.WriteStatus('OutputTieStatusName', 'Untied', {'Output': str(o+1), 'Tie Type': 'Audio'})
-            if o not in VideoList and o not in AudioList:
-                self.WriteStatus('OutputTieStatus', '0', {'Output': str(o+1), 'Tie Type': 'Audio/Video'})
-                if matrixIONameStatus:
-                    self.WriteStatus('OutputTieStatusName', 'Untied', {'Output': str(o+1), 'Tie Type': 'Audio/Video'})
+        ties = self.__Ties()
+        written = self.__outputTiesWritten
+        matrixIONameStatus = self.__IOName('Output', str(self.OutputSize)) # used to check if 'Matrix IO Name Status' exists or not
+        perOutput = 6 if matrixIONameStatus else 3
+        count = 0
+        for output in output_range:
+            audio, video = ties.Input(output + 1, 'Audio'), ties.Input(output + 1, 'Video')
+            state = (audio, video, bool(matrixIONameStatus))
+            if written[output] == state:
+                continue
+            both = audio if audio == video else 0
+            for tie_type, input_ in (('Audio', audio), ('Video', video), ('Audio/Video', both)):
+                self.WriteStatus('OutputTieStatus', str(input_), {'Output': str(output+1), 'Tie Type': tie_type})
+                if matrixIONameStatus: # only write 'Output Tie Status Name' if 'Matrix IO Name Status' has been written (prevents debug log error)
+                    inputName = self.__IOName('Input', str(input_)) if input_ else None
+                    self.WriteStatus('OutputTieStatusName', inputName or 'Untied', {'Output': str(output+1), 'Tie Type': tie_type}) # 'Untied' if no input name exists
+            count += perOutput
+            written[output] = state
+        self.__tieWriteStats['Written'] += count
+        self.__tieWriteStats['Suppressed'] += perOutput * len(output_range) - count
 
     def __MatchAllMatrixTie(self, match, tag):
 
         current_output = int(match.group(1))
         input_list = match.group(2).decode().split()
 
-        opposite_tag = 'Video' if tag == 'Audio' else 'Audio'
-
+        ties = self.__Ties()
         for i in input_list:
             if i != '--':
                 if tag == 'Audio':
@@ -264,17 +300,12 @@ class DeviceClass:
                 elif tag == 'Video':
                     self.video_status_counter += 1
 
-                if i != '00':
-                    if self.matrix_tie_status[int(i) - 1][int(current_output - 1)] == opposite_tag:
-                        self.matrix_tie_status[int(i) - 1][int(current_output - 1)] = 'Audio/Video'
-                    else:
-                        self.matrix_tie_status[int(i) - 1][int(current_output - 1)] = tag
-
+                ties.Tie(int(i), current_output, tag)
                 current_output += 1
             else:
                 break
 
-        if self.audio_status_counter == self.OutputSize and self.video_status_counter == self.OutputSize:
+        if self.audio_status_counter == self.OutputSize and self.video_status_counter == self.OutputSize and not self.__tieTransactions:
             self.InputTieStatusHelper('All')
             self.OutputTieStatusHelper('All')
 
@@ -1931,18 +1962,20 @@ class DeviceClass:
             cmdstring = 'w{0},{1}{2}\r'.format(number, name, TypeStates[qualifier['Type']])
             cmdstring = cmdstring.encode(encoding='iso-8859-1')
             self.__SetHelper('MatrixIONameCommand', cmdstring, None, None)
-            if qualifier['Type'] == 'Input': #only write the name if it's for input
-                for x in range(1, self.InputSize + 1):
-                    audioVal = self.ReadStatus('OutputTieStatus', {'Output': str(x), 'Tie Type': 'Audio'}) # get audio input
-                    videoVal = self.ReadStatus('OutputTieStatus', {'Output': str(x), 'Tie Type': 'Video'}) # get video input
-                    if audioVal == int(number):
-                        self.WriteStatus('OutputTieStatusName', name, {'Output': str(x), 'Tie Type': 'Audio'})
-                    if videoVal == int(number):
-                        self.WriteStatus('OutputTieStatusName', name, {'Output': str(x), 'Tie Type': 'Video'})
-                    if audioVal == videoVal == int(number): # if video input is the same as audio input
-                        self.WriteStatus('OutputTieStatusName', name, {'Output': str(x), 'Tie Type': 'Audio/Video'}) # write AV name
+            # The tie names follow when the device answers with the new name (__MatchMatrixIONameStatus)
+            self.__ioNames.pop((qualifier['Type'], str(number)), None)
         else:
             self.Discard('Invalid Command for SetMatrixIONameCommand')
+
+    # I/O names for the tie helpers, kept apart from the status store. Filled by __MatchMatrixIONameStatus; an entry
+    # dropped by SetMatrixIONameCommand is read back from the status once, until the device confirms the new name.
+    def __IOName(self, type_, number):
+        try:
+            return self.__ioNames[(type_, number)]
+        except KeyError:
+            name = self.__ioNames[(type_, number)] = self.ReadStatus('MatrixIONameStatus', {'Type': type_, 'Number': number})
+            return name
+
     def __MatchMatrixIONameStatus(self, match, tag):
 
         TypeStates = {
@@ -1954,16 +1987,20 @@ class DeviceClass:
         number = match.group(2).decode()
         value = match.group(3).decode()
         self.WriteStatus('MatrixIONameStatus', value, {'Type': type_, 'Number': number})
+        self.__ioNames[(type_, number)] = value
         if type_ == 'Input': # only write the name if type is input
-            for x in range(1, self.InputSize + 1):
-                audioVal = self.ReadStatus('OutputTieStatus', {'Output': str(x), 'Tie Type': 'Audio'}) # get audio input
-                videoVal = self.ReadStatus('OutputTieStatus', {'Output': str(x), 'Tie Type': 'Video'}) # get video input
+            self.__Ties()
+            for x, written in enumerate(self.__outputTiesWritten, 1):
+                if written is None:
+                    continue
+                audioVal, videoVal = str(written[0]), str(written[1]) # the inputs last written to 'Output Tie Status'
+                name = value or 'Untied' # as OutputTieStatusHelper writes an input without a name
                 if audioVal == number:
-                    self.WriteStatus('OutputTieStatusName', value, {'Output': str(x), 'Tie Type': 'Audio'})
+                    self.WriteStatus('OutputTieStatusName', name, {'Output': str(x), 'Tie Type': 'Audio'})
                 if videoVal == number:
-                    self.WriteStatus('OutputTieStatusName', value, {'Output': str(x), 'Tie Type': 'Video'})
+                    self.WriteStatus('OutputTieStatusName', name, {'Output': str(x), 'Tie Type': 'Video'})
                 if audioVal == videoVal == number:
-                    self.WriteStatus('OutputTieStatusName', value, {'Output': str(x), 'Tie Type': 'Audio/Video'})
+                    self.WriteStatus('OutputTieStatusName', name, {'Output': str(x), 'Tie Type': 'Audio/Video'})
 
     def SetRefreshMatrixIONames(self, value, qualifier):
 
@@ -2012,6 +2049,67 @@ class DeviceClass:
                 self.Discard('Invalid Command for SetMatrixTieCommand')
         else:
             self.Discard('Invalid Command for SetMatrixTieCommand')
+
+    # value is a {output: input} map, tied on qualifier['Tie Type'] ('Audio/Video' if not given) with one quick
+    # multiple tie command. The device answers it with a single Qik once every tie is made. Until then tie feedback
+    # only updates the tie grid, and the status helpers write the net change once, on the Qik.
+    def SetMatrixTieTransaction(self, value, qualifier):
+
+        TieTypeStates = {
+            'Audio'       : '$',
+            'Audio/Video' : '!',
+            'Video'       : '%'
+        }
+        tieType = qualifier.get('Tie Type', 'Audio/Video') if qualifier else 'Audio/Video'
+        try:
+            ties = {int(output): int(input_) for output, input_ in value.items()}
+        except (AttributeError, TypeError, ValueError):
+            ties = None
+
+        if ties and tieType in TieTypeStates and all(1 <= output <= self.OutputSize and 0 <= input_ <= self.InputSize for output, input_ in ties.items()):
+            Tie = TieTypeStates[tieType]
+            MatrixTieTransactionCmdString = '\x1b+Q{0}\r\n'.format(''.join('{0}*{1}{2}'.format(input_, output, Tie) for output, input_ in sorted(ties.items())))
+            self.__tieTransactions.append((tieType, ties))
+            if self.__tieTransactionWait is None:
+                self.__tieTransactionWait = Wait(self.TieTransactionTimeout, self.__TieTransactionExpired)
+            elif len(self.__tieTransactions) == 1:
+                self.__tieTransactionWait.Restart()
+            self.WriteLocalStatus('MatrixTieTransaction', 'Pending')
+            self.__SetHelper('MatrixTieTransaction', MatrixTieTransactionCmdString, value, qualifier)
+        else:
+            self.Discard('Invalid Command for SetMatrixTieTransaction')
+
+    # Transactions are answered in the order they were sent, so each Qik confirms the oldest one
+    def __CompleteTieTransaction(self):
+        tieType, ties = self.__tieTransactions.pop(0)
+        grid = self.__Ties()
+        for output, input_ in ties.items():
+            grid.Tie(input_, output, tieType)
+
+        if self.__tieTransactions:
+            self.__tieTransactionWait.Restart()
+        else:
+            self.__tieTransactionWait.Cancel()
+        self.WriteLocalStatus('MatrixTieTransaction', 'Confirmed')
+        if not self.__tieTransactions:
+            self.InputTieStatusHelper('All')
+            self.OutputTieStatusHelper('All')
+
+    # The ties of a failed transaction are unknown, so they are read back from the device
+    def __FailTieTransactions(self, count, Refresh=True):
+        del self.__tieTransactions[:count]
+        if self.__tieTransactions:
+            self.__tieTransactionWait.Restart()
+        else:
+            self.__tieTransactionWait.Cancel()
+        self.WriteLocalStatus('MatrixTieTransaction', 'Failed')
+        if Refresh:
+            self.UpdateAllMatrixTie(None, None)
+
+    def __TieTransactionExpired(self):
+        if self.__tieTransactions:
+            self.__FailTieTransactions(len(self.__tieTransactions))
+
     def SetOutputAudioSelect(self, value, qualifier):
 
         ValueStateValues = {
@@ -2423,30 +2521,11 @@ class DeviceClass:
         input_ = int(match.group(2))
         tietype = TieTypeStates[match.group(3).decode()]
 
-        if tietype == 'Audio/Video':
-            for i in range(self.InputSize):
-                current_tie = self.matrix_tie_status[i][output-1]
-                if i != input_-1 and current_tie in ['Audio', 'Video', 'Audio/Video']:
-                    self.matrix_tie_status[i][output-1] = 'Untied'
-                elif i == input_-1:
-                    self.matrix_tie_status[i][output-1] = 'Audio/Video'
-        elif tietype in ['Video', 'Audio']:
-            for i in range(self.InputSize):
-                current_tie = self.matrix_tie_status[i][output-1]
-                opTag = 'Audio' if tietype == 'Video' else 'Video'
-                if i == input_-1:
-                    if current_tie == opTag or current_tie == 'Audio/Video':
-                        self.matrix_tie_status[i][output-1] = 'Audio/Video'
-                    else:
-                        self.matrix_tie_status[i][output-1] = tietype
-                elif input_ == 0 or i != input_-1:
-                    if current_tie == tietype:
-                        self.matrix_tie_status[i][output-1] = 'Untied'
-                    elif current_tie == 'Audio/Video':
-                        self.matrix_tie_status[i][output-1] = opTag
-
-        self.OutputTieStatusHelper('Individual', output)
-        self.InputTieStatusHelper('Individual', output)
+        self.__Ties().Tie(input_, output, tietype)
+
+        if not self.__tieTransactions:
+            self.OutputTieStatusHelper('Individual', output)
+            self.InputTieStatusHelper('Individual', output)
 
     def __MatchAllTie(self, match, qualifier):
         TieTypeStates = {
@@ -2458,31 +2537,11 @@ class DeviceClass:
         new_input = int(match.group(4))
         tietype = TieTypeStates[match.group(5).decode()]
 
-        if tietype in ['Audio', 'Video']:
-            op_tie_type = 'Audio' if tietype == 'Video' else 'Video'
-            for output in range(self.OutputSize):
-                for input_ in range(self.InputSize):
-                    if input_ == new_input-1:
-                        if self.matrix_tie_status[input_][output] == op_tie_type:
-                            self.matrix_tie_status[input_][output] = 'Audio/Video'
-                        else:
-                            self.matrix_tie_status[input_][output] = tietype
-                    else:
-                        if self.matrix_tie_status[input_][output] == 'Audio/Video':
-                            self.matrix_tie_status[input_][output] = op_tie_type
-                        elif self.matrix_tie_status[input_][output] != op_tie_type:
-                            self.matrix_tie_status[input_][output] = 'Untied'
-
-        elif tietype == 'Audio/Video':
-            for output in range(self.OutputSize):
-                for input_ in range(self.InputSize):
-                    if input_ == new_input-1:
-                        self.matrix_tie_status[input_][output] = 'Audio/Video'
-                    else:
-                        self.matrix_tie_status[input_][output] = 'Untied'
-
-        self.InputTieStatusHelper('All')
-        self.OutputTieStatusHelper('All')
+        self.__Ties().TieAll(new_input, tietype)
+
+        if not self.__tieTransactions:
+            self.InputTieStatusHelper('All')
+            self.OutputTieStatusHelper('All')
     def SetPhantomPower(self, value, qualifier):
 
         InputStates = {
@@ -3066,17 +3125,10 @@ class DeviceClass:
 
     def __SetHelper(self, command, commandstring, value, qualifier):
         self.Debug = True
-        if self.EchoDisabled and 'Serial' not in self.ConnectionType:
-            @Wait(1)
-            def SendEcho():
-                self.Send('w0echo\r\n')
-        elif self.VerboseDisabled:
-            @Wait(1)
-            def SendVerbose():
-                self.Send('w3cv\r\n')
-                self.Send(commandstring)
-        else:
+        if self.Unidirectional == 'True':
             self.Send(commandstring)
+        else:
+            self.Session.Send(commandstring)
 
     def __UpdateHelper(self, command, commandstring, value, qualifier):
         if self.initializationChk:
@@ -3089,18 +3141,8 @@ class DeviceClass:
 
         if self.Unidirectional == 'True':
             self.Discard('Inappropriate Command ' + command)
-        elif self.EchoDisabled and 'Serial' not in self.ConnectionType:
-            @Wait(1)
-            def SendEcho():
-                self.Send('w0echo\r\n')
         else:
-            if self.VerboseDisabled:
-                @Wait(1)
-                def SendVerbose():
-                    self.Send('w3cv\r\n')
-                    self.Send(commandstring)
-            else:
-                self.Send(commandstring)
+            self.Session.Send(commandstring)
 
     def __MatchError(self, match, tag):
         self.counter = 0
@@ -3126,6 +3168,10 @@ class DeviceClass:
         else:
             self.Error(['Unrecognized error code: '+ match.group(0).decode().strip()])
 
+        # Only the errors a quick multiple tie can cause fail it; E10, E11, E22 and the rest answer other commands
+        if self.__tieTransactions and value in ('01', '12', '13', '14'):
+            self.__FailTieTransactions(1)
+
     def OnConnected(self):
         self.connectionFlag = True
         self.WriteStatus('ConnectionStatus', 'Connected')
@@ -3135,8 +3181,9 @@ class DeviceClass:
     def OnDisconnected(self):
         self.WriteStatus('ConnectionStatus', 'Disconnected')
         self.connectionFlag = False
-        self.EchoDisabled = True
-        self.VerboseDisabled = True
+        self.Session.Reset()
+        if self.__tieTransactions:
+            self.__FailTieTransactions(len(self.__tieTransactions), Refresh=False)
 
 
     def extr_15_1691_108(self):
@@ -4164,114 +4211,73 @@ class DeviceClass:
     def SubscribeStatus(self, command, qualifier, callback):
         Command = self.Commands.get(command, None)
         if Command:
-            if command not in self.Subscription:
-                self.Subscription[command] = {'method':{}}
-
-            Subscribe = self.Subscription[command]
-            Method = Subscribe['method']
-
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Method = Method[qualifier[Parameter]]
-                    except:
-                        if Parameter in qualifier:
-                            Method[qualifier[Parameter]] = {}
-                            Method = Method[qualifier[Parameter]]
-                        else:
-                            return
-
-            Method['callback'] = callback
-            Method['qualifier'] = qualifier
+            self.Subscription.Add(command, qualifier, callback)
         else:
             raise KeyError('Invalid command for SubscribeStatus ' + command)
 
     # This method is to check the command with new status have a callback method then trigger the callback
     def NewStatus(self, command, value, qualifier):
-        if command in self.Subscription :
-            Subscribe = self.Subscription[command]
-            Method = Subscribe['method']
-            Command = self.Commands[command]
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Method = Method[qualifier[Parameter]]
-                    except:
-                        break
-            if 'callback' in Method and Method['callback']:
-                Method['callback'](command, value, qualifier)
+        for callback in self.Subscription.Callbacks(command, qualifier):
+            callback(command, value, qualifier)
 
                 # Save new status to the command
     def WriteStatus(self, command, value, qualifier=None):
         self.counter = 0
         if not self.connectionFlag:
             self.OnConnected()
-        Command = self.Commands[command]
-        Status = Command['Status']
-        if qualifier:
-            for Parameter in Command['Parameters']:
-                try:
-                    Status = Status[qualifier[Parameter]]
-                except KeyError:
-                    if Parameter in qualifier:
-                        Status[qualifier[Parameter]] = {}
-                        Status = Status[qualifier[Parameter]]
-                    else:
-                        return
-        try:
-            if Status['Live'] != value:
-                Status['Live'] = value
-                self.NewStatus(command, value, qualifier)
-        except:
-            Status['Live'] = value
+        if self.__statusStore.Write(command, value, qualifier):
+            self.NewStatus(command, value, qualifier)
+
+    # Save a status the driver keeps itself, such as 'MatrixTieTransaction'. Unlike WriteStatus it is not a sign that
+    # the device answered, so it may be written while the device is offline without marking the connection 'Connected'.
+    def WriteLocalStatus(self, command, value, qualifier=None):
+        if self.__statusStore.Write(command, value, qualifier):
             self.NewStatus(command, value, qualifier)
 
     # Read the value from a command.
     def ReadStatus(self, command, qualifier=None):
-        Command = self.Commands.get(command, None)
-        if Command:
-            Status = Command['Status']
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Status = Status[qualifier[Parameter]]
-                    except KeyError:
-                        return None
-            try:
-                return Status['Live']
-            except:
-                return None
+        if command in self.Commands:
+            return self.__statusStore.Read(command, qualifier)
         else:
             raise KeyError('Invalid command for ReadStatus: ' + command)
 
     def __ReceiveData(self, interface, data):
         # Handle incoming data
-        self.__receiveBuffer += data
-        index = 0    # Start of possible good data
+        self.__receiveBuffer.Append(data)
+        if self.MatchEngine == 'Dispatcher':
+            if self.__matchDispatcher is None:
+                index = self.__matchTable.Dispatcher.Dispatch(self.__receiveBuffer.Data, self)
+            else:
+                index = self.__matchDispatcher.Dispatch(self.__receiveBuffer.Data)
+            if index:
+                # Everything up to the end of the last match has been consumed.
+                self.__receiveBuffer.Consume(index)
+            else:
+                self.__receiveBuffer.Cap()
+            return
 
         #check incoming data if it matched any expected data from device module
-        for regexString, CurrentMatch in self.__matchStringDict.items():
-            while True:
-                result = re.search(regexString, self.__receiveBuffer)
-                if result:
-                    index = result.start()
-                    CurrentMatch['callback'](result, CurrentMatch['para'])
-                    self.__receiveBuffer = self.__receiveBuffer[:result.start()] + self.__receiveBuffer[result.end():]
-                else:
-                    break
+        if self.MatchEngine == 'Lines':
+            index = self.__matchTable.Lines.Dispatch(self.__receiveBuffer, self)
+        else:
+            index = self.__receiveBuffer.MatchEach(self.__matchTable.Entries, self)
+        index = self.__receiveBuffer.MatchEach(list(self.__matchStringDict.values())) or index
 
         if index:
             # Clear out any junk data that came in before any good matches.
-            self.__receiveBuffer = self.__receiveBuffer[index:]
+            self.__receiveBuffer.Consume(index)
         else:
             # In rare cases, the buffer could be filled with garbage quickly.
             # Make sure the buffer is capped.  Max buffer size set in init.
-            self.__receiveBuffer = self.__receiveBuffer[-self.__maxBufferSize:]
+            self.__receiveBuffer.Cap()
 
     # Add regular expression so that it can be check on incoming data from device.
     def AddMatchString(self, regex_string, callback, arg):
-        if regex_string not in self.__matchStringDict:
-            self.__matchStringDict[regex_string] = {'callback': callback, 'para':arg}
+        if regex_string not in self.__matchTable and regex_string not in self.__matchStringDict:
+            self.__matchStringDict[regex_string] = (regex_string, callback, arg)
+            if self.__matchDispatcher is None:
+                self.__matchDispatcher = self.__matchTable.Bind(self)
+            self.__matchDispatcher.Add(regex_string, callback, arg)
 
     def MissingCredentialsLog(self, credential_type):
         if isinstance(self, EthernetClientInterface):
@@ -1,16 +1,19 @@
 from extronlib.interface import SerialInterface, EthernetClientInterface, SPInterface
-from re import compile, search
+from re import compile
 from extronlib.system import Wait
 from json import loads
+from SC_DriverSupport import MatchTable, ReceiveBuffer, SessionHandshake, StatusStore, SubscriptionIndex, TieMap
 class DeviceClass:
+    __matchTable = None     # MatchTable shared by every instance, built by the first __init__
+    __deviceTypes = {}      # model -> 'Encoder' or 'Decoder', see __NormalizeDeviceType
+
     def __init__(self):
 
         self.Unidirectional = 'False'
         self.connectionCounter = 15
-        self.Subscription = {}
         self.ReceiveData = self.__ReceiveData
-        self.__receiveBuffer = b''
-        self.__maxBufferSize = 10000
+        self.__receiveBuffer = ReceiveBuffer(MaxSize=10000)
+        self.MatchEngine = 'Legacy'     # 'Lines' dispatches complete lines by prefix; 'Legacy' runs each pattern in turn
         self.__matchStringDict = {}
         self.counter = 0
         self.connectionFlag = True
@@ -46,6 +49,7 @@ class DeviceClass:
             'DeviceNameEncoder': {'Parameters': ['ID'], 'Status': {}},
             'DeviceTagsDecoder': {'Parameters': ['ID'], 'Status': {}},
             'DeviceTagsEncoder': {'Parameters': ['ID'], 'Status': {}},
+            'GroupCommand': {'Parameters': ['Command'], 'Status': {}},
             'HDCPInputAuthorization': {'Parameters': ['ID'], 'Status': {}},
             'HDCPInputStatusDecoder': {'Parameters': ['ID'], 'Status': {}},
             'HDCPInputStatusEncoder': {'Parameters': ['ID'], 'Status': {}},
@@ -71,68 +75,91 @@ class DeviceClass:
             'VideoMuteEncoder': {'Parameters': ['ID'], 'Status': {}},
             'VideoWallPresetRecall': {'Parameters': ['Canvas'], 'Status': {}},
             'Volume': {'Parameters': ['ID'], 'Status': {}},
+            'WallPlan': {'Parameters': ['Plan'], 'Status': {}},
             'WindowMute': {'Parameters': ['Canvas', 'Window'], 'Status': {}},
         }
-
-        self.VerboseDisabled = True
-        self.InputList = []
-        self.OutputList = []
+        self.__statusStore = StatusStore(self.Commands)
+        self.Subscription = SubscriptionIndex(self.Commands)
+
+        self.Session = SessionHandshake(self.Send, [('Verbose', 'w3cv\r\n')])
+        self.InputList = set()                              # connected encoder IDs
+        self.OutputList = set()                             # connected decoder IDs
+        self.__inputInventory = bytearray()                 # last known presence per encoder, as in Rprt*Inventory*I
+        self.__outputInventory = bytearray()
+        self.__tieMap = TieMap()                            # video/audio ties, see TiedOutputs
+        self.__usbTieMap = TieMap(Planes=('USB',))          # (host number, type) tied to (device number, type)
+        self.__tiesReportOutput = 0                         # the last output of the ties report read so far
+        self.__deviceRecords = {}                           # ('Encoder' or 'Decoder', ID) -> (name, tags, location) written
+        self.__groupPending = {}                            # command -> {(ID, Row): None} sent by SetGroup, not yet answered
+        self.MaxWriteSize = 1024                            # bytes per write when SetGroup packs commands
+        self.__wallPlans = {}                               # name -> (writes, ((Canvas, Window), Input) expected)
+        self.__wallPending = {}                             # (Canvas, Window) -> (plan name, Input) awaiting Grp feedback
+        self.__wallPlanCounts = {}                          # plan name -> [windows still awaiting feedback, final status]
 
         if self.Unidirectional == 'False':
-            self.AddMatchString(compile(b'\{(\d{1,4})o\}Amt([0-2])\*([0-1])\r\n'), self.__MatchAudioMuteDecoder, 'Set')
-            self.AddMatchString(compile(b'\{(\d{1,4})o\}Amt([0-1])\r\n'), self.__MatchAudioMuteDecoder, 'SetAll')
-            self.AddMatchString(compile(b'\{(\d{1,4})o\}Amt([0-1]) ([0-1])'), self.__MatchAudioMuteDecoder, 'Update')
-            self.AddMatchString(compile(b'\{(\d{1,4})i\}Amt1\*([0-1])'), self.__MatchAudioMuteEncoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})i\}Amt([0-1])'), self.__MatchAudioMuteEncoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})i\}BitrV([0-9]{1,5})\r\n'), self.__MatchBitRateControl, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})([io])\}Dtag (\{"tags":\[[A-Za-z0-9-\, "]+\]\})\r\n'), self.__MatchDeviceTags, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})i\}HdcpE(0|1)\r\n'), self.__MatchHDCPInputAuthorization, None)
-            self.AddMatchString(compile(b'Output\t InVid\t InAud\r\n   ([0-9- ]{4}\t  [0-9- ]{4}\t  [0-9- ]{4}\r\n {0,3})+\r\n'), self.__MatchAllMatrixTie, None)
-            self.AddMatchString(compile(b'Out(\d{4}) In([0-9]{1,4}) (All|Vid|Aud)\r\n'), self.__MatchAllMatrixTie, 'Individual')
-            self.AddMatchString(compile(b'Device\tHost\r\n([0-9- io]{2,5}\t[0-9- io]{2,5}\r\n)+\r\n'), self.__MatchUSBMatrixTie, None)
-            self.AddMatchString(compile(b'Out(\d{4})([io]) In([0-9]{1,4})([io]) Usb\r\n'), self.__MatchUSBMatrixTie, 'Individual')
-            self.AddMatchString(compile(b'\{(\d{1,4})([io])\}In([0-9]{1,4})([io]) Usb\r\n'), self.__MatchUSBMatrixTie, 'Individual')
-            self.AddMatchString(compile(b'\{(\d{1,4})o\}HdcpI([0-2])\r\n'), self.__MatchHDCPInputStatusDecoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})i\}HdcpI([0-2])\r\n'), self.__MatchHDCPInputStatusEncoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})i\}HdcpO([0-2])\r\n'), self.__MatchHDCPOutputStatusEncoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})o\}HdcpO([0-2])\r\n'), self.__MatchHDCPOutputStatusDecoder, None)
-            self.AddMatchString(compile(b'Rprt\*Inventory\*I\*([0-9]{4096})\r\n'), self.__MatchInputInventory, 'Individual')
-            self.AddMatchString(compile(b'\{(\d{1,4})o\}Hkdm(P|K)(\d{1,2})\r\n'), self.__MatchHotkeySequenceDetectionDecoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})i\}In00 ([0-1])\r\n'), self.__MatchInputSignalStatus, None)
-            self.AddMatchString(compile(b'Grp(0[0-8]) Win([0-6][0-4]) In([0-9]{1,4})\r\n'), self.__MatchInputSwitchtoWindow, None)
-            self.AddMatchString(compile(b'(\{(\d{1,4})(i|o)\}){0,1}(6[01])Stat ({.*})\r\n'), self.__MatchLLDPStatus, None)
-            self.AddMatchString(compile(b'Rprt\*Inventory\*O\*([0-9]{4096})\r\n'), self.__MatchOutputInventory, 'Individual')
-            self.AddMatchString(compile(b'\{(\d{4})o\}In([0-9]{1,4}) (All|Vid|Aud)\r\n'), self.__MatchAllMatrixTie, 'Individual')
-            self.AddMatchString(compile(b'\{(\d{4})o\}In([0-9]{1,4}) Aud\nIn([0-9]{1,4}) Vid\r\n'), self.__MatchAllMatrixTie, 'WebInterface')
-            self.AddMatchString(compile(b'\{(\d{1,4})o\}Vmt([0-2])\r\n'), self.__MatchVideoMuteDecoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})i\}Vmt([0-2])\r\n'), self.__MatchVideoMuteEncoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})o\}Vol\+{0,1}([0-9]{1,3})\r\n'), self.__MatchVolume, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})o\}VidI([0-1])\*HdcpI([0-2])\*HdcpO([0-2])\*ResI[0-9]{1,4}x[0-9]{1,4}@[0-9.]{1,5}\*AudI([0-1])\*StrmI[0-2]\*Lnk[0-2]\*Dec\r\n'), self.__MatchDecoderInfo, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})i\}SigI([0-1])\*HdcpI([0-2])\*HdcpO([0-2])\*ResI([0-9]{1,4}x[0-9]{1,4}@[0-9.]{1,5}|NOT DETECTED)\*AudI([0-1])\*StrmI[0-2]\*Lnk[0-2]\*Enc\r\n'), self.__MatchEncoder2Info, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})i\}Inf35\*([0-2])\r\n'), self.__MatchEncoderInfo, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})o\}Inf35\*([0-2])\r\n'), self.__MatchDecoder2Info, None)
-            self.AddMatchString(compile(b'DevpC\*(\d{1,4})(i|o)\*([0-1])'), self.__MatchConnection, None)
-            #self.AddMatchString(compile(b'DevpA\*(\d{1,4})(i|o)\*([0-1])'), self.__MatchConnection, None)
-            self.AddMatchString(compile(b'Pno60-1534-01\r\n'), self.__MatchPartNumber, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})o\}WndwV1\*([0-1])\r\n'), self.__MatchCustomBorderVisibilityDecoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})o\}WndwD1\*(\d{1,3})\r\n'), self.__MatchCustomBorderDurationDecoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})o\}WndwB1\*([1-7])\r\n'), self.__MatchCustomBorderColorDecoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})i\}WndwV4\*([0-1])\r\n'), self.__MatchCustomOSDEncoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})i\}WndwD4\*(\d{1,3})\r\n'), self.__MatchCustomOSDDurationEncoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})i\}WndwL4\*([0-4])\r\n'), self.__MatchCustomOSDLocationEncoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})i\}TextT4\*([1-2])\*([\w|\W]{0,})\r\n'), self.__MatchCustomOSDTextEncoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})o\}WndwV4\*([0-1])\r\n'), self.__MatchCustomOSDDecoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})o\}WndwD4\*(\d{1,3})\r\n'), self.__MatchCustomOSDDurationDecoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})o\}WndwL4\*([0-4])\r\n'), self.__MatchCustomOSDLocationDecoder, None)
-            self.AddMatchString(compile(b'\{(\d{1,4})o\}TextT4\*([1-2])\*([\w|\W]{0,})\r\n'), self.__MatchCustomOSDTextDecoder, None)
-            self.AddMatchString(compile(b'Vmt(0[0-8])\*([0-6][0-4])\*([0-1])\r\n'), self.__MatchWindowMute, None)
-            self.AddMatchString(compile(b'\[\{(.|\r\n)*\]\}\]\r\n'), self.__MatchJInventory, None)
-            self.AddMatchString(compile(b'E(10|12|13|14|17|22|24|25|28)\r\n'), self.__MatchErrors, None)
-            self.AddMatchString(compile(b'Vrb3'), self.__MatchVerboseMode, None)
+            if DeviceClass.__matchTable is None:
+                table = MatchTable()
+                table.Add(compile(b'\{(\d{1,4})o\}Amt([0-2])\*([0-1])\r\n'), DeviceClass.__MatchAudioMuteDecoder, 'Set')
+                table.Add(compile(b'\{(\d{1,4})o\}Amt([0-1])\r\n'), DeviceClass.__MatchAudioMuteDecoder, 'SetAll')
+                table.Add(compile(b'\{(\d{1,4})o\}Amt([0-1]) ([0-1])'), DeviceClass.__MatchAudioMuteDecoder, 'Update')
+                table.Add(compile(b'\{(\d{1,4})i\}Amt1\*([0-1])'), DeviceClass.__MatchAudioMuteEncoder, None)
+                table.Add(compile(b'\{(\d{1,4})i\}Amt([0-1])'), DeviceClass.__MatchAudioMuteEncoder, None)
+                table.Add(compile(b'\{(\d{1,4})i\}BitrV([0-9]{1,5})\r\n'), DeviceClass.__MatchBitRateControl, None)
+                table.Add(compile(b'\{(\d{1,4})([io])\}Dtag (\{"tags":\[[A-Za-z0-9-\, "]+\]\})\r\n'), DeviceClass.__MatchDeviceTags, None)
+                table.Add(compile(b'\{(\d{1,4})i\}HdcpE(0|1)\r\n'), DeviceClass.__MatchHDCPInputAuthorization, None)
+                # The header waits for the byte after it as the rows do, so the line engine runs it with the rows and
+                # ahead of them, not after the rows already in the buffer
+                table.Add(compile(b'Output\t InVid\t InAud\r\n(?=[ \r])'), DeviceClass.__MatchTiesReport, 'Header')
+                # A row is only taken once the next byte is in: the blank line that ends the report, or the next line
+                table.Add(compile(b' {0,3}([0-9 ]{4})\t  ([0-9- ]{4})\t  ([0-9- ]{4})\r\n(?:(\r\n)|(?=[^\r]))'), DeviceClass.__MatchTiesReport, 'Row')
+                table.Add(compile(b'Out(\d{4}) In([0-9]{1,4}) (All|Vid|Aud)\r\n'), DeviceClass.__MatchAllMatrixTie, 'Individual')
+                table.Add(compile(b'Device\tHost\r\n([0-9- io]{2,5}\t[0-9- io]{2,5}\r\n)+\r\n'), DeviceClass.__MatchUSBMatrixTie, None)
+                table.Add(compile(b'Out(\d{4})([io]) In([0-9]{1,4})([io]) Usb\r\n'), DeviceClass.__MatchUSBMatrixTie, 'Individual')
+                table.Add(compile(b'\{(\d{1,4})([io])\}In([0-9]{1,4})([io]) Usb\r\n'), DeviceClass.__MatchUSBMatrixTie, 'Individual')
+                table.Add(compile(b'\{(\d{1,4})o\}HdcpI([0-2])\r\n'), DeviceClass.__MatchHDCPInputStatusDecoder, None)
+                table.Add(compile(b'\{(\d{1,4})i\}HdcpI([0-2])\r\n'), DeviceClass.__MatchHDCPInputStatusEncoder, None)
+                table.Add(compile(b'\{(\d{1,4})i\}HdcpO([0-2])\r\n'), DeviceClass.__MatchHDCPOutputStatusEncoder, None)
+                table.Add(compile(b'\{(\d{1,4})o\}HdcpO([0-2])\r\n'), DeviceClass.__MatchHDCPOutputStatusDecoder, None)
+                table.Add(compile(b'Rprt\*Inventory\*I\*([0-9]{4096})\r\n'), DeviceClass.__MatchInputInventory, 'Individual')
+                table.Add(compile(b'\{(\d{1,4})o\}Hkdm(P|K)(\d{1,2})\r\n'), DeviceClass.__MatchHotkeySequenceDetectionDecoder, None)
+                table.Add(compile(b'\{(\d{1,4})i\}In00 ([0-1])\r\n'), DeviceClass.__MatchInputSignalStatus, None)
+                table.Add(compile(b'Grp(0[0-8]) Win([0-6][0-9]) In([0-9]{1,4})\r\n'), DeviceClass.__MatchInputSwitchtoWindow, None)
+                table.Add(compile(b'(\{(\d{1,4})(i|o)\}){0,1}(6[01])Stat ({.*})\r\n'), DeviceClass.__MatchLLDPStatus, None)
+                table.Add(compile(b'Rprt\*Inventory\*O\*([0-9]{4096})\r\n'), DeviceClass.__MatchOutputInventory, 'Individual')
+                table.Add(compile(b'\{(\d{4})o\}In([0-9]{1,4}) (All|Vid|Aud)\r\n'), DeviceClass.__MatchAllMatrixTie, 'Individual')
+                table.Add(compile(b'\{(\d{4})o\}In([0-9]{1,4}) Aud\nIn([0-9]{1,4}) Vid\r\n'), DeviceClass.__MatchAllMatrixTie, 'WebInterface')
+                table.Add(compile(b'\{(\d{1,4})o\}Vmt([0-2])\r\n'), DeviceClass.__MatchVideoMuteDecoder, None)
+                table.Add(compile(b'\{(\d{1,4})i\}Vmt([0-2])\r\n'), DeviceClass.__MatchVideoMuteEncoder, None)
+                table.Add(compile(b'\{(\d{1,4})o\}Vol\+{0,1}([0-9]{1,3})\r\n'), DeviceClass.__MatchVolume, None)
+                table.Add(compile(b'\{(\d{1,4})o\}VidI([0-1])\*HdcpI([0-2])\*HdcpO([0-2])\*ResI[0-9]{1,4}x[0-9]{1,4}@[0-9.]{1,5}\*AudI([0-1])\*StrmI[0-2]\*Lnk[0-2]\*Dec\r\n'), DeviceClass.__MatchDecoderInfo, None)
+                table.Add(compile(b'\{(\d{1,4})i\}SigI([0-1])\*HdcpI([0-2])\*HdcpO([0-2])\*ResI([0-9]{1,4}x[0-9]{1,4}@[0-9.]{1,5}|NOT DETECTED)\*AudI([0-1])\*StrmI[0-2]\*Lnk[0-2]\*Enc\r\n'), DeviceClass.__MatchEncoder2Info, None)
+                table.Add(compile(b'\{(\d{1,4})i\}Inf35\*([0-2])\r\n'), DeviceClass.__MatchEncoderInfo, None)
+                table.Add(compile(b'\{(\d{1,4})o\}Inf35\*([0-2])\r\n'), DeviceClass.__MatchDecoder2Info, None)
+                table.Add(compile(b'DevpC\*(\d{1,4})(i|o)\*([0-1])'), DeviceClass.__MatchConnection, None)
+                #table.Add(compile(b'DevpA\*(\d{1,4})(i|o)\*([0-1])'), DeviceClass.__MatchConnection, None)
+                table.Add(compile(b'Pno60-1534-01\r\n'), DeviceClass.__MatchPartNumber, None)
+                table.Add(compile(b'\{(\d{1,4})o\}WndwV1\*([0-1])\r\n'), DeviceClass.__MatchCustomBorderVisibilityDecoder, None)
+                table.Add(compile(b'\{(\d{1,4})o\}WndwD1\*(\d{1,3})\r\n'), DeviceClass.__MatchCustomBorderDurationDecoder, None)
+                table.Add(compile(b'\{(\d{1,4})o\}WndwB1\*([1-7])\r\n'), DeviceClass.__MatchCustomBorderColorDecoder, None)
+                table.Add(compile(b'\{(\d{1,4})i\}WndwV4\*([0-1])\r\n'), DeviceClass.__MatchCustomOSDEncoder, None)
+                table.Add(compile(b'\{(\d{1,4})i\}WndwD4\*(\d{1,3})\r\n'), DeviceClass.__MatchCustomOSDDurationEncoder, None)
+                table.Add(compile(b'\{(\d{1,4})i\}WndwL4\*([0-4])\r\n'), DeviceClass.__MatchCustomOSDLocationEncoder, None)
+                table.Add(compile(b'\{(\d{1,4})i\}TextT4\*([1-2])\*([^\r\n]*)\r\n'), DeviceClass.__MatchCustomOSDTextEncoder, None)
+                table.Add(compile(b'\{(\d{1,4})o\}WndwV4\*([0-1])\r\n'), DeviceClass.__MatchCustomOSDDecoder, None)
+                table.Add(compile(b'\{(\d{1,4})o\}WndwD4\*(\d{1,3})\r\n'), DeviceClass.__MatchCustomOSDDurationDecoder, None)
+                table.Add(compile(b'\{(\d{1,4})o\}WndwL4\*([0-4])\r\n'), DeviceClass.__MatchCustomOSDLocationDecoder, None)
+                table.Add(compile(b'\{(\d{1,4})o\}TextT4\*([1-2])\*([^\r\n]*)\r\n'), DeviceClass.__MatchCustomOSDTextDecoder, None)
+                table.Add(compile(b'Vmt(0[0-8])\*([0-6][0-4])\*([0-1])\r\n'), DeviceClass.__MatchWindowMute, None)
+                # One device record of the J inventory, an object with a "model" key, after the array's [ or a comma.
+                # The lookahead steps over whole strings, so a brace in a name before "model" does not stop it.
+                table.Add(compile(b'[\[,]\s*(\{(?=(?:[^{}"]|"[^"\\\\]*(?:\\\\.[^"\\\\]*)*")*?"model"\s*:)[^{}"]*(?:(?:"[^"\\\\]*(?:\\\\.[^"\\\\]*)*"|\{[^{}"]*(?:"[^"\\\\]*(?:\\\\.[^"\\\\]*)*"[^{}"]*)*\})[^{}"]*)*\})(\s*\]\r\n)?'), DeviceClass.__MatchJInventory, None)
+                table.Add(compile(b'E(10|12|13|14|17|22|24|25|28)\r\n'), DeviceClass.__MatchErrors, None)
+                table.Add(compile(b'Vrb3'), DeviceClass.__MatchVerboseMode, None)
+                DeviceClass.__matchTable = table.Freeze()
 
     def __MatchVerboseMode(self, match, qualifier):
         self.OnConnected()
-        self.VerboseDisabled = False
+        self.Session.Confirm('Verbose')
         self.UpdateAllMatrixTie(None, None)
 
     def __MatchPartNumber(self, match, qualifer):
@@ -145,88 +172,115 @@ class DeviceClass:
         self.__UpdateHelper('RefreshMatrix', 'wTies*A*RPRT\r\n', None, None)
         self.__UpdateHelper('RefreshMatrix', 'wTies*U*RPRT\r\n', None, None)
 
+    # The outputs input Input is tied to on the TieType plane ('Video', 'Audio', or 'Audio/Video' for both), in order
+    def TiedOutputs(self, Input, TieType='Video'):
+        return sorted(self.__tieMap.Outputs(int(Input), TieType))
+
+    # The input tied to Output on the TieType plane ('Video' or 'Audio'), 0 when untied
+    def TiedInput(self, Output, TieType='Video'):
+        return self.__tieMap.Input(int(Output), TieType)
+
+    # The USB devices tied to a host, as (Device I/O Number, Device Type) pairs in order
+    def USBTiedDevices(self, Host, HostType):
+        return sorted(self.__usbTieMap.Outputs((int(Host), HostType), 'USB'))
+
+    # The host a USB device is tied to as a (Host I/O Number, Host Type) pair, 0 when untied
+    def USBTiedHost(self, Device, DeviceType):
+        return self.__usbTieMap.Input((int(Device), DeviceType), 'USB')
+
+    # Models repeat across a system, so each is normalized once
     def __NormalizeDeviceType(self, model):
+        deviceType = DeviceClass.__deviceTypes.get(model)
+        if deviceType is not None:
+            return deviceType
         # Remove last character
-        model = model[:-1]
+        normalized = model[:-1]
         # Remove Key words and letters that arent needed
         for item in ['NAV', 'DT', 'DTP', 'S']:
-            model = model.replace(item, '')
+            normalized = normalized.replace(item, '')
         # Remove Digits and space
-        model = ''.join([x for x in model if x.isalpha()])
+        normalized = ''.join([x for x in normalized if x.isalpha()])
 
-        return {'E':'Encoder', 'D':'Decoder'}[model]
+        deviceType = {'E':'Encoder', 'D':'Decoder'}[normalized]
+        DeviceClass.__deviceTypes[model] = deviceType
+        return deviceType
 
+    # The J inventory is read a device record at a time as it arrives, so the reply never has to fit in the receive
+    # buffer. A device's name, tags and location are only written when they differ from what was last written.
     def __MatchJInventory(self, match, tag):
-        deviceInfo = str(match.group(0).decode()).replace('\r\n', '')
-        deviceInfo = loads(deviceInfo)
-
-        for device in deviceInfo:
-            device_type = self.__NormalizeDeviceType(device['model'])
-            # Write DeviceName
-            self.WriteStatus({'Encoder': 'DeviceNameEncoder',
-                              'Decoder': 'DeviceNameDecoder'}[device_type], 
-                              device['name'], 
-                              {'ID': device['channel']})
-            # Write DeviceTags
-            tags = ', '.join(x for x in device['tags'])
-            self.WriteStatus({'Encoder': 'DeviceTagsEncoder',
-                              'Decoder': 'DeviceTagsDecoder'}[device_type], 
-                              tags, 
-                              {'ID': device['channel']})
-            # Write device Location
-            self.WriteStatus({'Encoder': 'DeviceLocationEncoder',
-                              'Decoder': 'DeviceLocationDecoder'}[device_type], 
-                              device['location'], 
-                              {'ID': device['channel']})
+        device = loads(match.group(1).decode().replace('\r\n', ''))
+        device_type = self.__NormalizeDeviceType(device['model'])
+        record = (device['name'], ', '.join(x for x in device['tags']), device['location'])
+        key = (device_type, device['channel'])
+        previous = self.__deviceRecords.get(key)
+        if record == previous:
+            return
+        self.__deviceRecords[key] = record
+
+        commands = {
+            'Encoder': ('DeviceNameEncoder', 'DeviceTagsEncoder', 'DeviceLocationEncoder'),
+            'Decoder': ('DeviceNameDecoder', 'DeviceTagsDecoder', 'DeviceLocationDecoder'),
+        }[device_type]
+        for index, command in enumerate(commands):
+            if previous is None or previous[index] != record[index]:
+                self.WriteStatus(command, record[index], {'ID': device['channel']})
 
     def __MatchInputInventory(self, match, tag):
         """
             Input Inventory Status handler
         """
-        lst = list(match.group(1).decode())
-        for key, input in enumerate(lst):
-            if input == '1': #and (int(key+1)) not in self.InputList:
-                self.WriteStatus('DeviceConnectionStatusEncoder', 'Connected', {'ID': int(key+1)})
-                if (int(key+1)) not in self.InputList:
-                    self.InputList.append(int(key+1))
-            elif input == '2':
-                self.WriteStatus('DeviceConnectionStatusEncoder', 'Disconnected', {'ID': int(key+1)})
+        self.__ApplyInventory(match.group(1), self.__inputInventory, self.InputList, 'DeviceConnectionStatusEncoder')
 
     def __MatchOutputInventory(self, match, tag):
         """
             Output Inventory Status handler
         """
-        lst = list(match.group(1).decode())
-        for key, input in enumerate(lst):
-            if input == '1': #and (int(key+1)) not in self.OutputList:
-                self.WriteStatus('DeviceConnectionStatusDecoder', 'Connected', {'ID': int(key+1)})
-                if (int(key+1)) not in self.OutputList:
-                    self.OutputList.append(int(key+1))
-            elif input == '2':
-                self.WriteStatus('DeviceConnectionStatusDecoder', 'Disconnected', {'ID': int(key+1)})
-                
+        self.__ApplyInventory(match.group(1), self.__outputInventory, self.OutputList, 'DeviceConnectionStatusDecoder')
+
+    # Each inventory is compared with the last one 64 endpoints at a time, and only the endpoints whose state changed
+    # are written ('1' connected, '2' disconnected, '0' not configured). __MatchConnection keeps the last inventory
+    # current between reports.
+    def __ApplyInventory(self, inventory, previous, present, command):
+        if inventory == previous:
+            return
+        if len(previous) != len(inventory):
+            changed = [index for index, state in enumerate(inventory) if state != 48]
+        else:
+            changed = []
+            for start in range(0, len(inventory), 64):
+                if inventory[start:start + 64] != previous[start:start + 64]:
+                    changed.extend(index for index in range(start, min(start + 64, len(inventory))) if inventory[index] != previous[index])
+
+        for index in changed:
+            state = inventory[index]
+            if state == 49:
+                present.add(index + 1)
+                self.WriteStatus(command, 'Connected', {'ID': index + 1})
+            else:
+                present.discard(index + 1)
+                if state == 50:
+                    self.WriteStatus(command, 'Disconnected', {'ID': index + 1})
+        previous[:] = inventory
+
     def __MatchConnection(self, match, tag):
-        id = match.group(1).decode()
+        id = int(match.group(1).decode())
         type = match.group(2).decode()
         state = match.group(3).decode()
         if type == 'i':
-            if state == '1':
-                if int(id) not in self.InputList:
-                    self.InputList.append(int(id))
-                    self.WriteStatus('DeviceConnectionStatusEncoder', 'Connected', {'ID': int(id)})
-            elif state == '0':
-                if int(id) in self.InputList:
-                    self.InputList.remove(int(id))
-                    self.WriteStatus('DeviceConnectionStatusEncoder', 'Disconnected', {'ID': int(id)})
+            present, inventory, command = self.InputList, self.__inputInventory, 'DeviceConnectionStatusEncoder'
         elif type == 'o':
-            if state == '1':
-                if int(id) not in self.OutputList:
-                    self.OutputList.append(int(id))
-                    self.WriteStatus('DeviceConnectionStatusDecoder', 'Connected', {'ID': int(id)})
-            elif state == '0':
-                if int(id) in self.OutputList:
-                    self.OutputList.remove(int(id))
-                    self.WriteStatus('DeviceConnectionStatusDecoder', 'Disconnected', {'ID': int(id)})
+            present, inventory, command = self.OutputList, self.__outputInventory, 'DeviceConnectionStatusDecoder'
+        else:
+            return
+
+        if state == '1' and id not in present:
+            present.add(id)
+            self.WriteStatus(command, 'Connected', {'ID': id})
+        elif state == '0' and id in present:
+            present.discard(id)
+            self.WriteStatus(command, 'Disconnected', {'ID': id})
+        if id <= len(inventory):
+            inventory[id - 1] = 49 if id in present else 50
 
     def __MatchAllMatrixTie(self, match, tag):
         """
@@ -285,6 +339,7 @@ class DeviceClass:
                         self.WriteStatus('OutputTieStatus', Input, {'Output': Output, 'Tie Type': 'Audio'})
                         self.WriteStatus('OutputTieStatus', Input, {'Output': Output, 'Tie Type': 'Video'})
                         self.WriteStatus('OutputTieStatus', Input, {'Output': Output, 'Tie Type': 'Audio/Video'})
+                self.__tieMap.Tie(Input, Output, {'Aud': 'Audio', 'Vid': 'Video', 'All': 'Audio/Video'}[Type])
                             
             elif tag == 'WebInterface':
                 AudInput = int(match.group(2))
@@ -295,43 +350,56 @@ class DeviceClass:
                 elif VidInput == 0:
                     self.WriteStatus('OutputTieStatus', 0, {'Output': Output, 'Tie Type': 'Video'})
                     self.WriteStatus('OutputTieStatus', AudInput, {'Output': Output, 'Tie Type': 'Audio'})
-
+                self.__tieMap.Tie(AudInput, Output, 'Audio')
+                self.__tieMap.Tie(VidInput, Output, 'Video')
+
+    # The wTies*A*RPRT report is applied a row at a time as it arrives, so it never has to fit in the receive buffer.
+    # It lists outputs in order, so the outputs skipped between two rows, or after the last one, are no longer tied.
+    def __MatchTiesReport(self, match, tag):
+        if tag == 'Header':
+            self.__tiesReportOutput = 0
+            return
+
+        Output = int(match.group(1))
+        items = (match.group(2).strip().decode(), match.group(3).strip().decode())
+        last = self.__tiesReportOutput
+        self.__UntieOutputs(last + 1, Output if Output > last else last + 1)
+        if match.group(4):
+            self.__UntieOutputs(Output + 1, self.OutputSize + 1)
+            self.__tiesReportOutput = 0
+        else:
+            self.__tiesReportOutput = Output
+
+        self.__tieMap.Tie(0 if items[0] == '----' else int(items[0]), Output, 'Video')
+        self.__tieMap.Tie(0 if items[1] == '----' else int(items[1]), Output, 'Audio')
+        if items[0] == items[1]:
+            if items[0] == '----':
+                self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Audio/Video'})
+                self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Audio'})
+                self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Video'})
+            else:
+                self.WriteStatus('OutputTieStatus',int(items[0]), {'Output': Output, 'Tie Type': 'Audio/Video'})
+                self.WriteStatus('OutputTieStatus',int(items[0]), {'Output': Output, 'Tie Type': 'Audio'})
+                self.WriteStatus('OutputTieStatus',int(items[0]), {'Output': Output, 'Tie Type': 'Video'})
         else:
-            tielist = match.group(0)
-            stripstring = tielist[24:-2].decode()
-            removespaces = stripstring.replace(' ', '')
-            splitoutputs = removespaces.strip('\r\n').split('\r\n')
+            if items[0] == '----':
+                self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Audio/Video'})
+                self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Video'})
+            else:
+                self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Audio/Video'})
+                self.WriteStatus('OutputTieStatus',int(items[0]), {'Output': Output, 'Tie Type': 'Video'})
+            if items[1] == '----':
+                self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Audio/Video'})
+                self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Audio'})
+            else:
+                self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Audio/Video'})
+                self.WriteStatus('OutputTieStatus',int(items[1]), {'Output': Output, 'Tie Type': 'Audio'})
+
+    def __UntieOutputs(self, first, end):
+        for output in range(first, end):
+            if self.__tieMap.Input(output, 'Video') or self.__tieMap.Input(output, 'Audio'):
+                self.__tieMap.Tie(0, output, 'Audio/Video')
 
-            for items in splitoutputs:
-                Audio = False
-                Video = False
-                items = items.split('\t')
-                Output = int(items[0])
-                if items[1] == items[2]:
-                    if items[1] == '----':
-                        self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Audio/Video'})
-                        self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Audio'})
-                        self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Video'})
-                    else:
-                        self.WriteStatus('OutputTieStatus',int(items[1]), {'Output': Output, 'Tie Type': 'Audio/Video'})
-                        self.WriteStatus('OutputTieStatus',int(items[1]), {'Output': Output, 'Tie Type': 'Audio'})
-                        self.WriteStatus('OutputTieStatus',int(items[1]), {'Output': Output, 'Tie Type': 'Video'})
-                else:
-                    if items[1] == '----':
-                        self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Audio/Video'})
-                        self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Video'})
-                    else:
-                        self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Audio/Video'})
-                        self.WriteStatus('OutputTieStatus',int(items[1]), {'Output': Output, 'Tie Type': 'Video'})
-                        Video = True
-                    if items[2] == '----':
-                        self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Audio/Video'})
-                        self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Audio'})
-                    else:
-                        self.WriteStatus('OutputTieStatus',0, {'Output': Output, 'Tie Type': 'Audio/Video'})
-                        self.WriteStatus('OutputTieStatus',int(items[2]), {'Output': Output, 'Tie Type': 'Audio'})
-                        Audio = True
-                        
     def __MatchUSBMatrixTie(self, match, tag):
         """
             Initial Matrix Tie Status handler
@@ -346,11 +414,13 @@ class DeviceClass:
             hostnum = int(match.group(3).decode())
             hosttype = match.group(4).decode()
             self.WriteStatus('USBDeviceTieStatus', hostnum, {'Device I/O Number': devicenum, 'Device Type': numlookup[devicetype], 'Host Type': numlookup[hosttype]})
+            self.__usbTieMap.Tie((hostnum, numlookup[hosttype]) if hostnum else 0, (devicenum, numlookup[devicetype]), 'USB')
 
         else:
             tielist = match.group(0)
             stripstring = tielist[13:].decode()
             splitoutputs = stripstring.strip('\r\n').split('\r\n')
+            self.__usbTieMap.Clear()
             for items in splitoutputs:
                 Audio = False
                 Video = False
@@ -377,6 +447,7 @@ class DeviceClass:
                     self.WriteStatus('USBDeviceTieStatus', 0, {'Device I/O Number': devicenum, 'Device Type': devicetype, 'Host Type': 'Output'})
                 else:
                     self.WriteStatus('USBDeviceTieStatus', hostnum, {'Device I/O Number': devicenum, 'Device Type': devicetype, 'Host Type': hosttype})
+                    self.__usbTieMap.Tie((hostnum, hosttype), (devicenum, devicetype), 'USB')
 
 
     
@@ -598,6 +669,11 @@ class DeviceClass:
             self.WriteStatus('DeviceTagsDecoder', text, {'ID': output})
         elif _type == 'i':
             self.WriteStatus('DeviceTagsEncoder', text, {'ID': output})
+
+        key = ({'o': 'Decoder', 'i': 'Encoder'}[_type], output)
+        if key in self.__deviceRecords:
+            name, tags, location = self.__deviceRecords[key]
+            self.__deviceRecords[key] = (name, text, location)
         
     def SetCustomBorderVisibilityDecoder(self, value, qualifier):
         BorderState = {
@@ -884,6 +960,11 @@ class DeviceClass:
         Canvas = str(int(match.group(1).decode()))
         value = int(match.group(3).decode())
         self.WriteStatus('InputSwitchtoWindow', value, {'Canvas': Canvas, 'Window': Window})
+        key = (int(Canvas), int(Window))
+        pending = self.__wallPending.get(key)
+        if pending and pending[1] == value:
+            del self.__wallPending[key]
+            self.__WallPlanWindowDone(pending[0], 'Complete')
 
     def UpdateLLDPStatusNAVLAN(self, value, qualifier):
         self.__UpdateHelper('LLDPStatusNAVLAN', '\x1b60STAT\r', value, qualifier)
@@ -1441,15 +1522,134 @@ class DeviceClass:
         value = ValueStateValues[match.group(3).decode()]
         self.WriteStatus('WindowMute', value, {'Canvas': Canvas, 'Window': Window})
 
+    # Sets command to value on every endpoint in IDs (a list or range) at once. The routed command is built once, the
+    # commands are packed into as few writes of up to MaxWriteSize bytes as they fit in, and each endpoint's reply is
+    # tracked: GroupPending lists the endpoints not yet answered, and 'GroupCommand' is 'Complete' when none are left.
+    # A unidirectional driver gets no replies, so its writes are sent untracked.
+    def SetGroup(self, command, value, IDs, qualifier=None):
+        VisibilityState = {
+            'On': 1,
+            'Off': 0
+        }
+        BorderState = {
+            'Visible': 1,
+            'Hidden': 0
+        }
+        VideoMuteState = {
+            'Off': '0',
+            'On': '1',
+            'Video and Sync': '2'
+        }
+
+        row = None
+        if command in ('CustomOSDTextDecoder', 'CustomOSDTextEncoder'):
+            row = int(qualifier['Row'])
+            body = ':wT4*{0}*{1}TEXT\r}}\r'.format(row, value)
+        elif command in ('CustomOSDDecoder', 'CustomOSDEncoder') and value in VisibilityState:
+            body = ':wV4*{0}WNDW\r}}\r'.format(VisibilityState[value])
+        elif command == 'CustomBorderVisibilityDecoder' and value in BorderState:
+            body = ':wV1*{0}WNDW\r}}\r'.format(BorderState[value])
+        elif command in ('VideoMuteDecoder', 'VideoMuteEncoder') and value in VideoMuteState:
+            body = ':{0}B\r}}\r'.format(VideoMuteState[value])
+        else:
+            self.Discard('Invalid Command for SetGroup')
+            return
+
+        endpoint, size = ('i', self.InputSize) if command.endswith('Encoder') else ('o', self.OutputSize)
+        channels = list(dict.fromkeys(int(ID) for ID in IDs))
+        if not channels or not all(0 < channel <= size for channel in channels):
+            self.Discard('Invalid Command for SetGroup')
+            return
+
+        body = endpoint + body
+        writes = []
+        write = ''
+        for channel in channels:
+            commandstring = '{' + str(channel) + body
+            if write and len(write) + len(commandstring) > self.MaxWriteSize:
+                writes.append(write)
+                write = ''
+            write += commandstring
+        writes.append(write)
+
+        if self.Unidirectional != 'True':
+            self.__groupPending.setdefault(command, {}).update(((channel, row), None) for channel in channels)
+            self.WriteLocalStatus('GroupCommand', 'Pending', {'Command': command})
+        for write in writes:
+            self.__SetHelper(command, write, value, qualifier)
+
+    # The endpoints of the SetGroup calls for command that have not answered yet, in order
+    def GroupPending(self, command):
+        return sorted(channel for channel, row in self.__groupPending.get(command, ()))
+
+    # Compiles a canvas layout, {Canvas: {Window: Input}}, into the InputSwitchtoWindow writes and the Grp feedback
+    # they should produce, and keeps it as name. RecallWallPlan sends the stored writes as they are, so a layout is
+    # validated and formatted once however often it is recalled.
+    def CompileWallPlan(self, name, Layout):
+        expected = []
+        for Canvas, Windows in sorted(Layout.items()):
+            for Window, Input in sorted(Windows.items()):
+                Canvas, Window, Input = int(Canvas), int(Window), int(Input)
+                if Canvas < 0 or Canvas > 8 or Window < 0 or Window > 64 or Input < 0 or Input > 4096:
+                    self.Discard('Invalid Command for CompileWallPlan')
+                    return
+                expected.append(((Canvas, Window), Input))
+        if not expected:
+            self.Discard('Invalid Command for CompileWallPlan')
+            return
+
+        writes = []
+        write = ''
+        for (Canvas, Window), Input in expected:
+            commandstring = '\x1B{0}*{1}*{2}!X\r'.format(Canvas, Window, Input)
+            if write and len(write) + len(commandstring) > self.MaxWriteSize:
+                writes.append(write)
+                write = ''
+            write += commandstring
+        writes.append(write)
+        self.__wallPlans[name] = (writes, tuple(expected))
+
+    # Recalls a plan from CompileWallPlan in one burst. 'WallPlan' is 'Pending' until every window has reported its
+    # input, then 'Complete'; a plan any of whose windows were taken over by a later recall is 'Superseded' once the
+    # rest have reported, and one still pending at a disconnect is 'Cancelled'. A unidirectional driver gets no
+    # feedback, so its plans are sent untracked.
+    def RecallWallPlan(self, name):
+        try:
+            writes, expected = self.__wallPlans[name]
+        except KeyError:
+            self.Discard('Invalid Command for RecallWallPlan')
+            return
+
+        if self.Unidirectional != 'True':
+            self.__wallPlanCounts[name] = [len(expected), 'Complete']
+            for key, Input in expected:
+                pending = self.__wallPending.get(key)
+                self.__wallPending[key] = (name, Input)
+                if pending and pending[0] != name:
+                    self.__WallPlanWindowDone(pending[0], 'Superseded')
+            self.WriteLocalStatus('WallPlan', 'Pending', {'Plan': name})
+        for write in writes:
+            self.__SetHelper('WallPlan', write, name, None)
+
+    # The (Canvas, Window) pairs of plan name that have not reported their input yet, in order
+    def WallPlanPending(self, name):
+        return sorted(key for key, pending in self.__wallPending.items() if pending[0] == name)
+
+    def __WallPlanWindowDone(self, name, status):
+        count = self.__wallPlanCounts[name]
+        count[0] -= 1
+        if status == 'Superseded':
+            count[1] = status
+        if not count[0]:
+            del self.__wallPlanCounts[name]
+            self.WriteLocalStatus('WallPlan', count[1], {'Plan': name})
+
     def __SetHelper(self, command, commandstring, value, qualifier):
         self.Debug = True
-        if self.VerboseDisabled:
-            @Wait(1)
-            def SendVerbose():
-                self.Send('w3cv\r\n')
-                self.Send(commandstring)
-        else:
+        if self.Unidirectional == 'True':
             self.Send(commandstring)
+        else:
+            self.Session.Send(commandstring)
 
     def __UpdateHelper(self, command, commandstring, value, qualifier):
 
@@ -1464,13 +1664,7 @@ class DeviceClass:
             if self.counter > self.connectionCounter and self.connectionFlag:
                 self.OnDisconnected()
             
-            if self.VerboseDisabled:
-                @Wait(1)
-                def SendVerbose():
-                    self.Send('w3cv\r\n')
-                    self.Send(commandstring)
-            else:
-                self.Send(commandstring)
+            self.Session.Send(commandstring)
 
     def __MatchErrors(self, match, tag):
 
@@ -1502,11 +1696,19 @@ class DeviceClass:
         self.counter = 0
 
     def OnDisconnected(self):
+        # Cleared before anyone is told, so a subscriber may recall a plan from the 'Cancelled' status
+        cancelled = list(self.__wallPlanCounts)
+        self.__wallPending.clear()
+        self.__wallPlanCounts.clear()
         self.WriteStatus('ConnectionStatus', 'Disconnected')
         self.connectionFlag = False
-        self.VerboseDisabled = True
-        self.InputList = []
-        self.OutputList = []
+        self.Session.Reset()
+        self.InputList.clear()
+        self.OutputList.clear()
+        self.__inputInventory.clear()
+        self.__outputInventory.clear()
+        for name in cancelled:
+            self.WriteLocalStatus('WallPlan', 'Cancelled', {'Plan': name})
 
     def extr_18_4118_NAVigator(self):
 
@@ -1541,110 +1743,61 @@ class DeviceClass:
     def SubscribeStatus(self, command, qualifier, callback):
         Command = self.Commands.get(command)
         if Command:
-            if command not in self.Subscription:
-                self.Subscription[command] = {'method': {}}
-
-            Subscribe = self.Subscription[command]
-            Method = Subscribe['method']
-
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Method = Method[qualifier[Parameter]]
-                    except BaseException:
-                        if Parameter in qualifier:
-                            Method[qualifier[Parameter]] = {}
-                            Method = Method[qualifier[Parameter]]
-                        else:
-                            return
-
-            Method['callback'] = callback
-            Method['qualifier'] = qualifier
+            self.Subscription.Add(command, qualifier, callback)
         else:
             print(command, 'does not exist in the module')
 
     # This method is to check the command with new status have a callback method then trigger the callback
     def NewStatus(self, command, value, qualifier):
-        if command in self.Subscription:
-            Subscribe = self.Subscription[command]
-            Method = Subscribe['method']
-            Command = self.Commands[command]
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Method = Method[qualifier[Parameter]]
-                    except BaseException:
-                        break
-            if 'callback' in Method and Method['callback']:
-                Method['callback'](command, value, qualifier)
+        for callback in self.Subscription.Callbacks(command, qualifier):
+            callback(command, value, qualifier)
 
     # Save new status to the command
     def WriteStatus(self, command, value, qualifier=None):
         self.counter = 0
         if not self.connectionFlag:
             self.OnConnected()
-        Command = self.Commands[command]
-        Status = Command['Status']
-        if qualifier:
-            for Parameter in Command['Parameters']:
-                try:
-                    Status = Status[qualifier[Parameter]]
-                except KeyError:
-                    if Parameter in qualifier:
-                        Status[qualifier[Parameter]] = {}
-                        Status = Status[qualifier[Parameter]]
-                    else:
-                        return
-        try:
-            if Status['Live'] != value:
-                Status['Live'] = value
-                self.NewStatus(command, value, qualifier)
-        except BaseException:
-            Status['Live'] = value
+        pending = self.__groupPending.get(command)
+        if pending and (qualifier['ID'], qualifier.get('Row')) in pending:
+            del pending[(qualifier['ID'], qualifier.get('Row'))]
+            if not pending:
+                del self.__groupPending[command]
+                self.WriteLocalStatus('GroupCommand', 'Complete', {'Command': command})
+        if self.__statusStore.Write(command, value, qualifier):
+            self.NewStatus(command, value, qualifier)
+
+    # Save a status the driver keeps itself, such as 'GroupCommand' and 'WallPlan'. Unlike WriteStatus it is not a sign that the
+    # device answered, so it may be written while the device is offline without marking the connection 'Connected'.
+    def WriteLocalStatus(self, command, value, qualifier=None):
+        if self.__statusStore.Write(command, value, qualifier):
             self.NewStatus(command, value, qualifier)
 
     # Read the value from a command.
     def ReadStatus(self, command, qualifier=None):
-        Command = self.Commands[command]
-        Status = Command['Status']
-        if qualifier:
-            for Parameter in Command['Parameters']:
-                try:
-                    Status = Status[qualifier[Parameter]]
-                except KeyError:
-                    return None
-        try:
-            return Status['Live']
-        except BaseException:
-            return None
+        return self.__statusStore.Read(command, qualifier)
 
     def __ReceiveData(self, interface, data):
         # Handle incoming data
-        self.__receiveBuffer += data
-        index = 0  # Start of possible good data
+        self.__receiveBuffer.Append(data)
         # check incoming data if it matched any expected data from device module
-        for regexString, CurrentMatch in self.__matchStringDict.items():
-            while True:
-                result = search(regexString, self.__receiveBuffer)
-                if result:
-                    index = result.start()
-                    CurrentMatch['callback'](result, CurrentMatch['para'])
-                    self.__receiveBuffer = self.__receiveBuffer[:result.start()] + self.__receiveBuffer[result.end():]
-                else:
-                    break
+        if self.MatchEngine == 'Lines':
+            index = self.__matchTable.Lines.Dispatch(self.__receiveBuffer, self)
+        else:
+            index = self.__receiveBuffer.MatchEach(self.__matchTable.Entries, self)
+        index = self.__receiveBuffer.MatchEach(list(self.__matchStringDict.values())) or index
 
         if index:
             # Clear out any junk data that came in before any good matches.
-            self.__receiveBuffer = self.__receiveBuffer[index:]
+            self.__receiveBuffer.Consume(index)
         else:
             # In rare cases, the buffer could be filled with garbage quickly.
             # Make sure the buffer is capped.  Max buffer size set in init.
-            self.__receiveBuffer = self.__receiveBuffer[-self.__maxBufferSize:]
+            self.__receiveBuffer.Cap()
 
     # Add regular expression so that it can be check on incoming data from device.
     def AddMatchString(self, regex_string, callback, arg):
-        if regex_string not in self.__matchStringDict:
-            self.__matchStringDict[regex_string] = {'callback': callback, 'para': arg}
+        if regex_string not in self.__matchTable and regex_string not in self.__matchStringDict:
+            self.__matchStringDict[regex_string] = (regex_string, callback, arg)
 
 class SPIClass(SPInterface, DeviceClass):
 
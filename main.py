@@ -9,6 +9,7 @@ from SC_PubSub import PubSubClass
 from SC_UIDevice import SuperUIDevice as UIDevice
 
 from ConnectionHandler import GetConnectionHandler
+from SC_DriverSupport import CoalescingQueue
 import system_config as sysConfig
 import qsc_dsp_Q_Sys_Core_Series_v1_12_4_0 as qsc_dsp
 import nec_display_P_V_X_Series_v1_4_1_0 as NecDisplay
@@ -126,6 +127,9 @@ def Switch_AV(source, dest, type='Audio/Video'):
 Dsp_Config = sysConfig.config['dsp']
 DSP_01 = GetConnectionHandler(qsc_dsp.EthernetClass(Dsp_Config['address'], 1702, Model='Q-Sys Core 110f'))
 DSP_01.Connect()
+# Level buttons repeat every 0.2 s; only the latest level and one refresh per control go out each 0.1 s. Every Set on
+# DSP_01 goes through this queue, so a mute and a level for the same control reach the Core in the order pressed
+DSP_01_Levels = CoalescingQueue(DSP_01, Interval=0.1)
 
 DSP_PollingTimer = None
 
@@ -556,29 +560,29 @@ def Rack_DSP_VolUp(btn, ev):
     instance = Rack_Volume_ID_Map[btn.ID]
     instance_settings = DSP_Level_Settings[instance]
     if instance_settings['currentLevel'] < instance_settings['max']:
-        DSP_01.Set('LevelControl', instance_settings['currentLevel'] + 1, { 'Instance Tag': instance, 'Channel': '1' })
+        DSP_01_Levels.Set('LevelControl', instance_settings['currentLevel'] + 1, { 'Instance Tag': instance, 'Channel': '1' })
     else:
-        DSP_01.Set('LevelControl', instance_settings['max'], { 'Instance Tag': instance, 'Channel': '1' })
-    DSP_01.Update('LevelControl', {'Instance Tag': instance, 'Channel': '1'})
+        DSP_01_Levels.Set('LevelControl', instance_settings['max'], { 'Instance Tag': instance, 'Channel': '1' })
+    DSP_01_Levels.Update('LevelControl', {'Instance Tag': instance, 'Channel': '1'})
 
 
 def Rack_DSP_VolDown(btn, ev):
     instance = Rack_Volume_ID_Map[btn.ID]
     instance_settings = DSP_Level_Settings[instance]
     if instance_settings['currentLevel'] > instance_settings['min']:
-        DSP_01.Set('LevelControl', instance_settings['currentLevel'] - 1, { 'Instance Tag': instance, 'Channel': '1' })
+        DSP_01_Levels.Set('LevelControl', instance_settings['currentLevel'] - 1, { 'Instance Tag': instance, 'Channel': '1' })
     else:
-        DSP_01.Set('LevelControl', instance_settings['min'], { 'Instance Tag': instance, 'Channel': '1' })
-    DSP_01.Update('LevelControl', {'Instance Tag': instance, 'Channel': '1'})
+        DSP_01_Levels.Set('LevelControl', instance_settings['min'], { 'Instance Tag': instance, 'Channel': '1' })
+    DSP_01_Levels.Update('LevelControl', {'Instance Tag': instance, 'Channel': '1'})
 
 def Rack_DSP_MuteToggle(btn, ev):
     instance = Rack_Volume_ID_Map[btn.ID]
     instance_settings = DSP_Level_Settings[instance]
     if instance_settings['muteState']:
-        DSP_01.Set('MuteControl', 'Off', { 'Instance Tag': instance, 'Channel': '1' })
+        DSP_01_Levels.Set('MuteControl', 'Off', { 'Instance Tag': instance, 'Channel': '1' })
     else:
-        DSP_01.Set('MuteControl', 'On', { 'Instance Tag': instance, 'Channel': '1' })
-    DSP_01.Update('MuteControl', {'Instance Tag': instance, 'Channel': '1'})
+        DSP_01_Levels.Set('MuteControl', 'On', { 'Instance Tag': instance, 'Channel': '1' })
+    DSP_01_Levels.Update('MuteControl', {'Instance Tag': instance, 'Channel': '1'})
 
 for instance in Rack_Volume_Control_Map:
     Rack_Volume_ID_Map[Rack_Volume_Control_Map[instance]['volUp']] = instance
@@ -1,6 +1,218 @@
 from extronlib.interface import SerialInterface, EthernetClientInterface
-from struct import pack
-from binascii import hexlify
+from extronlib.system import Wait
+from collections import deque
+from threading import Lock, local
+from time import monotonic
+from SC_DriverSupport import ReceiveBuffer, StatusStore, SubscriptionIndex
+
+
+class PacketBuilder:
+    """
+    CLASS: PacketBuilder
+    PARAMETERS: None
+
+    Builds the frames of the NEC protocol: SOH, '0', the monitor ID, the message from the command tables (source,
+    type, length, STX, message, ETX), the XOR check code of everything after SOH, and CR. A frame depends only on the
+    monitor ID and the message, so each is built once and the same bytes object is handed out from then on, shared
+    by every display of the program. Set commands that carry a value keep the check code of their fixed part, and
+    only the two value digits are folded in per call.
+
+    METHODS:
+        Frame(DeviceID, message)
+            Returns the frame for a message with no value: every query, and the Set commands whose values are in
+            their tables.
+        ValueFrame(DeviceID, head, value)
+            Returns the frame for head, the message up to its value, followed by value (0-255) as two hex digits.
+        Stats()
+            Returns the number of frames and value heads cached.
+    """
+    __frames = {}                                           # (DeviceID, message) -> frame
+    __heads = {}                                            # (DeviceID, head) -> (SOH..head, check code without the value)
+    __digits = [b'%02X' % value for value in range(256)]
+
+    @staticmethod
+    def __CheckCode(data):
+        checksum = 0
+        for i in data:
+            checksum ^= i
+        return checksum
+
+    @classmethod
+    def Frame(cls, DeviceID, message):
+        frame = cls.__frames.get((DeviceID, message))
+        if frame is None:
+            buffer = bytes((0x30, DeviceID)) + message
+            frame = cls.__frames[(DeviceID, message)] = b'\x01' + buffer + bytes((cls.__CheckCode(buffer),)) + b'\r'
+        return frame
+
+    @classmethod
+    def ValueFrame(cls, DeviceID, head, value):
+        cached = cls.__heads.get((DeviceID, head))
+        if cached is None:
+            buffer = bytes((0x30, DeviceID)) + head
+            # ETX is part of the check code whatever the value
+            cached = cls.__heads[(DeviceID, head)] = (b'\x01' + buffer, cls.__CheckCode(buffer) ^ 0x03)
+        prefix, checksum = cached
+        digits = cls.__digits[value]
+        return b''.join((prefix, digits, bytes((0x03, checksum ^ digits[0] ^ digits[1], 0x0D))))
+
+    @classmethod
+    def Stats(cls):
+        return {'Frames': len(cls.__frames), 'Heads': len(cls.__heads)}
+
+class ChainScheduler:
+    """
+    CLASS: ChainScheduler
+    PARAMETERS:
+        Device: The serial driver whose RS-232 chain is scheduled
+        Penalty: Seconds a display is skipped after its first timeout, doubled for each timeout in a row
+        MaxPenalty: The longest a display is skipped, in seconds
+
+    Shares one daisy chain between the displays on it. Each Step makes one call on Device: the oldest pending user
+    Set if there is one, otherwise the next poll of the next display in turn, so a user command waits for at most
+    the call in progress and polls are spread evenly over the Device IDs. A display that did not answer is left out
+    of the polls for Penalty seconds, then for twice as long after each further timeout, up to MaxPenalty, so an
+    offline display costs one timeout per penalty rather than one per poll. User Sets are always sent. Device
+    records the outcome of every call it makes on an ID, from the scheduler or not, through Record. Set may be
+    called from any thread; the call on Device is made outside the scheduler's lock.
+
+    METHODS:
+        Add(DeviceID, Commands)
+            Polls each command of Commands, in turn, with the qualifier {'Device ID': DeviceID}.
+        Set(command, value, qualifier)
+            Queues a Set to be sent ahead of the polls; a newer value for a queued command and qualifier replaces it.
+        Step()
+            Makes the next call on Device. Returns False if there was nothing to send.
+        Start(Interval=0.05)
+            Calls Step every Interval seconds, counted from when the previous call returned.
+        Stop()
+            Stops the Steps started by Start.
+        Record(DeviceID, elapsed, responded)
+            Records a call on DeviceID that took elapsed seconds, and whether the display responded.
+        Stats()
+            Returns a dictionary by Device ID of the Responses, Timeouts, Skipped polls, the Last, Average and Max
+            response time in seconds (None before the first response), and the Penalty seconds remaining.
+    """
+    def __init__(self, Device, Penalty=1, MaxPenalty=60):
+        self.Device = Device
+        self.Penalty = Penalty
+        self.MaxPenalty = MaxPenalty
+        self.__polls = {}               # Device ID -> [commands, index of the next one]
+        self.__order = deque()          # Device IDs in round-robin order
+        self.__pending = {}             # (command, qualifier key) -> (command, value, qualifier), oldest first
+        self.__stats = {}
+        self.__lock = Lock()            # guards the polls, the pending Sets and the stats between threads
+        self.__interval = 0.05
+        self.__running = False
+        self.__wait = None
+
+    def Add(self, DeviceID, Commands):
+        DeviceID = str(DeviceID)
+        with self.__lock:
+            if DeviceID not in self.__polls:
+                self.__order.append(DeviceID)
+            self.__polls[DeviceID] = [list(Commands), 0]
+            self.__Entry(DeviceID)
+
+    def Set(self, command, value, qualifier):
+        key = (command, tuple(sorted(qualifier.items())))
+        with self.__lock:
+            # a replaced value goes to the back, behind the Sets queued before it
+            self.__pending.pop(key, None)
+            self.__pending[key] = (command, value, qualifier)
+
+    def Step(self):
+        call = self.__Next()
+        if call is None:
+            return False
+        method, command, value, qualifier = call
+        if method == 'Set':
+            self.Device.Set(command, value, qualifier)
+        else:
+            self.Device.Update(command, qualifier)
+        return True
+
+    # The next call to make, taken under the lock; Device records its outcome through Record, which takes it again
+    def __Next(self):
+        with self.__lock:
+            if self.__pending:
+                return ('Set',) + self.__pending.pop(next(iter(self.__pending)))
+            now = monotonic()
+            for _ in range(len(self.__order)):
+                DeviceID = self.__order[0]
+                self.__order.rotate(-1)
+                commands, index = self.__polls[DeviceID]
+                if not commands:
+                    continue
+                if self.__stats[DeviceID]['Until'] > now:
+                    self.__stats[DeviceID]['Skipped'] += 1
+                    continue
+                self.__polls[DeviceID][1] = (index + 1) % len(commands)
+                return 'Update', commands[index], None, {'Device ID': DeviceID}
+        return None
+
+    def Start(self, Interval=0.05):
+        self.__interval = Interval
+        self.__running = True
+        self.__Restart()
+
+    def Stop(self):
+        self.__running = False
+        if self.__wait is not None:
+            self.__wait.Cancel()
+
+    def Record(self, DeviceID, elapsed, responded):
+        with self.__lock:
+            entry = self.__Entry(str(DeviceID))
+            if responded:
+                entry['Responses'] += 1
+                entry['Total'] += elapsed
+                entry['Last'] = elapsed
+                entry['Max'] = max(entry['Max'] or 0, elapsed)
+                entry['Failures'] = 0
+                entry['Until'] = 0
+            else:
+                entry['Timeouts'] += 1
+                entry['Failures'] += 1
+                entry['Until'] = monotonic() + min(self.Penalty * 2 ** (entry['Failures'] - 1), self.MaxPenalty)
+
+    def Stats(self):
+        now = monotonic()
+        stats = {}
+        with self.__lock:
+            for DeviceID, entry in self.__stats.items():
+                stats[DeviceID] = {
+                    'Responses': entry['Responses'],
+                    'Timeouts': entry['Timeouts'],
+                    'Skipped': entry['Skipped'],
+                    'Last': entry['Last'],
+                    'Average': entry['Total'] / entry['Responses'] if entry['Responses'] else None,
+                    'Max': entry['Max'],
+                    'Penalty': max(entry['Until'] - now, 0),
+                }
+        return stats
+
+    def __Entry(self, DeviceID):
+        entry = self.__stats.get(DeviceID)
+        if entry is None:
+            entry = self.__stats[DeviceID] = {'Responses': 0, 'Timeouts': 0, 'Skipped': 0, 'Last': None, 'Total': 0,
+                                              'Max': None, 'Failures': 0, 'Until': 0}
+        return entry
+
+    def __Restart(self):
+        if self.__wait is None:
+            self.__wait = Wait(self.__interval, self.__Run)
+        else:
+            self.__wait.Change(self.__interval)
+            self.__wait.Restart()
+
+    def __Run(self):
+        if self.__running:
+            try:
+                self.Step()
+            finally:
+                if self.__running:
+                    self.__Restart()
 
 class DeviceEthernetClass:
 
@@ -9,7 +221,6 @@ class DeviceEthernetClass:
         self.Unidirectional = 'False'
         self.connectionCounter = 15
         self.DefaultResponseTimeout = 0.3
-        self.Subscription = {}
         self.counter = 0
         self.connectionFlag = True
         self.initializationChk = True
@@ -50,7 +261,19 @@ class DeviceEthernetClass:
             'VideoMute': {'Status': {}},
             'Volume': {'Status': {}},
         }
+        self.__statusStore = StatusStore(self.Commands)
+        self.Subscription = SubscriptionIndex(self.Commands)
 
+        self.ReceiveData = self.__ReceiveData
+        self.PipelineDepth = 2                              # queries in flight at once; a Set is always sent alone
+        self.__receiveBuffer = ReceiveBuffer(MaxSize=64)
+        # [kind, command, qualifier, commandstring, reply type, key, sent, value, callback]
+        self.__queuedRequests = deque()
+        self.__outstandingRequests = deque()                # the same, sent and not answered yet, oldest first
+        self.__requestLock = Lock()                         # guards the two queues, the Wait and the stats
+        self.__thread = local()                             # per thread: .reply being parsed, .callback being queued
+        self.__requestWait = None
+        self.__requestStats = {'Completed': 0, 'TimedOut': 0}
 
     @property
     def DeviceID(self):
@@ -77,14 +300,7 @@ class DeviceEthernetClass:
         }
 
         if qualifier['Mode'] in BrightnessStates and ValueConstraints['Min'] <= value <= ValueConstraints['Max']:
-            result = hexlify(value.to_bytes(1,'big')).upper()
-            buffer = pack('>BB11s2ss', 0x30, self.DeviceID, BrightnessStates[qualifier['Mode']], result, b'\x03')
-
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            AmbientBrightnessCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+            AmbientBrightnessCmdString = PacketBuilder.ValueFrame(self.DeviceID, BrightnessStates[qualifier['Mode']], value)
             self.__SetHelper('AmbientBrightness', AmbientBrightnessCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -97,12 +313,7 @@ class DeviceEthernetClass:
         }
 
         if qualifier['Mode'] in BrightnessStates:
-            buffer = pack('>BB10s', 0x30, self.DeviceID, BrightnessStates[qualifier['Mode']])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            AmbientBrightnessCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+            AmbientBrightnessCmdString = PacketBuilder.Frame(self.DeviceID, BrightnessStates[qualifier['Mode']])
             res = self.__UpdateHelper('AmbientBrightness', AmbientBrightnessCmdString, value, qualifier)
             if res:
                 try:
@@ -115,13 +326,7 @@ class DeviceEthernetClass:
 
     def UpdateAmbientCurrentIlluminance(self, value, qualifier):
 
-        buffer = pack('>BB10s', 0x30, self.DeviceID, b'0C06\x0202B4\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-
-        AmbientCurrentIlluminanceCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+        AmbientCurrentIlluminanceCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x0202B4\x03')
         res = self.__UpdateHelper('AmbientCurrentIlluminance', AmbientCurrentIlluminanceCmdString, value, qualifier)
 
         if res:
@@ -133,13 +338,7 @@ class DeviceEthernetClass:
 
     def UpdateAmbientSensorRead(self, value, qualifier):
 
-        buffer = pack('>BB10s', 0x30, self.DeviceID, b'0C06\x0202B5\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-
-        AmbientSensorReadCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+        AmbientSensorReadCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x0202B5\x03')
         res = self.__UpdateHelper('AmbientSensorRead', AmbientSensorReadCmdString, value, qualifier)
 
         if res:
@@ -161,12 +360,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            AspectRatioCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+            AspectRatioCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('AspectRatio', AspectRatioCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -183,12 +377,7 @@ class DeviceEthernetClass:
            b'7' : 'Off (dot by dot)'
         }
 
-        buffer = pack('>BB10s', 0x30, self.DeviceID, b'0C06\x020270\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-        AspectRatioCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+        AspectRatioCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x020270\x03')
         res = self.__UpdateHelper('AspectRatio', AspectRatioCmdString, value, qualifier)
 
         if res:
@@ -210,12 +399,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            AudioInputCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+            AudioInputCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('AudioInput', AudioInputCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -232,12 +416,7 @@ class DeviceEthernetClass:
             b'7' : 'DisplayPort' 
         }
 
-        buffer = pack('>BB10s', 0x30, self.DeviceID, b'0C06\x02022E\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-        AudioInputCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+        AudioInputCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x02022E\x03')
         res = self.__UpdateHelper('AudioInput', AudioInputCmdString, value, qualifier)
 
         if res:
@@ -255,12 +434,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack('>BB14s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            AudioMuteCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+            AudioMuteCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('AudioMute', AudioMuteCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -273,12 +447,7 @@ class DeviceEthernetClass:
             b'0' : 'Off' 
         }
 
-        buffer = pack('>BB10s', 0x30, self.DeviceID, b'0C06\x02008D\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-        AudioMuteCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+        AudioMuteCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x02008D\x03')
         res = self.__UpdateHelper('AudioMute', AudioMuteCmdString, value, qualifier)
 
         if res:
@@ -287,17 +456,10 @@ class DeviceEthernetClass:
                 self.WriteStatus('AudioMute', value, qualifier)
             except (KeyError, IndexError):
                 self.Error(['Audio Mute: Invalid/unexpected response'])
-        else:
-            self.Discard('Invalid Command')
 
     def SetAutoImage(self, value, qualifier):
 
-        buffer = pack('>BB14s', 0x30, self.DeviceID, b'0E0A\x02001E0001\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-        AutoImageCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+        AutoImageCmdString = PacketBuilder.Frame(self.DeviceID, b'0E0A\x02001E0001\x03')
         self.__SetHelper('AutoImage', AutoImageCmdString, value, qualifier)
 
 
@@ -309,14 +471,7 @@ class DeviceEthernetClass:
             }
 
         if ValueConstraints['Min'] <= value <= ValueConstraints['Max']:
-            result = hexlify(value.to_bytes(1, 'big')).upper()
-            buffer = pack('>BB11s2ss', 0x30, self.DeviceID, b'0E0A\x02001000', result, b'\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-
-            BacklightCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+            BacklightCmdString = PacketBuilder.ValueFrame(self.DeviceID, b'0E0A\x02001000', value)
             self.__SetHelper('Backlight', BacklightCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -324,14 +479,7 @@ class DeviceEthernetClass:
 
     def UpdateBacklight(self, value, qualifier):
 
-        buffer = pack('>BB10s', 0x30, self.DeviceID, b'0C06\x020010\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-
-            
-        BacklightCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+        BacklightCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x020010\x03')
         res = self.__UpdateHelper('Backlight', BacklightCmdString, value, qualifier)
 
         if res:
@@ -349,26 +497,14 @@ class DeviceEthernetClass:
             }
 
         if ValueConstraints['Min'] <= value <= ValueConstraints['Max']:
-            result = hexlify(value.to_bytes(1, 'big')).upper()
-            buffer = pack('>BB11s2ss', 0x30, self.DeviceID, b'0E0A\x02009200', result, b'\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            BrightnessCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+            BrightnessCmdString = PacketBuilder.ValueFrame(self.DeviceID, b'0E0A\x02009200', value)
             self.__SetHelper('Brightness', BrightnessCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
 
     def UpdateBrightness(self, value, qualifier):
 
-        buffer = pack('>BB10s', 0x30, self.DeviceID, b'0C06\x020092\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-
-        BrightnessCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+        BrightnessCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x020092\x03')
         res = self.__UpdateHelper('Brightness', BrightnessCmdString, value, qualifier)
 
         if res:
@@ -398,12 +534,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack('>BB16s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            ChannelNumberCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+            ChannelNumberCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('ChannelNumber', ChannelNumberCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -423,12 +554,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            ClosedCaptionCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            ClosedCaptionCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('ClosedCaption', ClosedCaptionCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -442,13 +568,7 @@ class DeviceEthernetClass:
             }
 
         if ValueConstraints['Min'] <= value <= ValueConstraints['Max']:
-            result = hexlify(value.to_bytes(1,'big')).upper()
-            buffer = pack( '>BB11s2ss', 0x30, self.DeviceID, b'0E0A\x02001200', result, b'\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            ContrastCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            ContrastCmdString = PacketBuilder.ValueFrame(self.DeviceID, b'0E0A\x02001200', value)
             self.__SetHelper('Contrast', ContrastCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -456,12 +576,7 @@ class DeviceEthernetClass:
 
     def UpdateContrast(self, value, qualifier):
 
-        buffer = pack( '>BB10s', 0x30, self.DeviceID, b'0C06\x020012\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-        ContrastCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+        ContrastCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x020012\x03')
         res = self.__UpdateHelper('Contrast', ContrastCmdString, value, qualifier)
 
         if res:
@@ -483,13 +598,7 @@ class DeviceEthernetClass:
             }
 
         if value in ValueStateValues:
-            buffer = pack('>BB14s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-
-            GammaCorrectionCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+            GammaCorrectionCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('GammaCorrection', GammaCorrectionCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -505,13 +614,7 @@ class DeviceEthernetClass:
             b'06' : 'Programmable'
         }
 
-        buffer = pack( '>BB10s', 0x30, self.DeviceID, b'0C06\x020268\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-
-        GammaCorrectionCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+        GammaCorrectionCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x020268\x03')
         res = self.__UpdateHelper('GammaCorrection', GammaCorrectionCmdString, value, qualifier)
 
         if res:
@@ -539,12 +642,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            InputCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            InputCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('Input', InputCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -566,12 +664,7 @@ class DeviceEthernetClass:
             b'11'  :'HDMI'  
         }
 
-        buffer = pack( '>BB10s', 0x30, self.DeviceID, b'0C06\x020060\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-        InputCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+        InputCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x020060\x03')
         res = self.__UpdateHelper('Input', InputCmdString, value, qualifier)
 
         if res:
@@ -590,12 +683,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            OnScreenDisplayCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            OnScreenDisplayCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('OnScreenDisplay', OnScreenDisplayCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -608,12 +696,7 @@ class DeviceEthernetClass:
             b'1' : 'Off' 
         }
 
-        buffer = pack( '>BB10s', 0x30, self.DeviceID, b'0C06\x0202EA\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-        OnScreenDisplayCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+        OnScreenDisplayCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x0202EA\x03')
         res = self.__UpdateHelper('OnScreenDisplay', OnScreenDisplayCmdString, value, qualifier)
 
         if res:
@@ -631,12 +714,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            OverscanCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            OverscanCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('Overscan', OverscanCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -649,12 +727,7 @@ class DeviceEthernetClass:
             b'1' : 'Off'
         }
 
-        buffer = pack( '>BB10s', 0x30, self.DeviceID, b'0C06\x0202E3\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-        OverscanCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+        OverscanCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x0202E3\x03')
         res = self.__UpdateHelper('Overscan', OverscanCmdString, value, qualifier)
 
         if res:
@@ -678,13 +751,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-
-            PictureModeCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            PictureModeCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('PictureMode', PictureModeCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -702,13 +769,7 @@ class DeviceEthernetClass:
             b'0C' : 'Ambient-2'
         }
 
-        buffer = pack( '>BB10s', 0x30, self.DeviceID, b'0C06\x02021A\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-
-        PictureModeCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+        PictureModeCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x02021A\x03')
         res = self.__UpdateHelper('PictureMode', PictureModeCmdString, value, qualifier)
 
         if res:
@@ -736,12 +797,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            PIPInputCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            PIPInputCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('PIPInput', PIPInputCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -763,12 +819,7 @@ class DeviceEthernetClass:
             b'11'  :'HDMI' 
         }
 
-        buffer = pack( '>BB10s', 0x30, self.DeviceID, b'0C06\x020273\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-        PIPInputCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+        PIPInputCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x020273\x03')
         res = self.__UpdateHelper('PIPInput', PIPInputCmdString, value, qualifier)
 
         if res:
@@ -790,12 +841,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            PIPModeCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            PIPModeCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('PIPMode', PIPModeCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -811,12 +857,7 @@ class DeviceEthernetClass:
             b'6'  :'Side by side (Full)'     
         }
 
-        buffer = pack( '>BB10s', 0x30, self.DeviceID, b'0C06\x020272\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-        PIPModeCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+        PIPModeCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x020272\x03')
         res = self.__UpdateHelper('PIPMode', PIPModeCmdString, value, qualifier)
 
         if res:
@@ -835,12 +876,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            PIPSizeCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            PIPSizeCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('PIPSize', PIPSizeCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -853,12 +889,7 @@ class DeviceEthernetClass:
             b'3'  :'Large'
         }
 
-        buffer = pack( '>BB10s', 0x30, self.DeviceID, b'0C06\x020271\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-        PIPSizeCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+        PIPSizeCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x020271\x03')
         res = self.__UpdateHelper('PIPSize', PIPSizeCmdString, value, qualifier)
 
         if res:
@@ -876,12 +907,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack( '>BB16s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            PowerCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            PowerCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('Power', PowerCmdString, value, qualifier)
 
     def UpdatePower(self, value, qualifier):
@@ -893,12 +919,7 @@ class DeviceEthernetClass:
             b'4'  :'Off'
         }
 
-        buffer = pack( '>BB10s', 0x30, self.DeviceID, b'0A06\x0201D6\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-        PowerCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+        PowerCmdString = PacketBuilder.Frame(self.DeviceID, b'0A06\x0201D6\x03')
         res = self.__UpdateHelper('Power', PowerCmdString, value, qualifier)
 
         if res:
@@ -916,12 +937,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack('>BB14s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            PowerSaveCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+            PowerSaveCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('PowerSave', PowerSaveCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -933,11 +949,7 @@ class DeviceEthernetClass:
             b'0': 'Off'
         }
 
-        buffer = pack('>BB10s', 0x30, self.DeviceID, b'0C06\x0200E1\x03')
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-        PowerSaveCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+        PowerSaveCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x0200E1\x03')
         res = self.__UpdateHelper('PowerSave', PowerSaveCmdString, value, qualifier)
 
         if res:
@@ -951,13 +963,7 @@ class DeviceEthernetClass:
 
         value = int(value)
         if 1 <= value <= 10:
-            result = hexlify(value.to_bytes(1,'big')).upper()
-            buffer = pack( '>BB11s2ss', 0x30, self.DeviceID, b'0E0A\x0202D000', result, b'\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            TileHMonitorCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            TileHMonitorCmdString = PacketBuilder.ValueFrame(self.DeviceID, b'0E0A\x0202D000', value)
             self.__SetHelper('TileHMonitor', TileHMonitorCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -971,12 +977,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            TileMatrixCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            TileMatrixCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('TileMatrix', TileMatrixCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -989,12 +990,7 @@ class DeviceEthernetClass:
             b'3'  :'Off'
         }
 
-        buffer = pack( '>BB10s', 0x30, self.DeviceID, b'0C06\x0202D3\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-        TileMatrixCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+        TileMatrixCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x0202D3\x03')
         res = self.__UpdateHelper('TileMatrix', TileMatrixCmdString, value, qualifier)
 
         if res:
@@ -1012,12 +1008,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            TileMatrixCompCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            TileMatrixCompCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('TileMatrixComp', TileMatrixCompCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -1026,13 +1017,7 @@ class DeviceEthernetClass:
 
         value = int(value)
         if 1 <= value <= 100:
-            result = hexlify(value.to_bytes(1,'big')).upper()
-            buffer = pack( '>BB11s2ss', 0x30, self.DeviceID, b'0E0A\x0202D200', result, b'\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            TilePositionCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            TilePositionCmdString = PacketBuilder.ValueFrame(self.DeviceID, b'0E0A\x0202D200', value)
             self.__SetHelper('TilePosition', TilePositionCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -1041,13 +1026,7 @@ class DeviceEthernetClass:
 
         value = int(value)
         if 1 <= value <= 10:
-            result = hexlify(value.to_bytes(1,'big')).upper()
-            buffer = pack( '>BB11s2ss', 0x30, self.DeviceID, b'0E0A\x0202D100', result, b'\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            TileVMonitorCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            TileVMonitorCmdString = PacketBuilder.ValueFrame(self.DeviceID, b'0E0A\x0202D100', value)
             self.__SetHelper('TileVMonitor', TileVMonitorCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -1060,12 +1039,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            TVChannelStepCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            TVChannelStepCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('TVChannelStep', TVChannelStepCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -1078,12 +1052,7 @@ class DeviceEthernetClass:
         }
 
         if value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, self.DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            MuteCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            MuteCmdString = PacketBuilder.Frame(self.DeviceID, ValueStateValues[value])
             self.__SetHelper('VideoMute', MuteCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -1097,12 +1066,7 @@ class DeviceEthernetClass:
             b'0' : 'No Signal' 
         }
 
-        buffer = pack( '>BB10s', 0x30, self.DeviceID, b'0C06\x0210B6\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-        MuteCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+        MuteCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x0210B6\x03')
         res = self.__UpdateHelper('VideoMute', MuteCmdString, value, qualifier)
 
         if res:
@@ -1120,25 +1084,14 @@ class DeviceEthernetClass:
             }
 
         if ValueConstraints['Min'] <= value <= ValueConstraints['Max']:
-            result = hexlify(value.to_bytes(1,'big')).upper()
-            buffer = pack( '>BB11s2ss', 0x30, self.DeviceID, b'0E0A\x02006200', result, b'\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            VolumeCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            VolumeCmdString = PacketBuilder.ValueFrame(self.DeviceID, b'0E0A\x02006200', value)
             self.__SetHelper('Volume', VolumeCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
 
     def UpdateVolume(self, value, qualifier):
 
-        buffer = pack( '>BB10s', 0x30, self.DeviceID, b'0C06\x020062\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-        VolumeCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+        VolumeCmdString = PacketBuilder.Frame(self.DeviceID, b'0C06\x020062\x03')
         res = self.__UpdateHelper('Volume', VolumeCmdString, value, qualifier)
 
         if res:
@@ -1162,14 +1115,15 @@ class DeviceEthernetClass:
         if self.Unidirectional == 'True':
             self.Send(commandstring)
         else:
-            res = self.SendAndWait(commandstring, self.DefaultResponseTimeout, deliTag=b'\r')
-            if not res:
-                self.Error(['{0} : Invalid/Unexpected Response'.format(command)])
-            else:
-                res = self.__CheckResponseForErrors(command, res)
-    
+            self.__Request('Set', command, qualifier, commandstring, value)
+
+    # Queues the query and returns at once. The Update method is run again with the reply when it arrives, and this
+    # then returns the reply for the method to parse.
     def __UpdateHelper(self, command, commandstring, value, qualifier):
-        if self.Unidirectional == 'True':
+        reply = getattr(self.__thread, 'reply', None)
+        if reply is not None:
+            return self.__CheckResponseForErrors(command, reply)
+        elif self.Unidirectional == 'True':
             self.Discard('Inappropriate Command ' + command)
             return ''
         else:
@@ -1181,11 +1135,150 @@ class DeviceEthernetClass:
             if self.counter > self.connectionCounter and self.connectionFlag:
                 self.OnDisconnected()
 
-            res = self.SendAndWait(commandstring, self.DefaultResponseTimeout, deliTag=b'\r')
-            if not res:
-                return ''
+            self.__Request('Update', command, qualifier, commandstring, value)
+            return ''
+
+    # Set and Update, but Callback(command, value, qualifier) is called once the display has answered: with the value
+    # set, or the status the reply was parsed into. value is None if the call was not sent, failed, timed out or was
+    # dropped at a disconnect. The callback runs on the thread that received the reply or ran the timeout.
+    def SetAsync(self, command, value, qualifier=None, Callback=None):
+        self.__Call(self.Set, (command, value, qualifier), command, qualifier, Callback)
+
+    def UpdateAsync(self, command, qualifier=None, Callback=None):
+        self.__Call(self.Update, (command, qualifier), command, qualifier, Callback)
+
+    def __Call(self, method, args, command, qualifier, Callback):
+        self.__thread.callback = Callback
+        try:
+            method(*args)
+        finally:
+            # not taken by __Request: the call was discarded, or sent without expecting a reply
+            unsent = self.__thread.callback is not None
+            self.__thread.callback = None
+        if unsent:
+            Callback(command, None, qualifier)
+
+    # A reply's message type follows its request's: A (command) -> B, C (get parameter) -> D, E (set parameter) -> F.
+    # Parameter replies echo the op-code page and code, so they are matched by them; command replies are matched in
+    # the order the commands were sent.
+    def __Request(self, kind, command, qualifier, commandstring, value):
+        replyType = commandstring[4] + 1
+        key = commandstring[8:12] if replyType != 0x42 else None
+        callback = getattr(self.__thread, 'callback', None)
+        self.__thread.callback = None
+        with self.__requestLock:
+            self.__queuedRequests.append([kind, command, qualifier, commandstring, replyType, key, 0, value, callback])
+        self.__SendRequests()
+
+    # Sends queued requests in order while the pipeline has room: up to PipelineDepth queries, or one Set on its own.
+    # Requests are sent under the lock so that they reach the display in the order they were queued.
+    def __SendRequests(self):
+        with self.__requestLock:
+            outstanding = self.__outstandingRequests
+            while self.__queuedRequests:
+                request = self.__queuedRequests[0]
+                if outstanding and (request[0] == 'Set' or outstanding[0][0] == 'Set' or
+                                    len(outstanding) >= self.PipelineDepth):
+                    break
+                self.__queuedRequests.popleft()
+                request[6] = monotonic()
+                outstanding.append(request)
+                if len(outstanding) == 1:
+                    self.__StartRequestWait(self.DefaultResponseTimeout)
+                self.Send(request[3])
+
+    def __StartRequestWait(self, timeout):
+        if self.__requestWait is None:
+            self.__requestWait = Wait(timeout, self.__ExpireRequests)
+        else:
+            self.__requestWait.Change(timeout)
+            self.__requestWait.Restart()
+
+    def __ReceiveData(self, interface, data):
+        self.__receiveBuffer.Append(data)
+        buffer = self.__receiveBuffer.Data
+        while True:
+            start = buffer.find(b'\x01')
+            if start < 0:
+                self.__receiveBuffer.Clear()
+                break
+            self.__receiveBuffer.Consume(start)
+            if len(buffer) < 7:
+                break
+            # SOH, the 6 byte header, the message (its length is in the header), the check code and CR
+            try:
+                size = int(buffer[5:7], 16) + 9
+            except ValueError:
+                self.__receiveBuffer.Consume(1)
+                continue
+            if len(buffer) < size:
+                break
+            reply = bytes(buffer[:size])
+            self.__receiveBuffer.Consume(size)
+            if reply[-1] == 0x0D:
+                self.__CompleteRequest(reply)
+
+    # The request is taken off the queue under the lock; its reply is parsed, and its callback run, after the lock is
+    # released, as the parser may queue further requests.
+    def __CompleteRequest(self, reply):
+        replyType = reply[4]
+        key = reply[10:14] if replyType != 0x42 else None
+        with self.__requestLock:
+            outstanding = self.__outstandingRequests
+            for request in outstanding:
+                if request[4] == replyType and request[5] == key:
+                    break
             else:
-                return self.__CheckResponseForErrors(command, res)
+                return
+
+            head = request is outstanding[0]
+            outstanding.remove(request)
+            self.__requestStats['Completed'] += 1
+            if head:
+                if outstanding:
+                    self.__StartRequestWait(max(outstanding[0][6] + self.DefaultResponseTimeout - monotonic(), 0.01))
+                else:
+                    self.__requestWait.Cancel()
+
+        kind, command, qualifier = request[:3]
+        if kind == 'Set':
+            value = request[7] if self.__CheckResponseForErrors(command, reply) else None
+        else:
+            self.__thread.reply = reply
+            try:
+                getattr(self, 'Update' + command)(None, qualifier)
+            finally:
+                self.__thread.reply = None
+            value = self.ReadStatus(command, qualifier)
+        if request[8] is not None:
+            request[8](command, value, qualifier)
+        self.__SendRequests()
+
+    # Drops every request that has waited DefaultResponseTimeout without a reply
+    def __ExpireRequests(self):
+        expired = []
+        with self.__requestLock:
+            outstanding = self.__outstandingRequests
+            deadline = monotonic() - self.DefaultResponseTimeout + 0.01
+            while outstanding and outstanding[0][6] <= deadline:
+                expired.append(outstanding.popleft())
+            self.__requestStats['TimedOut'] += len(expired)
+            if outstanding:
+                self.__StartRequestWait(max(outstanding[0][6] + self.DefaultResponseTimeout - monotonic(), 0.01))
+        for request in expired:
+            if request[0] == 'Set':
+                self.Error(['{0} : Invalid/Unexpected Response'.format(request[1])])
+            if request[8] is not None:
+                request[8](request[1], None, request[2])
+        self.__SendRequests()
+
+    # The requests in flight and queued, and how many were answered or timed out
+    def RequestStats(self):
+        with self.__requestLock:
+            stats = dict(self.__requestStats)
+            stats['Outstanding'] = len(self.__outstandingRequests)
+            stats['Queued'] = len(self.__queuedRequests)
+        return stats
 
     def OnConnected(self):
         self.connectionFlag = True
@@ -1196,6 +1289,16 @@ class DeviceEthernetClass:
     def OnDisconnected(self):
         self.WriteStatus('ConnectionStatus', 'Disconnected')
         self.connectionFlag = False
+        with self.__requestLock:
+            dropped = list(self.__outstandingRequests) + list(self.__queuedRequests)
+            self.__queuedRequests.clear()
+            self.__outstandingRequests.clear()
+            if self.__requestWait is not None:
+                self.__requestWait.Cancel()
+        self.__receiveBuffer.Clear()
+        for request in dropped:
+            if request[8] is not None:
+                request[8](request[1], None, request[2])
 
 
     ######################################################
@@ -1225,83 +1328,27 @@ class DeviceEthernetClass:
     def SubscribeStatus(self, command, qualifier, callback):
         Command = self.Commands.get(command, None)
         if Command:
-            if command not in self.Subscription:
-                self.Subscription[command] = {'method':{}}
-
-            Subscribe = self.Subscription[command]
-            Method = Subscribe['method']
-
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Method = Method[qualifier[Parameter]]
-                    except:
-                        if Parameter in qualifier:
-                            Method[qualifier[Parameter]] = {}
-                            Method = Method[qualifier[Parameter]]
-                        else:
-                            return
-
-            Method['callback'] = callback
-            Method['qualifier'] = qualifier
+            self.Subscription.Add(command, qualifier, callback)
         else:
             raise KeyError('Invalid command for SubscribeStatus ', command)
 
     # This method is to check the command with new status have a callback method then trigger the callback
     def NewStatus(self, command, value, qualifier):
-        if command in self.Subscription :
-            Subscribe = self.Subscription[command]
-            Method = Subscribe['method']
-            Command = self.Commands[command]
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Method = Method[qualifier[Parameter]]
-                    except:
-                        break
-            if 'callback' in Method and Method['callback']:
-                Method['callback'](command, value, qualifier)
+        for callback in self.Subscription.Callbacks(command, qualifier):
+            callback(command, value, qualifier)
 
     # Save new status to the command
     def WriteStatus(self, command, value, qualifier=None):
         self.counter = 0
         if not self.connectionFlag:
             self.OnConnected()
-        Command = self.Commands[command]
-        Status = Command['Status']
-        if qualifier:
-            for Parameter in Command['Parameters']:
-                try:
-                    Status = Status[qualifier[Parameter]]
-                except KeyError:
-                    if Parameter in qualifier:
-                        Status[qualifier[Parameter]] = {}
-                        Status = Status[qualifier[Parameter]]
-                    else:
-                        return
-        try:
-            if Status['Live'] != value:
-                Status['Live'] = value
-                self.NewStatus(command, value, qualifier)
-        except:
-            Status['Live'] = value
+        if self.__statusStore.Write(command, value, qualifier):
             self.NewStatus(command, value, qualifier)
 
     # Read the value from a command.
     def ReadStatus(self, command, qualifier=None):
-        Command = self.Commands.get(command, None)
-        if Command:
-            Status = Command['Status']
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Status = Status[qualifier[Parameter]]
-                    except KeyError:
-                        return None
-            try:
-                return Status['Live']
-            except:
-                return None
+        if command in self.Commands:
+            return self.__statusStore.Read(command, qualifier)
         else:
             raise KeyError('Invalid command for ReadStatus: ', command)
 
@@ -1313,7 +1360,6 @@ class DeviceSerialClass:
         self.Unidirectional = 'False'
         self.connectionCounter = 15
         self.DefaultResponseTimeout = 0.3
-        self.Subscription = {}
         self.counter = 0
         self.connectionFlag = True
         self.initializationChk = True
@@ -1355,6 +1401,9 @@ class DeviceSerialClass:
             'VideoMute': {'Parameters': ['Device ID'], 'Status': {}},
             'Volume': {'Parameters': ['Device ID'], 'Status': {}},
         }
+        self.__statusStore = StatusStore(self.Commands)
+        self.Subscription = SubscriptionIndex(self.Commands)
+        self.Chain = ChainScheduler(self)
 
     @property
     def DeviceID(self):
@@ -1390,14 +1439,7 @@ class DeviceSerialClass:
         }
 
         if DeviceID != 0 and qualifier['Mode'] in BrightnessStates and ValueConstraints['Min'] <= value <= ValueConstraints['Max']:
-            result = hexlify(value.to_bytes(1,'big')).upper()
-            buffer = pack('>BB11s2ss', 0x30, DeviceID, BrightnessStates[qualifier['Mode']], result, b'\x03')
-
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            AmbientBrightnessCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+            AmbientBrightnessCmdString = PacketBuilder.ValueFrame(DeviceID, BrightnessStates[qualifier['Mode']], value)
             self.__SetHelper('AmbientBrightness', AmbientBrightnessCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -1412,12 +1454,7 @@ class DeviceSerialClass:
         }
 
         if DeviceID != 0 and qualifier['Mode'] in BrightnessStates:
-            buffer = pack('>BB10s', 0x30, DeviceID, BrightnessStates[qualifier['Mode']])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            AmbientBrightnessCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+            AmbientBrightnessCmdString = PacketBuilder.Frame(DeviceID, BrightnessStates[qualifier['Mode']])
             res = self.__UpdateHelper('AmbientBrightness', AmbientBrightnessCmdString, value, qualifier)
 
             if res:
@@ -1434,13 +1471,7 @@ class DeviceSerialClass:
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
 
         if DeviceID != 0:
-            buffer = pack('>BB10s', 0x30, DeviceID, b'0C06\x0202B4\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-
-            AmbientCurrentIlluminanceCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+            AmbientCurrentIlluminanceCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x0202B4\x03')
             res = self.__UpdateHelper('AmbientCurrentIlluminance', AmbientCurrentIlluminanceCmdString, value, qualifier)
 
             if res:
@@ -1457,13 +1488,7 @@ class DeviceSerialClass:
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
 
         if DeviceID != 0:
-            buffer = pack('>BB10s', 0x30, DeviceID, b'0C06\x0202B5\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-
-            AmbientSensorReadCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+            AmbientSensorReadCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x0202B5\x03')
             res = self.__UpdateHelper('AmbientSensorRead', AmbientSensorReadCmdString, value, qualifier)
 
             if res:
@@ -1488,12 +1513,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            AspectRatioCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r' 
+            AspectRatioCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value]) 
             self.__SetHelper('AspectRatio', AspectRatioCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -1512,12 +1532,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x020270\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            AspectRatioCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'        
+            AspectRatioCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x020270\x03')        
             res = self.__UpdateHelper('AspectRatio', AspectRatioCmdString, value, qualifier)
 
             if res:
@@ -1542,12 +1557,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            AudioInputCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            AudioInputCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('AudioInput', AudioInputCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -1566,12 +1576,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x02022E\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            AudioInputCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            AudioInputCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x02022E\x03')
             res = self.__UpdateHelper('AudioInput', AudioInputCmdString, value, qualifier)
 
             if res:
@@ -1592,12 +1597,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            AudioMuteCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            AudioMuteCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('AudioMute', AudioMuteCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -1613,12 +1613,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x02008D\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            AudioMuteCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            AudioMuteCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x02008D\x03')
             res = self.__UpdateHelper('AudioMute', AudioMuteCmdString, value, qualifier)
 
             if res:
@@ -1634,13 +1629,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB14s', 0x30, DeviceID, b'0E0A\x02001E0001\x03')
-
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            AutoImageCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            AutoImageCmdString = PacketBuilder.Frame(DeviceID, b'0E0A\x02001E0001\x03')
             self.__SetHelper('AutoImage', AutoImageCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -1654,14 +1643,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and ValueConstraints['Min'] <= value <= ValueConstraints['Max']:
-            result = hexlify(value.to_bytes(1,'big')).upper()
-            buffer = pack( '>BB11s2ss', 0x30, DeviceID, b'0E0A\x02001000', result, b'\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-
-            BacklightCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            BacklightCmdString = PacketBuilder.ValueFrame(DeviceID, b'0E0A\x02001000', value)
             self.__SetHelper('Backlight', BacklightCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -1671,13 +1653,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x020010\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            
-            BacklightCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            BacklightCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x020010\x03')
             res = self.__UpdateHelper('Backlight', BacklightCmdString, value, qualifier)
 
             if res:
@@ -1698,13 +1674,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and ValueConstraints['Min'] <= value <= ValueConstraints['Max']:
-            result = hexlify(value.to_bytes(1,'big')).upper()
-            buffer = pack( '>BB11s2ss', 0x30, DeviceID, b'0E0A\x02009200', result, b'\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            BrightnessCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            BrightnessCmdString = PacketBuilder.ValueFrame(DeviceID, b'0E0A\x02009200', value)
             self.__SetHelper('Brightness', BrightnessCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -1714,13 +1684,7 @@ class DeviceSerialClass:
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
 
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x020092\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-
-            BrightnessCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            BrightnessCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x020092\x03')
             res = self.__UpdateHelper('Brightness', BrightnessCmdString, value, qualifier)
 
             if res:
@@ -1753,12 +1717,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack( '>BB16s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            ChannelNumberCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            ChannelNumberCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('ChannelNumber', ChannelNumberCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -1780,12 +1739,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            ClosedCaptionCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            ClosedCaptionCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('ClosedCaption', ClosedCaptionCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -1807,12 +1761,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x021084\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            ClosedCaptionCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            ClosedCaptionCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x021084\x03')
             res = self.__UpdateHelper('ClosedCaption', ClosedCaptionCmdString, value, qualifier)
 
             if res:
@@ -1833,13 +1782,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and ValueConstraints['Min'] <= value <= ValueConstraints['Max']:
-            result = hexlify(value.to_bytes(1,'big')).upper()
-            buffer = pack( '>BB11s2ss', 0x30, DeviceID, b'0E0A\x02001200', result, b'\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            ContrastCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            ContrastCmdString = PacketBuilder.ValueFrame(DeviceID, b'0E0A\x02001200', value)
             self.__SetHelper('Contrast', ContrastCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -1848,12 +1791,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x020012\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            ContrastCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            ContrastCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x020012\x03')
             res = self.__UpdateHelper('Contrast', ContrastCmdString, value, qualifier)
 
             if res:
@@ -1879,13 +1817,7 @@ class DeviceSerialClass:
         }
 
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack('>BB14s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-
-            GammaCorrectionCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+            GammaCorrectionCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('GammaCorrection', GammaCorrectionCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -1905,13 +1837,7 @@ class DeviceSerialClass:
         }
 
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x020268\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-
-            GammaCorrectionCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            GammaCorrectionCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x020268\x03')
             res = self.__UpdateHelper('GammaCorrection', GammaCorrectionCmdString, value, qualifier)
 
             if res:
@@ -1942,12 +1868,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            InputCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            InputCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('Input', InputCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -1972,12 +1893,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x020060\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            InputCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            InputCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x020060\x03')
             res = self.__UpdateHelper('Input', InputCmdString, value, qualifier)
 
             if res:
@@ -1998,12 +1914,7 @@ class DeviceSerialClass:
             b'4'  :'Off'
         }
 
-        buffer = pack( '>BB10s', 0x30, self._DeviceID, b'0A06\x0201D6\x03')
-
-        checksum = 0
-        for i in buffer:
-            checksum = checksum ^ i
-        MasterPowerCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+        MasterPowerCmdString = PacketBuilder.Frame(self._DeviceID, b'0A06\x0201D6\x03')
         res = self.__UpdateHelper('MasterPower', MasterPowerCmdString, value, qualifier)
 
         if res:
@@ -2023,12 +1934,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            OnScreenDisplayCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            OnScreenDisplayCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('OnScreenDisplay', OnScreenDisplayCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -2043,12 +1949,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x0202EA\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            OnScreenDisplayCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            OnScreenDisplayCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x0202EA\x03')
             res = self.__UpdateHelper('OnScreenDisplay', OnScreenDisplayCmdString, value, qualifier)
 
             if res:
@@ -2069,12 +1970,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            OverscanCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            OverscanCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('Overscan', OverscanCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -2089,12 +1985,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x0202E3\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            OverscanCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            OverscanCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x0202E3\x03')
             res = self.__UpdateHelper('Overscan', OverscanCmdString, value, qualifier)
 
             if res:
@@ -2122,13 +2013,7 @@ class DeviceSerialClass:
         }
 
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-
-            PictureModeCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            PictureModeCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('PictureMode', PictureModeCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -2149,13 +2034,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x02021A\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-
-            PictureModeCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            PictureModeCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x02021A\x03')
             res = self.__UpdateHelper('PictureMode', PictureModeCmdString, value, qualifier)
 
             if res:
@@ -2186,12 +2065,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            PIPInputCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            PIPInputCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('PIPInput', PIPInputCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -2217,12 +2091,7 @@ class DeviceSerialClass:
         
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x020273\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            PIPInputCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            PIPInputCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x020273\x03')
             res = self.__UpdateHelper('PIPInput', PIPInputCmdString, value, qualifier)
 
             if res:
@@ -2247,12 +2116,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            PIPModeCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            PIPModeCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('PIPMode', PIPModeCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -2271,12 +2135,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x020272\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            PIPModeCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            PIPModeCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x020272\x03')
             res = self.__UpdateHelper('PIPMode', PIPModeCmdString, value, qualifier)
 
             if res:
@@ -2298,12 +2157,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            PIPSizeCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            PIPSizeCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('PIPSize', PIPSizeCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -2319,12 +2173,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x020271\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            PIPSizeCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            PIPSizeCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x020271\x03')
             res = self.__UpdateHelper('PIPSize', PIPSizeCmdString, value, qualifier)
 
             if res:
@@ -2345,12 +2194,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack( '>BB16s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            PowerCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            PowerCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('Power', PowerCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -2367,12 +2211,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0A06\x0201D6\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            PowerCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            PowerCmdString = PacketBuilder.Frame(DeviceID, b'0A06\x0201D6\x03')
             res = self.__UpdateHelper('Power', PowerCmdString, value, qualifier)
 
             if res:
@@ -2393,12 +2232,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack('>BB14s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            PowerSaveCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+            PowerSaveCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('PowerSave', PowerSaveCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -2413,12 +2247,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack('>BB10s', 0x30, DeviceID, b'0C06\x0200E1\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            PowerSaveCmdString = b'\x01' + buffer + pack('>B', checksum) + b'\r'
+            PowerSaveCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x0200E1\x03')
             res = self.__UpdateHelper('PowerSave', PowerSaveCmdString, value, qualifier)
 
             if res:
@@ -2435,13 +2264,7 @@ class DeviceSerialClass:
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         value = int(value)
         if DeviceID != 0 and 1 <= value <= 10:
-            result = hexlify(value.to_bytes(1,'big')).upper()
-            buffer = pack( '>BB11s2ss', 0x30, DeviceID, b'0E0A\x0202D000', result, b'\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            TileHMonitorCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            TileHMonitorCmdString = PacketBuilder.ValueFrame(DeviceID, b'0E0A\x0202D000', value)
             self.__SetHelper('TileHMonitor', TileHMonitorCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -2457,12 +2280,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            TileMatrixCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            TileMatrixCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('TileMatrix', TileMatrixCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -2478,12 +2296,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x0202D3\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            TileMatrixCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            TileMatrixCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x0202D3\x03')
             res = self.__UpdateHelper('TileMatrix', TileMatrixCmdString, value, qualifier)
 
             if res:
@@ -2504,12 +2317,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            TileMatrixCompCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            TileMatrixCompCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('TileMatrixComp', TileMatrixCompCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -2519,13 +2327,7 @@ class DeviceSerialClass:
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         value = int(value)
         if DeviceID != 0 and 1 <= value <= 100:
-            result = hexlify(value.to_bytes(1,'big')).upper()
-            buffer = pack( '>BB11s2ss', 0x30, DeviceID, b'0E0A\x0202D200', result, b'\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            TilePositionCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            TilePositionCmdString = PacketBuilder.ValueFrame(DeviceID, b'0E0A\x0202D200', value)
             self.__SetHelper('TilePosition', TilePositionCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -2535,13 +2337,7 @@ class DeviceSerialClass:
         value = int(value)
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and 1 <= value <= 10:
-            result = hexlify(value.to_bytes(1,'big')).upper()
-            buffer = pack( '>BB11s2ss', 0x30, DeviceID, b'0E0A\x0202D100', result, b'\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            TileVMonitorCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            TileVMonitorCmdString = PacketBuilder.ValueFrame(DeviceID, b'0E0A\x0202D100', value)
             self.__SetHelper('TileVMonitor', TileVMonitorCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -2556,12 +2352,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            TVChannelStepCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            TVChannelStepCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('TVChannelStep', TVChannelStepCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -2575,12 +2366,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and value in ValueStateValues:
-            buffer = pack( '>BB14s', 0x30, DeviceID, ValueStateValues[value])
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            MuteCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            MuteCmdString = PacketBuilder.Frame(DeviceID, ValueStateValues[value])
             self.__SetHelper('VideoMute', MuteCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -2596,12 +2382,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x0210B6\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            MuteCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            MuteCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x0210B6\x03')
             res = self.__UpdateHelper('VideoMute', MuteCmdString, value, qualifier)
 
             if res:
@@ -2622,13 +2403,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0 and ValueConstraints['Min'] <= value <= ValueConstraints['Max']:
-            result = hexlify(value.to_bytes(1,'big')).upper()
-            buffer = pack( '>BB11s2ss', 0x30, DeviceID, b'0E0A\x02006200', result, b'\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            VolumeCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            VolumeCmdString = PacketBuilder.ValueFrame(DeviceID, b'0E0A\x02006200', value)
             self.__SetHelper('Volume', VolumeCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -2638,12 +2413,7 @@ class DeviceSerialClass:
 
         DeviceID = self.SetQualifierDeviceID(qualifier['Device ID'])
         if DeviceID != 0:
-            buffer = pack( '>BB10s', 0x30, DeviceID, b'0C06\x020062\x03')
-
-            checksum = 0
-            for i in buffer:
-                checksum = checksum ^ i
-            VolumeCmdString = b'\x01'+ buffer + pack('>B', checksum) + b'\r'
+            VolumeCmdString = PacketBuilder.Frame(DeviceID, b'0C06\x020062\x03')
             res = self.__UpdateHelper('Volume', VolumeCmdString, value, qualifier)
 
             if res:
@@ -2668,7 +2438,9 @@ class DeviceSerialClass:
         if self.Unidirectional == 'True' or 'Broadcast' in [qualifier['Device ID']]:
             self.Send(commandstring)
         else:
+            started = monotonic()
             res = self.SendAndWait(commandstring, self.DefaultResponseTimeout, deliTag=b'\r')
+            self.Chain.Record(qualifier['Device ID'], monotonic() - started, bool(res))
             if not res:
                 self.Error(['{0} : Invalid/Unexpected Response'.format(command)])
             else:
@@ -2688,7 +2460,9 @@ class DeviceSerialClass:
             if self.counter > self.connectionCounter and self.connectionFlag:
                 self.OnDisconnected()
 
+            started = monotonic()
             res = self.SendAndWait(commandstring, self.DefaultResponseTimeout, deliTag=b'\r')
+            self.Chain.Record(qualifier['Device ID'], monotonic() - started, bool(res))
             if not res:
                 return ''
             else:
@@ -2732,83 +2506,27 @@ class DeviceSerialClass:
     def SubscribeStatus(self, command, qualifier, callback):
         Command = self.Commands.get(command, None)
         if Command:
-            if command not in self.Subscription:
-                self.Subscription[command] = {'method':{}}
-
-            Subscribe = self.Subscription[command]
-            Method = Subscribe['method']
-
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Method = Method[qualifier[Parameter]]
-                    except:
-                        if Parameter in qualifier:
-                            Method[qualifier[Parameter]] = {}
-                            Method = Method[qualifier[Parameter]]
-                        else:
-                            return
-
-            Method['callback'] = callback
-            Method['qualifier'] = qualifier
+            self.Subscription.Add(command, qualifier, callback)
         else:
             raise KeyError('Invalid command for SubscribeStatus ', command)
 
     # This method is to check the command with new status have a callback method then trigger the callback
     def NewStatus(self, command, value, qualifier):
-        if command in self.Subscription :
-            Subscribe = self.Subscription[command]
-            Method = Subscribe['method']
-            Command = self.Commands[command]
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Method = Method[qualifier[Parameter]]
-                    except:
-                        break
-            if 'callback' in Method and Method['callback']:
-                Method['callback'](command, value, qualifier)
+        for callback in self.Subscription.Callbacks(command, qualifier):
+            callback(command, value, qualifier)
 
     # Save new status to the command
     def WriteStatus(self, command, value, qualifier=None):
         self.counter = 0
         if not self.connectionFlag:
             self.OnConnected()
-        Command = self.Commands[command]
-        Status = Command['Status']
-        if qualifier:
-            for Parameter in Command['Parameters']:
-                try:
-                    Status = Status[qualifier[Parameter]]
-                except KeyError:
-                    if Parameter in qualifier:
-                        Status[qualifier[Parameter]] = {}
-                        Status = Status[qualifier[Parameter]]
-                    else:
-                        return
-        try:
-            if Status['Live'] != value:
-                Status['Live'] = value
-                self.NewStatus(command, value, qualifier)
-        except:
-            Status['Live'] = value
+        if self.__statusStore.Write(command, value, qualifier):
             self.NewStatus(command, value, qualifier)
 
     # Read the value from a command.
     def ReadStatus(self, command, qualifier=None):
-        Command = self.Commands.get(command, None)
-        if Command:
-            Status = Command['Status']
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Status = Status[qualifier[Parameter]]
-                    except KeyError:
-                        return None
-            try:
-                return Status['Live']
-            except:
-                return None
+        if command in self.Commands:
+            return self.__statusStore.Read(command, qualifier)
         else:
             raise KeyError('Invalid command for ReadStatus: ', command)
 
@@ -1,17 +1,18 @@
 from extronlib.interface import SerialInterface, EthernetClientInterface
 import re
 from extronlib.system import Wait, ProgramLog
+from SC_DriverSupport import MatchTable, ReceiveBuffer, StatusStore, SubscriptionIndex
 
 class DeviceClass:
+    __matchTable = None     # MatchTable shared by every instance, built by the first __init__
+
     def __init__(self):
 
         self.Unidirectional = 'False'
         self.connectionCounter = 15
         self.DefaultResponseTimeout = 0.3
-        self.Subscription = {}
         self.ReceiveData = self.__ReceiveData
-        self.__receiveBuffer = b''
-        self.__maxBufferSize = 2048
+        self.__receiveBuffer = ReceiveBuffer(MaxSize=2048)
         self.__matchStringDict = {}
         self.counter = 0
         self.connectionFlag = True
@@ -31,13 +32,18 @@ class DeviceClass:
             'PresetRecall': { 'Status': {}},
             'PresetSave': { 'Status': {}},
         }
+        self.__statusStore = StatusStore(self.Commands)
+        self.Subscription = SubscriptionIndex(self.Commands)
                         
         if self.Unidirectional == 'False':
-            self.AddMatchString(re.compile(b'\(0;INS=([04567])\)\r'), self.__MatchInput, None)
-            self.AddMatchString(re.compile(b'\(0;INM=([02])\)\r'), self.__MatchInputMode, None)
-            self.AddMatchString(re.compile(b'\(0;MI([1-4])=([012])\)\r'), self.__MatchMultipleInput, None)
-            self.AddMatchString(re.compile(b'\(0;STA=([0-4])\)\r'), self.__MatchPower, None)
-            self.AddMatchString(re.compile(b'\(([1-9]|1[01]);(INS|INM|KEY|MI[1-4]|PSA|PSS|PWR|STA)=[\"\w ]+\)\r'), self.__MatchError, None)
+            if DeviceClass.__matchTable is None:
+                table = MatchTable()
+                table.Add(re.compile(b'\(0;INS=([04567])\)\r'), DeviceClass.__MatchInput, None)
+                table.Add(re.compile(b'\(0;INM=([02])\)\r'), DeviceClass.__MatchInputMode, None)
+                table.Add(re.compile(b'\(0;MI([1-4])=([012])\)\r'), DeviceClass.__MatchMultipleInput, None)
+                table.Add(re.compile(b'\(0;STA=([0-4])\)\r'), DeviceClass.__MatchPower, None)
+                table.Add(re.compile(b'\(([1-9]|1[01]);(INS|INM|KEY|MI[1-4]|PSA|PSS|PWR|STA)=[\"\w ]+\)\r'), DeviceClass.__MatchError, None)
+                DeviceClass.__matchTable = table.Freeze()
 
     def SetInput(self, value, qualifier):
 
@@ -314,114 +320,50 @@ class DeviceClass:
     def SubscribeStatus(self, command, qualifier, callback):
         Command = self.Commands.get(command, None)
         if Command:
-            if command not in self.Subscription:
-                self.Subscription[command] = {'method':{}}
-        
-            Subscribe = self.Subscription[command]
-            Method = Subscribe['method']
-        
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Method = Method[qualifier[Parameter]]
-                    except:
-                        if Parameter in qualifier:
-                            Method[qualifier[Parameter]] = {}
-                            Method = Method[qualifier[Parameter]]
-                        else:
-                            return
-        
-            Method['callback'] = callback
-            Method['qualifier'] = qualifier    
+            self.Subscription.Add(command, qualifier, callback)
         else:
             raise KeyError('Invalid command for SubscribeStatus ' + command)
 
     # This method is to check the command with new status have a callback method then trigger the callback
     def NewStatus(self, command, value, qualifier):
-        if command in self.Subscription :
-            Subscribe = self.Subscription[command]
-            Method = Subscribe['method']
-            Command = self.Commands[command]
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Method = Method[qualifier[Parameter]]
-                    except:
-                        break
-            if 'callback' in Method and Method['callback']:
-                Method['callback'](command, value, qualifier)  
+        for callback in self.Subscription.Callbacks(command, qualifier):
+            callback(command, value, qualifier)
 
     # Save new status to the command
     def WriteStatus(self, command, value, qualifier=None):
         self.counter = 0
         if not self.connectionFlag:
             self.OnConnected()
-        Command = self.Commands[command]
-        Status = Command['Status']
-        if qualifier:
-            for Parameter in Command['Parameters']:
-                try:
-                    Status = Status[qualifier[Parameter]]
-                except KeyError:
-                    if Parameter in qualifier:
-                        Status[qualifier[Parameter]] = {}
-                        Status = Status[qualifier[Parameter]]
-                    else:
-                        return  
-        try:
-            if Status['Live'] != value:
-                Status['Live'] = value
-                self.NewStatus(command, value, qualifier)
-        except:
-            Status['Live'] = value
+        if self.__statusStore.Write(command, value, qualifier):
             self.NewStatus(command, value, qualifier)
 
     # Read the value from a command.
     def ReadStatus(self, command, qualifier=None):
-        Command = self.Commands.get(command, None)
-        if Command:
-            Status = Command['Status']
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Status = Status[qualifier[Parameter]]
-                    except KeyError:
-                        return None
-            try:
-                return Status['Live']
-            except:
-                return None
+        if command in self.Commands:
+            return self.__statusStore.Read(command, qualifier)
         else:
             raise KeyError('Invalid command for ReadStatus: ' + command)
 
     def __ReceiveData(self, interface, data):
         # Handle incoming data
-        self.__receiveBuffer += data
-        index = 0    # Start of possible good data
+        self.__receiveBuffer.Append(data)
         
         #check incoming data if it matched any expected data from device module
-        for regexString, CurrentMatch in self.__matchStringDict.items():
-            while True:
-                result = re.search(regexString, self.__receiveBuffer)
-                if result:
-                    index = result.start()
-                    CurrentMatch['callback'](result, CurrentMatch['para'])
-                    self.__receiveBuffer = self.__receiveBuffer[:result.start()] + self.__receiveBuffer[result.end():]
-                else:
-                    break
+        index = self.__receiveBuffer.MatchEach(self.__matchTable.Entries, self)
+        index = self.__receiveBuffer.MatchEach(list(self.__matchStringDict.values())) or index
                     
         if index: 
             # Clear out any junk data that came in before any good matches.
-            self.__receiveBuffer = self.__receiveBuffer[index:]
+            self.__receiveBuffer.Consume(index)
         else:
             # In rare cases, the buffer could be filled with garbage quickly.
             # Make sure the buffer is capped.  Max buffer size set in init.
-            self.__receiveBuffer = self.__receiveBuffer[-self.__maxBufferSize:]
+            self.__receiveBuffer.Cap()
 
     # Add regular expression so that it can be check on incoming data from device.
     def AddMatchString(self, regex_string, callback, arg):
-        if regex_string not in self.__matchStringDict:
-            self.__matchStringDict[regex_string] = {'callback': callback, 'para':arg}
+        if regex_string not in self.__matchTable and regex_string not in self.__matchStringDict:
+            self.__matchStringDict[regex_string] = (regex_string, callback, arg)
 
 class SerialClass(SerialInterface, DeviceClass):
 
@@ -1,20 +1,28 @@
 from extronlib.interface import SerialInterface, EthernetClientInterface
 from extronlib.system import Wait, ProgramLog
 import re
-import copy
+import json
+from SC_DriverSupport import MatchTable, ReceiveBuffer, StatusStore, SubscriptionIndex
 
 
 class DeviceClass:
+    __matchTable = None     # MatchTable shared by every instance, built by the first __init__
+
     def __init__(self):
 
         self.Unidirectional = 'False'
         self.connectionCounter = 15
         self.DefaultResponseTimeout = 0.3
-        self.Subscription = {}
         self.ReceiveData = self.__ReceiveData
-        self.__receiveBuffer = b''
-        self.__maxBufferSize = 2048
+        self.__receiveBuffer = ReceiveBuffer(MaxSize=2048)
         self.__matchStringDict = {}
+        self.__controlMatchDict = {}    # (Control ID, b'cv'/b'cvv') -> [(regex, callback)], see __AddControlMatch
+        self.__controlValueLine = re.compile(b'(cvv?) "([^"]*)"[^\n]*\n')
+        self.ChangeGroupID = 1
+        self.ChangeGroupPollRate = 1000     # milliseconds between change group auto-polls
+        self.__changeGroupControls = {}     # Control ID -> command, for controls subscribed with Mode='ChangeGroup'
+        self.__changeGroupPolled = {}       # Control ID -> command, subscribed as 'ChangeGroup' but left to polling
+        self.__changeGroupStarted = False
         self.counter = 0
         self.connectionFlag = True
         self.initializationChk = True
@@ -57,14 +65,19 @@ class DeviceClass:
             'SnapshotSave': {'Parameters': ['Bank'], 'Status': {}},
             'DesignName': { 'Status': {}},
         }
+        self.__statusStore = StatusStore(self.Commands)
+        self.Subscription = SubscriptionIndex(self.Commands)
 
         self.dialString = {}
         self.CallHistory = {}
         self.Phonebook = {}
             
         if self.Unidirectional == 'False':
-            self.AddMatchString(re.compile(b'sr \"([\w\s]{1,63})\" \"\w{1,63}\" [0-1] [0-1]\r\n'), self.__MatchDesignName, None)
-            self.AddMatchString(re.compile(b'bad_(.*)\r\n'), self.__MatchError, None)
+            if DeviceClass.__matchTable is None:
+                table = MatchTable()
+                table.Add(re.compile(b'sr \"([\w\s]{1,63})\" \"\w{1,63}\" [0-1] [0-1]\r\n'), DeviceClass.__MatchDesignName, None)
+                table.Add(re.compile(b'bad_(.*)\r\n'), DeviceClass.__MatchError, None)
+                DeviceClass.__matchTable = table.Freeze()
             if 'Serial' not in self.ConnectionType:
                 self.AddMatchString(re.compile(b'login NAME PIN'), self.__MatchCredential, None)  # from legacy driver
                 self.AddMatchString(re.compile(b'login_required'), self.__MatchCredential, None)  # based off manufacture emulator software
@@ -111,7 +124,7 @@ class DeviceClass:
         if ctrlID: 
             CallStatusCmdString = 'get \"{0}\"\n'.format(ctrlID)
             if ctrlID not in self.Commands['CallStatus']['Status']:
-                self.AddMatchString(re.compile('cv \"({0})\" \"(?:((.*) - (.*) \((.*)\))|(.*))\" .*\n'.format(ctrlID.replace('.', '\.')).encode()), self.__MatchCallStatus, None)
+                self.__AddControlMatch(ctrlID, b'cv "([^"]*)" "(?:((.*) - (.*) \((.*)\))|(.*))" .*\n', self.__MatchCallStatus)
             self.__UpdateHelper('CallStatus', CallStatusCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command for UpdateCallStatus')
@@ -216,7 +229,7 @@ class DeviceClass:
         if ctrlID:
             RouterCmdString = 'get \"{0}\"\n'.format(ctrlID)
             if ctrlID not in self.Commands['GetStatusValue']['Status']:
-                self.AddMatchString(re.compile('cv \"({0})\" \".*\" (0|1).*\n'.format(ctrlID.replace('.', '\.')).encode()), self.__MatchRouter, None)
+                self.__AddControlMatch(ctrlID, b'cv "([^"]*)" ".*" (0|1).*\n', self.__MatchRouter)
             self.__UpdateHelper('Router', RouterCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command for UpdateRouter')
@@ -275,7 +288,7 @@ class DeviceClass:
         ctrlID = qualifier['Control ID']
         if ctrlID:
             if ctrlID not in self.Commands['FocusMode']['Status']:
-                self.AddMatchString(re.compile('cv \"({0})\" \"(true|false)\".*\n'.format(ctrlID.replace('.', '\.')).encode()), self.__MatchFocusMode, None)
+                self.__AddControlMatch(ctrlID, b'cv "([^"]*)" "(true|false)".*\n', self.__MatchFocusMode)
             FocusModeCmdString = 'get \"{0}\"\n'.format(ctrlID)
             self.__UpdateHelper('FocusMode', FocusModeCmdString, value, qualifier)
         else:
@@ -304,7 +317,7 @@ class DeviceClass:
         ctrlID = qualifier['Control ID']
         if ctrlID:
             if ctrlID not in self.Commands['FocusSpeed']['Status']:
-                self.AddMatchString(re.compile('cv \"({0})\" \"(\d?\.\d+)\".*\n'.format(ctrlID.replace('.', '\.')).encode()), self.__MatchFocusSpeed, None)        
+                self.__AddControlMatch(ctrlID, b'cv "([^"]*)" "(\d?\.\d+)".*\n', self.__MatchFocusSpeed)        
             FocusSpeedCmdString = 'get \"{0}\"\n'.format(ctrlID)
             self.__UpdateHelper('FocusSpeed', FocusSpeedCmdString, value, qualifier)
         else:
@@ -322,7 +335,7 @@ class DeviceClass:
         ctrlID = qualifier['Control ID']
         if -100 <= value <= 83 and ctrlID:
             if ctrlID not in self.Commands['Gain']['Status']:
-                self.AddMatchString(re.compile('cv \"({0})\" \"(.*)dB\".*\n'.format(ctrlID.replace('.', '\.')).encode()), self.__MatchGain, None)
+                self.__AddControlMatch(ctrlID, b'cv "([^"]*)" "(.*)dB".*\n', self.__MatchGain)
             GainCmdString = 'csv \"{0}\" {1}\n'.format(ctrlID, value)
             self.__SetHelper('Gain', GainCmdString, value, qualifier)
         else:
@@ -333,7 +346,7 @@ class DeviceClass:
         ctrlID = qualifier['Control ID']
         if ctrlID:
             if ctrlID not in self.Commands['Gain']['Status']:
-                self.AddMatchString(re.compile('cv \"({0})\" \"(.*)dB\".*\n'.format(ctrlID.replace('.', '\.')).encode()), self.__MatchGain, None)
+                self.__AddControlMatch(ctrlID, b'cv "([^"]*)" "(.*)dB".*\n', self.__MatchGain)
             GainCmdString = 'get \"{0}\"\n'.format(ctrlID)
             self.__UpdateHelper('Gain', GainCmdString, value, qualifier)
         else:
@@ -350,7 +363,7 @@ class DeviceClass:
         if ctrlID:
             GetStatusCmdString = 'get \"{0}\"\n'.format(ctrlID)
             if ctrlID not in self.Commands['GetStatusString']['Status']:
-                self.AddMatchString(re.compile('cv \"({0})\" \"(.*)\".*\n'.format(ctrlID.replace('.', '\.')).encode()), self.__MatchGetStatusString, None)
+                self.__AddControlMatch(ctrlID, b'cv "([^"]*)" "(.*)".*\n', self.__MatchGetStatusString)
             self.__UpdateHelper('GetStatusString', GetStatusCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command')
@@ -367,8 +380,8 @@ class DeviceClass:
         if ctrlID:
             GetStatusCmdString = 'get \"{0}\"\n'.format(ctrlID)
             if ctrlID not in self.Commands['GetStatusValue']['Status']:
-                self.AddMatchString(re.compile('cv \"({0})\" ([01]).*\n'.format(ctrlID.replace('.', '\.')).encode()), self.__MatchGetStatusValue, None)
-                self.AddMatchString(re.compile('cv \"({0})\" \".*\" (0|1).*\n'.format(ctrlID.replace('.', '\.')).encode()), self.__MatchGetStatusValue, None)
+                self.__AddControlMatch(ctrlID, b'cv "([^"]*)" ([01]).*\n', self.__MatchGetStatusValue)
+                self.__AddControlMatch(ctrlID, b'cv "([^"]*)" ".*" (0|1).*\n', self.__MatchGetStatusValue)
             self.__UpdateHelper('GetStatusValue', GetStatusCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command for UpdateGetStatusValue')
@@ -389,7 +402,7 @@ class DeviceClass:
         ctrlID = qualifier['Control ID']
         if ctrlID:
             if ctrlID not in self.Commands['LevelMeter']['Status']:
-                self.AddMatchString(re.compile('cvv \"({0})\" 2 \"([-.0-9]+)dB\" \"([-.0-9]+)dB\".*\n'.format(ctrlID.replace('.', '\.')).encode()), self.__MatchLevelMeter, None)
+                self.__AddControlMatch(ctrlID, b'cvv "([^"]*)" 2 "([-.0-9]+)dB" "([-.0-9]+)dB".*\n', self.__MatchLevelMeter)
             LevelMeterCmdString = 'get \"{0}\"\n'.format(ctrlID)
             self.__UpdateHelper('LevelMeter', LevelMeterCmdString, value, qualifier)
         else:
@@ -412,7 +425,7 @@ class DeviceClass:
         if ctrlID:
             MuteCmdString = 'csv \"{0}\" {1}\n'.format(ctrlID, ValueStateValues[value])
             if ctrlID not in self.Commands['Mute']['Status']:
-                self.AddMatchString(re.compile('cv \"({0})\" \"(muted|unmuted)\".*\n'.format(ctrlID.replace('.', '\.')).encode()), self.__MatchMute, None)
+                self.__AddControlMatch(ctrlID, b'cv "([^"]*)" "(muted|unmuted)".*\n', self.__MatchMute)
             self.__SetHelper('Mute', MuteCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command for SetMute')
@@ -423,7 +436,7 @@ class DeviceClass:
         if ctrlID:
             MuteCmdString = 'get \"{0}\"\n'.format(ctrlID)
             if ctrlID not in self.Commands['Mute']['Status']:
-                self.AddMatchString(re.compile('cv \"({0})\" \"(muted|unmuted)\".*\n'.format(ctrlID.replace('.', '\.')).encode()), self.__MatchMute, None)
+                self.__AddControlMatch(ctrlID, b'cv "([^"]*)" "(muted|unmuted)".*\n', self.__MatchMute)
             self.__UpdateHelper('Mute', MuteCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command for UpdateMute')
@@ -446,7 +459,7 @@ class DeviceClass:
         if ctrlID:
             FunctionCmdString = 'csv \"{0}\" {1}\n'.format(ctrlID, ValueStateValues[value])
             if ctrlID not in self.Commands['Function']['Status']:
-                self.AddMatchString(re.compile('cv \"({0})\" \"(enabled|disabled)\".*\n'.format(ctrlID.replace('.', '\.')).encode()), self.__MatchFunction, None)
+                self.__AddControlMatch(ctrlID, b'cv "([^"]*)" "(enabled|disabled)".*\n', self.__MatchFunction)
             self.__SetHelper('Function', FunctionCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command for SetFunction')
@@ -457,7 +470,7 @@ class DeviceClass:
         if ctrlID:
             FunctionCmdString = 'get \"{0}\"\n'.format(ctrlID)
             if ctrlID not in self.Commands['Function']['Status']:
-                self.AddMatchString(re.compile('cv \"({0})\" \"(enabled|disabled)\".*\n'.format(ctrlID.replace('.', '\.')).encode()), self.__MatchFunction, None)
+                self.__AddControlMatch(ctrlID, b'cv "([^"]*)" "(enabled|disabled)".*\n', self.__MatchFunction)
             self.__UpdateHelper('Function', FunctionCmdString, value, qualifier)
         else:
             self.Discard('Invalid Command for UpdateFunction')
@@ -593,7 +606,7 @@ class DeviceClass:
         ctrlID = qualifier['Control ID']
         if ctrlID:
             if ctrlID not in self.Commands['PTZSpeed']['Status']:
-                self.AddMatchString(re.compile('cv \"({0})\" \"(\d?\.\d+)\".*\n'.format(ctrlID.replace('.', '\.')).encode()), self.__MatchPTZSpeed, None)     
+                self.__AddControlMatch(ctrlID, b'cv "([^"]*)" "(\d?\.\d+)".*\n', self.__MatchPTZSpeed)     
             PTZSpeedCmdString = 'get \"{0}\"\n'.format(ctrlID)
             self.__UpdateHelper('PTZSpeed', PTZSpeedCmdString, value, qualifier)
         else:
@@ -658,16 +671,54 @@ class DeviceClass:
         self.counter = 0
         self.Error(['Error'])
 
+    # Subscribe a control to the change group. The core then reports it only when it changes, at ChangeGroupPollRate.
+    # A change group reports a control with a cv line, so commands without a Control ID and LevelMeter, which is read
+    # from the cvv line of a get, are left to the periodic Updates; ChangeGroupControls lists them.
+    def __AddChangeGroupControl(self, command, qualifier):
+        ctrlID = qualifier.get('Control ID') if qualifier else None
+        method = getattr(self, 'Update%s' % command, None)
+        if method is None:
+            self.Discard('Invalid Command for ChangeGroup ' + command)
+            return
+
+        # The Update registers the control's response pattern and reads its current value
+        method(None, qualifier)
+        if not ctrlID or command == 'LevelMeter':
+            self.__changeGroupPolled[ctrlID] = command
+        elif ctrlID not in self.__changeGroupControls:
+            self.__changeGroupControls[ctrlID] = command
+            if self.__changeGroupStarted:
+                self.Send('cga {0} \"{1}\"\n'.format(self.ChangeGroupID, ctrlID))
+            else:
+                self.__StartChangeGroup()
+
+    # Change groups only last as long as the connection, so this is sent again from OnConnected
+    def __StartChangeGroup(self):
+        group = self.ChangeGroupID
+        commands = ['cgc {0}\n'.format(group)]
+        commands.extend('cga {0} \"{1}\"\n'.format(group, ctrlID) for ctrlID in self.__changeGroupControls)
+        commands.append('cgsna {0} {1}\n'.format(group, self.ChangeGroupPollRate))
+        self.__changeGroupStarted = True
+        self.Send(''.join(commands))
+
+    # Returns {'ChangeGroup': {Control ID: command}, 'Poll': {Control ID: command}} for the controls subscribed with
+    # Mode='ChangeGroup': those in the change group, and those that still need Update calls.
+    def ChangeGroupControls(self):
+        return {'ChangeGroup': dict(self.__changeGroupControls), 'Poll': dict(self.__changeGroupPolled)}
+
     def OnConnected(self):
         self.connectionFlag = True
         self.WriteStatus('ConnectionStatus', 'Connected')
         self.counter = 0
         if 'Serial' not in self.ConnectionType:
             self.SetPassword(None, None)
+        if self.__changeGroupControls and not self.__changeGroupStarted:
+            self.__StartChangeGroup()
 
     def OnDisconnected(self):
         self.WriteStatus('ConnectionStatus', 'Disconnected')
         self.connectionFlag = False
+        self.__changeGroupStarted = False
 
         self.dialString = {}
         self.CallHistory = {}
@@ -697,116 +748,82 @@ class DeviceClass:
     # when its value is updated. It sets how often the command will be query, if the command
     # have the update method.
     # If the command doesn't have the update feature then that command is only used for feedback 
-    def SubscribeStatus(self, command, qualifier, callback):
+    # With Mode='ChangeGroup' the control is added to an ECP change group that the core auto-polls, so it no longer
+    # needs a periodic Update and only changed values are sent back.
+    def SubscribeStatus(self, command, qualifier, callback, Mode='Poll'):
         Command = self.Commands.get(command, None)
         if Command:
-            if command not in self.Subscription:
-                self.Subscription[command] = {'method':{}}
-        
-            Subscribe = self.Subscription[command]
-            Method = Subscribe['method']
-        
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Method = Method[qualifier[Parameter]]
-                    except:
-                        if Parameter in qualifier:
-                            Method[qualifier[Parameter]] = {}
-                            Method = Method[qualifier[Parameter]]
-                        else:
-                            return
-        
-            Method['callback'] = callback
-            Method['qualifier'] = qualifier    
+            self.Subscription.Add(command, qualifier, callback)
+            if Mode == 'ChangeGroup':
+                self.__AddChangeGroupControl(command, qualifier)
         else:
             raise KeyError('Invalid command for SubscribeStatus ' + command)
 
     # This method is to check the command with new status have a callback method then trigger the callback
     def NewStatus(self, command, value, qualifier):
-        if command in self.Subscription :
-            Subscribe = self.Subscription[command]
-            Method = Subscribe['method']
-            Command = self.Commands[command]
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Method = Method[qualifier[Parameter]]
-                    except:
-                        break
-            if 'callback' in Method and Method['callback']:
-                Method['callback'](command, value, qualifier)  
+        for callback in self.Subscription.Callbacks(command, qualifier):
+            callback(command, value, qualifier)
 
     # Save new status to the command
     def WriteStatus(self, command, value, qualifier=None):
         self.counter = 0
         if not self.connectionFlag:
             self.OnConnected()
-        Command = self.Commands[command]
-        Status = Command['Status']
-        if qualifier:
-            for Parameter in Command['Parameters']:
-                try:
-                    Status = Status[qualifier[Parameter]]
-                except KeyError:
-                    if Parameter in qualifier:
-                        Status[qualifier[Parameter]] = {}
-                        Status = Status[qualifier[Parameter]]
-                    else:
-                        return  
-        try:
-            if Status['Live'] != value:
-                Status['Live'] = value
-                self.NewStatus(command, value, qualifier)
-        except:
-            Status['Live'] = value
+        if self.__statusStore.Write(command, value, qualifier):
             self.NewStatus(command, value, qualifier)
 
     # Read the value from a command.
     def ReadStatus(self, command, qualifier=None):
-        Command = self.Commands.get(command, None)
-        if Command:
-            Status = Command['Status']
-            if qualifier:
-                for Parameter in Command['Parameters']:
-                    try:
-                        Status = Status[qualifier[Parameter]]
-                    except KeyError:
-                        return None
-            try:
-                return Status['Live']
-            except:
-                return None
+        if command in self.Commands:
+            return self.__statusStore.Read(command, qualifier)
         else:
             raise KeyError('Invalid command for ReadStatus: ' + command)
 
     def __ReceiveData(self, interface, data):
         # Handle incoming data
-        self.__receiveBuffer += data
-        index = 0    # Start of possible good data
+        self.__receiveBuffer.Append(data)
+        if self.__controlMatchDict:
+            # Control value lines are consumed in a single pass and routed by Control ID, see __MatchControlValue
+            lines = list(self.__controlValueLine.finditer(self.__receiveBuffer.Data))
+            for line in lines:
+                self.__MatchControlValue(line)
+            self.__receiveBuffer.RemoveSpans(line.span() for line in lines)
         # check incoming data if it matched any expected data from device module
-        tempList = copy.copy(self.__matchStringDict)
-        for regexString, CurrentMatch in tempList.items():
-            while True:
-                result = re.search(regexString, self.__receiveBuffer)
-                if result:
-                    index = result.start()
-                    CurrentMatch['callback'](result, CurrentMatch['para'])
-                    self.__receiveBuffer = self.__receiveBuffer[:result.start()] + self.__receiveBuffer[result.end():]
-                else:
-                    break
+        index = self.__receiveBuffer.MatchEach(self.__matchTable.Entries, self)
+        index = self.__receiveBuffer.MatchEach(list(self.__matchStringDict.values())) or index
         if index:
             # Clear out any junk data that came in before any good matches.
-            self.__receiveBuffer = self.__receiveBuffer[index:]
+            self.__receiveBuffer.Consume(index)
         else:
             # In rare cases, the buffer could be filled with garbage quickly.
             # Make sure the buffer is capped.  Max buffer size set in init.
-            self.__receiveBuffer = self.__receiveBuffer[-self.__maxBufferSize:]
+            self.__receiveBuffer.Cap()
 
     # Add regular expression so that it can be check on incoming data from device.
     def AddMatchString(self, regex_string, callback, arg):
-        if regex_string not in self.__matchStringDict:
-            self.__matchStringDict[regex_string] = {'callback': callback, 'para':arg}
+        if regex_string not in self.__matchTable and regex_string not in self.__matchStringDict:
+            self.__matchStringDict[regex_string] = (regex_string, callback, arg)
+
+    # Register a 'cv'/'cvv' response pattern for one Control ID. The pattern matches any Control ID in group 1;
+    # lines are looked up by Control ID first, so the cost per line does not grow with the number of controls.
+    def __AddControlMatch(self, ctrlID, regex_string, callback):
+        key = (ctrlID.encode(), regex_string.split(b' ', 1)[0])
+        entry = (re.compile(regex_string), callback)
+        handlers = self.__controlMatchDict.setdefault(key, [])
+        if entry not in handlers:
+            handlers.append(entry)
+
+    # Called for every complete control value line; __ReceiveData removes the line whether or not it was handled.
+    # The first registered pattern for the control that matches the line wins, as with AddMatchString.
+    def __MatchControlValue(self, match):
+        handlers = self.__controlMatchDict.get((match.group(2), match.group(1)))
+        if handlers:
+            line = match.group(0)
+            for regex, callback in handlers:
+                result = regex.match(line)
+                if result:
+                    callback(result, None)
+                    break
 
     def MissingCredentialsLog(self, credential_type):
         if isinstance(self, EthernetClientInterface):
@@ -890,6 +907,192 @@ class EthernetClass(EthernetClientInterface, DeviceClass):
         self.OnDisconnected()
 
 
+# QRC (JSON-RPC on port 1710) transport for the same Set/Update/SubscribeStatus API. The ECP commands built by
+# DeviceClass are translated to JSON-RPC requests, and control values in the replies are handed back to the ECP
+# receive path as 'cv' lines ('cvv' for level meters), so every response pattern is shared with EthernetClass.
+# The Core closes a QRC socket that is idle for 60 s, so a NoOp is sent after KeepAliveTime without a request.
+class QRCClass(EthernetClientInterface, DeviceClass):
+
+    def __init__(self, Hostname, IPPort=1710, Protocol='TCP', ServicePort=0, Model=None):
+        EthernetClientInterface.__init__(self, Hostname, IPPort, Protocol, ServicePort)
+        self.ConnectionType = 'Ethernet'
+        DeviceClass.__init__(self)
+        self.__ReceiveECP = self.ReceiveData
+        self.ReceiveData = self.__ReceiveJSON
+        self.BatchTime = 0.02   # seconds requests are held so they go out together, see Flush
+        self.KeepAliveTime = 30 # seconds without a request before a NoOp is sent
+        self.__jsonBuffer = b''
+        self.__requestID = 0
+        self.__requests = {}    # JSON-RPC id -> method, for replies still outstanding
+        self.__queue = []       # [method, params] waiting for Flush
+        self.__getNames = None  # Control.Get names in the queue, one request for all of them
+        self.__setValues = None # Control.Set name -> value in the queue, one request for all of them
+        self.__meters = set()   # Control IDs read as LevelMeter
+        self.__groupAdds = {}   # change group Id -> ChangeGroup.AddControl names in the queue
+        self.__flushWait = None
+        self.__keepAliveWait = None
+        self.__ecpWords = re.compile(r'"[^"]*"|\S+')
+        # Check if Model belongs to a subclass
+        if len(self.Models) > 0:
+            if Model not in self.Models:
+                print('Model mismatch')
+            else:
+                self.Models[Model]()
+
+    def SetPassword(self, value, qualifier):
+        if self.devicePassword is not None:
+            self.__Queue('Logon', {'User': self.deviceUsername or '', 'Password': self.devicePassword})
+            self.Flush()
+
+    def Send(self, data):
+        for command in data.splitlines():
+            words = self.__ecpWords.findall(command)
+            if not words:
+                continue
+            op, args = words[0], [word.strip('"') for word in words[1:]]
+            if op == 'get':
+                if self.__getNames is None:
+                    self.__getNames = []
+                    self.__queue.append(['Control.Get', self.__getNames])
+                if args[0] not in self.__getNames:
+                    self.__getNames.append(args[0])
+            elif op in ('csv', 'css'):
+                # A newer value for a control still in the queue replaces the older one
+                if self.__setValues is None:
+                    self.__setValues = {}
+                    self.__queue.append(['Control.Set', self.__setValues])
+                self.__setValues[args[0]] = float(args[1]) if op == 'csv' else args[1]
+            elif op == 'cga':
+                if args[0] not in self.__groupAdds:
+                    self.__groupAdds[args[0]] = []
+                    self.__queue.append(['ChangeGroup.AddControl', {'Id': args[0], 'Controls': self.__groupAdds[args[0]]}])
+                self.__groupAdds[args[0]].append(args[1])
+            elif op == 'cgsna':
+                self.__Queue('ChangeGroup.AutoPoll', {'Id': args[0], 'Rate': int(args[1]) / 1000})
+            elif op == 'cgc':
+                pass    # QRC creates the change group with its first AddControl
+            elif op == 'sg':
+                self.__Queue('StatusGet', 0)
+            elif op == 'ssl':
+                self.__Queue('Snapshot.Load', {'Name': args[0], 'Bank': int(args[1]), 'Ramp': float(args[2])})
+            elif op == 'sss':
+                self.__Queue('Snapshot.Save', {'Name': args[0], 'Bank': int(args[1])})
+            else:
+                self.Discard('Command not supported over QRC: ' + op)
+
+        if self.__queue:
+            if self.__flushWait is None:
+                self.__flushWait = Wait(self.BatchTime, self.Flush)
+            else:
+                self.__flushWait.Restart()
+
+    # Call history and phonebook queries wait on ECP-only replies
+    def SendAndWait(self, data, timeout, **delimiter):
+        self.Discard('Command not supported over QRC: ' + data.split(' ', 1)[0])
+        return None
+
+    def UpdateLevelMeter(self, value, qualifier):
+        if qualifier and qualifier.get('Control ID'):
+            self.__meters.add(qualifier['Control ID'])
+        DeviceClass.UpdateLevelMeter(self, value, qualifier)
+
+    def __Queue(self, method, params):
+        self.__queue.append([method, params])
+
+    # Write every queued request in a single send. Replies are matched back to their request by JSON-RPC id.
+    def Flush(self):
+        if self.__flushWait is not None:
+            self.__flushWait.Cancel()
+        messages = []
+        for method, params in self.__queue:
+            if method == 'Control.Set':
+                params = [{'Name': name, 'Value': value} for name, value in params.items()]
+            self.__requestID += 1
+            self.__requests[self.__requestID] = method
+            messages.append(json.dumps({'jsonrpc': '2.0', 'method': method, 'params': params, 'id': self.__requestID}).encode() + b'\x00')
+        self.__queue = []
+        self.__getNames = None
+        self.__setValues = None
+        self.__groupAdds = {}
+        if messages:
+            EthernetClientInterface.Send(self, b''.join(messages))
+            self.__RestartKeepAlive()
+
+    def __RestartKeepAlive(self):
+        if self.__keepAliveWait is None:
+            self.__keepAliveWait = Wait(self.KeepAliveTime, self.__KeepAlive)
+        else:
+            self.__keepAliveWait.Change(self.KeepAliveTime)
+            self.__keepAliveWait.Restart()
+
+    def __KeepAlive(self):
+        self.__Queue('NoOp', {})
+        self.Flush()
+
+    def __ReceiveJSON(self, interface, data):
+        messages = (self.__jsonBuffer + data).split(b'\x00')
+        self.__jsonBuffer = messages.pop()
+        lines = []
+        for message in messages:
+            if not message.strip():
+                continue
+            try:
+                message = json.loads(message.decode())
+            except ValueError:
+                self.Error(['Invalid QRC message'])
+                continue
+
+            method = self.__requests.pop(message.get('id'), None) or message.get('method')
+            if 'error' in message:
+                self.counter = 0
+                self.Error([message['error'].get('message', 'Error')])
+            elif method == 'ChangeGroup.Poll':
+                lines.extend(self.__ControlLine(change) for change in message['params']['Changes'])
+            elif method == 'StatusGet':
+                status = message['result']
+                lines.append('sr "{0}" "{1}" {2} {3}\r\n'.format(status['DesignName'], status['DesignCode'],
+                             int(status['IsRedundant']), int(status['IsEmulator'])).encode())
+            elif method in ('Control.Get', 'Control.Set'):
+                result = message.get('result')
+                controls = result if isinstance(result, list) else [result]
+                lines.extend(self.__ControlLine(control) for control in controls if isinstance(control, dict) and 'Name' in control)
+
+        if lines:
+            self.__ReceiveECP(interface, b''.join(lines))
+
+    # A control state as the ECP line the response patterns expect: 'cv', or for a level meter the 'cvv' line with
+    # its level in dB
+    def __ControlLine(self, control):
+        if control['Name'] in self.__meters:
+            value, position = control.get('Value', 0), control.get('Position', 0)
+            return 'cvv "{0}" 2 "{1:.1f}dB" "{1:.1f}dB" 2 {1} {1} 2 {2} {2}\r\n'.format(control['Name'], float(value),
+                                                                                      position).encode()
+        return 'cv "{0}" "{1}" {2} {3}\r\n'.format(control['Name'], control.get('String', ''), control.get('Value', 0),
+                                                   control.get('Position', 0)).encode()
+
+    def OnConnected(self):
+        DeviceClass.OnConnected(self)
+        self.__RestartKeepAlive()
+
+    def OnDisconnected(self):
+        DeviceClass.OnDisconnected(self)
+        if self.__keepAliveWait is not None:
+            self.__keepAliveWait.Cancel()
+        self.__jsonBuffer = b''
+        self.__requests = {}
+
+    def Error(self, message):
+        portInfo = 'IP Address/Host: {0}:{1}'.format(self.Hostname, self.IPPort)
+        print('Module: {}'.format(__name__), portInfo, 'Error Message: {}'.format(message[0]), sep='\r\n')
+
+    def Discard(self, message):
+        self.Error([message])
+
+    def Disconnect(self):
+        EthernetClientInterface.Disconnect(self)
+        self.OnDisconnected()
+
+
 def UseAutoUpdate(func):
     def wrapper(self, *args, **kwargs):
         res = func(self, *args, **kwargs)
@@ -0,0 +1,61 @@
+"""
+Start-up cost of the drivers: the time to build 50 instances of each, best of 5, and the memory those 50 hold, traced
+with tracemalloc on the first build, which also pays for anything a driver builds once per class.
+
+    python tests/bench_driver_startup.py [--baseline REV]
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: F401  installs the stand-in extronlib
+import bench_support
+
+TREE = bench_support.Tree()
+
+import biam_dsp_TesiraSeries_v1_15_1_0 as tesira
+import extr_dsp_SSP_200_v1_0_0_0 as ssp
+import extr_matrix_DTPCrossPoint_86_1084KSeriesv11000 as dtp
+import extr_sm_NAVigator_v1_0_1_2 as nav
+import plnr_display_PSxx74K_N_Series_v1_0_1_0 as planar
+import qsc_dsp_Q_Sys_Core_Series_v1_12_4_0 as qsys
+
+COUNT = 50
+DRIVERS = (
+    ('DTP CrossPoint', lambda i: dtp.SSHClass('10.0.0.%d' % i, 22, Credentials=('admin', 'extron'),
+                                              Model='DTP CrossPoint 108 4K')),
+    ('NAVigator', lambda i: nav.SPIClass('NAVigator', Model='NAVigator')),
+    ('SSP 200', lambda i: ssp.SSHClass('10.0.1.%d' % i, 22, Credentials=('admin', 'extron'))),
+    ('PSxx74K', lambda i: planar.EthernetClass('10.0.2.%d' % i, 57)),
+    ('Tesira', lambda i: tesira.SSHClass('10.0.3.%d' % i, 22, Credentials=('default', ''))),
+    ('Q-Sys', lambda i: qsys.EthernetClass('10.0.4.%d' % i, 1702)),
+)
+
+
+def Build(make):
+    return [make(i) for i in range(COUNT)]
+
+
+def Memory(make):
+    gc.collect()
+    tracemalloc.start()
+    instances = Build(make)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del instances
+    return size
+
+
+def main():
+    print('{0}: {1} instances of each driver'.format(TREE, COUNT))
+    print('{0:<16}{1:>10}{2:>12}'.format('', 'time', 'memory'))
+    for name, make in DRIVERS:
+        memory = Memory(make)
+        elapsed = bench_support.Best(lambda: Build(make))
+        print('{0:<16}{1:>7.1f} ms{2:>9.0f} KB'.format(name, elapsed * 1000, memory / 1024))
+
+
+if __name__ == '__main__':
+    main()
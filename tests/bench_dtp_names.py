@@ -0,0 +1,52 @@
+"""
+Cost of OutputTieStatusHelper('All') on the DTP CrossPoint 108 (10x8) with every input and output name known, and
+every output forced to rewrite its tie and name statuses, with the number of ReadStatus calls one pass makes.
+
+    python tests/bench_dtp_names.py [--baseline REV]
+
+The time is the best of 3000 runs.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: F401  installs the stand-in extronlib
+import bench_support
+
+TREE = bench_support.Tree()
+
+import extr_matrix_DTPCrossPoint_86_1084KSeriesv11000 as dtp
+
+
+def Build():
+    device = dtp.SSHClass('192.168.1.10', 22, Credentials=('admin', 'extron'), Model='DTP CrossPoint 108 4K')
+    device.ReceiveData(device, b''.join(b'Nmi%d,Source %d\r\n' % (i, i) for i in range(1, 11)) +
+                       b''.join(b'Nmo%d,Display %d\r\n' % (i, i) for i in range(1, 9)))
+    device.UpdateAllMatrixTie(None, None)
+    device.ReceiveData(device, b'Vgp00 Out01*01 02 03 04 05 06 07 08Vid\r\nVgp00 Out01*02 03 04 05 06 07 08 09Aud\r\n')
+    return device
+
+
+def Force(device):
+    # forget what was written, so every output is written again
+    if hasattr(device, '_DeviceClass__outputTiesWritten'):
+        device._DeviceClass__outputTiesWritten[:] = [None] * device.OutputSize
+    return device
+
+
+def main():
+    device = Build()
+    reads = []
+    read = device.ReadStatus
+    device.ReadStatus = lambda command, qualifier=None: (reads.append(command), read(command, qualifier))[1]
+    device.OutputTieStatusHelper('All')
+    Force(device)
+    del reads[:]
+    device.OutputTieStatusHelper('All')
+    device.ReadStatus = read
+    elapsed = bench_support.Best(lambda device: device.OutputTieStatusHelper('All'), lambda: Force(device), repeat=3000)
+    print('{0}: {1:.1f} us, {2} ReadStatus calls'.format(TREE, elapsed * 1e6, len(reads)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Time to apply the 24-tie 'video' preset of system_presets to a 24x24 DTP CrossPoint, against the emulated matrix of
+dtp_emulator: one MatrixTieCommand per tie, as main.py applies them, and one MatrixTieTransaction for the lot. The
+preset counts as applied once every OutputTieStatus shows it.
+
+    python tests/bench_dtp_preset.py [service ms] [tie ms]
+
+Times are on the emulator's virtual clock, stepped a millisecond at a time, so they repeat exactly for a given
+service and tie time.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: F401  installs the stand-in extronlib
+
+import extr_matrix_DTPCrossPoint_86_1084KSeriesv11000 as dtp
+from dtp_emulator import Matrix
+from extronlib.system import Wait
+from system_presets import ShowReady_Mode_Preset
+
+SIZE = 24
+
+
+def Apply(transaction, service, tie):
+    Wait.Reset()
+    device = dtp.SSHClass('192.168.1.10', 22, Credentials=('admin', 'extron'), Model='DTP CrossPoint 108 4K')
+    device.InputSize = device.OutputSize = SIZE
+    device.Session.Confirm('Echo')
+    device.Session.Confirm('Verbose')
+    Matrix(SIZE, SIZE, ServiceTime=service, TieTime=tie).Attach(device)
+    del device.Sent[:]
+
+    preset = ShowReady_Mode_Preset['video']
+    if transaction:
+        device.Set('MatrixTieTransaction', preset, {'Tie Type': 'Video'})
+    else:
+        for output, input_ in preset.items():
+            device.Set('MatrixTieCommand', None, {'Input': str(input_), 'Output': str(output), 'Tie Type': 'Video'})
+
+    applied = lambda: all(device.ReadStatus('OutputTieStatus', {'Output': str(output), 'Tie Type': 'Video'}) ==
+                          str(input_) for output, input_ in preset.items())
+    while not applied():
+        Wait.Advance(0.001)
+    return Wait.Now, len(device.Sent), device.TieWriteStats()['Written']
+
+
+def main():
+    service = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.01
+    tie = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0005
+    print('{0}x{0} matrix, {1:g} ms per command, {2:g} ms per tie'.format(SIZE, service * 1000, tie * 1000))
+    print('{0:<26}{1:>10}{2:>8}{3:>16}'.format('', 'applied', 'sends', 'status writes'))
+    for name, transaction in (('24 x MatrixTieCommand', False), ('1 x MatrixTieTransaction', True)):
+        applied, sends, writes = Apply(transaction, service, tie)
+        print('{0:<26}{1:>7.0f} ms{2:>8}{3:>16}'.format(name, applied * 1000, sends, writes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Receive time of the DTP CrossPoint driver per MatchEngine: 'Legacy' runs each pattern over the whole buffer in turn,
+'Dispatcher' scans it once for all of them and 'Lines' frames it into CRLF lines first. The traffic is the synthetic DTP
+CrossPoint transcript of test_sis_line_framing, five times over (2000 lines of Ds, Nm, Out, Vgp, Frz, Vmt and Rate
+responses), fed as one burst and in seeded random chunks of 20-600 bytes.
+
+    python tests/bench_dtp_receive.py [--baseline REV]
+
+Each time is the best of 5 runs.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: F401  installs the stand-in extronlib
+import bench_support
+
+TREE = bench_support.Tree()
+
+import extr_matrix_DTPCrossPoint_86_1084KSeriesv11000 as dtp
+
+ENGINES = ('Legacy', 'Dispatcher', 'Lines')
+TRANSCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'transcripts', 'dtp_crosspoint.txt')
+
+
+def Receive(engine, chunks):
+    def Build():
+        device = dtp.SSHClass('192.168.1.10', 22, Credentials=('admin', 'extron'), Model='DTP CrossPoint 108 4K')
+        device.MatchEngine = engine
+        device.UpdateAllMatrixTie(None, None)
+        return device
+
+    def Feed(device):
+        for chunk in chunks:
+            device.ReceiveData(device, chunk)
+    return bench_support.Best(Feed, Build)
+
+
+def main():
+    with open(TRANSCRIPT, 'rb') as transcript:
+        traffic = transcript.read() * 5
+    feeds = (('burst', [traffic]), ('20-600 B', bench_support.Chunks(traffic, 1, 20, 600)))
+    print('{0}: {1} lines, {2} bytes'.format(TREE, traffic.count(b'\r\n'), len(traffic)))
+    print('{0:<12}'.format('') + ''.join('{0:>12}'.format(name) for name, chunks in feeds))
+    # a tree from before the dispatcher has the legacy engine only
+    probe = dtp.SSHClass('192.168.1.10', 22, Credentials=('admin', 'extron'), Model='DTP CrossPoint 108 4K')
+    for engine in ENGINES if hasattr(probe, 'MatchEngine') else ENGINES[:1]:
+        print('{0:<12}'.format(engine) + ''.join('{0:>9.1f} ms'.format(Receive(engine, chunks) * 1000)
+                                                 for name, chunks in feeds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Cost of keeping the DTP CrossPoint's tie state, apart from writing the tie statuses: the tie status helpers are
+stubbed out, and parsed tie replies go straight to the driver's match handlers. Per tie is the mean of 3000 random
+individual ties ('Out## In## All/Vid/Aud'); refresh is UpdateAllMatrixTie and the two Vgp replies of every output.
+Memory is the deep size of the tie state's containers. The 108 model is 10x8; the synthetic grid is 64x64.
+
+    python tests/bench_dtp_ties.py [--baseline REV]
+
+Each time is the best of 5 runs.
+"""
+import os
+import random
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: F401  installs the stand-in extronlib
+import bench_support
+
+TREE = bench_support.Tree()
+
+import extr_matrix_DTPCrossPoint_86_1084KSeriesv11000 as dtp
+
+TIES = 3000
+TIE = re.compile(b'(?:Out(\\d+) In(\\d+) (All|Vid|Aud))|(?:In(\\d+) (All|Vid|Aud))\r\n')
+VGP = re.compile(b'Vgp00 Out(\\d{2})\\*([0-9 -]*)(Vid|Aud)\r\n')
+
+
+def Build(inputs, outputs):
+    device = dtp.SSHClass('192.168.1.10', 22, Credentials=('admin', 'extron'), Model='DTP CrossPoint 108 4K')
+    device.InputSize, device.OutputSize = inputs, outputs
+    device.InputTieStatusHelper = device.OutputTieStatusHelper = lambda tie, output=None: None
+    device.UpdateAllMatrixTie(None, None)
+    return device
+
+
+def TieMatches(inputs, outputs):
+    rng = random.Random(11)
+    replies = b''.join(b'Out%02d In%02d %s\r\n' % (rng.randrange(1, outputs + 1), rng.randrange(inputs + 1),
+                                                    rng.choice((b'All', b'Vid', b'Aud'))) for i in range(TIES))
+    return list(TIE.finditer(replies))
+
+
+def RefreshMatches(inputs, outputs):
+    rng = random.Random(12)
+    replies = b''
+    for plane in (b'Vid', b'Aud'):
+        ties = [rng.randrange(inputs + 1) for output in range(outputs)]
+        replies += b''.join(b'Vgp00 Out%02d*%s %s\r\n' % (start + 1, b' '.join(b'%02d' % i for i in ties[start:start + 16]),
+                                                          plane) for start in range(0, outputs, 16))
+    return [(match, {b'Vid': 'Video', b'Aud': 'Audio'}[match.group(3)]) for match in VGP.finditer(replies)]
+
+
+def Tie(inputs, outputs):
+    matches = TieMatches(inputs, outputs)
+
+    def Run(device):
+        tie = device._DeviceClass__MatchOutputTieStatus
+        for match in matches:
+            tie(match, None)
+    return bench_support.Best(Run, lambda: Build(inputs, outputs)) / TIES
+
+
+def Refresh(inputs, outputs):
+    matches = RefreshMatches(inputs, outputs)
+
+    def Run(device):
+        device.UpdateAllMatrixTie(None, None)
+        refresh = device._DeviceClass__MatchAllMatrixTie
+        for match, tag in matches:
+            refresh(match, tag)
+    return bench_support.Best(Run, lambda: Build(inputs, outputs))
+
+
+def Memory(inputs, outputs):
+    device = Build(inputs, outputs)
+    for match in TieMatches(inputs, outputs):
+        device._DeviceClass__MatchOutputTieStatus(match, None)
+    state = vars(device).get('_DeviceClass__tieGrid')
+    return bench_support.Size(state if state is not None else device.matrix_tie_status)
+
+
+def main():
+    print('{0}: helpers stubbed'.format(TREE))
+    print('{0:<18}{1:>10}{2:>12}{3:>12}'.format('', 'memory', 'per tie', 'refresh'))
+    for name, inputs, outputs in (('108 model (10x8)', 10, 8), ('64x64 synthetic', 64, 64)):
+        print('{0:<18}{1:>7.1f} KB{2:>9.2f} us{3:>9.1f} us'.format(name, Memory(inputs, outputs) / 1024,
+                                                                  Tie(inputs, outputs) * 1e6,
+                                                                  Refresh(inputs, outputs) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+NAVigator inventory reports on a fully populated 4096/4096 system: the first I and O inventories, the same two again,
+two where 5 encoders have dropped, and a single DevpC connection event, each through ReceiveData, with the number of
+connection statuses each writes.
+
+    python tests/bench_nav_inventory.py [--baseline REV]
+
+Each time is the best of 5 runs.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: F401  installs the stand-in extronlib
+import bench_support
+
+TREE = bench_support.Tree()
+
+import extr_sm_NAVigator_v1_0_1_2 as nav
+
+ENDPOINTS = 4096
+FULL = b'1' * ENDPOINTS
+DROPPED = bytearray(FULL)
+for index in (10, 700, 1500, 2900, 4000):
+    DROPPED[index] = ord('2')
+DROPPED = bytes(DROPPED)
+
+
+def Inventories(inputs, outputs):
+    return b'Rprt*Inventory*I*' + inputs + b'\r\nRprt*Inventory*O*' + outputs + b'\r\n'
+
+
+def Build(*reports):
+    def Setup():
+        device = nav.SPIClass('NAVigator', Model='NAVigator')
+        for report in reports:
+            device.ReceiveData(device, report)
+        return device
+    return Setup
+
+
+def Writes(setup, data):
+    device = setup()
+    writes = []
+    write = device.WriteStatus
+    device.WriteStatus = lambda command, value, qualifier=None: (
+        writes.append(command) if command.startswith('DeviceConnectionStatus') else None,
+        write(command, value, qualifier))
+    device.ReceiveData(device, data)
+    return len(writes)
+
+
+def main():
+    first = Inventories(FULL, FULL)
+    cases = (('first I+O inventory', Build(), first),
+             ('unchanged I+O inventory', Build(first), first),
+             ('5 encoders dropped', Build(first), Inventories(DROPPED, FULL)),
+             ('DevpC event', Build(first), b'DevpC*1501i*0\r\n'))
+    print('{0}: {1} encoders, {1} decoders'.format(TREE, ENDPOINTS))
+    for name, setup, data in cases:
+        elapsed = bench_support.Best(lambda device: device.ReceiveData(device, data), setup)
+        print('{0:<26}{1:>10.3f} ms{2:>7} writes'.format(name, elapsed * 1000, Writes(setup, data)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+NAVigator tie lookups on a 4096-output system, every output tied on both planes to one of 1024 sources: ingesting the
+wTies*A*RPRT report, finding the outputs that show an input with TiedOutputs and with a scan of OutputTieStatus, a
+tie line through ReceiveData, and the deep size of the tie map. Trees from before TiedOutputs report the scan and the ingest.
+
+    python tests/bench_nav_ties.py [--baseline REV]
+
+Each time is the best of 5 runs.
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: F401  installs the stand-in extronlib
+import bench_support
+
+TREE = bench_support.Tree()
+
+import extr_sm_NAVigator_v1_0_1_2 as nav
+
+OUTPUTS = 4096
+SOURCES = 1024
+
+
+def Report():
+    rng = random.Random(15)
+    rows = b''.join(b'   %4d\t  %4d\t  %4d\r\n' % (output, rng.randrange(1, SOURCES + 1), rng.randrange(1, SOURCES + 1))
+                    for output in range(1, OUTPUTS + 1))
+    return b'Output\t InVid\t InAud\r\n' + rows + b'\r\n'
+
+
+def Build():
+    return nav.SPIClass('NAVigator', Model='NAVigator')
+
+
+def Scan(device, input_):
+    return [output for output in range(1, OUTPUTS + 1)
+            if device.ReadStatus('OutputTieStatus', {'Output': output, 'Tie Type': 'Video'}) == input_]
+
+
+def main():
+    report = Report()
+    device = Build()
+    device.ReceiveData(device, report)
+    input_ = device.ReadStatus('OutputTieStatus', {'Output': 1, 'Tie Type': 'Video'})
+    print('{0}: {1} outputs over {2} sources, report {3} bytes'.format(TREE, OUTPUTS, SOURCES, len(report)))
+    ingest = bench_support.Best(lambda device: device.ReceiveData(device, report), Build)
+    print('{0:<34}{1:>10.1f} ms'.format('report ingest', ingest * 1000))
+    print('{0:<34}{1:>10.2f} ms'.format('outputs showing an input, scan', bench_support.Best(lambda: Scan(device, input_)) * 1000))
+    if not hasattr(device, 'TiedOutputs'):
+        return
+    assert device.TiedOutputs(input_) == Scan(device, input_)
+    for name, tieType in (('  TiedOutputs, Video', 'Video'), ('  TiedOutputs, Audio/Video', 'Audio/Video')):
+        elapsed = bench_support.Best(lambda: [device.TiedOutputs(i, tieType) for i in range(1, 101)]) / 100
+        print('{0:<34}{1:>10.2f} us'.format(name, elapsed * 1e6))
+    ties = [b'Out%04d In%d All\r\n' % (output, output % SOURCES + 1) for output in range(1, 101)]
+    elapsed = bench_support.Best(lambda: [device.ReceiveData(device, tie) for tie in ties]) / len(ties)
+    print('{0:<34}{1:>10.2f} us'.format('tie line through ReceiveData', elapsed * 1e6))
+    tieMap = device._DeviceClass__tieMap
+    stats = tieMap.Stats()
+    print('{0:<34}{1:>10.0f} KB for {2} ties'.format('tie map', bench_support.Size(tieMap) / 1024,
+                                                      sum(plane['Outputs'] for plane in stats.values())))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Switching a NAVigator video wall of 8 canvases x 16 windows between two layouts, against the emulated wall of
+nav_emulator: one SetInputSwitchtoWindow per window, and one RecallWallPlan of the layout compiled beforehand. For each,
+the time to issue the layout, the number of Send calls, and the time until every window has reported its new input.
+
+    python tests/bench_nav_wall_plan.py [write ms] [command ms]
+
+Issue times are the driver's alone, with nothing on the wire, and the best of 5 runs. Landing times are on the
+emulator's virtual clock, stepped 0.1 ms at a time, so they repeat exactly for a given write and command time.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: F401  installs the stand-in extronlib
+import bench_support
+
+import extr_sm_NAVigator_v1_0_1_2 as nav
+from extronlib.system import Wait
+from nav_emulator import Wall
+
+CANVASES = 8
+WINDOWS = 16
+LAYOUTS = {name: {Canvas: {Window: offset + Canvas * WINDOWS + Window for Window in range(1, WINDOWS + 1)}
+                  for Canvas in range(1, CANVASES + 1)}
+           for name, offset in (('A', 0), ('B', 200))}
+
+
+def Build(write, command, attached=True):
+    Wait.Reset()
+    device = nav.SPIClass('NAVigator', Model='NAVigator')
+    device.Session.Confirm('Verbose')
+    for name, layout in LAYOUTS.items():
+        device.CompileWallPlan(name, layout)
+    # Both ways start from layout A on the wall
+    wall = Wall(WriteTime=write, CommandTime=command).Attach(device)
+    device.RecallWallPlan('A')
+    while device.ReadStatus('WallPlan', {'Plan': 'A'}) != 'Complete':
+        Wait.Advance(0.0001)
+    del device.Sent[:]
+    if not attached:
+        device.Wire = None
+    return device, wall
+
+
+def PerWindow(device):
+    for Canvas, Windows in LAYOUTS['B'].items():
+        for Window, Input in Windows.items():
+            device.SetInputSwitchtoWindow(Input, {'Canvas': str(Canvas), 'Window': str(Window)})
+
+
+def Plan(device):
+    device.RecallWallPlan('B')
+
+
+# Without the plan the windows can only be polled
+def Landed(device, plan):
+    if plan:
+        return device.ReadStatus('WallPlan', {'Plan': 'B'}) == 'Complete'
+    return all(device.ReadStatus('InputSwitchtoWindow', {'Canvas': str(Canvas), 'Window': str(Window)}) == Input
+               for Canvas, Windows in LAYOUTS['B'].items() for Window, Input in Windows.items())
+
+
+def main():
+    write = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.001
+    command = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.00025
+    print('{0} canvases x {1} windows, {2:g} ms per write, {3:g} ms per command'.format(
+        CANVASES, WINDOWS, write * 1000, command * 1000))
+    print('{0:<26}{1:>10}{2:>8}{3:>10}'.format('', 'issue', 'sends', 'landed'))
+    for name, issue, plan in (('SetInputSwitchtoWindow', PerWindow, False), ('RecallWallPlan', Plan, True)):
+        best = bench_support.Best(issue, lambda: Build(write, command, attached=False)[0])
+        device, wall = Build(write, command)
+        start = Wait.Now
+        issue(device)
+        sends = len(device.Sent)
+        while not Landed(device, plan):
+            Wait.Advance(0.0001)
+        assert all(wall.Windows[(Canvas, Window)] == Input
+                   for Canvas, Windows in LAYOUTS['B'].items() for Window, Input in Windows.items())
+        print('{0:<26}{1:>7.0f} us{2:>8}{3:>7.1f} ms'.format(name, best * 1e6, sends, (Wait.Now - start) * 1000))
+
+
+if __name__ == '__main__':
+    main()
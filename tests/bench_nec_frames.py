@@ -0,0 +1,97 @@
+"""
+NEC frames built per second: the raw power query and volume 55 frames, and whole Set/Update calls of the Ethernet and
+Serial drivers that build them. The raw frames are built by PacketBuilder and, for comparison within the same run, by
+the struct.pack and check code loop each method had before it. An Ethernet call ends once its frame is queued or sent; a Serial
+call blocks in SendAndWait, which is answered at once with the display's reply from nec_emulator, so it includes
+parsing that reply.
+
+    python tests/bench_nec_frames.py [--baseline REV]
+
+A tree without PacketBuilder, such as 603b030~1, only has the whole calls. Each rate is from the best of 9 runs. The
+whole calls vary more from run to run than they differ between trees on a busy machine; compare the raw rows within one
+run.
+"""
+import os
+import sys
+from binascii import hexlify
+from struct import pack
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: F401  installs the stand-in extronlib
+import bench_support
+
+TREE = bench_support.Tree()
+
+import nec_display_P_V_X_Series_v1_4_1_0 as nec
+from nec_emulator import Display
+
+CALLS = 20000
+QUALIFIER = {'Device ID': '1'}
+
+
+# The frames as UpdatePower and SetVolume built them before PacketBuilder
+def PackedQuery(DeviceID):
+    buffer = pack('>BB10s', 0x30, DeviceID, b'0A06\x0201D6\x03')
+    checksum = 0
+    for i in buffer:
+        checksum = checksum ^ i
+    return b'\x01' + buffer + pack('>B', checksum) + b'\r'
+
+
+def PackedValue(DeviceID, value):
+    result = hexlify(value.to_bytes(1, 'big')).upper()
+    buffer = pack('>BB11s2ss', 0x30, DeviceID, b'0E0A\x02006200', result, b'\x03')
+    checksum = 0
+    for i in buffer:
+        checksum = checksum ^ i
+    return b'\x01' + buffer + pack('>B', checksum) + b'\r'
+
+
+def Raw(build):
+    def Run():
+        for i in range(CALLS):
+            build()
+    return Run, None
+
+
+def Ethernet(method, value):
+    def Setup():
+        device = nec.EthernetClass('192.168.1.100', 7142)
+        return getattr(device, method)
+    return lambda call: [call(value, None) for i in range(CALLS)], Setup
+
+
+def Serial(method, value):
+    def Setup():
+        device = nec.SerialClass('ProcessorAlias', 'COM1')
+        # Answered with the reply the display would give to the first frame, built before the timing starts
+        display = Display(0x41)
+        replies = {}
+        device.SendAndWait = lambda data, timeout, **delimiter: replies.get(data) or replies.setdefault(
+            data, display.Reply(data))
+        call = getattr(device, method)
+        call(value, QUALIFIER)
+        return call
+    return lambda call: [call(value, QUALIFIER) for i in range(CALLS)], Setup
+
+
+def main():
+    cases = [('raw query frame, packed', Raw(lambda: PackedQuery(0x41))),
+             ('raw value frame, packed', Raw(lambda: PackedValue(0x41, 55)))]
+    if hasattr(nec, 'PacketBuilder'):
+        assert nec.PacketBuilder.Frame(0x41, b'0A06\x0201D6\x03') == PackedQuery(0x41)
+        assert nec.PacketBuilder.ValueFrame(0x41, b'0E0A\x02006200', 55) == PackedValue(0x41, 55)
+        cases += [('raw query frame, PacketBuilder', Raw(lambda: nec.PacketBuilder.Frame(0x41, b'0A06\x0201D6\x03'))),
+                  ('raw value frame, PacketBuilder',
+                   Raw(lambda: nec.PacketBuilder.ValueFrame(0x41, b'0E0A\x02006200', 55)))]
+    cases += [('Ethernet UpdatePower', Ethernet('UpdatePower', None)),
+              ('Ethernet SetInput', Ethernet('SetInput', 'HDMI')),
+              ('Serial UpdatePower', Serial('UpdatePower', None)),
+              ('Serial SetVolume', Serial('SetVolume', 55))]
+    print('{0}: frames per second, {1} per run'.format(TREE, CALLS))
+    for name, (run, setup) in cases:
+        print('{0:<34}{1:>8.0f}k/s'.format(name, CALLS / bench_support.Best(run, setup, repeat=9) / 1000))
+
+
+if __name__ == '__main__':
+    main()
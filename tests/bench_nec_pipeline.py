@@ -0,0 +1,64 @@
+"""
+Full-status poll time of the NEC Ethernet driver, against the emulated displays of nec_emulator: Power, Input, Volume,
+AudioMute and VideoMute of one display and of 20, each on its own connection. 'Blocking' waits for each reply before
+the next query, as SendAndWait did; the others queue every query at once and pipeline PipelineDepth of them.
+
+    python tests/bench_nec_pipeline.py [latency ms] [service ms]
+
+Times are on the emulator's virtual clock, stepped a millisecond at a time, so they repeat exactly for a given
+latency and service time.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: F401  installs the stand-in extronlib
+
+import nec_display_P_V_X_Series_v1_4_1_0 as nec
+from extronlib.system import Wait
+from nec_emulator import Display
+
+STATUS = ('Power', 'Input', 'Volume', 'AudioMute', 'VideoMute')
+
+
+def Poll(count, depth, latency, service):
+    Wait.Reset()
+    nec.monotonic = lambda: Wait.Now
+    answered = []
+    devices = []
+    for i in range(count):
+        device = nec.EthernetClass('192.168.1.%d' % (100 + i), 7142)
+        device.PipelineDepth = depth or 1
+        Display(Latency=latency, ServiceTime=service).Attach(device)
+        devices.append(device)
+
+    record = lambda command, value, qualifier: answered.append(value)
+    if depth is None:
+        for device in devices:
+            for command in STATUS:
+                waiting = len(answered)
+                device.UpdateAsync(command, Callback=record)
+                while len(answered) == waiting:
+                    Wait.Advance(0.001)
+    else:
+        for device in devices:
+            for command in STATUS:
+                device.UpdateAsync(command, Callback=record)
+        while len(answered) < count * len(STATUS):
+            Wait.Advance(0.001)
+    assert None not in answered
+    return Wait.Now
+
+
+def main():
+    latency = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.01
+    service = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.02
+    print('latency {0:.0f} ms each way, {1:.0f} ms per query'.format(latency * 1000, service * 1000))
+    print('{0:<10}{1:>12}{2:>14}'.format('', '1 display', '20 displays'))
+    for name, depth in (('Blocking', None), ('Depth 1', 1), ('Depth 2', 2), ('Depth 4', 4)):
+        print('{0:<10}{1:>9.0f} ms{2:>11.0f} ms'.format(name, Poll(1, depth, latency, service) * 1000,
+                                                        Poll(20, depth, latency, service) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Receive rate of the Q-Sys ECP driver against the number of controls in the design. Each control is updated as a
+Gain, a Mute and a LevelMeter, so the driver holds three patterns for it, and 3000 cv and cvv lines spread over the
+controls come back in chunks of 5 lines.
+
+    python tests/bench_qsys_receive.py [--baseline REV]
+
+Each rate is the best of 5 runs.
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: F401  installs the stand-in extronlib
+import bench_support
+
+TREE = bench_support.Tree()
+
+import qsc_dsp_Q_Sys_Core_Series_v1_12_4_0 as qsys
+
+LINES = 3000
+
+
+def Traffic(count):
+    rng = random.Random(count)
+    lines = []
+    for i in range(LINES):
+        control = rng.randrange(count)
+        kind = i % 3
+        if kind == 0:
+            level = round(rng.uniform(-60, 0), 1)
+            lines.append('cv "Gain{0}" "{1:.1f}dB" {1:.1f} 0.5\n'.format(control, level))
+        elif kind == 1:
+            muted = rng.randrange(2)
+            lines.append('cv "Mute{0}" "{1}" {2} {2}\n'.format(control, 'muted' if muted else 'unmuted', muted))
+        else:
+            level = round(rng.uniform(-100, 0), 1)
+            lines.append('cvv "Meter{0}" 2 "{1:.1f}dB" "{1:.1f}dB" 2 {1:.1f} {1:.1f} 2 0.5 0.5\n'.format(control, level))
+    return [''.join(lines[i:i + 5]).encode() for i in range(0, LINES, 5)]
+
+
+def Rate(count):
+    chunks = Traffic(count)
+
+    def Build():
+        device = qsys.EthernetClass('192.168.1.20', 1702)
+        for i in range(count):
+            device.Update('Gain', {'Control ID': 'Gain%d' % i})
+            device.Update('Mute', {'Control ID': 'Mute%d' % i})
+            device.Update('LevelMeter', {'Control ID': 'Meter%d' % i})
+        return device
+
+    def Feed(device):
+        for chunk in chunks:
+            device.ReceiveData(device, chunk)
+    return LINES / bench_support.Best(Feed, Build)
+
+
+def main():
+    print('{0}: {1} lines in chunks of 5'.format(TREE, LINES))
+    for count in (10, 100, 1000):
+        print('{0:>5} controls{1:>10.1f}k lines/s'.format(count, Rate(count) / 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Latency of the Q-Sys driver over ECP (EthernetClass, port 1702) and over QRC (QRCClass, port 1710), against the same
+design on the emulated Cores of qsys_emulator: the time to update 17 and 100 controls until every status is read, to
+set them until every status shows the new value, and for a change on the Core, made just after a poll, to reach a change-group subscriber.
+Half the controls are gains and half mutes.
+
+    python tests/bench_qsys_transports.py [latency ms] [service ms]
+
+Times are on the virtual clock of conftest's Wait, stepped a millisecond at a time, so they repeat exactly for a
+given latency and service time.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: F401  installs the stand-in extronlib
+
+import qsc_dsp_Q_Sys_Core_Series_v1_12_4_0 as qsys
+from extronlib.system import Wait
+from qsys_emulator import ECPEmulator, QRCEmulator
+
+POLL_RATE = 100     # ms, change-group auto-poll rate
+
+
+def Command(i):
+    return 'Gain' if i % 2 == 0 else 'Mute'
+
+
+def Build(transport, count, latency, service):
+    Wait.Reset()
+    controls = {'Control%d' % i: ('-20.0dB', -20.0) if i % 2 == 0 else ('unmuted', 0) for i in range(count)}
+    if transport == 'ECP':
+        device = qsys.EthernetClass('192.168.1.20', 1702)
+        core = ECPEmulator(controls, ServiceTime=service, Latency=latency).Attach(device)
+    else:
+        device = qsys.QRCClass('192.168.1.20')
+        core = QRCEmulator(controls, ServiceTime=service, Latency=latency).Attach(device)
+    device.ChangeGroupPollRate = POLL_RATE
+    return device, core
+
+
+def Until(done, core=None):
+    start = Wait.Now
+    while not done():
+        Wait.Advance(0.001)
+        if core:
+            core.Advance(1)
+    return Wait.Now - start
+
+
+def Requests(core, start):
+    return len(core.Received) - start
+
+
+def Update(transport, count, latency, service):
+    device, core = Build(transport, count, latency, service)
+    for i in range(count):
+        device.Update(Command(i), {'Control ID': 'Control%d' % i})
+    elapsed = Until(lambda: all(device.ReadStatus(Command(i), {'Control ID': 'Control%d' % i}) is not None
+                                for i in range(count)))
+    return elapsed, Requests(core, 0)
+
+
+def Set(transport, count, latency, service):
+    device, core = Build(transport, count, latency, service)
+    sent = len(core.Received)
+    values = {'Gain': -6.0, 'Mute': 'On'}
+    for i in range(count):
+        device.Set(Command(i), values[Command(i)], {'Control ID': 'Control%d' % i})
+    elapsed = Until(lambda: all(device.ReadStatus(Command(i), {'Control ID': 'Control%d' % i}) == values[Command(i)]
+                                for i in range(count)))
+    return elapsed, Requests(core, sent)
+
+
+def Push(transport, count, latency, service):
+    device, core = Build(transport, count, latency, service)
+    for i in range(count):
+        device.SubscribeStatus(Command(i), {'Control ID': 'Control%d' % i}, lambda command, value, qualifier: None,
+                               Mode='ChangeGroup')
+    Until(lambda: all(device.ReadStatus(Command(i), {'Control ID': 'Control%d' % i}) is not None
+                      for i in range(count)), core)
+    # change the control just after a poll, so the change waits out a whole poll period
+    Until(lambda: core.Groups and all(core.Now == group['Due'] - POLL_RATE for group in core.Groups.values()), core)
+    sent = len(core.Received)
+    core.Change('Control0', '-3.5dB', -3.5)
+    elapsed = Until(lambda: device.ReadStatus('Gain', {'Control ID': 'Control0'}) == -3.5, core)
+    return elapsed, Requests(core, sent)
+
+
+def main():
+    latency = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.001
+    service = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.002
+    print('latency {0:g} ms each way, {1:g} ms per request, change groups polled every {2} ms'.format(
+        latency * 1000, service * 1000, POLL_RATE))
+    print('{0:<24}{1:>10}{2:>10}{3:>10}{4:>10}'.format('', 'ECP', 'requests', 'QRC', 'requests'))
+    for name, measure, count in (('update 17 controls', Update, 17), ('update 100 controls', Update, 100),
+                                 ('set 17 controls', Set, 17), ('set 100 controls', Set, 100),
+                                 ('change pushed', Push, 17)):
+        row = '{0:<24}'.format(name)
+        for transport in ('ECP', 'QRC'):
+            elapsed, requests = measure(transport, count, latency, service)
+            row += '{0:>7.0f} ms{1:>10}'.format(elapsed * 1000, requests)
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Status storage cost of the drivers, on the DTP CrossPoint's OutputTieStatus with 10000 statuses (5000 outputs, Audio
+and Video): writing them for the first time, writing them again unchanged, writing them changed, reading them, and
+the memory the first write leaves allocated, traced with tracemalloc.
+
+    python tests/bench_status_store.py [--baseline REV]
+
+Each time is the best of 7 runs.
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: F401  installs the stand-in extronlib
+import bench_support
+
+TREE = bench_support.Tree()
+
+import extr_matrix_DTPCrossPoint_86_1084KSeriesv11000 as dtp
+
+OUTPUTS = 5000
+QUALIFIERS = [{'Output': str(output), 'Tie Type': tieType} for output in range(1, OUTPUTS + 1)
+              for tieType in ('Audio', 'Video')]
+
+
+def Build():
+    return dtp.SSHClass('192.168.1.10', 22, Credentials=('admin', 'extron'), Model='DTP CrossPoint 108 4K')
+
+
+def Written(value):
+    def Setup():
+        device = Build()
+        Write(device, value)
+        return device
+    return Setup
+
+
+def Write(device, value='1'):
+    for qualifier in QUALIFIERS:
+        device.WriteStatus('OutputTieStatus', value, qualifier)
+
+
+def Read(device):
+    for qualifier in QUALIFIERS:
+        device.ReadStatus('OutputTieStatus', qualifier)
+
+
+def Storage():
+    device = Build()
+    gc.collect()
+    tracemalloc.start()
+    Write(device)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def main():
+    print('{0}: {1} OutputTieStatus entries'.format(TREE, len(QUALIFIERS)))
+    for name, function, setup in (('first write', Write, Build),
+                                  ('unchanged write', lambda device: Write(device, '1'), Written('1')),
+                                  ('changed write', lambda device: Write(device, '2'), Written('1')),
+                                  ('read', Read, Written('1'))):
+        print('{0:<18}{1:>8.1f} ms'.format(name, bench_support.Best(function, setup, repeat=7) * 1000))
+    print('{0:<18}{1:>8.0f} KB'.format('storage', Storage() / 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+What the bench scripts share. A bench times the drivers of the working tree, or with --baseline REV those of an earlier
+commit, which git archive unpacks to a temporary directory. The same script then times a change before and after, as
+long as it only calls what both trees have:
+
+    python tests/bench_status_store.py --baseline a1bb88f~1
+
+Times are wall-clock, so they vary from run to run and from machine to machine; compare them within one run, or
+between runs on one machine.
+"""
+import atexit
+import gc
+import io
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def Tree():
+    """Put the drivers of --baseline REV ahead of the working tree's on sys.path, and return the name of the tree."""
+    if '--baseline' not in sys.argv[:-1]:
+        return 'working tree'
+    i = sys.argv.index('--baseline')
+    revision = sys.argv[i + 1]
+    del sys.argv[i:i + 2]
+    archive = subprocess.run(['git', 'archive', revision], cwd=ROOT, stdout=subprocess.PIPE, check=True).stdout
+    path = tempfile.mkdtemp(prefix='bench-')
+    atexit.register(shutil.rmtree, path, True)
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(path)
+    sys.path.insert(0, path)
+    return revision
+
+
+def Best(function, setup=None, repeat=5):
+    """The shortest of repeat runs of function, in seconds. setup, if given, runs untimed before each run and its
+    result is passed to function. The garbage collector is off while function runs, as in timeit."""
+    best = None
+    gc.collect()
+    for i in range(repeat):
+        argument = setup() if setup else None
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            if setup:
+                function(argument)
+            else:
+                function()
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def Chunks(data, seed, smallest, largest):
+    """data cut into chunks of random sizes from smallest to largest bytes, the same ones for a given seed."""
+    rng = random.Random(seed)
+    chunks = []
+    i = 0
+    while i < len(data):
+        step = rng.randrange(smallest, largest + 1)
+        chunks.append(data[i:i + step])
+        i += step
+    return chunks
+
+
+def Size(value, seen=None):
+    """The deep size of value's containers and objects in bytes. Strings and numbers are left out: they are mostly
+    shared."""
+    seen = set() if seen is None else seen
+    if id(value) in seen or isinstance(value, (str, int, type(None))):
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(Size(key, seen) + Size(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(Size(item, seen) for item in value)
+    elif hasattr(value, '__dict__'):
+        size += Size(vars(value), seen)
+    return size
@@ -0,0 +1,92 @@
+"""
+Throughput of the Tesira driver's subscription pushes. 5000 publishToken pushes, either mixed (levels, mutes, logic
+meters, signal meters, selectors and VoIP lines in use) or levels only, go through ReceiveData in chunks of 10, and
+their matches go straight to __MatchAllSubscribe, which leaves out the receive buffer.
+
+    python tests/bench_tesira_publish.py [--baseline REV]
+
+Each rate is the best of 10 passes.
+"""
+import os
+import random
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: F401  installs the stand-in extronlib
+import bench_support
+
+TREE = bench_support.Tree()
+
+import biam_dsp_TesiraSeries_v1_15_1_0 as tesira
+
+PUSHES = 5000
+PUBLISH = re.compile(b'\\! "publishToken":"([\\S ]+?)" "value":([\\S ]+?)\r\n')
+
+
+def Level(rng):
+    return '{0:.6f}'.format(round(rng.uniform(-100, 12), rng.choice((1, 2, 3))))
+
+
+def State(rng):
+    return rng.choice(('true', 'false'))
+
+
+def Push(rng, kind):
+    if kind == 'FineLevelControl':
+        return 'FineLevelControl_Level{0}'.format(rng.randrange(20)), '[{0} {1}]'.format(Level(rng), Level(rng))
+    if kind == 'LevelControl':
+        return 'LevelControl_Level{0}'.format(rng.randrange(20)), '[{0} {1}]'.format(Level(rng), Level(rng))
+    if kind == 'MuteControl':
+        return 'MuteControl_Mute{0}'.format(rng.randrange(20)), '[{0} {1}]'.format(State(rng), State(rng))
+    if kind == 'LogicMeter':
+        return 'LogicMeter_Logic{0}'.format(rng.randrange(10)), '[{0}]'.format(' '.join(State(rng) for i in range(4)))
+    if kind == 'SignalPresentMeter':
+        return 'SignalPresentMeter_Meter{0}_{1}_signalPresent'.format(rng.randrange(10), rng.randrange(1, 5)), State(rng)
+    if kind == 'SourceSelectorSourceSelection':
+        return 'SourceSelectorSourceSelection_Selector{0}'.format(rng.randrange(5)), str(rng.randrange(9))
+    return 'VoIPLineInUse_Dialer{0}_{1}_{2}'.format(rng.randrange(2), rng.randrange(1, 3), rng.randrange(1, 7)), State(rng)
+
+
+def Stream(kinds):
+    rng = random.Random(6)
+    return b''.join('! "publishToken":"{0}" "value":{1}\r\n'.format(*Push(rng, rng.choice(kinds))).encode()
+                    for i in range(PUSHES))
+
+
+def Build():
+    return tesira.SSHClass('192.168.1.12', 22, Credentials=('default', ''))
+
+
+def Receive(stream):
+    lines = stream.splitlines(keepends=True)
+    chunks = [b''.join(lines[i:i + 10]) for i in range(0, len(lines), 10)]
+
+    def Feed(device):
+        for chunk in chunks:
+            device.ReceiveData(device, chunk)
+    return PUSHES / bench_support.Best(Feed, Build, repeat=10)
+
+
+def Match(stream):
+    matches = list(PUBLISH.finditer(stream))
+
+    def Feed(device):
+        publish = device._DeviceClass__MatchAllSubscribe
+        for match in matches:
+            publish(match, None)
+    return PUSHES / bench_support.Best(Feed, Build, repeat=10)
+
+
+def main():
+    streams = (('mixed', Stream(('FineLevelControl', 'LevelControl', 'MuteControl', 'LogicMeter', 'SignalPresentMeter',
+                                 'SourceSelectorSourceSelection', 'VoIPLineInUse'))),
+               ('levels', Stream(('FineLevelControl',))))
+    print('{0}: {1} pushes, messages per second'.format(TREE, PUSHES))
+    print('{0:<22}'.format('') + ''.join('{0:>10}'.format(name) for name, stream in streams))
+    print('{0:<22}'.format('ReceiveData') + ''.join('{0:>10.0f}'.format(Receive(stream)) for name, stream in streams))
+    print('{0:<22}'.format('__MatchAllSubscribe') + ''.join('{0:>10.0f}'.format(Match(stream)) for name, stream in streams))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Stands in for the extronlib runtime, which only exists on an Extron processor, so the drivers can be imported and
+exercised here. Interfaces record what they send, and pass it to their Wire when a test sets one; Wait runs on a
+virtual clock that the tests move with Wait.Advance.
+"""
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class _Interface:
+    Wire = None     # set by a test to receive what the interface sends
+
+    def __init__(self, *args, **kwargs):
+        self.Sent = []
+        self.Host = args[0] if args else None
+        self.Hostname = self.IPAddress = args[0] if args else None
+        self.IPPort = self.Port = args[1] if len(args) > 1 else None
+        self.Credentials = kwargs.get('Credentials')
+
+    def Send(self, data):
+        self.Sent.append(data)
+        if self.Wire is not None:
+            self.Wire(data)
+
+    def SendAndWait(self, data, timeout, **delimiter):
+        self.Sent.append(data)
+        return None
+
+    def Connect(self, timeout=None):
+        return 'Connected'
+
+    def Disconnect(self):
+        pass
+
+    def StartKeepAlive(self, interval, data):
+        pass
+
+    def StopKeepAlive(self):
+        pass
+
+
+class Wait:
+    """A Wait on a virtual clock: it runs its function once, when Advance moves the clock past it."""
+    Now = 0.0
+    Armed = []
+
+    def __init__(self, Time, Function=None):
+        self.Time = Time
+        self.Function = Function
+        self.Due = None
+        if Function is not None:
+            self.Restart()
+
+    def __call__(self, Function):
+        self.Function = Function
+        self.Restart()
+        return Function
+
+    def Restart(self):
+        self.Due = Wait.Now + self.Time
+        if self not in Wait.Armed:
+            Wait.Armed.append(self)
+
+    def Cancel(self):
+        self.Due = None
+        if self in Wait.Armed:
+            Wait.Armed.remove(self)
+
+    def Change(self, Time):
+        self.Time = Time
+
+    @classmethod
+    def Advance(cls, seconds):
+        end = cls.Now + seconds
+        while True:
+            due = [wait for wait in cls.Armed if wait.Due <= end]
+            if not due:
+                break
+            wait = min(due, key=lambda wait: wait.Due)
+            cls.Now = wait.Due
+            wait.Cancel()
+            wait.Function()
+        cls.Now = end
+
+    @classmethod
+    def Reset(cls):
+        cls.Now = 0.0
+        cls.Armed = []
+
+
+class Timer:
+    def __init__(self, Interval, Function=None):
+        self.Interval = Interval
+        self.Function = Function
+        self.State = 'Running'
+
+    def Change(self, Interval):
+        self.Interval = Interval
+
+    def Pause(self):
+        self.State = 'Paused'
+
+    def Resume(self):
+        self.State = 'Running'
+
+    def Restart(self):
+        self.State = 'Running'
+
+    def Stop(self):
+        self.State = 'Stopped'
+
+
+def _Install():
+    extronlib = types.ModuleType('extronlib')
+    extronlib.event = lambda *args, **kwargs: (lambda function: function)
+    extronlib.Version = lambda: '0.0.0'
+    extronlib.Platform = lambda: 'test'
+
+    interface = types.ModuleType('extronlib.interface')
+    for name in ('EthernetClientInterface', 'EthernetServerInterfaceEx', 'SerialInterface', 'SPInterface',
+                 'DanteInterface', 'ContactInterface', 'DigitalIOInterface', 'FlexIOInterface', 'IRInterface',
+                 'RelayInterface', 'SWPowerInterface', 'VolumeInterface'):
+        setattr(interface, name, type(name, (_Interface,), {}))
+
+    system = types.ModuleType('extronlib.system')
+    system.Wait = Wait
+    system.Timer = Timer
+    system.ProgramLog = lambda *args, **kwargs: None
+    system.MESet = type('MESet', (), {'__init__': lambda self, objects: None})
+    system.Clock = type('Clock', (), {})
+    system.GetSystemUpTime = lambda: 0
+    system.Ping = lambda *args, **kwargs: (0, 0, 0)
+
+    device = types.ModuleType('extronlib.device')
+    for name in ('ProcessorDevice', 'UIDevice', 'eBUSDevice'):
+        setattr(device, name, type(name, (), {}))
+
+    ui = types.ModuleType('extronlib.ui')
+    for name in ('Button', 'Knob', 'Label', 'Level', 'Slider'):
+        setattr(ui, name, type(name, (), {}))
+
+    software = types.ModuleType('extronlib.software')
+    software.SummitConnect = type('SummitConnect', (), {})
+
+    for module in (interface, system, device, ui, software):
+        setattr(extronlib, module.__name__.rpartition('.')[2], module)
+        sys.modules[module.__name__] = module
+    sys.modules['extronlib'] = extronlib
+
+
+if 'extronlib' not in sys.modules:
+    _Install()
+
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def ResetWaits():
+    Wait.Reset()
+    yield
+    Wait.Reset()
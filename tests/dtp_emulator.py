@@ -0,0 +1,87 @@
+"""
+A DTP CrossPoint matrix for the DTP driver tests and benches, on the virtual clock of conftest's Wait. It speaks the
+SIS tie commands the driver sends: single ties, ties of one input to every output, quick multiple ties and the
+read of every tie. Each command reaches the matrix after Latency and is served after ServiceTime, plus TieTime for
+each tie it makes, one command at a time; the reply reaches the driver after Latency again, through its ReceiveData.
+"""
+import re
+
+from extronlib.system import Wait
+
+TIE_TYPES = {b'!': 'All', b'%': 'Vid', b'$': 'Aud'}
+TIE_COMMAND = re.compile(rb'(\d+)\*(?:(\d+))?([!%$])')
+
+
+class Matrix:
+
+    def __init__(self, InputSize=10, OutputSize=8, Latency=0.001, ServiceTime=0.01, TieTime=0.0005):
+        self.InputSize = InputSize
+        self.OutputSize = OutputSize
+        self.Latency = Latency
+        self.ServiceTime = ServiceTime
+        self.TieTime = TieTime
+        self.Ties = {'Vid': [0] * OutputSize, 'Aud': [0] * OutputSize}    # tie type -> input on each output
+        self.Received = []      # (virtual time, command) as the commands reached the matrix
+        self.Output = None
+        self.__busyUntil = 0.0
+        self.__partial = b''
+
+    def Attach(self, driver):
+        self.Output = lambda data: driver.ReceiveData(driver, data)
+        driver.Wire = self.Receive
+        return self
+
+    def Receive(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        lines = (self.__partial + data).split(b'\r\n')
+        self.__partial = lines.pop()
+        for line in lines:
+            if line:
+                self.Serve(line)
+
+    def Serve(self, command):
+        arrival = Wait.Now + self.Latency
+        self.Received.append((arrival, command))
+        reply, ties = self.Reply(command)
+        done = max(arrival, self.__busyUntil) + self.ServiceTime + ties * self.TieTime
+        self.__busyUntil = done
+        Wait(done + self.Latency - Wait.Now, lambda: self.Output(reply))
+
+    def Tie(self, input_, output, tieType):
+        if not 0 <= input_ <= self.InputSize:
+            return False
+        for kind in ('Vid', 'Aud'):
+            if tieType in ('All', kind):
+                self.Ties[kind][output - 1] = input_
+        return True
+
+    # The reply to a command, and the number of ties it made
+    def Reply(self, command):
+        if command.startswith(b'\x1b+Q'):
+            ties = TIE_COMMAND.findall(command[3:])
+            if not ties or not all(output and 1 <= int(output) <= self.OutputSize for input_, output, tie in ties):
+                return b'E13\r\n', 0
+            for input_, output, tie in ties:
+                if not self.Tie(int(input_), int(output), TIE_TYPES[tie]):
+                    return b'E01\r\n', 0
+            return b'Qik\r\n', len(ties)
+        if command in (b'w0*1*1VC', b'w0*1*2VC'):
+            kind = 'Vid' if command.endswith(b'1VC') else 'Aud'
+            ties = self.Ties[kind]
+            return b''.join(b'Vgp00 Out%02d*%s%s\r\n' % (start + 1, b' '.join(b'%02d' % i for i in ties[start:start + 16]),
+                                                      kind.encode()) for start in range(0, self.OutputSize, 16)), 0
+        match = TIE_COMMAND.fullmatch(command)
+        if match:
+            input_, output, tie = int(match.group(1)), match.group(2), TIE_TYPES[match.group(3)]
+            if output is None:
+                for output in range(1, self.OutputSize + 1):
+                    if not self.Tie(input_, output, tie):
+                        return b'E01\r\n', 0
+                return b'In%02d %s\r\n' % (input_, tie.encode()), self.OutputSize
+            if not 1 <= int(output) <= self.OutputSize:
+                return b'E13\r\n', 0
+            if not self.Tie(input_, int(output), tie):
+                return b'E01\r\n', 0
+            return b'Out%02d In%02d %s\r\n' % (int(output), input_, tie.encode()), 1
+        return b'E10\r\n', 0
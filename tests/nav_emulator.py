@@ -0,0 +1,44 @@
+"""
+A NAVigator video wall for the NAVigator driver benches, on the virtual clock of conftest's Wait. It takes the
+InputSwitchtoWindow commands, ESC Canvas*Window*Input!X, however they are packed into writes. Each write reaches the
+wall after Latency and costs WriteTime, plus CommandTime for each command in it, one write at a time; each window's
+Grp feedback reaches the driver after Latency again, through its ReceiveData, as soon as its command is done.
+"""
+import re
+
+from extronlib.system import Wait
+
+WINDOW_COMMAND = re.compile(rb'\x1b(\d+)\*(\d+)\*(\d+)!X\r')
+
+
+class Wall:
+
+    def __init__(self, Latency=0.001, WriteTime=0.001, CommandTime=0.00025):
+        self.Latency = Latency
+        self.WriteTime = WriteTime
+        self.CommandTime = CommandTime
+        self.Windows = {}       # (Canvas, Window) -> Input
+        self.Received = []      # (virtual time, write) as the writes reached the wall
+        self.Output = None
+        self.__busyUntil = 0.0
+
+    def Attach(self, driver):
+        self.Output = lambda data: driver.ReceiveData(driver, data)
+        driver.Wire = self.Receive
+        return self
+
+    def Receive(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        arrival = Wait.Now + self.Latency
+        self.Received.append((arrival, data))
+        done = max(arrival, self.__busyUntil) + self.WriteTime
+        for match in WINDOW_COMMAND.finditer(data):
+            Canvas, Window, Input = (int(group) for group in match.groups())
+            self.Windows[(Canvas, Window)] = Input
+            done += self.CommandTime
+            self.Reply(done, b'Grp%02d Win%02d In%d\r\n' % (Canvas, Window, Input))
+        self.__busyUntil = done
+
+    def Reply(self, done, reply):
+        Wait(done + self.Latency - Wait.Now, lambda: self.Output(reply))
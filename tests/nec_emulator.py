@@ -0,0 +1,110 @@
+"""
+NEC displays for the NEC driver tests, on the virtual clock of conftest's Wait. Each frame a driver sends reaches the
+display after Latency, is answered after ServiceTime, one frame at a time, and the reply reaches the driver after
+Latency again, through its ReceiveData. A poll therefore runs in virtual time and its duration can be read off
+Wait.Now. A Silent display never answers. Chain puts displays on one RS-232 line for the serial driver instead, and
+answers its blocking SendAndWait on a clock of its own.
+"""
+from extronlib.system import Wait
+
+
+def Frame(DeviceID, replyType, body):
+    """A reply from the display: SOH, '0', '0' (the controller), the monitor ID, the type, the length, the message."""
+    message = b'\x02' + body + b'\x03'
+    buffer = b'00' + bytes((DeviceID, replyType)) + b'%02X' % len(message) + message
+    checksum = 0
+    for i in buffer:
+        checksum ^= i
+    return b'\x01' + buffer + bytes((checksum, 0x0D))
+
+
+class Display:
+
+    def __init__(self, DeviceID=0x41, Latency=0.01, ServiceTime=0.02, Silent=False):
+        self.DeviceID = DeviceID
+        self.Latency = Latency
+        self.ServiceTime = ServiceTime
+        self.Silent = Silent
+        self.Power = 1
+        self.Parameters = {     # op-code page and code -> [maximum, current]
+            b'0062': [100, 30],     # Volume
+            b'0060': [18, 0x11],    # Input: HDMI
+            b'008D': [2, 2],        # Audio mute: off
+            b'10B6': [2, 2],        # Video mute: off
+            b'00E1': [1, 0],        # Power save: off
+        }
+        self.Received = []      # (virtual time, frame) as the frames reached the display
+        self.Output = None
+        self.__busyUntil = 0.0
+        self.__partial = b''
+
+    def Attach(self, driver):
+        self.Output = lambda data: driver.ReceiveData(driver, data)
+        driver.Wire = self.Receive
+        return self
+
+    def Receive(self, data):
+        data = self.__partial + data
+        while len(data) >= 7:
+            size = int(data[5:7], 16) + 9
+            if len(data) < size:
+                break
+            self.Serve(data[:size])
+            data = data[size:]
+        self.__partial = data
+
+    def Serve(self, frame):
+        arrival = Wait.Now + self.Latency
+        self.Received.append((arrival, frame))
+        if self.Silent:
+            return
+        done = max(arrival, self.__busyUntil) + self.ServiceTime
+        self.__busyUntil = done
+        reply = self.Reply(frame)
+        Wait(done + self.Latency - Wait.Now, lambda: self.Output(reply))
+
+    def Reply(self, frame):
+        kind, message = frame[4], frame[8:-3]
+        if kind == ord('C'):
+            key = message[:4]
+            if key not in self.Parameters:
+                return Frame(self.DeviceID, ord('D'), b'01' + key + b'000000' + b'0000')
+            maximum, current = self.Parameters[key]
+            return Frame(self.DeviceID, ord('D'), b'00' + key + b'00' + b'%04X%04X' % (maximum, current))
+        elif kind == ord('E'):
+            key, value = message[:4], int(message[4:8], 16)
+            parameter = self.Parameters.setdefault(key, [255, 0])
+            parameter[1] = value
+            return Frame(self.DeviceID, ord('F'), b'00' + key + b'00' + b'%04X%04X' % tuple(parameter))
+        elif message == b'01D6':
+            return Frame(self.DeviceID, ord('B'), b'0200D6000004' + b'%04X' % self.Power)
+        elif message.startswith(b'C203D6'):
+            self.Power = int(message[6:10], 16)
+            return Frame(self.DeviceID, ord('B'), b'00' + message)
+        return Frame(self.DeviceID, ord('B'), b'01' + message)
+
+
+
+class Chain:
+    """
+    Displays on one RS-232 daisy chain. The display the monitor ID of a frame addresses answers it, and the call moves
+    Now on by the round trip; a frame for a silent or missing display moves Now on by the driver's timeout instead.
+    """
+
+    def __init__(self, displays):
+        self.Displays = {display.DeviceID: display for display in displays}
+        self.Now = 0.0
+        self.Calls = []         # (Device ID, message type) in the order the frames were sent
+
+    def Attach(self, driver):
+        driver.SendAndWait = self.SendAndWait
+        return self
+
+    def SendAndWait(self, data, timeout, **delimiter):
+        self.Calls.append((data[2] - 0x40, chr(data[4])))
+        display = self.Displays.get(data[2])
+        if display is None or display.Silent:
+            self.Now += timeout
+            return b''
+        self.Now += 2 * display.Latency + display.ServiceTime
+        return display.Reply(data)
@@ -0,0 +1,249 @@
+"""
+In-process Q-Sys Cores for the Q-Sys driver tests: ECPEmulator speaks ECP, the line protocol of port 1702, and
+QRCEmulator speaks QRC, the null-terminated JSON-RPC of port 1710. Attach one to a driver and what the driver sends
+is answered through the driver's ReceiveData, straight away, or on the virtual clock of conftest's Wait when the Core
+is given a Latency or ServiceTime: each request then reaches the Core after Latency, is served after ServiceTime, one
+at a time, and the reply is back after Latency again. Serve puts a Core behind a local TCP port instead, where
+ServiceTime is spent in real time. Change groups are auto-polled on a clock the test moves with Advance.
+"""
+import json
+import re
+import socket
+import threading
+import time
+
+from extronlib.system import Wait
+
+
+class Core:
+    """The design both protocols read and write: controls, level meters and change groups."""
+
+    def __init__(self, controls, design='TestDesign', ServiceTime=0, Latency=0):
+        self.Controls = {}          # Control ID -> [string, value, position]
+        for ctrlID, (string, value) in controls.items():
+            self.Controls[ctrlID] = [string, value, 0.5]
+        self.Meters = {}            # Control ID -> level in dB
+        self.Design = design
+        self.ServiceTime = ServiceTime  # seconds the Core spends on each request
+        self.Latency = Latency          # seconds each way between an attached driver and the Core
+        self.Groups = {}            # group -> {'Controls': [], 'Rate': ms or None, 'Due': ms, 'Last': {}}
+        self.Now = 0
+        self.Received = []          # requests from the driver
+        self.Replies = []           # data sent back to the driver
+        self.Output = None
+        self.__served = False
+        self.__busyUntil = 0.0
+
+    def Attach(self, driver):
+        self.Output = lambda data: driver.ReceiveData(driver, data)
+        return self
+
+    def Handle(self, request, handler):
+        """Runs handler(request) when the Core has served the request; its replies go out as it runs."""
+        if self.__served:
+            if self.ServiceTime:
+                time.sleep(self.ServiceTime)
+            handler(request)
+        elif self.Latency or self.ServiceTime:
+            done = max(Wait.Now + self.Latency, self.__busyUntil) + self.ServiceTime
+            self.__busyUntil = done
+            Wait(done + self.Latency - Wait.Now, lambda: handler(request))
+        else:
+            handler(request)
+
+    def Change(self, ctrlID, string, value):
+        self.Controls[ctrlID][:2] = [string, value]
+
+    def SetControl(self, ctrlID, value):
+        control = self.Controls[ctrlID]
+        if control[0].endswith('dB'):
+            control[:2] = ['{0:.1f}dB'.format(float(value)), float(value)]
+        else:
+            control[:2] = ['muted' if float(value) else 'unmuted', int(float(value))]
+
+    def Advance(self, ms):
+        end = self.Now + ms
+        while True:
+            due = [(group['Due'], name) for name, group in self.Groups.items() if group['Rate'] and group['Due'] <= end]
+            if not due:
+                break
+            self.Now, name = min(due)
+            group = self.Groups[name]
+            changed = []
+            for ctrlID in group['Controls']:
+                state = tuple(self.Controls[ctrlID]) if ctrlID in self.Controls else self.Meters[ctrlID]
+                if group['Last'].get(ctrlID) != state:
+                    group['Last'][ctrlID] = state
+                    changed.append(ctrlID)
+            if changed:
+                self.Poll(name, changed)
+            group['Due'] += group['Rate']
+        self.Now = end
+
+    def AddToGroup(self, name, ctrlIDs):
+        group = self.Groups.setdefault(name, {'Controls': [], 'Rate': None, 'Due': 0, 'Last': {}})
+        group['Controls'].extend(ctrlID for ctrlID in ctrlIDs if ctrlID not in group['Controls'])
+
+    def AutoPoll(self, name, ms):
+        group = self.Groups[name]
+        group['Rate'] = ms
+        group['Due'] = self.Now + ms
+
+    def Reply(self, data):
+        self.Replies.append(data)
+        self.Output(data)
+
+    def Serve(self, port=0):
+        """Accepts one connection on 127.0.0.1 and runs the protocol on it. Returns the port."""
+        server = socket.socket()
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(('127.0.0.1', port))
+        server.listen(1)
+        self.__served = True
+
+        def Run():
+            connection, address = server.accept()
+            server.close()
+            lock = threading.Lock()
+
+            def Output(data):
+                with lock:
+                    connection.sendall(data)
+            self.Output = Output
+            while True:
+                data = connection.recv(65536)
+                if not data:
+                    return
+                self.Receive(data)
+        threading.Thread(target=Run, daemon=True).start()
+        return server.getsockname()[1]
+
+    def Receive(self, data):
+        raise NotImplementedError
+
+    def Poll(self, name, ctrlIDs):
+        raise NotImplementedError
+
+
+class ECPEmulator(Core):
+
+    def __init__(self, controls, design='TestDesign', ServiceTime=0, Latency=0):
+        Core.__init__(self, controls, design, ServiceTime, Latency)
+        self.__partial = ''
+
+    def Attach(self, driver):
+        Core.Attach(self, driver)
+        driver.Send = self.Receive
+        return self
+
+    def Receive(self, data):
+        if isinstance(data, bytes):
+            data = data.decode()
+        lines = (self.__partial + data).split('\n')
+        self.__partial = lines.pop()
+        for line in lines:
+            if line.strip():
+                self.Received.append(line.strip())
+                self.Handle(line, self.__Command)
+
+    def Count(self, verb):
+        return sum(1 for line in self.Received if line.split(' ', 1)[0] == verb)
+
+    def Poll(self, name, ctrlIDs):
+        self.Reply(b''.join(self.__Value(ctrlID) for ctrlID in ctrlIDs) + b'cgpa\r\n')
+
+    def __Value(self, ctrlID):
+        if ctrlID in self.Meters:
+            level = self.Meters[ctrlID]
+            return 'cvv "{0}" 2 "{1}dB" "{1}dB" 2 {1} {1} 2 0.5 0.5\r\n'.format(ctrlID, level).encode()
+        string, value, position = self.Controls[ctrlID]
+        return 'cv "{0}" "{1}" {2} {3}\r\n'.format(ctrlID, string, value, position).encode()
+
+    def __Command(self, line):
+        words = [word.strip('"') for word in re.findall(r'"[^"]*"|\S+', line)]
+        verb, args = words[0], words[1:]
+        if verb == 'sg':
+            self.Reply('sr "{0}" "core" 1 1\r\n'.format(self.Design).encode())
+        elif verb == 'get':
+            if args[0] in self.Controls or args[0] in self.Meters:
+                self.Reply(self.__Value(args[0]))
+            else:
+                self.Reply(b'bad_id "%s"\r\n' % args[0].encode())
+        elif verb == 'csv':
+            self.SetControl(args[0], args[1])
+            self.Reply(self.__Value(args[0]))
+        elif verb == 'cgc':
+            self.Groups[args[0]] = {'Controls': [], 'Rate': None, 'Due': 0, 'Last': {}}
+        elif verb == 'cga':
+            self.AddToGroup(args[0], [args[1]])
+        elif verb == 'cgsna':
+            self.AutoPoll(args[0], int(args[1]))
+        elif verb == 'cgd':
+            self.Groups.pop(args[0], None)
+
+
+class QRCEmulator(Core):
+
+    def __init__(self, controls, design='TestDesign', ServiceTime=0, Latency=0):
+        Core.__init__(self, controls, design, ServiceTime, Latency)
+        self.__partial = b''
+
+    def Attach(self, driver):
+        Core.Attach(self, driver)
+        driver.Wire = self.Receive
+        return self
+
+    def Receive(self, data):
+        messages = (self.__partial + data).split(b'\x00')
+        self.__partial = messages.pop()
+        for message in messages:
+            if message.strip():
+                request = json.loads(message.decode())
+                self.Received.append(request)
+                self.Handle(request, self.__Request)
+
+    def Count(self, method):
+        return sum(1 for request in self.Received if request['method'] == method)
+
+    def Poll(self, name, ctrlIDs):
+        self.__Send({'jsonrpc': '2.0', 'method': 'ChangeGroup.Poll',
+                     'params': {'Id': name, 'Changes': [self.__State(ctrlID) for ctrlID in ctrlIDs]}})
+
+    def __Send(self, message):
+        self.Reply(json.dumps(message).encode() + b'\x00')
+
+    def __State(self, ctrlID):
+        if ctrlID in self.Meters:
+            level = self.Meters[ctrlID]
+            return {'Name': ctrlID, 'String': '{0}dB'.format(level), 'Value': level, 'Position': 0.5}
+        string, value, position = self.Controls[ctrlID]
+        return {'Name': ctrlID, 'String': string, 'Value': value, 'Position': position}
+
+    def __Request(self, request):
+        method, params = request['method'], request.get('params')
+        reply = {'jsonrpc': '2.0', 'id': request['id']}
+        if method == 'Control.Get':
+            unknown = [name for name in params if name not in self.Controls and name not in self.Meters]
+            if unknown:
+                reply['error'] = {'code': 8, 'message': 'Unknown control ' + unknown[0]}
+            else:
+                reply['result'] = [self.__State(name) for name in params]
+        elif method == 'Control.Set':
+            controls = params if isinstance(params, list) else [params]
+            for control in controls:
+                self.SetControl(control['Name'], control['Value'])
+            reply['result'] = [self.__State(control['Name']) for control in controls]
+        elif method == 'ChangeGroup.AddControl':
+            self.AddToGroup(params['Id'], params['Controls'])
+            reply['result'] = True
+        elif method == 'ChangeGroup.AutoPoll':
+            self.AutoPoll(params['Id'], int(params['Rate'] * 1000))
+            reply['result'] = True
+        elif method == 'StatusGet':
+            reply['result'] = {'DesignName': self.Design, 'DesignCode': 'core', 'IsRedundant': False,
+                               'IsEmulator': True}
+        elif method in ('NoOp', 'Logon'):
+            reply['result'] = True
+        else:
+            reply['error'] = {'code': -32601, 'message': 'Method not found'}
+        self.__Send(reply)
@@ -0,0 +1,84 @@
+"""CoalescingQueue from SC_DriverSupport: latest value wins, calls on the device never overlap."""
+import threading
+import time
+
+from extronlib.system import Wait
+from SC_DriverSupport import CoalescingQueue
+
+
+class Device:
+    """Records the calls made on it and how many were in progress at once."""
+
+    def __init__(self, Delay=0):
+        self.Delay = Delay
+        self.Calls = []
+        self.Active = 0
+        self.MostActive = 0
+        self.__lock = threading.Lock()
+
+    def Set(self, command, value, qualifier=None):
+        self.__Enter(('Set', command, value, qualifier))
+
+    def Update(self, command, qualifier=None):
+        self.__Enter(('Update', command, None, qualifier))
+
+    def __Enter(self, call):
+        with self.__lock:
+            self.Active += 1
+            self.MostActive = max(self.MostActive, self.Active)
+        time.sleep(self.Delay)
+        with self.__lock:
+            self.Calls.append(call)
+            self.Active -= 1
+
+
+def Tag(instance):
+    return {'Instance Tag': instance, 'Channel': '1'}
+
+
+def test_latest_value_wins_in_order():
+    device = Device()
+    queue = CoalescingQueue(device, Interval=0.1)
+    queue.Set('LevelControl', -20, Tag('A'))
+    queue.Set('LevelControl', -19, Tag('A'))
+    queue.Set('MuteControl', 'On', Tag('A'))
+    queue.Set('LevelControl', -18, Tag('A'))
+    assert queue.Stats() == {'Sent': 1, 'Coalesced': 1, 'Queued': 2}
+    Wait.Advance(1)
+    assert device.Calls == [('Set', 'LevelControl', -20, Tag('A')), ('Set', 'LevelControl', -18, Tag('A')),
+                            ('Set', 'MuteControl', 'On', Tag('A'))]
+    assert queue.Stats() == {'Sent': 3, 'Coalesced': 1, 'Queued': 0}
+
+
+def test_calls_from_many_threads_never_overlap():
+    device = Device(Delay=0.01)
+    queue = CoalescingQueue(device, Interval=0.1)
+    start = threading.Barrier(8)
+
+    def Press(i):
+        start.wait()
+        queue.Set('LevelControl', i, Tag('Level%d' % i))
+    threads = [threading.Thread(target=Press, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(device.Calls) == 1
+    Wait.Advance(1)
+    assert device.MostActive == 1
+    assert sorted(call[2] for call in device.Calls) == list(range(8))
+    assert queue.Stats()['Queued'] == 0
+
+
+def test_put_during_drain_is_not_stranded():
+    device = Device()
+    queue = CoalescingQueue(device, Interval=0.1)
+    queue.Set('LevelControl', 1, Tag('A'))
+    Wait.Advance(0.1)
+    # idle again: the next call goes straight out
+    queue.Set('LevelControl', 2, Tag('A'))
+    assert device.Calls[-1] == ('Set', 'LevelControl', 2, Tag('A'))
+    queue.Set('LevelControl', 3, Tag('A'))
+    Wait.Advance(0.2)
+    assert device.Calls[-1] == ('Set', 'LevelControl', 3, Tag('A'))
+    assert queue.Stats()['Queued'] == 0
@@ -0,0 +1,75 @@
+"""MatrixTieTransaction on the DTP CrossPoint driver: which replies confirm or fail a pending transaction."""
+import pytest
+
+import extr_matrix_DTPCrossPoint_86_1084KSeriesv11000 as dtp
+from dtp_emulator import Matrix
+from extronlib.system import Wait
+
+
+def Build():
+    device = dtp.SSHClass('192.168.1.10', 22, Credentials=('admin', 'extron'), Model='DTP CrossPoint 108 4K')
+    device.Session.Confirm('Echo')
+    device.Session.Confirm('Verbose')
+    device.Set('MatrixTieTransaction', {1: 2, 3: 4}, {'Tie Type': 'Video'})
+    assert device.Sent[-1] == '\x1b+Q2*1%4*3%\r\n'
+    assert device.ReadStatus('MatrixTieTransaction') == 'Pending'
+    return device
+
+
+def test_qik_confirms_the_transaction():
+    device = Build()
+    device.ReceiveData(device, b'Qik\r\n')
+    assert device.ReadStatus('MatrixTieTransaction') == 'Confirmed'
+
+
+@pytest.mark.parametrize('code', ['10', '11', '22', '24'])
+def test_errors_from_other_commands_leave_it_pending(code):
+    device = Build()
+    device.ReceiveData(device, b'E' + code.encode() + b'\r\n')
+    assert device.ReadStatus('MatrixTieTransaction') == 'Pending'
+    device.ReceiveData(device, b'Qik\r\n')
+    assert device.ReadStatus('MatrixTieTransaction') == 'Confirmed'
+
+
+@pytest.mark.parametrize('code', ['01', '12', '13', '14'])
+def test_tie_errors_fail_it(code):
+    device = Build()
+    device.ReceiveData(device, b'E' + code.encode() + b'\r\n')
+    assert device.ReadStatus('MatrixTieTransaction') == 'Failed'
+
+
+def test_error_with_nothing_outstanding_is_ignored():
+    device = Build()
+    device.ReceiveData(device, b'Qik\r\n')
+    device.ReceiveData(device, b'E13\r\n')
+    assert device.ReadStatus('MatrixTieTransaction') == 'Confirmed'
+
+
+def test_disconnect_fails_the_transaction_and_stays_disconnected():
+    device = Build()
+    device.OnDisconnected()
+    assert device.ReadStatus('MatrixTieTransaction') == 'Failed'
+    assert device.ReadStatus('ConnectionStatus') == 'Disconnected'
+
+
+def test_transaction_while_offline_stays_disconnected():
+    device = Build()
+    device.ReceiveData(device, b'Qik\r\n')
+    device.OnDisconnected()
+    device.Set('MatrixTieTransaction', {2: 1}, {'Tie Type': 'Audio/Video'})
+    assert device.ReadStatus('MatrixTieTransaction') == 'Pending'
+    assert device.ReadStatus('ConnectionStatus') == 'Disconnected'
+
+
+def test_transaction_against_the_matrix_emulator():
+    device = Build()
+    device.ReceiveData(device, b'Qik\r\n')
+    matrix = Matrix(ServiceTime=0.01, TieTime=0.0005).Attach(device)
+    device.Set('MatrixTieTransaction', {4: 1, 5: 1, 6: 3}, {'Tie Type': 'Audio'})
+    Wait.Advance(0.01)
+    assert device.ReadStatus('MatrixTieTransaction') == 'Pending'
+    Wait.Advance(0.01)
+    assert device.ReadStatus('MatrixTieTransaction') == 'Confirmed'
+    assert matrix.Ties['Aud'][3:6] == [1, 1, 3]
+    assert [device.ReadStatus('OutputTieStatus', {'Output': str(output), 'Tie Type': 'Audio'})
+            for output in (4, 5, 6)] == ['1', '1', '3']
@@ -0,0 +1,65 @@
+"""TieWriteStats on the DTP CrossPoint driver: the tie status writes made and skipped after each refresh or tie."""
+import extr_matrix_DTPCrossPoint_86_1084KSeriesv11000 as dtp
+
+
+def Refresh(device, video, audio):
+    device.UpdateAllMatrixTie(None, None)
+    device.ReceiveData(device, b'Vgp00 Out01*' + b' '.join(b'%02d' % i for i in video) + b'Vid\r\n' +
+                               b'Vgp00 Out01*' + b' '.join(b'%02d' % i for i in audio) + b'Aud\r\n')
+
+
+def Delta(device, before):
+    after = device.TieWriteStats()
+    return {key: after[key] - before[key] for key in after}
+
+
+def Build():
+    device = dtp.SSHClass('192.168.1.10', 22, Credentials=('admin', 'extron'), Model='DTP CrossPoint 108 4K')
+    Refresh(device, range(1, 9), range(1, 9))
+    return device
+
+
+def test_first_refresh_writes_the_whole_matrix():
+    device = Build()
+    # InputTieStatus for 10 inputs x 8 outputs, OutputTieStatus for 3 tie types x 8 outputs
+    assert device.TieWriteStats() == {'Written': 80 + 24, 'Suppressed': 0}
+    assert device.ReadStatus('InputTieStatus', {'Input': '10', 'Output': '8'}) == 'Untied'
+
+
+def test_unchanged_refresh_writes_nothing():
+    device = Build()
+    before = device.TieWriteStats()
+    Refresh(device, range(1, 9), range(1, 9))
+    assert Delta(device, before) == {'Written': 0, 'Suppressed': 104}
+
+
+def test_refresh_writes_the_changed_output_only():
+    device = Build()
+    before = device.TieWriteStats()
+    Refresh(device, [1, 9, 3, 4, 5, 6, 7, 8], range(1, 9))
+    # inputs 2 and 9 on output 2, and its three tie types
+    assert Delta(device, before) == {'Written': 2 + 3, 'Suppressed': 78 + 21}
+    assert device.ReadStatus('InputTieStatus', {'Input': '2', 'Output': '2'}) == 'Audio'
+    assert device.ReadStatus('InputTieStatus', {'Input': '9', 'Output': '2'}) == 'Video'
+    assert device.ReadStatus('OutputTieStatus', {'Output': '2', 'Tie Type': 'Audio/Video'}) == '0'
+
+
+def test_individual_tie_writes_its_output():
+    device = Build()
+    before = device.TieWriteStats()
+    device.ReceiveData(device, b'Out04 In00 Aud\r\n')
+    assert Delta(device, before) == {'Written': 1 + 3, 'Suppressed': 9}
+    assert device.ReadStatus('InputTieStatus', {'Input': '4', 'Output': '4'}) == 'Video'
+
+
+def test_names_becoming_known_rewrite_every_output():
+    device = Build()
+    device.ReceiveData(device, b'Nmo8,Projector\r\n')
+    before = device.TieWriteStats()
+    Refresh(device, range(1, 9), range(1, 9))
+    # tie and name statuses for 3 tie types x 8 outputs; the crosspoints did not move
+    assert Delta(device, before) == {'Written': 48, 'Suppressed': 80}
+    assert device.ReadStatus('OutputTieStatusName', {'Output': '1', 'Tie Type': 'Video'}) == 'Untied'
+    before = device.TieWriteStats()
+    Refresh(device, range(1, 9), range(1, 9))
+    assert Delta(device, before) == {'Written': 0, 'Suppressed': 128}
@@ -0,0 +1,39 @@
+"""SetGroup on the NAVigator driver: packed writes, per-endpoint tracking and the 'GroupCommand' status."""
+import extr_sm_NAVigator_v1_0_1_2 as nav
+
+
+def Build():
+    device = nav.SPIClass('NAVigator', Model='NAVigator')
+    device.Session.Confirm('Verbose')
+    return device
+
+
+def test_group_completes_when_every_endpoint_answers():
+    device = Build()
+    device.SetGroup('VideoMuteDecoder', 'On', [3, 1, 3])
+    assert device.Sent[-1] == '{3o:1B\r}\r{1o:1B\r}\r'
+    assert device.GroupPending('VideoMuteDecoder') == [1, 3]
+    assert device.ReadStatus('GroupCommand', {'Command': 'VideoMuteDecoder'}) == 'Pending'
+    device.ReceiveData(device, b'{1o}Vmt1\r\n{3o}Vmt1\r\n')
+    assert device.GroupPending('VideoMuteDecoder') == []
+    assert device.ReadStatus('GroupCommand', {'Command': 'VideoMuteDecoder'}) == 'Complete'
+
+
+def test_group_while_offline_does_not_mark_the_device_connected():
+    device = Build()
+    device.OnDisconnected()
+    assert device.ReadStatus('ConnectionStatus') == 'Disconnected'
+    device.SetGroup('VideoMuteDecoder', 'On', [1, 2])
+    assert device.ReadStatus('GroupCommand', {'Command': 'VideoMuteDecoder'}) == 'Pending'
+    assert device.ReadStatus('ConnectionStatus') == 'Disconnected'
+
+
+def test_unidirectional_group_is_sent_untracked():
+    device = Build()
+    device.Unidirectional = 'True'
+    del device.Sent[:]
+    device.SetGroup('VideoMuteDecoder', 'On', [1, 2])
+    # straight out, without the verbose-mode handshake
+    assert device.Sent == ['{1o:1B\r}\r{2o:1B\r}\r']
+    assert device.GroupPending('VideoMuteDecoder') == []
+    assert device.ReadStatus('GroupCommand', {'Command': 'VideoMuteDecoder'}) is None
@@ -0,0 +1,78 @@
+"""Inventory reports on the NAVigator driver: only the endpoints whose state changed are written."""
+import extr_sm_NAVigator_v1_0_1_2 as nav
+
+
+def Inventory(states, direction=b'I'):
+    report = bytearray(b'0' * 4096)
+    for id_, state in states.items():
+        report[id_ - 1] = ord(state)
+    return b'Rprt*Inventory*' + direction + b'*' + bytes(report) + b'\r\n'
+
+
+def Build():
+    device = nav.SPIClass('NAVigator', Model='NAVigator')
+    writes = []
+    device.SubscribeStatus('DeviceConnectionStatusEncoder', None,
+                           lambda command, value, qualifier: writes.append((qualifier['ID'], value)))
+    return device, writes
+
+
+def test_first_inventory_writes_every_configured_endpoint():
+    device, writes = Build()
+    device.ReceiveData(device, Inventory({1: '1', 2: '2', 4096: '1'}))
+    assert writes == [(1, 'Connected'), (2, 'Disconnected'), (4096, 'Connected')]
+    assert device.InputList == {1, 4096}
+
+
+def test_unchanged_inventory_writes_nothing():
+    device, writes = Build()
+    device.ReceiveData(device, Inventory({1: '1', 2: '2'}))
+    del writes[:]
+    device.ReceiveData(device, Inventory({1: '1', 2: '2'}))
+    assert writes == []
+
+
+def test_only_changed_endpoints_are_written():
+    device, writes = Build()
+    states = {id_: '1' for id_ in range(1, 201)}
+    device.ReceiveData(device, Inventory(states))
+    del writes[:]
+    states.update({70: '2', 130: '2', 300: '1'})
+    device.ReceiveData(device, Inventory(states))
+    assert writes == [(70, 'Disconnected'), (130, 'Disconnected'), (300, 'Connected')]
+    assert 70 not in device.InputList and 300 in device.InputList
+
+
+def test_unconfigured_endpoint_leaves_the_presence_set():
+    device, writes = Build()
+    device.ReceiveData(device, Inventory({5: '1'}))
+    device.ReceiveData(device, Inventory({}))
+    assert device.InputList == set()
+    assert device.ReadStatus('DeviceConnectionStatusEncoder', {'ID': 5}) == 'Connected'
+
+
+def test_connection_event_between_reports():
+    device, writes = Build()
+    device.ReceiveData(device, Inventory({5: '1', 6: '1'}))
+    del writes[:]
+    device.ReceiveData(device, b'DevpC*5i*0\r\n')
+    assert writes == [(5, 'Disconnected')]
+    device.ReceiveData(device, Inventory({5: '1', 6: '1'}))
+    assert writes == [(5, 'Disconnected'), (5, 'Connected')]
+
+
+def test_decoders_are_kept_apart():
+    device, writes = Build()
+    device.ReceiveData(device, Inventory({3: '1'}, b'O'))
+    assert writes == []
+    assert device.OutputList == {3}
+    assert device.ReadStatus('DeviceConnectionStatusDecoder', {'ID': 3}) == 'Connected'
+
+
+def test_report_after_reconnect_is_applied_in_full():
+    device, writes = Build()
+    device.ReceiveData(device, Inventory({5: '1'}))
+    device.OnDisconnected()
+    assert device.InputList == set()
+    device.ReceiveData(device, Inventory({5: '1'}))
+    assert device.InputList == {5}
@@ -0,0 +1,106 @@
+"""The J inventory on the NAVigator driver, read a device record at a time as it arrives."""
+import json
+
+import pytest
+
+import extr_sm_NAVigator_v1_0_1_2 as nav
+
+COMMANDS = ('DeviceNameEncoder', 'DeviceTagsEncoder', 'DeviceLocationEncoder',
+            'DeviceNameDecoder', 'DeviceTagsDecoder', 'DeviceLocationDecoder')
+
+
+def Record(channel, model='NAV E 101', name=None, tags=('Lobby',), location='Rack 1', **extra):
+    record = {'name': name or 'Endpoint {0}'.format(channel), 'model': model, 'channel': channel, 'tags': list(tags),
+              'location': location}
+    record.update(extra)
+    return record
+
+
+def Inventory(*records):
+    return json.dumps(list(records)).encode() + b'\r\n'
+
+
+def Build(engine='Legacy'):
+    device = nav.SPIClass('NAVigator', Model='NAVigator')
+    device.MatchEngine = engine
+    writes = []
+    for command in COMMANDS:
+        device.SubscribeStatus(command, None, lambda command, value, qualifier: writes.append(
+            (command, qualifier['ID'], value)))
+    return device, writes
+
+
+@pytest.fixture(params=['Legacy', 'Lines'])
+def engine(request):
+    return request.param
+
+
+def test_every_record_is_written(engine):
+    device, writes = Build(engine)
+    device.ReceiveData(device, Inventory(Record(1), Record(2, model='NAV SD 101', tags=('A', 'B'))))
+    assert writes == [('DeviceNameEncoder', 1, 'Endpoint 1'), ('DeviceTagsEncoder', 1, 'Lobby'),
+                      ('DeviceLocationEncoder', 1, 'Rack 1'), ('DeviceNameDecoder', 2, 'Endpoint 2'),
+                      ('DeviceTagsDecoder', 2, 'A, B'), ('DeviceLocationDecoder', 2, 'Rack 1')]
+
+
+def test_record_split_across_chunks(engine):
+    device, writes = Build(engine)
+    data = Inventory(Record(1), Record(2))
+    middle = data.index(b'"model"', data.index(b'Endpoint 2'))
+    for chunk in (data[:middle], data[middle:middle + 5], data[middle + 5:]):
+        device.ReceiveData(device, chunk)
+    assert device.ReadStatus('DeviceNameEncoder', {'ID': 2}) == 'Endpoint 2'
+    assert len(writes) == 6
+
+
+def test_inventory_larger_than_the_receive_buffer(engine):
+    device, writes = Build(engine)
+    data = Inventory(*(Record(channel, location='Building 4, floor {0}'.format(channel % 9))
+                       for channel in range(1, 2001)))
+    assert len(data) > 10000
+    for start in range(0, len(data), 1400):
+        device.ReceiveData(device, data[start:start + 1400])
+        assert len(device._DeviceClass__receiveBuffer.Data) < 1500
+    assert len(writes) == 6000
+    assert device.ReadStatus('DeviceLocationEncoder', {'ID': 2000}) == 'Building 4, floor 2'
+
+
+def test_unchanged_records_write_nothing():
+    device, writes = Build()
+    device.ReceiveData(device, Inventory(Record(1), Record(2)))
+    del writes[:]
+    device.ReceiveData(device, Inventory(Record(1), Record(2)))
+    assert writes == []
+
+
+def test_renamed_record_writes_only_its_name():
+    device, writes = Build()
+    device.ReceiveData(device, Inventory(Record(1), Record(2)))
+    del writes[:]
+    device.ReceiveData(device, Inventory(Record(1), Record(2, name='Stage left')))
+    assert writes == [('DeviceNameEncoder', 2, 'Stage left')]
+
+
+def test_tags_report_updates_the_kept_tags():
+    device, writes = Build()
+    device.ReceiveData(device, Inventory(Record(1)))
+    device.ReceiveData(device, b'{1i}Dtag {"tags":["Stage"]}\r\n')
+    assert device.ReadStatus('DeviceTagsEncoder', {'ID': 1}) == 'Stage'
+    del writes[:]
+    # the inventory restores the old tags, which differ from the last written
+    device.ReceiveData(device, Inventory(Record(1)))
+    assert writes == [('DeviceTagsEncoder', 1, 'Lobby')]
+
+
+def test_objects_without_a_model_are_left_alone():
+    device, writes = Build()
+    device.ReceiveData(device, b'[{"port":1,"neighbor":{"name":"switch-1","channel":4}}]\r\n')
+    assert writes == []
+
+
+def test_escapes_and_nested_objects(engine):
+    device, writes = Build(engine)
+    record = Record(1, name='Say "hi" {now}', location='A\\B, [north]', network={'ip': '10.0.0.1', 'tag': '}'})
+    device.ReceiveData(device, Inventory(record))
+    assert device.ReadStatus('DeviceNameEncoder', {'ID': 1}) == 'Say "hi" {now}'
+    assert device.ReadStatus('DeviceLocationEncoder', {'ID': 1}) == 'A\\B, [north]'
@@ -0,0 +1,79 @@
+"""The wTies*A*RPRT report on the NAVigator driver, applied a row at a time as it arrives."""
+import pytest
+
+import extr_sm_NAVigator_v1_0_1_2 as nav
+
+HEADER = b'Output\t InVid\t InAud\r\n'
+
+
+def Row(output, video, audio):
+    item = lambda input_: b'----' if not input_ else b'%4d' % input_
+    return b'   %4d\t  %s\t  %s\r\n' % (output, item(video), item(audio))
+
+
+def Build(engine):
+    device = nav.SPIClass('NAVigator', Model='NAVigator')
+    device.MatchEngine = engine
+    return device
+
+
+def Ties(device, output):
+    return tuple(device.ReadStatus('OutputTieStatus', {'Output': output, 'Tie Type': tieType})
+                 for tieType in ('Video', 'Audio', 'Audio/Video'))
+
+
+@pytest.fixture(params=['Legacy', 'Lines'])
+def engine(request):
+    return request.param
+
+
+def test_row_split_across_chunks(engine):
+    device = Build(engine)
+    report = HEADER + Row(1, 12, 12) + Row(2, 30, 0) + Row(3, 0, 0) + b'\r\n'
+    middle = report.index(b'30')
+    for chunk in (report[:middle], report[middle:middle + 3], report[middle + 3:]):
+        device.ReceiveData(device, chunk)
+    assert Ties(device, 1) == (12, 12, 12)
+    assert Ties(device, 2) == (30, 0, 0)
+    assert Ties(device, 3) == (0, 0, 0)
+
+
+def test_row_waits_for_the_byte_after_its_line_end(engine):
+    device = Build(engine)
+    device.ReceiveData(device, HEADER + Row(1, 12, 12))
+    # until the next byte arrives the row could be the last one, so it is not applied yet
+    assert Ties(device, 1) == (None, None, None)
+    device.ReceiveData(device, Row(2, 5, 6)[:1])
+    assert Ties(device, 1) == (12, 12, 12)
+    device.ReceiveData(device, Row(2, 5, 6)[1:] + b'\r\n')
+    assert Ties(device, 2) == (5, 6, 0)
+
+
+def test_report_larger_than_the_receive_buffer(engine):
+    device = Build(engine)
+    outputs = 2000
+    report = HEADER + b''.join(Row(output, output % 700 + 1, output % 300 + 1) for output in range(1, outputs + 1)) + b'\r\n'
+    assert len(report) > 10000
+    for start in range(0, len(report), 1400):
+        device.ReceiveData(device, report[start:start + 1400])
+        assert len(device._DeviceClass__receiveBuffer.Data) < 1500
+    assert Ties(device, 1) == (2, 2, 2)
+    assert Ties(device, 302) == (303, 3, 0)
+    assert Ties(device, 1999) == (600, 200, 0)
+    assert device.TiedOutputs(2) == [1, 701, 1401]
+
+
+def test_outputs_left_out_of_the_report_are_untied(engine):
+    device = Build(engine)
+    device.ReceiveData(device, HEADER + Row(1, 4, 4) + Row(2, 4, 4) + Row(3, 4, 4) + b'\r\n')
+    device.ReceiveData(device, HEADER + Row(2, 4, 4) + b'\r\n')
+    assert device.TiedOutputs(4) == [2]
+
+
+def test_header_is_applied_ahead_of_the_rows_after_it(engine):
+    device = Build(engine)
+    report = HEADER + Row(1, 4, 4) + Row(2, 4, 4) + Row(3, 4, 4) + b'\r\n'
+    middle = report.index(Row(3, 4, 4))
+    device.ReceiveData(device, report[:middle])
+    device.ReceiveData(device, report[middle:])
+    assert device.TiedOutputs(4) == [1, 2, 3]
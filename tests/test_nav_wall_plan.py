@@ -0,0 +1,83 @@
+"""Wall plans on the NAVigator driver: CompileWallPlan, RecallWallPlan and the 'WallPlan' status."""
+import extr_sm_NAVigator_v1_0_1_2 as nav
+
+
+def Build():
+    device = nav.SPIClass('NAVigator', Model='NAVigator')
+    device.Session.Confirm('Verbose')
+    device.CompileWallPlan('A', {1: {1: 10, 2: 11, 3: 12}})
+    device.CompileWallPlan('B', {1: {3: 20, 4: 21}})
+    return device
+
+
+def Report(device, Canvas, Window, Input):
+    device.ReceiveData(device, 'Grp{0:02d} Win{1:02d} In{2}\r\n'.format(Canvas, Window, Input).encode())
+
+
+def test_plan_completes_when_every_window_reports():
+    device = Build()
+    device.RecallWallPlan('A')
+    assert device.Sent[-1] == '\x1b1*1*10!X\r\x1b1*2*11!X\r\x1b1*3*12!X\r'
+    Report(device, 1, 1, 10)
+    Report(device, 1, 2, 11)
+    assert device.ReadStatus('WallPlan', {'Plan': 'A'}) == 'Pending'
+    assert device.WallPlanPending('A') == [(1, 3)]
+    Report(device, 1, 3, 12)
+    assert device.ReadStatus('WallPlan', {'Plan': 'A'}) == 'Complete'
+
+
+def test_partly_overwritten_plan_is_superseded():
+    device = Build()
+    device.RecallWallPlan('A')
+    device.RecallWallPlan('B')
+    Report(device, 1, 1, 10)
+    Report(device, 1, 2, 11)
+    assert device.ReadStatus('WallPlan', {'Plan': 'A'}) == 'Superseded'
+    Report(device, 1, 3, 20)
+    Report(device, 1, 4, 21)
+    assert device.ReadStatus('WallPlan', {'Plan': 'B'}) == 'Complete'
+
+
+def test_subscriber_may_recall_on_cancel():
+    device = Build()
+    recalled = []
+
+    def Recall(command, value, qualifier):
+        if value == 'Cancelled':
+            recalled.append(qualifier['Plan'])
+            device.RecallWallPlan(qualifier['Plan'])
+    device.SubscribeStatus('WallPlan', {'Plan': 'A'}, Recall)
+    device.SubscribeStatus('WallPlan', {'Plan': 'B'}, Recall)
+    device.RecallWallPlan('A')
+    device.RecallWallPlan('B')
+    device.OnDisconnected()
+    assert sorted(recalled) == ['A', 'B']
+    assert device.ReadStatus('WallPlan', {'Plan': 'A'}) == 'Pending'
+    assert device.WallPlanPending('B') == [(1, 3), (1, 4)]
+
+
+def test_disconnect_with_a_plan_pending_stays_disconnected():
+    device = Build()
+    device.RecallWallPlan('A')
+    device.OnDisconnected()
+    assert device.ReadStatus('WallPlan', {'Plan': 'A'}) == 'Cancelled'
+    assert device.ReadStatus('ConnectionStatus') == 'Disconnected'
+
+
+def test_recall_while_offline_stays_disconnected():
+    device = Build()
+    device.OnDisconnected()
+    device.RecallWallPlan('A')
+    device.RecallWallPlan('B')
+    assert device.ReadStatus('WallPlan', {'Plan': 'A'}) == 'Pending'
+    assert device.ReadStatus('ConnectionStatus') == 'Disconnected'
+
+
+def test_unidirectional_plan_is_sent_untracked():
+    device = Build()
+    device.Unidirectional = 'True'
+    del device.Sent[:]
+    device.RecallWallPlan('A')
+    assert device.Sent == ['\x1b1*1*10!X\r\x1b1*2*11!X\r\x1b1*3*12!X\r']
+    assert device.WallPlanPending('A') == []
+    assert device.ReadStatus('WallPlan', {'Plan': 'A'}) is None
@@ -0,0 +1,112 @@
+"""ChainScheduler on the NEC serial driver, against a simulated RS-232 chain of displays."""
+import threading
+import time
+
+import pytest
+
+import nec_display_P_V_X_Series_v1_4_1_0 as nec
+from nec_emulator import Chain, Display
+
+
+@pytest.fixture
+def Build(monkeypatch):
+    def Build(ids, silent=(), **kwargs):
+        device = nec.SerialClass('ProcessorDevice', 'COM1')
+        chain = Chain([Display(0x40 + i, Silent=i in silent) for i in ids]).Attach(device)
+        monkeypatch.setattr(nec, 'monotonic', lambda: chain.Now)
+        scheduler = device.Chain = nec.ChainScheduler(device, **kwargs)
+        return device, chain, scheduler
+    return Build
+
+
+def test_polls_round_robin_over_the_chain(Build):
+    device, chain, scheduler = Build([1, 2, 3])
+    for i in (1, 2, 3):
+        scheduler.Add(i, ['Power', 'Input'])
+    for i in range(7):
+        assert scheduler.Step()
+    assert chain.Calls == [(1, 'A'), (2, 'A'), (3, 'A'), (1, 'C'), (2, 'C'), (3, 'C'), (1, 'A')]
+    assert device.ReadStatus('Input', {'Device ID': '3'}) == 'HDMI'
+    stats = scheduler.Stats()
+    assert stats['1']['Responses'] == 3 and stats['1']['Last'] == pytest.approx(0.04)
+
+
+def test_sets_go_ahead_of_the_polls(Build):
+    device, chain, scheduler = Build([1, 2, 3])
+    for i in (1, 2, 3):
+        scheduler.Add(i, ['Power'])
+    scheduler.Step()
+    scheduler.Set('Volume', 40, {'Device ID': '3'})
+    scheduler.Set('Volume', 50, {'Device ID': '2'})
+    scheduler.Set('Volume', 45, {'Device ID': '3'})     # replaces the first, behind the Set queued after it
+    scheduler.Step()
+    scheduler.Step()
+    scheduler.Step()
+    assert chain.Calls == [(1, 'A'), (2, 'E'), (3, 'E'), (2, 'A')]
+    assert chain.Displays[0x42].Parameters[b'0062'][1] == 50
+    assert chain.Displays[0x43].Parameters[b'0062'][1] == 45
+
+
+def test_offline_display_penalty_doubles_up_to_the_maximum(Build):
+    device, chain, scheduler = Build([1, 2, 3], silent=[2], Penalty=1, MaxPenalty=4)
+    for i in (1, 2, 3):
+        scheduler.Add(i, ['Power'])
+    penalties = []
+    attempts = []
+    while chain.Now < 20:
+        until = chain.Now + scheduler.Stats()['2']['Penalty']
+        scheduler.Step()
+        if chain.Calls[-1][0] == 2:
+            attempts.append(chain.Now)
+            # never polled while its penalty runs
+            assert chain.Now - device.DefaultResponseTimeout >= until - 1e-9
+            penalties.append(round(scheduler.Stats()['2']['Penalty'], 6))
+    assert penalties[:5] == [1, 2, 4, 4, 4]
+    stats = scheduler.Stats()
+    assert stats['2']['Timeouts'] == len(attempts) and stats['2']['Skipped'] > 0 and stats['2']['Responses'] == 0
+    # the displays that answer are polled far more often than the one that does not
+    assert stats['1']['Responses'] > 5 * stats['2']['Timeouts']
+
+
+def test_penalty_resets_once_the_display_answers(Build):
+    device, chain, scheduler = Build([1, 2], silent=[2], Penalty=1, MaxPenalty=4)
+    scheduler.Add(1, ['Power'])
+    scheduler.Add(2, ['Power'])
+    while scheduler.Stats()['2']['Timeouts'] < 3:
+        scheduler.Step()
+    chain.Displays[0x42].Silent = False
+    while scheduler.Stats()['2']['Responses'] < 1:
+        scheduler.Step()
+    assert scheduler.Stats()['2']['Penalty'] == 0
+    chain.Displays[0x42].Silent = True
+    while scheduler.Stats()['2']['Timeouts'] < 4:
+        scheduler.Step()
+    assert scheduler.Stats()['2']['Penalty'] == pytest.approx(1)
+
+
+def test_sets_from_many_threads(Build):
+    device, chain, scheduler = Build(range(1, 101))
+    for i in range(1, 101):
+        scheduler.Add(i, ['Power'])
+    stop = threading.Event()
+
+    def Press(first):
+        for i in range(first, first + 25):
+            for value in (10, 20, i):
+                scheduler.Set('Volume', value, {'Device ID': str(i)})
+
+    def Run():
+        while not stop.is_set():
+            scheduler.Step()
+    stepping = threading.Thread(target=Run)
+    stepping.start()
+    pressing = [threading.Thread(target=Press, args=(first,)) for first in (1, 26, 51, 76)]
+    for thread in pressing:
+        thread.start()
+    for thread in pressing:
+        thread.join()
+    deadline = time.monotonic() + 10
+    while any(display.Parameters[b'0062'][1] != display.DeviceID - 0x40 for display in chain.Displays.values()):
+        assert time.monotonic() < deadline
+    stop.set()
+    stepping.join()
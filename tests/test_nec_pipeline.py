@@ -0,0 +1,141 @@
+"""The pipelined request engine of the NEC Ethernet driver, against the emulated displays of nec_emulator."""
+import queue
+import threading
+
+import pytest
+
+import nec_display_P_V_X_Series_v1_4_1_0 as nec
+from extronlib.system import Wait
+from nec_emulator import Display, Frame
+
+STATUS = ('Power', 'Input', 'Volume', 'AudioMute', 'VideoMute')
+
+
+@pytest.fixture(autouse=True)
+def VirtualClock(monkeypatch):
+    monkeypatch.setattr(nec, 'monotonic', lambda: Wait.Now)
+
+
+def Build(**kwargs):
+    device = nec.EthernetClass('192.168.1.30', 7142)
+    display = Display(**kwargs).Attach(device)
+    return device, display
+
+
+def test_full_status_poll_is_pipelined():
+    device, display = Build()
+    answered = []
+    for command in STATUS:
+        device.UpdateAsync(command, Callback=lambda command, value, qualifier: answered.append(Wait.Now))
+    # two queries go out at once; the caller is not held up
+    assert [frame[8:12] for time, frame in display.Received] == [b'01D6', b'0060']
+    Wait.Advance(1)
+    assert [device.ReadStatus(command) for command in STATUS] == ['On', 'HDMI', 30, 'Off', 'Off']
+    assert device.RequestStats() == {'Completed': 5, 'TimedOut': 0, 'Outstanding': 0, 'Queued': 0}
+    # one query at a time takes 5 round trips of 40 ms; two in flight keep the display busy from the second one on
+    assert max(answered) == pytest.approx(0.12)
+
+
+def test_no_more_than_pipeline_depth_in_flight():
+    device, display = Build()
+    device.PipelineDepth = 3
+    for command in STATUS:
+        device.Update(command)
+    assert len(display.Received) == 3
+    assert device.RequestStats()['Queued'] == 2
+    Wait.Advance(1)
+    assert len(display.Received) == 5
+
+
+def test_set_is_sent_alone():
+    device, display = Build()
+    device.Update('Input')
+    device.Update('Volume')
+    device.Set('Volume', 40)
+    device.Update('AudioMute')
+    assert len(display.Received) == 2
+    Wait.Advance(0.085)     # both queries answered, the Set in flight on its own
+    assert [frame[4] for time, frame in display.Received] == [ord('C'), ord('C'), ord('E')]
+    Wait.Advance(1)
+    assert display.Parameters[b'0062'][1] == 40
+    assert [frame[4] for time, frame in display.Received] == [ord('C'), ord('C'), ord('E'), ord('C')]
+
+
+def test_parameter_replies_are_matched_by_op_code():
+    device = nec.EthernetClass('192.168.1.30', 7142)
+    device.Update('Input')
+    device.Update('Volume')
+    device.ReceiveData(device, Frame(0x41, ord('D'), b'0000620000640021'))
+    device.ReceiveData(device, Frame(0x41, ord('D'), b'000060000012000F'))
+    assert device.ReadStatus('Volume') == 0x21
+    assert device.ReadStatus('Input') == 'DisplayPort'
+
+
+def test_callbacks_complete_with_the_parsed_value():
+    device, display = Build()
+    results = []
+    record = lambda command, value, qualifier: results.append((command, value))
+    device.UpdateAsync('Input', Callback=record)
+    device.SetAsync('Volume', 55, Callback=record)
+    device.UpdateAsync('Volume', Callback=record)
+    device.SetAsync('Volume', 500, Callback=record)     # out of range, never sent
+    assert results == [('Volume', None)]
+    Wait.Advance(1)
+    assert results == [('Volume', None), ('Input', 'HDMI'), ('Volume', 55), ('Volume', 55)]
+
+
+def test_silent_display_times_out_every_request():
+    device, display = Build(Silent=True)
+    results = []
+    for command in STATUS:
+        device.UpdateAsync(command, Callback=lambda command, value, qualifier: results.append((command, value)))
+    Wait.Advance(1)
+    assert sorted(results) == sorted((command, None) for command in STATUS)
+    assert device.RequestStats() == {'Completed': 0, 'TimedOut': 5, 'Outstanding': 0, 'Queued': 0}
+
+
+def test_disconnect_drops_requests_and_calls_back():
+    device, display = Build()
+    results = []
+    for command in STATUS:
+        device.UpdateAsync(command, Callback=lambda command, value, qualifier: results.append(value))
+    device.OnDisconnected()
+    assert results == [None] * 5
+    assert device.RequestStats()['Outstanding'] == device.RequestStats()['Queued'] == 0
+
+
+def test_requests_from_many_threads():
+    device = nec.EthernetClass('192.168.1.30', 7142)
+    display = Display()
+    frames = queue.Queue()
+    device.Wire = frames.put
+
+    def Answer():
+        while True:
+            frame = frames.get()
+            if frame is None:
+                return
+            device.ReceiveData(device, display.Reply(frame))
+    answering = threading.Thread(target=Answer)
+    answering.start()
+
+    results = []
+
+    # each poller waits for its round, so no more than 15 Updates are ever unanswered (connectionCounter)
+    def Poll():
+        done = threading.Semaphore(0)
+        for i in range(50):
+            for command in STATUS:
+                device.UpdateAsync(command, Callback=lambda command, value, qualifier: (results.append(value),
+                                                                                       done.release()))
+            for command in STATUS:
+                assert done.acquire(timeout=5)
+    polling = [threading.Thread(target=Poll) for i in range(3)]
+    for thread in polling:
+        thread.start()
+    for thread in polling:
+        thread.join()
+    frames.put(None)
+    answering.join()
+    assert len(results) == 750 and None not in results
+    assert device.RequestStats() == {'Completed': 750, 'TimedOut': 0, 'Outstanding': 0, 'Queued': 0}
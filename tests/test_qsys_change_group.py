@@ -0,0 +1,111 @@
+"""SubscribeStatus(..., Mode='ChangeGroup') on the Q-Sys ECP driver, against the in-process ECP emulator."""
+import random
+
+import qsc_dsp_Q_Sys_Core_Series_v1_12_4_0 as qsys
+from qsys_emulator import ECPEmulator
+
+
+def Build(count, Mode, PollRate=1000):
+    controls = {}
+    for i in range(count):
+        controls['Gain%d' % i] = ('-20.0dB', -20.0) if i % 2 == 0 else ('unmuted', 0)
+    device = qsys.EthernetClass('192.168.1.20', 1702)
+    device.ChangeGroupPollRate = PollRate
+    core = ECPEmulator(controls).Attach(device)
+    changes = []
+    for i in range(count):
+        command = 'Gain' if i % 2 == 0 else 'Mute'
+        device.SubscribeStatus(command, {'Control ID': 'Gain%d' % i},
+                               lambda command, value, qualifier: changes.append((qualifier['Control ID'], value)),
+                               Mode=Mode)
+    return device, core, changes
+
+
+def Change(core, rng, count):
+    i = rng.randrange(count)
+    if i % 2 == 0:
+        value = round(rng.uniform(-60, 0), 1)
+        core.Change('Gain%d' % i, '{0:.1f}dB'.format(value), value)
+    else:
+        muted = rng.randrange(2)
+        core.Change('Gain%d' % i, 'muted' if muted else 'unmuted', muted)
+
+
+def Statuses(device, count):
+    return [device.ReadStatus('Gain' if i % 2 == 0 else 'Mute', {'Control ID': 'Gain%d' % i}) for i in range(count)]
+
+
+def test_group_is_built_once_and_auto_polled():
+    device, core, changes = Build(4, 'ChangeGroup', PollRate=500)
+    assert core.Received == ['get "Gain0"', 'cgc 1', 'cga 1 "Gain0"', 'cgsna 1 500',
+                             'get "Gain1"', 'cga 1 "Gain1"', 'get "Gain2"', 'cga 1 "Gain2"', 'get "Gain3"', 'cga 1 "Gain3"']
+    assert device.ChangeGroupControls() == {'ChangeGroup': {'Gain0': 'Gain', 'Gain1': 'Mute', 'Gain2': 'Gain',
+                                                            'Gain3': 'Mute'}, 'Poll': {}}
+
+
+def test_only_changes_come_back():
+    device, core, changes = Build(17, 'ChangeGroup')
+    core.Advance(1000)
+    del changes[:]
+    sent = len(core.Received)
+    core.Change('Gain4', '-6.5dB', -6.5)
+    core.Change('Gain7', 'muted', 1)
+    core.Advance(30000)
+    assert len(core.Received) == sent
+    assert sorted(changes) == [('Gain4', -6.5), ('Gain7', 'On')]
+    assert device.ReadStatus('Gain', {'Control ID': 'Gain4'}) == -6.5
+
+
+def test_same_status_as_polling_with_fewer_lines():
+    rng = {mode: random.Random(2) for mode in ('Poll', 'ChangeGroup')}
+    results = {}
+    for mode in ('Poll', 'ChangeGroup'):
+        device, core, changes = Build(100, mode)
+        del core.Received[:], core.Replies[:]
+        for interval in range(20):
+            Change(core, rng[mode], 100)
+            Change(core, rng[mode], 100)
+            if mode == 'Poll':
+                for i in range(100):
+                    device.Update('Gain' if i % 2 == 0 else 'Mute', {'Control ID': 'Gain%d' % i})
+            else:
+                core.Advance(30000)
+        results[mode] = (Statuses(device, 100), len(core.Received), sum(reply.count(b'cv ') for reply in core.Replies))
+    assert results['Poll'][0] == results['ChangeGroup'][0]
+    assert results['Poll'][1] == 2000 and results['ChangeGroup'][1] == 0
+    # the first auto-poll reports every control, then only the 40 changes
+    assert results['Poll'][2] == 2000 and results['ChangeGroup'][2] <= 140
+
+
+def test_later_subscription_only_adds_the_control():
+    device, core, changes = Build(2, 'ChangeGroup')
+    core.Controls['Gain2'] = ['-3.0dB', -3.0, 0.5]
+    del core.Received[:]
+    device.SubscribeStatus('Gain', {'Control ID': 'Gain2'}, lambda *args: None, Mode='ChangeGroup')
+    assert core.Received == ['get "Gain2"', 'cga 1 "Gain2"']
+
+
+def test_group_is_rebuilt_after_reconnect():
+    device, core, changes = Build(3, 'ChangeGroup')
+    device.OnDisconnected()
+    core.Groups.clear()
+    del core.Received[:]
+    device.Update('DesignName')
+    assert core.Received[0] == 'sg'
+    assert core.Received[1:] == ['cgc 1', 'cga 1 "Gain0"', 'cga 1 "Gain1"', 'cga 1 "Gain2"', 'cgsna 1 1000']
+    core.Change('Gain1', 'muted', 1)
+    core.Advance(1000)
+    assert device.ReadStatus('Mute', {'Control ID': 'Gain1'}) == 'On'
+
+
+def test_controls_a_group_cannot_report_are_left_to_polling():
+    device, core, changes = Build(2, 'ChangeGroup')
+    core.Meters['Meter1'] = -12.0
+    del core.Received[:]
+    device.SubscribeStatus('LevelMeter', {'Control ID': 'Meter1'}, lambda *args: None, Mode='ChangeGroup')
+    device.SubscribeStatus('DesignName', None, lambda *args: None, Mode='ChangeGroup')
+    assert core.Received == ['get "Meter1"', 'sg']
+    assert device.ChangeGroupControls()['Poll'] == {'Meter1': 'LevelMeter', None: 'DesignName'}
+    assert 'Meter1' not in core.Groups['1']['Controls']
+    assert device.ReadStatus('LevelMeter', {'Control ID': 'Meter1'}) == -12.0
+    assert device.ReadStatus('DesignName') == 'TestDesign'
@@ -0,0 +1,119 @@
+"""QRCClass, the Q-Sys driver over QRC JSON-RPC, against the in-process QRC emulator."""
+import json
+
+import qsc_dsp_Q_Sys_Core_Series_v1_12_4_0 as qsys
+from extronlib.system import Wait
+from qsys_emulator import QRCEmulator
+
+
+def Build(count=4):
+    controls = {}
+    for i in range(count):
+        controls['Gain%d' % i] = ('-20.0dB', -20.0) if i % 2 == 0 else ('unmuted', 0)
+    device = qsys.QRCClass('192.168.1.20')
+    core = QRCEmulator(controls).Attach(device)
+    return device, core
+
+
+def Requests(device):
+    return [json.loads(message) for data in device.Sent for message in data.split(b'\x00') if message]
+
+
+def test_updates_in_a_batch_window_are_one_control_get():
+    device, core = Build(6)
+    for i in range(6):
+        device.Update('Gain' if i % 2 == 0 else 'Mute', {'Control ID': 'Gain%d' % i})
+    assert core.Received == []
+    Wait.Advance(device.BatchTime)
+    assert len(device.Sent) == 1
+    assert [request['method'] for request in core.Received] == ['Control.Get']
+    assert core.Received[0]['params'] == ['Gain%d' % i for i in range(6)]
+    assert device.ReadStatus('Gain', {'Control ID': 'Gain4'}) == -20.0
+    assert device.ReadStatus('Mute', {'Control ID': 'Gain5'}) == 'Off'
+
+
+def test_sets_in_a_batch_window_are_one_control_set():
+    device, core = Build(4)
+    device.Set('Gain', -10, {'Control ID': 'Gain0'})
+    device.Set('Mute', 'On', {'Control ID': 'Gain1'})
+    device.Set('Gain', -12, {'Control ID': 'Gain2'})
+    device.Set('Gain', -8, {'Control ID': 'Gain0'})
+    Wait.Advance(device.BatchTime)
+    assert len(device.Sent) == 1
+    assert [request['method'] for request in core.Received] == ['Control.Set']
+    assert core.Received[0]['params'] == [{'Name': 'Gain0', 'Value': -8.0}, {'Name': 'Gain1', 'Value': 1.0},
+                                          {'Name': 'Gain2', 'Value': -12.0}]
+    assert core.Controls['Gain0'][1] == -8.0
+    assert device.ReadStatus('Gain', {'Control ID': 'Gain0'}) == -8.0
+    assert device.ReadStatus('Mute', {'Control ID': 'Gain1'}) == 'On'
+
+
+def test_replies_are_matched_by_id():
+    device = qsys.QRCClass('192.168.1.20')
+    device.Update('Gain', {'Control ID': 'Gain0'})
+    device.Update('DesignName')
+    device.Flush()
+    get, status = Requests(device)
+    assert (get['method'], status['method']) == ('Control.Get', 'StatusGet')
+    replies = [
+        {'jsonrpc': '2.0', 'id': status['id'], 'result': {'DesignName': 'Room1', 'DesignCode': 'x', 'IsRedundant': False,
+                                                         'IsEmulator': False}},
+        {'jsonrpc': '2.0', 'id': get['id'], 'result': [{'Name': 'Gain0', 'String': '-3.0dB', 'Value': -3.0,
+                                                        'Position': 0.8}]},
+    ]
+    data = b''.join(json.dumps(reply).encode() + b'\x00' for reply in replies)
+    device.ReceiveData(device, data[:17])
+    device.ReceiveData(device, data[17:])
+    assert device.ReadStatus('DesignName') == 'Room1'
+    assert device.ReadStatus('Gain', {'Control ID': 'Gain0'}) == -3.0
+
+
+def test_level_meters_are_read_over_qrc():
+    device, core = Build(2)
+    core.Meters['Meter1'] = -17.5
+    device.Update('LevelMeter', {'Control ID': 'Meter1'})
+    Wait.Advance(device.BatchTime)
+    assert device.ReadStatus('LevelMeter', {'Control ID': 'Meter1'}) == -17.5
+    core.Meters['Meter1'] = -6.25
+    device.Update('LevelMeter', {'Control ID': 'Meter1'})
+    Wait.Advance(device.BatchTime)
+    assert device.ReadStatus('LevelMeter', {'Control ID': 'Meter1'}) == -6.2
+
+
+def test_change_group_is_pushed_by_auto_poll():
+    device, core = Build(4)
+    device.ChangeGroupPollRate = 100
+    changes = []
+    for i in range(4):
+        device.SubscribeStatus('Gain' if i % 2 == 0 else 'Mute', {'Control ID': 'Gain%d' % i},
+                               lambda command, value, qualifier: changes.append((qualifier['Control ID'], value)),
+                               Mode='ChangeGroup')
+    Wait.Advance(device.BatchTime)
+    assert [request['method'] for request in core.Received] == ['Control.Get', 'ChangeGroup.AddControl',
+                                                                'ChangeGroup.AutoPoll']
+    assert core.Received[1]['params'] == {'Id': '1', 'Controls': ['Gain0', 'Gain1', 'Gain2', 'Gain3']}
+    assert core.Received[2]['params'] == {'Id': '1', 'Rate': 0.1}
+    core.Advance(100)
+    del changes[:]
+    core.Change('Gain2', '-4.0dB', -4.0)
+    core.Advance(100)
+    assert changes == [('Gain2', -4.0)]
+
+
+def test_keepalive_noop_when_idle():
+    device, core = Build(2)
+    device.Update('Gain', {'Control ID': 'Gain0'})
+    Wait.Advance(device.BatchTime)
+    Wait.Advance(device.KeepAliveTime - 1)
+    assert core.Count('NoOp') == 0
+    device.Update('Gain', {'Control ID': 'Gain0'})
+    Wait.Advance(device.BatchTime)
+    Wait.Advance(device.KeepAliveTime - 1)
+    assert core.Count('NoOp') == 0
+    Wait.Advance(1)
+    assert core.Count('NoOp') == 1
+    Wait.Advance(device.KeepAliveTime * 3)
+    assert core.Count('NoOp') == 4
+    device.OnDisconnected()
+    Wait.Advance(device.KeepAliveTime * 3)
+    assert core.Count('NoOp') == 4
@@ -0,0 +1,109 @@
+"""
+Parity of the SIS receive engines. Each transcript of device traffic is replayed through a driver in random chunk
+sizes, once per MatchEngine, and every engine must leave the same status and the same incomplete last line.
+
+The transcripts in tests/transcripts are synthetic: lines generated in the response formats each driver matches, not
+traffic recorded from a device. (Legacy
+also keeps complete lines no pattern matched until the buffer is capped; the line engines drop them.)
+
+On the DTP CrossPoint the Legacy engine runs each pattern over the whole buffer in turn, so when a chunk holds
+several tie lines it applies them out of order; it is compared with the others one line at a time only.
+"""
+import os
+import random
+from collections.abc import Mapping
+
+import pytest
+
+import extr_dsp_SSP_200_v1_0_0_0 as ssp
+import extr_matrix_DTPCrossPoint_86_1084KSeriesv11000 as dtp
+import extr_sm_NAVigator_v1_0_1_2 as nav
+
+TRANSCRIPTS = os.path.join(os.path.dirname(__file__), 'transcripts')
+
+
+def Transcript(name):
+    with open(os.path.join(TRANSCRIPTS, name), 'rb') as transcript:
+        return transcript.read()
+
+
+def Chunks(data, seed, smallest, largest):
+    rng = random.Random(seed)
+    chunks = []
+    i = 0
+    while i < len(data):
+        step = rng.randrange(smallest, largest)
+        chunks.append(data[i:i + step])
+        i += step
+    return chunks
+
+
+def Plain(status):
+    if isinstance(status, Mapping):
+        return {key: Plain(value) for key, value in status.items()}
+    return status
+
+
+def Replay(make, engine, chunks):
+    device = make()
+    device.MatchEngine = engine
+    for chunk in chunks:
+        device.ReceiveData(device, chunk)
+    return {command: Plain(entry['Status']) for command, entry in device.Commands.items()}, \
+        bytes(device._DeviceClass__receiveBuffer.Data).rpartition(b'\r\n')[2]
+
+
+def MakeDTP():
+    device = dtp.SSHClass('192.168.1.10', 22, Credentials=('admin', 'extron'), Model='DTP CrossPoint 108 4K')
+    device.UpdateAllMatrixTie(None, None)
+    return device
+
+
+def MakeSSP():
+    return ssp.SSHClass('192.168.1.11', 22, Credentials=('admin', 'extron'))
+
+
+def MakeNAV():
+    return nav.SPIClass('NAVigator', Model='NAVigator')
+
+
+DRIVERS = [
+    ('dtp_crosspoint.txt', MakeDTP, ('Dispatcher', 'Lines')),
+    ('ssp_200.txt', MakeSSP, ('Legacy', 'Lines')),
+    ('navigator.txt', MakeNAV, ('Legacy', 'Lines')),
+]
+
+
+@pytest.mark.parametrize('name, make, engines', DRIVERS, ids=[name for name, make, engines in DRIVERS])
+@pytest.mark.parametrize('seed, smallest, largest', [(1, 1, 8), (2, 20, 600), (3, 1000, 4000)])
+def test_engines_match(name, make, engines, seed, smallest, largest):
+    chunks = Chunks(Transcript(name), seed, smallest, largest)
+    reference = Replay(make, engines[0], chunks)
+    assert any(reference[0].values())
+    for engine in engines[1:]:
+        assert Replay(make, engine, chunks) == reference, engine
+
+
+@pytest.mark.parametrize('name, make, engines', DRIVERS, ids=[name for name, make, engines in DRIVERS])
+def test_engines_match_whole_transcript(name, make, engines):
+    chunks = [Transcript(name)]
+    reference = Replay(make, engines[0], chunks)
+    for engine in engines[1:]:
+        assert Replay(make, engine, chunks) == reference, engine
+
+
+@pytest.mark.parametrize('name, make, engines', DRIVERS, ids=[name for name, make, engines in DRIVERS])
+def test_engines_match_legacy_line_by_line(name, make, engines):
+    chunks = Transcript(name).splitlines(keepends=True)
+    reference = Replay(make, 'Legacy', chunks)
+    for engine in engines:
+        assert Replay(make, engine, chunks) == reference, engine
+
+
+def test_partial_line_is_kept_until_complete():
+    device = MakeSSP()
+    device.MatchEngine = 'Lines'
+    device.ReceiveData(device, b'Vol4')
+    assert device.ReadStatus('Volume') is None
+    device.ReceiveData(device, b'2\r\n')
+    assert device.ReadStatus('Volume') is not None
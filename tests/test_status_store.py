@@ -0,0 +1,98 @@
+"""StatusStore and the StatusView it puts in each Commands[command]['Status']."""
+import pytest
+
+import extr_matrix_DTPCrossPoint_86_1084KSeriesv11000 as dtp
+from SC_DriverSupport import StatusStore
+
+
+def Build():
+    commands = {
+        'Power': {'Status': {}},
+        'Gain': {'Parameters': ['Channel'], 'Status': {}},
+        'Tie': {'Parameters': ['Output', 'Tie Type'], 'Status': {}},
+    }
+    return StatusStore(commands), commands
+
+
+def test_keys_by_number_of_parameters():
+    store, commands = Build()
+    assert store.Key('Power') is None
+    assert store.Key('Power', {'Channel': '1'}) is None
+    assert store.Key('Gain', {'Channel': '1'}) == '1'
+    assert store.Key('Tie', {'Tie Type': 'Video', 'Output': '3'}) == ('3', 'Video')
+    with pytest.raises(KeyError):
+        store.Key('Volume')
+
+
+def test_write_and_read_one_and_several_parameters():
+    store, commands = Build()
+    assert store.Write('Power', 'On')
+    assert store.Write('Gain', -10, {'Channel': '1'})
+    assert store.Write('Tie', '4', {'Output': '3', 'Tie Type': 'Video'})
+    assert store.Read('Power') == 'On'
+    assert store.Read('Gain', {'Channel': '1'}) == -10
+    assert store.Read('Gain', {'Channel': '2'}) is None
+    assert store.Read('Tie', {'Output': '3', 'Tie Type': 'Video'}) == '4'
+    assert store.Read('Tie', {'Output': '3', 'Tie Type': 'Audio'}) is None
+
+
+def test_write_reports_changes_only():
+    store, commands = Build()
+    assert store.Write('Gain', -10, {'Channel': '1'})
+    assert not store.Write('Gain', -10, {'Channel': '1'})
+    assert store.Write('Gain', -12, {'Channel': '1'})
+
+
+def test_first_write_of_none_is_a_change():
+    store, commands = Build()
+    assert store.Write('Tie', None, {'Output': '1', 'Tie Type': 'Audio'})
+    assert not store.Write('Tie', None, {'Output': '1', 'Tie Type': 'Audio'})
+    assert 'Live' in commands['Tie']['Status']['1']['Audio']
+
+
+def test_qualifier_missing_a_parameter():
+    store, commands = Build()
+    qualifier = {'Output': '3'}
+    assert store.Key('Tie', qualifier) is StatusStore.Missing
+    assert not store.Write('Tie', '4', qualifier)
+    assert store.Read('Tie', qualifier) is None
+    assert dict(commands['Tie']['Status']) == {}
+
+
+def test_view_keeps_the_nested_layout():
+    store, commands = Build()
+    store.Write('Power', 'On')
+    store.Write('Gain', -10, {'Channel': '1'})
+    store.Write('Tie', '4', {'Output': '3', 'Tie Type': 'Video'})
+    store.Write('Tie', '5', {'Output': '3', 'Tie Type': 'Audio'})
+    store.Write('Tie', '6', {'Output': '7', 'Tie Type': 'Audio'})
+    assert commands['Power']['Status']['Live'] == 'On'
+    assert commands['Gain']['Status']['1']['Live'] == -10
+    assert '1' in commands['Gain']['Status'] and '2' not in commands['Gain']['Status']
+    status = commands['Tie']['Status']
+    assert sorted(status) == ['3', '7']
+    assert sorted(status['3']) == ['Audio', 'Video']
+    assert status['3']['Video']['Live'] == '4'
+    assert 'Video' not in status['7']
+    with pytest.raises(KeyError):
+        status['8']
+    with pytest.raises(KeyError):
+        status['3']['Video']['Audio']
+
+
+def test_view_is_read_only():
+    store, commands = Build()
+    with pytest.raises(TypeError):
+        commands['Gain']['Status']['1'] = {'Live': -10}
+    assert store.Read('Gain', {'Channel': '1'}) is None
+
+
+def test_driver_first_write_of_none_fires_new_status():
+    device = dtp.SSHClass('192.168.1.10', 22, Credentials=('admin', 'extron'), Model='DTP CrossPoint 108 4K')
+    changes = []
+    device.SubscribeStatus('OutputTieStatusName', {'Output': '1', 'Tie Type': 'Video'},
+                           lambda command, value, qualifier: changes.append(value))
+    device.WriteStatus('OutputTieStatusName', None, {'Output': '1', 'Tie Type': 'Video'})
+    device.WriteStatus('OutputTieStatusName', None, {'Output': '1', 'Tie Type': 'Video'})
+    device.WriteStatus('OutputTieStatusName', 'Laptop', {'Output': '1', 'Tie Type': 'Video'})
+    assert changes == [None, 'Laptop']
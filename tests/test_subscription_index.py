@@ -0,0 +1,98 @@
+"""SubscriptionIndex, the SubscribeStatus registry with wildcard qualifiers."""
+import biam_dsp_TesiraSeries_v1_15_1_0 as tesira
+from SC_DriverSupport import SubscriptionIndex
+
+COMMANDS = {
+    'Power': {'Status': {}},
+    'Level': {'Parameters': ['Instance Tag', 'Channel'], 'Status': {}},
+}
+
+
+def Callback(name):
+    def Called(command, value, qualifier):
+        pass
+    Called.__name__ = name
+    return Called
+
+
+def Names(callbacks):
+    return [callback.__name__ for callback in callbacks]
+
+
+def test_nothing_subscribed():
+    index = SubscriptionIndex(COMMANDS)
+    assert index.Callbacks('Level', {'Instance Tag': 'Level1', 'Channel': '1'}) == ()
+    assert index.Callbacks('Power') == ()
+
+
+def test_exact_qualifier():
+    index = SubscriptionIndex(COMMANDS)
+    index.Add('Level', {'Instance Tag': 'Level1', 'Channel': '1'}, Callback('exact'))
+    assert Names(index.Callbacks('Level', {'Instance Tag': 'Level1', 'Channel': '1'})) == ['exact']
+    assert index.Callbacks('Level', {'Instance Tag': 'Level1', 'Channel': '2'}) == ()
+    assert index.Callbacks('Level', {'Instance Tag': 'Level2', 'Channel': '1'}) == ()
+
+
+def test_command_without_parameters():
+    index = SubscriptionIndex(COMMANDS)
+    index.Add('Power', None, Callback('power'))
+    assert Names(index.Callbacks('Power')) == ['power']
+    assert Names(index.Callbacks('Power', {'Channel': '1'})) == ['power']
+
+
+def test_partial_qualifier_matches_every_value_left_out():
+    index = SubscriptionIndex(COMMANDS)
+    index.Add('Level', {'Instance Tag': 'Level1'}, Callback('tag'))
+    index.Add('Level', {'Instance Tag': None, 'Channel': '2'}, Callback('channel'))
+    assert Names(index.Callbacks('Level', {'Instance Tag': 'Level1', 'Channel': '1'})) == ['tag']
+    assert Names(index.Callbacks('Level', {'Instance Tag': 'Level1', 'Channel': '2'})) == ['tag', 'channel']
+    assert Names(index.Callbacks('Level', {'Instance Tag': 'Level2', 'Channel': '2'})) == ['channel']
+
+
+def test_wildcard_matches_every_status_in_subscription_order():
+    index = SubscriptionIndex(COMMANDS)
+    index.Add('Level', {'Instance Tag': 'Level1', 'Channel': '1'}, Callback('exact'))
+    index.Add('Level', None, Callback('all'))
+    index.Add('Level', {'Instance Tag': 'Level1'}, Callback('tag'))
+    assert Names(index.Callbacks('Level', {'Instance Tag': 'Level1', 'Channel': '1'})) == ['exact', 'all', 'tag']
+    assert Names(index.Callbacks('Level', {'Instance Tag': 'Level9', 'Channel': '4'})) == ['all']
+    assert Names(index.Callbacks('Level')) == ['all']
+
+
+def test_callback_subscribed_twice_is_called_once():
+    index = SubscriptionIndex(COMMANDS)
+    shared = Callback('shared')
+    index.Add('Level', {'Instance Tag': 'Level1', 'Channel': '1'}, shared)
+    index.Add('Level', {'Instance Tag': 'Level1'}, shared)
+    assert index.Callbacks('Level', {'Instance Tag': 'Level1', 'Channel': '1'}) == (shared,)
+
+
+def test_resubscribe_replaces_the_callback_and_keeps_its_place():
+    index = SubscriptionIndex(COMMANDS)
+    index.Add('Level', {'Instance Tag': 'Level1', 'Channel': '1'}, Callback('first'))
+    index.Add('Level', None, Callback('all'))
+    index.Add('Level', {'Channel': '1', 'Instance Tag': 'Level1'}, Callback('second'))
+    assert Names(index.Callbacks('Level', {'Instance Tag': 'Level1', 'Channel': '1'})) == ['second', 'all']
+
+
+def test_add_drops_the_resolved_lists():
+    index = SubscriptionIndex(COMMANDS)
+    index.Add('Level', {'Instance Tag': 'Level1', 'Channel': '1'}, Callback('exact'))
+    qualifier = {'Instance Tag': 'Level1', 'Channel': '1'}
+    assert Names(index.Callbacks('Level', qualifier)) == ['exact']
+    index.Add('Level', {'Instance Tag': 'Level1'}, Callback('tag'))
+    assert Names(index.Callbacks('Level', qualifier)) == ['exact', 'tag']
+    index.Add('Level', {'Instance Tag': 'Level1'}, None)
+    assert Names(index.Callbacks('Level', qualifier)) == ['exact']
+
+
+def test_tesira_partial_subscription_fires_for_every_channel():
+    device = tesira.SSHClass('192.168.1.12', 22, Credentials=('default', ''))
+    changes = []
+    device.SubscribeStatus('MuteControl', {'Instance Tag': 'Mute1'},
+                           lambda command, value, qualifier: changes.append((qualifier['Channel'], value)))
+    device.ReceiveData(device, b'! "publishToken":"MuteControl_Mute1" "value":[true false true]\r\n'
+                               b'! "publishToken":"MuteControl_Mute2" "value":[true true]\r\n')
+    assert changes == [('1', 'On'), ('2', 'Off'), ('3', 'On')]
+    device.ReceiveData(device, b'! "publishToken":"MuteControl_Mute1" "value":[true true true]\r\n')
+    assert changes[3:] == [('2', 'On')]
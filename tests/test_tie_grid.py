@@ -0,0 +1,69 @@
+"""TieGrid, the tie state of the DTP CrossPoint driver."""
+import pytest
+
+import extr_matrix_DTPCrossPoint_86_1084KSeriesv11000 as dtp
+from SC_DriverSupport import TieGrid
+
+
+def test_new_grid_is_untied():
+    grid = TieGrid(3, 2)
+    assert grid.Input(1, 'Audio') == grid.Input(2, 'Video') == 0
+    assert grid.Rows() == [['Untied', 'Untied']] * 3
+
+
+def test_ties_per_plane():
+    grid = TieGrid(4, 3)
+    grid.Tie(2, 1, 'Audio')
+    grid.Tie(3, 1, 'Video')
+    grid.Tie(4, 2, 'Audio/Video')
+    assert (grid.Input(1, 'Audio'), grid.Input(1, 'Video')) == (2, 3)
+    assert grid.State(2, 1) == 'Audio'
+    assert grid.State(3, 1) == 'Video'
+    assert grid.State(4, 2) == 'Audio/Video'
+    assert grid.State(1, 1) == 'Untied'
+
+
+def test_a_tie_replaces_the_input_on_its_plane_only():
+    grid = TieGrid(4, 2)
+    grid.Tie(1, 1, 'Audio/Video')
+    grid.Tie(2, 1, 'Video')
+    assert grid.State(1, 1) == 'Audio'
+    assert grid.State(2, 1) == 'Video'
+    grid.Tie(0, 1, 'Audio')
+    assert grid.State(1, 1) == 'Untied'
+    assert (grid.Input(1, 'Audio'), grid.Input(1, 'Video')) == (0, 2)
+
+
+def test_tie_all_and_clear():
+    grid = TieGrid(4, 3)
+    grid.Tie(1, 2, 'Audio/Video')
+    grid.TieAll(3, 'Video')
+    assert [grid.Input(output, 'Video') for output in (1, 2, 3)] == [3, 3, 3]
+    assert grid.State(1, 2) == 'Audio'
+    grid.TieAll(4, 'Audio/Video')
+    assert grid.Rows()[3] == ['Audio/Video'] * 3
+    grid.Clear()
+    assert grid.Rows() == [['Untied'] * 3] * 4
+
+
+def test_rows_are_per_input():
+    grid = TieGrid(2, 3)
+    grid.Tie(2, 3, 'Audio')
+    grid.Tie(1, 1, 'Video')
+    assert grid.Rows() == [['Video', 'Untied', 'Untied'], ['Untied', 'Untied', 'Audio']]
+
+
+@pytest.mark.parametrize('inputs', [0, 256])
+def test_input_count_must_fit_a_byte(inputs):
+    with pytest.raises(ValueError):
+        TieGrid(inputs, 8)
+
+
+def test_driver_keeps_the_other_plane_of_a_crosspoint():
+    device = dtp.SSHClass('192.168.1.10', 22, Credentials=('admin', 'extron'), Model='DTP CrossPoint 108 4K')
+    device.ReceiveData(device, b'Out03 In02 All\r\n')
+    device.ReceiveData(device, b'In02 Vid\r\n')
+    assert device.matrix_tie_status[1][2] == 'Audio/Video'
+    assert device.ReadStatus('OutputTieStatus', {'Output': '3', 'Tie Type': 'Audio/Video'}) == '2'
+    assert device.ReadStatus('OutputTieStatus', {'Output': '1', 'Tie Type': 'Audio'}) == '0'
+    assert device.ReadStatus('OutputTieStatus', {'Output': '1', 'Tie Type': 'Video'}) == '2'
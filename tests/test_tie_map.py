@@ -0,0 +1,78 @@
+"""TieMap, the sparse tie state of the NAVigator driver, and its reverse index."""
+import extr_sm_NAVigator_v1_0_1_2 as nav
+from SC_DriverSupport import TieMap
+
+
+def test_forward_and_reverse_lookups():
+    ties = TieMap()
+    ties.Tie(5, 1, 'Video')
+    ties.Tie(5, 2, 'Video')
+    ties.Tie(7, 2, 'Audio')
+    assert ties.Input(1, 'Video') == 5
+    assert ties.Input(1, 'Audio') == 0
+    assert ties.Outputs(5, 'Video') == {1, 2}
+    assert ties.Outputs(7, 'Audio') == {2}
+    assert ties.Outputs(9, 'Video') == frozenset()
+
+
+def test_retie_moves_the_output_in_the_reverse_index():
+    ties = TieMap()
+    ties.Tie(5, 1, 'Video')
+    ties.Tie(6, 1, 'Video')
+    assert ties.Outputs(5, 'Video') == frozenset()
+    assert ties.Outputs(6, 'Video') == {1}
+    assert ties.Stats() == {'Audio': {'Outputs': 0, 'Inputs': 0}, 'Video': {'Outputs': 1, 'Inputs': 1}}
+
+
+def test_untie_removes_both_directions():
+    ties = TieMap()
+    ties.Tie(5, 1, 'Audio/Video')
+    ties.Tie(0, 1, 'Audio')
+    assert ties.Input(1, 'Audio') == 0
+    assert ties.Outputs(5, 'Audio') == frozenset()
+    assert ties.Outputs(5, 'Video') == {1}
+    ties.Tie(0, 1, 'Audio/Video')
+    ties.Tie(0, 3, 'Video')         # untying an untied output changes nothing
+    assert ties.Stats() == {'Audio': {'Outputs': 0, 'Inputs': 0}, 'Video': {'Outputs': 0, 'Inputs': 0}}
+
+
+def test_audio_video_outputs_are_tied_on_every_plane():
+    ties = TieMap()
+    ties.Tie(5, 1, 'Audio/Video')
+    ties.Tie(5, 2, 'Video')
+    ties.Tie(5, 3, 'Audio')
+    assert ties.Outputs(5, 'Audio/Video') == {1}
+
+
+def test_returned_outputs_do_not_follow_later_ties():
+    ties = TieMap()
+    ties.Tie(5, 1, 'Video')
+    outputs = ties.Outputs(5, 'Video')
+    ties.Tie(5, 2, 'Video')
+    assert outputs == {1}
+
+
+def test_endpoints_may_be_any_hashable():
+    usb = TieMap(Planes=('USB',))
+    usb.Tie((1, 'Host'), (4, 'Device'), 'USB')
+    usb.Tie((1, 'Host'), (5, 'Device'), 'USB')
+    assert usb.Outputs((1, 'Host'), 'USB') == {(4, 'Device'), (5, 'Device')}
+    assert usb.Input((5, 'Device'), 'USB') == (1, 'Host')
+    usb.Clear()
+    assert usb.Stats() == {'USB': {'Outputs': 0, 'Inputs': 0}}
+
+
+def test_navigator_ties_follow_report_and_individual_ties():
+    device = nav.SPIClass('NAVigator', Model='NAVigator')
+    device.ReceiveData(device, b'Output\t InVid\t InAud\r\n'
+                               b'      1\t    12\t    12\r\n'
+                               b'      2\t    12\t  ----\r\n'
+                               b'      4\t    30\t    12\r\n\r\n')
+    assert device.TiedOutputs(12) == [1, 2]
+    assert device.TiedOutputs(12, 'Audio') == [1, 4]
+    assert device.TiedOutputs(12, 'Audio/Video') == [1]
+    device.ReceiveData(device, b'Out0002 In30 Vid\r\n')
+    assert device.TiedOutputs(12) == [1]
+    assert device.TiedOutputs(30) == [2, 4]
+    assert device.TiedInput(2) == 30
+    assert device.TiedInput(3) == 0